@@ -0,0 +1,46 @@
+"""
+Бэктестинг торговой связки на исторических свечах raw_market_data
+"""
+
+from .engine import BacktestEngine, run_post_model
+from .exchange import SimulatedExchange
+from .inference import ModelRunner
+from .metrics import calculate_metrics
+from .models import (
+    BacktestResult,
+    BacktestSettings,
+    ModelHistory,
+    SignalSeries,
+    SymbolResult,
+    Trade,
+)
+from .signals import generate_signals
+from .sweep import (
+    ParameterSpace,
+    ParameterSweep,
+    SweepResult,
+    SweepSettings,
+    WalkForwardFold,
+    walk_forward_splits,
+)
+
+__all__ = [
+    "BacktestEngine",
+    "BacktestResult",
+    "BacktestSettings",
+    "ModelHistory",
+    "ModelRunner",
+    "ParameterSpace",
+    "ParameterSweep",
+    "SignalSeries",
+    "SimulatedExchange",
+    "SweepResult",
+    "SweepSettings",
+    "SymbolResult",
+    "Trade",
+    "WalkForwardFold",
+    "calculate_metrics",
+    "generate_signals",
+    "run_post_model",
+    "walk_forward_splits",
+]
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Бэктест торговой связки: признаки -> PatchTST -> фильтрация -> SL/TP
+
+Этапы для каждого символа:
+1. create_features один раз по всей истории и батчевый инференс (ModelRunner)
+   - дорогой этап, результат (ModelHistory) можно сохранить и переиспользовать;
+2. фильтрация сигналов SignalQualityAnalyzer и симуляция исполнения с
+   SL/TP/частичными TP (run_post_model) - дешевый этап.
+
+Символы независимы (капитал не реинвестируется), поэтому шардируются по
+процессам: каждый процесс один раз загружает модель в initializer, свечи
+передаются через shared memory (pack_frame), обратно возвращаются только
+массивы результата.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import asdict, fields
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from core.logger import setup_logger
+from ml.logic.feature_executor import SharedFrameSpec, pack_frame, unpack_frame
+from ml.logic.signal_quality_analyzer import SignalQualityAnalyzer
+
+from .exchange import SimulatedExchange
+from .inference import ModelRunner, prepare_candles
+from .metrics import calculate_metrics, equity_curve
+from .models import BacktestResult, BacktestSettings, ModelHistory, SymbolResult, Trade
+from .signals import generate_signals
+
+logger = setup_logger(__name__)
+
+# Логгеры, пишущие INFO на каждый сигнал/перенос SL - в бэктесте только WARNING
+QUIET_LOGGERS = (
+    "ml.logic.signal_quality_analyzer",
+    "enhanced_sltp_manager",
+    "sltp_tick_engine",
+    "ProductionFeatureEngineer",
+)
+
+
+@contextmanager
+def quiet_loggers(names: Iterable[str] = QUIET_LOGGERS):
+    """Временно поднимает уровень шумных логгеров до WARNING"""
+    loggers = [logging.getLogger(name) for name in names]
+    levels = [item.level for item in loggers]
+    for item in loggers:
+        item.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        for item, level in zip(loggers, levels, strict=True):
+            item.setLevel(level)
+
+
+def run_post_model(
+    history: ModelHistory, config: dict[str, Any], settings: BacktestSettings | None = None
+) -> SymbolResult:
+    """
+    Фильтрация сигналов и симуляция по готовым выходам модели
+
+    Args:
+        history: Свечи и выходы модели символа
+        config: Конфигурация (signal_filtering, enhanced_sltp)
+        settings: Параметры симуляции (по умолчанию из config)
+    """
+    settings = settings or BacktestSettings.from_config(config)
+    started = time.perf_counter()
+    with quiet_loggers():
+        signals = generate_signals(history.outputs, SignalQualityAnalyzer(config))
+        signals_done = time.perf_counter()
+        result = SimulatedExchange(settings, config).run(history, signals)
+    result.timings = {
+        **history.timings,
+        "signals": signals_done - started,
+        "simulation": time.perf_counter() - signals_done,
+    }
+    return result
+
+
+# =================== ВОРКЕРЫ ===================
+
+# Состояние процесса-воркера: модель загружается один раз на процесс
+_worker_runner: ModelRunner | None = None
+_worker_config: dict[str, Any] | None = None
+
+
+def _init_worker(config: dict[str, Any]) -> None:
+    global _worker_runner, _worker_config
+    _worker_config = config
+    with quiet_loggers():
+        # Процесс пула без event loop - модель загружается в собственном loop
+        _worker_runner = asyncio.run(
+            ModelRunner.create(config, BacktestSettings.from_config(config))
+        )
+
+
+def _load_shared(spec: SharedFrameSpec) -> pd.DataFrame:
+    shm = shared_memory.SharedMemory(name=spec.shm_name)
+    try:
+        return unpack_frame(shm.buf, spec)
+    finally:
+        shm.close()
+
+
+def _worker_history(spec: SharedFrameSpec, symbol: str) -> ModelHistory:
+    with quiet_loggers():
+        return _worker_runner.history(_load_shared(spec), symbol)
+
+
+def _worker_backtest(
+    spec: SharedFrameSpec, symbol: str, keep_history: bool
+) -> tuple[ModelHistory | None, SymbolResult]:
+    history = _worker_history(spec, symbol)
+    result = run_post_model(history, _worker_config)
+    return (history if keep_history else None), result
+
+
+class BacktestEngine:
+    """
+    Бэктест по историческим свечам с шардированием символов по процессам
+
+    Для прогона в текущем процессе (один воркер) модель загружается заранее
+    через `await initialize()`.
+
+    Args:
+        config: Полная конфигурация системы (ml, backtesting, enhanced_sltp, ...)
+        settings: Параметры симуляции (по умолчанию из config)
+    """
+
+    def __init__(self, config: dict[str, Any], settings: BacktestSettings | None = None):
+        self.config = config
+        self.settings = settings or BacktestSettings.from_config(config)
+        self._runner: ModelRunner | None = None
+
+    def _worker_count(self, tasks: int) -> int:
+        workers = self.settings.max_workers or min(8, os.cpu_count() or 1)
+        return max(1, min(int(workers), tasks))
+
+    async def initialize(self) -> None:
+        """Загружает модель для прогона в текущем процессе (один воркер)"""
+        if self._runner is None:
+            with quiet_loggers():
+                self._runner = await ModelRunner.create(self.config, self.settings)
+
+    def _inline_runner(self) -> ModelRunner:
+        if self._runner is None:
+            raise RuntimeError("Модель не загружена: вызовите await BacktestEngine.initialize()")
+        return self._runner
+
+    def _map(
+        self,
+        candles: dict[str, pd.DataFrame],
+        inline: Callable[[pd.DataFrame, str], Any],
+        worker: Callable[..., Any],
+        *args: Any,
+    ) -> tuple[dict[str, Any], dict[str, str]]:
+        """Выполняет задачу по каждому символу (inline или в пуле процессов)"""
+        # Длинные истории первыми - меньше простоя в конце
+        symbols = sorted(candles, key=lambda symbol: len(candles[symbol]), reverse=True)
+        results: dict[str, Any] = {}
+        failed: dict[str, str] = {}
+        workers = self._worker_count(len(symbols))
+
+        if workers == 1:
+            # Без загруженной модели - одна ошибка, а не отказ каждого символа
+            if symbols:
+                self._inline_runner()
+            for symbol in symbols:
+                try:
+                    results[symbol] = inline(candles[symbol], symbol)
+                except Exception as e:
+                    logger.error(f"Бэктест {symbol} завершился ошибкой: {e}")
+                    failed[symbol] = str(e)
+            return results, failed
+
+        segments = []
+        pool: Executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self.config,)
+        )
+        try:
+            futures = {}
+            for symbol in symbols:
+                shm, spec = pack_frame(prepare_candles(candles[symbol], symbol))
+                segments.append(shm)
+                futures[pool.submit(worker, spec, symbol, *args)] = symbol
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    results[symbol] = future.result()
+                except Exception as e:
+                    logger.error(f"Бэктест {symbol} завершился ошибкой: {e}")
+                    failed[symbol] = str(e)
+        finally:
+            pool.shutdown()
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+        return results, failed
+
+    def precompute(self, candles: dict[str, pd.DataFrame]) -> dict[str, ModelHistory]:
+        """Дорогой этап: признаки и выходы модели по каждому символу"""
+
+        def inline(df: pd.DataFrame, symbol: str) -> ModelHistory:
+            with quiet_loggers():
+                return self._inline_runner().history(df, symbol)
+
+        histories, failed = self._map(candles, inline, _worker_history)
+        for symbol, error in failed.items():
+            logger.warning(f"Символ {symbol} пропущен: {error}")
+        return histories
+
+    def run(self, candles: dict[str, pd.DataFrame], keep_histories: bool = False) -> BacktestResult:
+        """
+        Полный прогон: признаки, инференс, фильтрация и симуляция
+
+        Args:
+            candles: {symbol: OHLCV DataFrame} (индекс или колонка datetime)
+            keep_histories: Вернуть выходы модели для повторных прогонов simulate()
+        """
+        started = time.perf_counter()
+
+        def inline(df: pd.DataFrame, symbol: str) -> tuple[ModelHistory, SymbolResult]:
+            with quiet_loggers():
+                history = self._inline_runner().history(df, symbol)
+            return history, run_post_model(history, self.config, self.settings)
+
+        outputs, failed = self._map(candles, inline, _worker_backtest, keep_histories)
+        histories = {
+            symbol: history
+            for symbol, (history, _) in outputs.items()
+            if keep_histories and history is not None
+        }
+        results = {symbol: result for symbol, (_, result) in outputs.items()}
+        return self._collect(results, histories, failed, started)
+
+    def simulate(
+        self, histories: dict[str, ModelHistory], config: dict[str, Any] | None = None
+    ) -> BacktestResult:
+        """
+        Дешевый этап по сохраненным выходам модели
+
+        Args:
+            histories: Результат precompute() или run(keep_histories=True)
+            config: Конфигурация фильтрации и SL/TP (по умолчанию конфигурация движка)
+        """
+        started = time.perf_counter()
+        settings = self.settings if config is None else BacktestSettings.from_config(config)
+        config = config or self.config
+        results = {
+            symbol: run_post_model(history, config, settings)
+            for symbol, history in histories.items()
+        }
+        return self._collect(results, histories, {}, started, settings)
+
+    def _collect(
+        self,
+        results: dict[str, SymbolResult],
+        histories: dict[str, ModelHistory],
+        failed: dict[str, str],
+        started: float,
+        settings: BacktestSettings | None = None,
+    ) -> BacktestResult:
+        settings = settings or self.settings
+        if not results:
+            raise RuntimeError(f"Нет результатов бэктеста: {failed or 'нет данных'}")
+
+        pnl = pd.concat(
+            [
+                pd.Series(result.pnl, index=pd.DatetimeIndex(result.timestamps, tz="UTC"))
+                for result in results.values()
+            ]
+        )
+        pnl = pnl.groupby(level=0).sum()
+        equity = equity_curve(pnl, settings.initial_capital)
+
+        trades = pd.DataFrame(
+            [asdict(trade) for result in results.values() for trade in result.trades],
+            columns=[field.name for field in fields(Trade)],
+        )
+        metrics = calculate_metrics(
+            equity,
+            trades["pnl"].to_numpy(),
+            settings.initial_capital,
+            settings.periods_per_year,
+            settings.metrics or None,
+        )
+
+        symbols = {}
+        timings: dict[str, float] = {}
+        for symbol, result in sorted(results.items()):
+            symbol_pnl = np.array([trade.pnl for trade in result.trades])
+            symbols[symbol] = {
+                "candles": len(result.pnl),
+                "signals": result.signals,
+                "trades": len(result.trades),
+                "pnl": float(symbol_pnl.sum()),
+                "win_rate": float((symbol_pnl > 0).mean()) if len(symbol_pnl) else 0.0,
+            }
+            for stage, seconds in result.timings.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+        timings["wall"] = time.perf_counter() - started
+
+        logger.info(
+            f"Бэктест: {len(results)} символов, {metrics['total_trades']} сделок, "
+            f"доходность {metrics.get('total_return', 0.0):.2%}, за {timings['wall']:.1f}s"
+        )
+        return BacktestResult(
+            metrics=metrics,
+            equity=equity,
+            trades=trades,
+            symbols=symbols,
+            histories=histories,
+            failed=failed,
+            timings=timings,
+        )
+
+    # =================== ДАННЫЕ ===================
+
+    async def load_candles(
+        self,
+        symbols: list[str],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        exchange: str = "bybit",
+        loader: Any = None,
+    ) -> dict[str, pd.DataFrame]:
+        """Загружает свечи raw_market_data колоночным загрузчиком"""
+        if loader is None:
+            from data.ohlcv_loader import OHLCVColumnarLoader
+
+            loader = OHLCVColumnarLoader()
+        return await loader.load_many(
+            symbols,
+            exchange=exchange,
+            interval_minutes=self.settings.interval_minutes,
+            start=start,
+            end=end,
+        )
+
+    async def run_from_db(
+        self,
+        symbols: list[str],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        exchange: str = "bybit",
+        loader: Any = None,
+    ) -> BacktestResult:
+        """Загрузка свечей из БД и прогон вне event loop"""
+        candles = await self.load_candles(symbols, start, end, exchange, loader)
+        if not candles:
+            raise RuntimeError(f"Нет свечей для {symbols}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run, candles)
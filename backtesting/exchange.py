@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Симулированная биржа: исполнение сигналов и SL/TP по свечам
+
+Сигнал свечи t исполняется по открытию свечи t+1. Открытая позиция на
+каждой свече проверяется на SL/TP по high/low (при срабатывании обоих на
+одной свече первым считается SL), затем TickSLTPEngine пересчитывает
+трейлинг, защиту прибыли и частичные TP по цене закрытия - той же
+векторной логикой и конфигурацией EnhancedSLTPManager, что и в торговле.
+
+Капитал не реинвестируется: размер позиции считается от initial_capital,
+поэтому символы симулируются независимо и могут идти в разных процессах.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from trading.sltp.enhanced_manager import EnhancedSLTPManager, normalize_percentage
+from trading.sltp.tick_engine import TickSLTPEngine
+
+from .models import BacktestSettings, ModelHistory, SignalSeries, SymbolResult, Trade
+
+# Смещение SL после частичного TP (как в _update_sl_after_partial_tp)
+PARTIAL_BREAKEVEN_OFFSET = 0.001
+
+
+class StaticConfigSource:
+    """Источник конфигурации для EnhancedSLTPManager из словаря"""
+
+    def __init__(self, config: dict[str, Any]):
+        self._config = config
+
+    def get_system_config(self) -> dict[str, Any]:
+        return self._config
+
+
+@dataclass
+class SimPosition:
+    """Открытая позиция симуляции (интерфейс позиции для TickSLTPEngine)"""
+
+    id: str
+    symbol: str
+    side: str
+    size: float
+    entry_price: float
+    stop_loss: float
+    take_profit: float
+    opened_index: int
+    initial_size: float
+    fees: float = 0.0
+    realized: float = 0.0
+    partial_fills: int = 0
+
+    @property
+    def sign(self) -> int:
+        return 1 if self.side == "Buy" else -1
+
+
+class SimulatedExchange:
+    """
+    Исполнение сигналов одного символа с комиссией и проскальзыванием
+
+    Args:
+        settings: Параметры симуляции
+        config: Конфигурация системы (секции enhanced_sltp)
+    """
+
+    def __init__(self, settings: BacktestSettings, config: dict[str, Any]):
+        self.settings = settings
+        self.manager = EnhancedSLTPManager(config_manager=StaticConfigSource(config))
+        tick_config = (config.get("enhanced_sltp", {}) or {}).get("tick_engine", {}) or {}
+        # Окна объединения не действуют на свечах - только порог переноса SL
+        self.sltp = TickSLTPEngine(
+            self.manager,
+            debounce=0,
+            min_amend_interval=0,
+            min_move_percent=float(tick_config.get("min_move_percent", 0.05)),
+        )
+        self._partial_levels = sorted(
+            (normalize_percentage(level.percentage), level.close_ratio)
+            for level in self.manager.config.partial_tp_levels
+        )
+
+    def position_size(self, price: float, stop_loss_pct: float) -> float:
+        """Размер позиции: риск risk_per_trade до SL, не больше max_position_size маржи"""
+        capital = self.settings.initial_capital
+        notional = capital * self.settings.risk_per_trade / stop_loss_pct
+        notional = min(notional, capital * self.settings.max_position_size * self.settings.leverage)
+        return notional / price
+
+    def _fill_price(self, price: float, sign: int) -> float:
+        # Рыночное исполнение хуже цены на slippage в сторону сделки
+        return price * (1 + sign * self.settings.slippage)
+
+    def _fee(self, qty: float, price: float) -> float:
+        return qty * price * self.settings.commission
+
+    def run(self, history: ModelHistory, signals: SignalSeries) -> SymbolResult:
+        """Прогоняет сигналы по свечам истории"""
+        symbol = history.symbol
+        n = len(history)
+        open_, high, low, close = history.open, history.high, history.low, history.close
+        pnl = np.zeros(n)
+        trades: list[Trade] = []
+        entries = np.flatnonzero(signals.side)
+
+        i = 0
+        while True:
+            k = np.searchsorted(entries, i)
+            if k >= len(entries) or entries[k] >= n - 1:
+                break
+            signal_index = entries[k]
+            t = signal_index + 1
+            sign = int(signals.side[signal_index])
+            position = self._open(history, signals, signal_index, t, sign)
+            pnl[t] -= position.fees
+            mark = position.entry_price
+
+            closed = False
+            for b in range(t, n):
+                exit_price, reason = self._check_exit(position, open_[b], high[b], low[b])
+                if exit_price is not None:
+                    pnl[b] += self._close(position, exit_price, mark, b, history, trades, reason)
+                    closed = True
+                    break
+
+                pnl[b] += position.size * sign * (close[b] - mark)
+                mark = close[b]
+                pnl[b] += self._evaluate(position, close[b])
+
+            if not closed:
+                # Конец истории - позиция закрывается по последней цене
+                pnl[n - 1] += self._close(
+                    position, close[n - 1], mark, n - 1, history, trades, "end_of_data"
+                )
+                break
+            i = b
+
+        return SymbolResult(
+            symbol=symbol,
+            timestamps=history.timestamps,
+            pnl=pnl,
+            trades=trades,
+            signals=signals.count,
+            sltp_stats=self.sltp.get_stats(),
+        )
+
+    def _open(
+        self, history: ModelHistory, signals: SignalSeries, signal_index: int, t: int, sign: int
+    ) -> SimPosition:
+        entry = self._fill_price(history.open[t], sign)
+        sl_pct = float(signals.stop_loss_pct[signal_index])
+        tp_pct = float(signals.take_profit_pct[signal_index])
+        size = self.position_size(entry, sl_pct)
+        position = SimPosition(
+            id=f"{history.symbol}-{t}",
+            symbol=history.symbol,
+            side="Buy" if sign > 0 else "Sell",
+            size=size,
+            entry_price=entry,
+            stop_loss=entry * (1 - sign * sl_pct),
+            take_profit=entry * (1 + sign * tp_pct),
+            opened_index=t,
+            initial_size=size,
+        )
+        position.fees = self._fee(size, entry)
+        position.realized = -position.fees
+        self.sltp.sync_positions([position])
+        return position
+
+    def _check_exit(
+        self, position: SimPosition, open_: float, high: float, low: float
+    ) -> tuple[float | None, str]:
+        """Срабатывание SL/TP на свече; гэп за уровень исполняется по открытию"""
+        sl, tp = position.stop_loss, position.take_profit
+        if position.sign > 0:
+            if low <= sl:
+                return min(open_, sl), "stop_loss"
+            if high >= tp:
+                return max(open_, tp), "take_profit"
+        else:
+            if high >= sl:
+                return max(open_, sl), "stop_loss"
+            if low <= tp:
+                return min(open_, tp), "take_profit"
+        return None, ""
+
+    def _evaluate(self, position: SimPosition, price: float) -> float:
+        """Трейлинг, защита прибыли и частичный TP на закрытии свечи; возвращает PnL свечи"""
+        amendments, partial_hits = self.sltp.evaluate(position.symbol, price)
+        for amendment in amendments:
+            if position.sign * (amendment.price - position.stop_loss) > 0:
+                position.stop_loss = amendment.price
+        if not partial_hits:
+            return 0.0
+
+        sign = position.sign
+        profit = (price - position.entry_price) / position.entry_price * 100 * sign
+        # Уровни отсортированы по проценту - уже исполненные идут первыми
+        crossed = [ratio for level, ratio in self._partial_levels if profit >= level and ratio > 0][
+            position.partial_fills :
+        ]
+        result = 0.0
+        for ratio in crossed:
+            qty = position.size * ratio
+            fill = self._fill_price(price, -sign)
+            fee = self._fee(qty, fill)
+            # Позиция уже переоценена по price
+            result += qty * sign * (fill - price) - fee
+            position.realized += qty * sign * (fill - position.entry_price) - fee
+            position.fees += fee
+            position.size -= qty
+            position.partial_fills += 1
+
+        if crossed and self.manager.config.partial_tp_update_sl:
+            breakeven = position.entry_price * (1 + sign * PARTIAL_BREAKEVEN_OFFSET)
+            if sign * (breakeven - position.stop_loss) > 0:
+                position.stop_loss = breakeven
+                self.sltp.sync_positions([position])
+        return result
+
+    def _close(
+        self,
+        position: SimPosition,
+        price: float,
+        mark: float,
+        index: int,
+        history: ModelHistory,
+        trades: list[Trade],
+        reason: str,
+    ) -> float:
+        """Закрывает остаток позиции; возвращает PnL свечи относительно mark"""
+        sign = position.sign
+        fill = self._fill_price(price, -sign)
+        fee = self._fee(position.size, fill)
+        position.realized += position.size * sign * (fill - position.entry_price) - fee
+        position.fees += fee
+        trades.append(
+            Trade(
+                symbol=position.symbol,
+                side=position.side,
+                entry_time=history.timestamps[position.opened_index],
+                exit_time=history.timestamps[index],
+                entry_price=position.entry_price,
+                exit_price=fill,
+                size=position.initial_size,
+                pnl=position.realized,
+                fees=position.fees,
+                exit_reason=reason,
+                partial_fills=position.partial_fills,
+                bars_held=index - position.opened_index + 1,
+            )
+        )
+        self.sltp.sync_positions([])
+        return position.size * sign * (fill - mark) - fee
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Признаки и инференс по всей истории символа
+
+Вместо расчета признаков на каждом шаге (как в торговле) create_features
+вызывается один раз для всей истории, матрица признаков нормализуется
+целиком, а окна context_length - это представления sliding_window_view
+без копирования, которые уходят в модель батчами по batch_size.
+
+Модель, scaler и FeatureEngineer загружаются тем же PatchTSTAdapter, что и
+в торговле (ModelAdapterFactory.create_from_config).
+"""
+
+import time
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import torch
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core.logger import setup_logger
+from ml.adapters.factory import ModelAdapterFactory
+from ml.realtime_indicator_calculator import select_model_features
+
+from .models import BacktestSettings, ModelHistory
+
+logger = setup_logger(__name__)
+
+
+def prepare_candles(candles: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    """Приводит OHLCV (индекс или колонка datetime) к входу create_features"""
+    df = candles.reset_index() if "datetime" not in candles.columns else candles.copy()
+    if "turnover" not in df.columns:
+        df["turnover"] = df["close"] * df["volume"]
+    df["symbol"] = symbol
+    return df.sort_values("datetime").reset_index(drop=True)
+
+
+class ModelRunner:
+    """
+    Батчевый инференс модели по истории символа
+
+    Модель загружается в `initialize()` (или сразу через `create()`).
+
+    Args:
+        config: Полная конфигурация системы (секция ml)
+        settings: Параметры бэктеста (устройство, batch_size, потоки)
+    """
+
+    def __init__(self, config: dict[str, Any], settings: BacktestSettings):
+        adapter = ModelAdapterFactory.create_from_config(config)
+        if adapter is None:
+            raise ValueError("ML модель отключена в конфигурации")
+
+        # torch.compile с max-autotune компилируется дольше короткого прогона
+        adapter.use_torch_compile = False
+        adapter.device = torch.device(settings.device)
+        adapter.inference_threads = settings.inference_threads
+        adapter.max_batch_size = settings.batch_size
+
+        self.adapter = adapter
+        self.batch_size = settings.batch_size
+
+    @classmethod
+    async def create(cls, config: dict[str, Any], settings: BacktestSettings) -> "ModelRunner":
+        """Создает раннер и загружает модель"""
+        runner = cls(config, settings)
+        await runner.initialize()
+        return runner
+
+    async def initialize(self) -> None:
+        """Загружает модель, scaler и FeatureEngineer адаптера"""
+        await self.adapter.initialize()
+        self.adapter.feature_engineer.disable_progress = True
+
+    def features(self, candles: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        """Признаки для всей истории одним вызовом create_features"""
+        df = prepare_candles(candles, symbol)
+        return self.adapter.feature_engineer.create_features(df, use_enhanced_features=True)
+
+    def feature_matrix(self, features: pd.DataFrame) -> np.ndarray:
+        """Нормализованная матрица (N, num_features) в порядке признаков торговли"""
+        num_features = self.adapter.num_features
+        matrix = features[select_model_features(features.columns.tolist(), num_features)]
+        matrix = matrix.to_numpy(dtype=np.float64)
+        if matrix.shape[1] < num_features:
+            padding = np.zeros((len(matrix), num_features - matrix.shape[1]))
+            matrix = np.hstack([matrix, padding])
+        # Scaler построчный - нормализация всей истории совпадает с поокон
+        return self.adapter.scaler.transform(matrix).astype(np.float32)
+
+    def predict(self, matrix: np.ndarray) -> np.ndarray:
+        """Выходы модели для всех окон: (N - context_length + 1, 20)"""
+        context = self.adapter.context_length
+        if len(matrix) < context:
+            return np.empty((0, self.adapter.num_targets), dtype=np.float32)
+
+        # (окна, признаки, context) -> (окна, context, признаки) без копирования
+        windows = sliding_window_view(matrix, context, axis=0).transpose(0, 2, 1)
+        outputs = np.empty((len(windows), self.adapter.num_targets), dtype=np.float32)
+        for start in range(0, len(windows), self.batch_size):
+            batch = np.ascontiguousarray(windows[start : start + self.batch_size])
+            outputs[start : start + len(batch)] = self.adapter._forward_batch(batch)
+        return outputs
+
+    def history(self, candles: pd.DataFrame, symbol: str) -> ModelHistory:
+        """Свечи и выходы модели, выровненные по свече предсказания"""
+        started = time.perf_counter()
+        features = self.features(candles, symbol)
+        matrix = self.feature_matrix(features)
+        features_done = time.perf_counter()
+        outputs = self.predict(matrix)
+        inference_done = time.perf_counter()
+
+        # Первое предсказание - на свече, закрывающей первое полное окно
+        aligned = features.iloc[len(features) - len(outputs) :]
+        timestamps = pd.to_datetime(aligned["datetime"], utc=True)
+        history = ModelHistory(
+            symbol=symbol,
+            timestamps=timestamps.dt.tz_localize(None).to_numpy("datetime64[ns]"),
+            open=aligned["open"].to_numpy(dtype=np.float64),
+            high=aligned["high"].to_numpy(dtype=np.float64),
+            low=aligned["low"].to_numpy(dtype=np.float64),
+            close=aligned["close"].to_numpy(dtype=np.float64),
+            outputs=outputs,
+            timings={
+                "features": features_done - started,
+                "inference": inference_done - features_done,
+            },
+        )
+        logger.info(
+            f"{symbol}: {len(history)} предсказаний, признаки {history.timings['features']:.1f}s, "
+            f"инференс {history.timings['inference']:.1f}s"
+        )
+        return history
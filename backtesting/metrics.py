@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Метрики бэктеста (список по умолчанию - backtesting.metrics в config.yaml)
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_METRICS = (
+    "total_return",
+    "sharpe_ratio",
+    "max_drawdown",
+    "win_rate",
+    "profit_factor",
+    "expectancy",
+    "calmar_ratio",
+)
+
+
+def equity_curve(pnl: pd.Series, initial_capital: float) -> pd.Series:
+    """Капитал после каждой свечи по суммарному PnL символов"""
+    return initial_capital + pnl.sort_index().cumsum()
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """Максимальная просадка (доля от пика, положительное число)"""
+    if len(equity) == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(equity)
+    return float(np.max(1 - equity / peaks))
+
+
+def calculate_metrics(
+    equity: pd.Series,
+    trade_pnl: np.ndarray,
+    initial_capital: float,
+    periods_per_year: float,
+    names: Sequence[str] | None = None,
+) -> dict[str, float]:
+    """
+    Рассчитывает метрики по кривой капитала и PnL сделок
+
+    Args:
+        equity: Капитал после каждой свечи
+        trade_pnl: PnL закрытых сделок с учетом комиссий
+        initial_capital: Капитал до первой свечи
+        periods_per_year: Свечей в году (для годовой нормировки)
+        names: Метрики (по умолчанию DEFAULT_METRICS)
+    """
+    values = np.concatenate([[initial_capital], np.asarray(equity, dtype=float)])
+    returns = np.diff(values) / values[:-1]
+    total_return = values[-1] / initial_capital - 1
+    drawdown = max_drawdown(values)
+
+    years = len(returns) / periods_per_year if periods_per_year else 0.0
+    if years > 0 and total_return > -1:
+        annual_return = (1 + total_return) ** (1 / years) - 1
+    else:
+        annual_return = 0.0
+
+    std = returns.std() if len(returns) > 1 else 0.0
+    sharpe = returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0
+
+    trade_pnl = np.asarray(trade_pnl, dtype=float)
+    gross_profit = trade_pnl[trade_pnl > 0].sum()
+    gross_loss = -trade_pnl[trade_pnl < 0].sum()
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = float("inf") if gross_profit > 0 else 0.0
+
+    metrics = {
+        "total_return": float(total_return),
+        "annual_return": float(annual_return),
+        "sharpe_ratio": float(sharpe),
+        "max_drawdown": drawdown,
+        "win_rate": float((trade_pnl > 0).mean()) if len(trade_pnl) else 0.0,
+        "profit_factor": float(profit_factor),
+        "expectancy": float(trade_pnl.mean()) if len(trade_pnl) else 0.0,
+        "calmar_ratio": float(annual_return / drawdown) if drawdown > 0 else 0.0,
+        "total_trades": len(trade_pnl),
+    }
+    selected = [*(names or DEFAULT_METRICS), "total_trades"]
+    return {name: metrics[name] for name in dict.fromkeys(selected) if name in metrics}
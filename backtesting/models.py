@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Структуры данных бэктестера
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Минут в году - для годовой нормировки метрик
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+@dataclass
+class BacktestSettings:
+    """
+    Параметры симуляции
+
+    Значения по умолчанию берутся из секций backtesting и risk_management
+    конфигурации (см. from_config).
+    """
+
+    initial_capital: float = 100000.0
+    commission: float = 0.001  # Комиссия с объема каждого исполнения
+    slippage: float = 0.0005  # Проскальзывание рыночных исполнений (доля цены)
+    risk_per_trade: float = 0.02  # Риск на сделку от капитала (до SL)
+    max_position_size: float = 0.1  # Максимальная маржа позиции от капитала
+    leverage: float = 5.0
+    interval_minutes: int = 15
+    batch_size: int = 512  # Окон на один forward pass
+    max_workers: int | None = None  # Процессов (None - по числу ядер)
+    device: str = "cpu"
+    inference_threads: int = 1  # Потоков torch на процесс
+    metrics: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "BacktestSettings":
+        backtesting = config.get("backtesting", {}) or {}
+        risk = config.get("risk_management", {}) or {}
+        position = risk.get("position", {}) or {}
+        defaults = cls()
+        return cls(
+            initial_capital=float(backtesting.get("initial_capital", defaults.initial_capital)),
+            commission=float(backtesting.get("commission", defaults.commission)),
+            slippage=float(backtesting.get("slippage", defaults.slippage)),
+            risk_per_trade=float(
+                backtesting.get(
+                    "risk_per_trade", risk.get("risk_per_trade", defaults.risk_per_trade)
+                )
+            ),
+            max_position_size=float(
+                backtesting.get(
+                    "max_position_size",
+                    position.get("max_position_size", defaults.max_position_size),
+                )
+            ),
+            leverage=float(
+                backtesting.get("leverage", risk.get("default_leverage", defaults.leverage))
+            ),
+            interval_minutes=int(backtesting.get("interval_minutes", defaults.interval_minutes)),
+            batch_size=int(backtesting.get("batch_size", defaults.batch_size)),
+            max_workers=backtesting.get("max_workers"),
+            device=backtesting.get("device", defaults.device),
+            inference_threads=int(backtesting.get("inference_threads", defaults.inference_threads)),
+            metrics=list(backtesting.get("metrics", [])),
+        )
+
+    @property
+    def periods_per_year(self) -> float:
+        return MINUTES_PER_YEAR / self.interval_minutes
+
+
+@dataclass
+class ModelHistory:
+    """
+    Выходы модели по всей истории символа
+
+    Строка i - свеча, на закрытии которой построено предсказание outputs[i]
+    по окну из context_length свечей, заканчивающемуся этой свечой.
+    """
+
+    symbol: str
+    timestamps: np.ndarray  # datetime64[ns], UTC
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    outputs: np.ndarray  # (N, 20) сырые выходы модели
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def save(self, path: str | Path) -> None:
+        """Сохраняет выходы модели в .npz для повторных прогонов без инференса"""
+        np.savez(
+            path,
+            symbol=np.array(self.symbol),
+            timestamps=self.timestamps.astype("datetime64[ns]"),
+            open=self.open,
+            high=self.high,
+            low=self.low,
+            close=self.close,
+            outputs=self.outputs,
+            timings=np.array(json.dumps(self.timings)),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ModelHistory":
+        with np.load(path) as data:
+            return cls(
+                symbol=str(data["symbol"]),
+                timestamps=data["timestamps"],
+                open=data["open"],
+                high=data["high"],
+                low=data["low"],
+                close=data["close"],
+                outputs=data["outputs"],
+                timings=json.loads(str(data["timings"])),
+            )
+
+
+@dataclass
+class SignalSeries:
+    """Сигналы после фильтрации SignalQualityAnalyzer"""
+
+    side: np.ndarray  # 1 - LONG, -1 - SHORT, 0 - нет сигнала
+    stop_loss_pct: np.ndarray  # доля цены, NaN без сигнала
+    take_profit_pct: np.ndarray
+    quality_score: np.ndarray
+
+    @property
+    def count(self) -> int:
+        return int(np.count_nonzero(self.side))
+
+
+@dataclass
+class Trade:
+    """Закрытая сделка симуляции"""
+
+    symbol: str
+    side: str
+    entry_time: np.datetime64
+    exit_time: np.datetime64
+    entry_price: float
+    exit_price: float
+    size: float
+    pnl: float  # с учетом комиссий
+    fees: float
+    exit_reason: str
+    partial_fills: int
+    bars_held: int
+
+
+@dataclass
+class SymbolResult:
+    """Результат симуляции одного символа"""
+
+    symbol: str
+    timestamps: np.ndarray
+    pnl: np.ndarray  # изменение капитала на каждой свече (с переоценкой позиции)
+    trades: list[Trade]
+    signals: int
+    sltp_stats: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class BacktestResult:
+    """Итог бэктеста по всем символам"""
+
+    metrics: dict[str, float]
+    equity: pd.Series  # капитал после каждой свечи (UTC)
+    trades: pd.DataFrame
+    symbols: dict[str, dict[str, Any]]
+    histories: dict[str, ModelHistory] = field(default_factory=dict)
+    failed: dict[str, str] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
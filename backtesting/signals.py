@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Сигналы из выходов модели по всей истории
+
+Softmax и направления по таймфреймам считаются векторно для всех свечей,
+решение о сделке принимает тот же SignalQualityAnalyzer, что и в
+PatchTSTAdapter.interpret_outputs, а SL/TP считаются общей функцией
+signal_sltp_percent.
+"""
+
+import numpy as np
+
+from ml.adapters.patchtst import signal_sltp_percent
+from ml.logic.signal_quality_analyzer import SignalQualityAnalyzer
+
+from .models import SignalSeries
+
+# Веса таймфреймов для weighted_direction (как в interpret_outputs)
+DIRECTION_WEIGHTS = np.array([0.4, 0.3, 0.2, 0.1])
+NEUTRAL_CLASS = 2
+SIDES = {"LONG": 1, "SHORT": -1}
+
+
+def direction_probabilities(outputs: np.ndarray) -> np.ndarray:
+    """Softmax логитов направления: (N, 20) -> (N, 4 таймфрейма, 3 класса)"""
+    logits = outputs[:, 4:16].reshape(-1, 4, 3).astype(np.float64)
+    exp_logits = np.exp(logits - logits.max(axis=2, keepdims=True))
+    return exp_logits / exp_logits.sum(axis=2, keepdims=True)
+
+
+def generate_signals(outputs: np.ndarray, analyzer: SignalQualityAnalyzer) -> SignalSeries:
+    """
+    Фильтрует выходы модели через SignalQualityAnalyzer
+
+    Свечи, где все таймфреймы предсказывают NEUTRAL, анализатор всегда
+    отклоняет (тип сигнала NEUTRAL) - они пропускаются без вызова.
+    """
+    n = len(outputs)
+    side = np.zeros(n, dtype=np.int8)
+    stop_loss_pct = np.full(n, np.nan)
+    take_profit_pct = np.full(n, np.nan)
+    quality_score = np.zeros(n)
+    if n == 0:
+        return SignalSeries(side, stop_loss_pct, take_profit_pct, quality_score)
+
+    probs = direction_probabilities(outputs)
+    directions = probs.argmax(axis=2)
+    weighted_direction = directions @ DIRECTION_WEIGHTS
+    future_returns = outputs[:, 0:4].astype(np.float64)
+    risk_metrics = outputs[:, 16:20].astype(np.float64)
+
+    for i in np.flatnonzero((directions != NEUTRAL_CLASS).any(axis=1)):
+        result = analyzer.analyze_signal_quality(
+            directions=directions[i],
+            direction_probs=list(probs[i]),
+            future_returns=future_returns[i],
+            risk_metrics=risk_metrics[i],
+            weighted_direction=weighted_direction[i],
+        )
+        if not result.passed or result.signal_type not in SIDES:
+            continue
+        quality = result.quality_metrics.quality_score
+        side[i] = SIDES[result.signal_type]
+        stop_loss_pct[i], take_profit_pct[i] = signal_sltp_percent(quality, future_returns[i])
+        quality_score[i] = quality
+
+    return SignalSeries(side, stop_loss_pct, take_profit_pct, quality_score)
@@ -0,0 +1,703 @@
+#!/usr/bin/env python3
+"""
+Перебор параметров фильтрации и SL/TP с walk-forward проверкой
+
+Дорогой этап (признаки и инференс) выполняется один раз - перебор идет по
+готовым ModelHistory (BacktestEngine.precompute или ModelHistory.load).
+Для каждой конфигурации повторяются только сигналы и симуляция, причем
+сигналы зависят лишь от секции signal_filtering: конфигурации с одинаковой
+фильтрацией группируются в одну задачу пула и считают сигналы один раз.
+
+Каждая конфигурация прогоняется по всей истории, метрики окон train/test
+считаются по срезам PnL свечей и сделкам, закрытым внутри окна.
+Позиция, открытая на границе окна, попадает в оба окна своей переоценкой.
+"""
+
+import copy
+import itertools
+import json
+import os
+import time
+from collections.abc import Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from core.logger import setup_logger
+from ml.logic.signal_quality_analyzer import FilterStrategy, SignalQualityAnalyzer
+
+from .engine import quiet_loggers
+from .exchange import SimulatedExchange
+from .metrics import DEFAULT_METRICS, calculate_metrics
+from .models import BacktestSettings, ModelHistory, SignalSeries
+from .signals import generate_signals
+
+logger = setup_logger(__name__)
+
+FULL_SEGMENT = "full"
+TRAIN_SEGMENT = "train"
+TEST_SEGMENT = "test"
+
+
+# =================== ПРОСТРАНСТВО ПАРАМЕТРОВ ===================
+
+
+class ParameterSpace:
+    """
+    Пространство перебора: путь в конфигурации через точку -> значения
+
+    Значение - список вариантов (сетка и случайная выборка) или диапазон
+    {"low": ..., "high": ..., "log": bool, "integer": bool} (только выборка).
+
+    Пример:
+        ParameterSpace({
+            "signal_filtering.strategy": ["conservative", "moderate"],
+            "enhanced_sltp.trailing_stop.step": [0.3, 0.5, 0.8],
+            "backtesting.risk_per_trade": {"low": 0.005, "high": 0.03},
+        })
+    """
+
+    def __init__(self, parameters: dict[str, Any]):
+        if not parameters:
+            raise ValueError("Пустое пространство параметров")
+        for path, values in parameters.items():
+            if isinstance(values, dict):
+                if "low" not in values or "high" not in values:
+                    raise ValueError(f"Диапазон {path} требует low и high")
+                if values["low"] > values["high"]:
+                    raise ValueError(f"Диапазон {path}: low > high")
+            elif not isinstance(values, list | tuple) or not values:
+                raise ValueError(f"Параметр {path}: ожидается непустой список или диапазон")
+        self.parameters = dict(parameters)
+
+    @property
+    def has_ranges(self) -> bool:
+        return any(isinstance(values, dict) for values in self.parameters.values())
+
+    def __len__(self) -> int:
+        """Размер сетки"""
+        if self.has_ranges:
+            raise ValueError("Размер сетки не определен для диапазонов")
+        return int(np.prod([len(values) for values in self.parameters.values()]))
+
+    def grid(self) -> list[dict[str, Any]]:
+        """Полная сетка значений"""
+        if self.has_ranges:
+            raise ValueError("Диапазоны поддерживаются только случайной выборкой (samples)")
+        paths = list(self.parameters)
+        return [
+            dict(zip(paths, combination, strict=True))
+            for combination in itertools.product(*self.parameters.values())
+        ]
+
+    def sample(self, samples: int, seed: int | None = None) -> list[dict[str, Any]]:
+        """Случайная выборка без повторов (не больше размера сетки)"""
+        rng = np.random.default_rng(seed)
+        if not self.has_ranges:
+            samples = min(samples, len(self))
+
+        result: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        attempts = 0
+        while len(result) < samples and attempts < samples * 20:
+            attempts += 1
+            overrides = {path: self._draw(rng, values) for path, values in self.parameters.items()}
+            key = json.dumps(overrides, sort_keys=True, default=str)
+            if key not in seen:
+                seen.add(key)
+                result.append(overrides)
+        return result
+
+    @staticmethod
+    def _draw(rng: np.random.Generator, values: Any) -> Any:
+        if not isinstance(values, dict):
+            # Индекс, а не rng.choice: варианты бывают списками/словарями
+            return values[int(rng.integers(len(values)))]
+        low, high = float(values["low"]), float(values["high"])
+        if values.get("log"):
+            value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        else:
+            value = float(rng.uniform(low, high))
+        return round(value) if values.get("integer") else value
+
+
+def apply_overrides(config: dict[str, Any], overrides: dict[str, Any]) -> dict[str, Any]:
+    """
+    Копия конфигурации с подставленными значениями путей через точку
+
+    SignalQualityAnalyzer берет параметры стратегии фильтрации целиком из
+    signal_filtering.<strategy>, поэтому перед изменением отдельного порога
+    отсутствующая секция заполняется значениями по умолчанию анализатора.
+    """
+    config = copy.deepcopy(config)
+    strategies = {strategy.value: strategy for strategy in FilterStrategy}
+    defaults = None
+
+    for path, value in overrides.items():
+        keys = path.split(".")
+        if len(keys) > 2 and keys[0] == "signal_filtering" and keys[1] in strategies:
+            section = config.setdefault("signal_filtering", {})
+            if keys[1] not in section:
+                defaults = defaults or SignalQualityAnalyzer({}).strategy_params
+                section[keys[1]] = dict(defaults[strategies[keys[1]]])
+
+        node = config
+        for key in keys[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            node = child
+        node[keys[-1]] = copy.deepcopy(value)
+    return config
+
+
+def filter_key(config: dict[str, Any]) -> str:
+    """Ключ секции фильтрации - конфигурации с одним ключом дают одни сигналы"""
+    return json.dumps(config.get("signal_filtering", {}), sort_keys=True, default=str)
+
+
+# =================== WALK-FORWARD ===================
+
+
+@dataclass
+class WalkForwardFold:
+    """Окно обучения (подбор параметров) и следующее за ним окно проверки"""
+
+    index: int
+    train_start: np.datetime64
+    train_end: np.datetime64  # не включительно
+    test_start: np.datetime64
+    test_end: np.datetime64
+
+
+def walk_forward_splits(
+    start: Any,
+    end: Any,
+    train: Any,
+    test: Any,
+    step: Any = None,
+    anchored: bool = False,
+) -> list[WalkForwardFold]:
+    """
+    Скользящие (или расширяющиеся при anchored) окна train/test
+
+    Args:
+        start: Начало истории
+        end: Конец истории (не включительно)
+        train: Длина окна подбора (Timedelta или строка "90D")
+        test: Длина окна проверки
+        step: Сдвиг между фолдами (по умолчанию длина test)
+        anchored: Окно подбора всегда начинается с start
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    train, test = pd.Timedelta(train), pd.Timedelta(test)
+    step = pd.Timedelta(step) if step is not None else test
+    if train <= pd.Timedelta(0) or test <= pd.Timedelta(0) or step <= pd.Timedelta(0):
+        raise ValueError("Длины окон walk-forward должны быть положительными")
+
+    folds = []
+    train_start = start
+    test_start = start + train
+    while test_start + test <= end:
+        folds.append(
+            WalkForwardFold(
+                index=len(folds),
+                train_start=train_start.to_datetime64(),
+                train_end=test_start.to_datetime64(),
+                test_start=test_start.to_datetime64(),
+                test_end=(test_start + test).to_datetime64(),
+            )
+        )
+        test_start += step
+        if not anchored:
+            train_start += step
+    return folds
+
+
+# =================== ОЦЕНКА КОНФИГУРАЦИЙ ===================
+
+
+@dataclass
+class ConfigEvaluation:
+    """Метрики одной конфигурации по окнам и ее PnL для склейки walk-forward"""
+
+    config_id: int
+    rows: list[dict[str, Any]]
+    pnl: np.ndarray | None = None  # суммарный PnL символов по общему индексу свечей
+    trade_exit: np.ndarray | None = None
+    trade_pnl: np.ndarray | None = None
+
+
+@dataclass
+class _Window:
+    segment: str
+    fold: int | None
+    start: np.datetime64
+    end: np.datetime64
+
+
+def _window_metrics(
+    window: _Window,
+    index: np.ndarray,
+    pnl: np.ndarray,
+    trade_exit: np.ndarray,
+    trade_pnl: np.ndarray,
+    settings: BacktestSettings,
+) -> dict[str, Any]:
+    lo, hi = np.searchsorted(index, [window.start, window.end])
+    traded = (trade_exit >= window.start) & (trade_exit < window.end)
+    equity = settings.initial_capital + np.cumsum(pnl[lo:hi])
+    metrics = calculate_metrics(
+        equity,
+        trade_pnl[traded],
+        settings.initial_capital,
+        settings.periods_per_year,
+        settings.metrics or None,
+    )
+    return {
+        "segment": window.segment,
+        "fold": window.fold,
+        "start": window.start,
+        "end": window.end,
+        **metrics,
+    }
+
+
+def evaluate_configs(
+    histories: dict[str, ModelHistory],
+    configs: Sequence[tuple[int, dict[str, Any]]],
+    windows: Sequence[_Window],
+    index: np.ndarray,
+    keep_pnl: bool = False,
+) -> list[ConfigEvaluation]:
+    """
+    Сигналы и симуляция каждой конфигурации по всем символам
+
+    Сигналы кешируются по ключу signal_filtering: конфигурации, которые
+    отличаются только SL/TP или параметрами исполнения, используют их повторно.
+    """
+    signals_cache: dict[tuple[str, str], SignalSeries] = {}
+    positions = {symbol: np.searchsorted(index, h.timestamps) for symbol, h in histories.items()}
+    evaluations = []
+
+    with quiet_loggers():
+        for config_id, config in configs:
+            settings = BacktestSettings.from_config(config)
+            key = filter_key(config)
+            analyzer = None
+            pnl = np.zeros(len(index))
+            exits, trade_pnl = [], []
+
+            for symbol, history in histories.items():
+                if (key, symbol) not in signals_cache:
+                    analyzer = analyzer or SignalQualityAnalyzer(config)
+                    signals_cache[(key, symbol)] = generate_signals(history.outputs, analyzer)
+                result = SimulatedExchange(settings, config).run(
+                    history, signals_cache[(key, symbol)]
+                )
+                np.add.at(pnl, positions[symbol], result.pnl)
+                exits.extend(trade.exit_time for trade in result.trades)
+                trade_pnl.extend(trade.pnl for trade in result.trades)
+
+            trade_exit = np.array(exits, dtype="datetime64[ns]")
+            trade_pnl = np.array(trade_pnl, dtype=float)
+            rows = [
+                _window_metrics(window, index, pnl, trade_exit, trade_pnl, settings)
+                for window in windows
+            ]
+            evaluations.append(
+                ConfigEvaluation(
+                    config_id=config_id,
+                    rows=rows,
+                    pnl=pnl.astype(np.float32) if keep_pnl else None,
+                    trade_exit=trade_exit if keep_pnl else None,
+                    trade_pnl=trade_pnl if keep_pnl else None,
+                )
+            )
+    return evaluations
+
+
+def plan_tasks(
+    configs: Sequence[tuple[int, dict[str, Any]]], workers: int
+) -> list[list[tuple[int, dict[str, Any]]]]:
+    """
+    Группирует конфигурации по ключу фильтрации
+
+    Если групп меньше, чем процессов, крупнейшие группы делятся пополам -
+    сигналы такой группы посчитаются дважды, зато все процессы заняты.
+    """
+    groups: dict[str, list[tuple[int, dict[str, Any]]]] = {}
+    for item in configs:
+        groups.setdefault(filter_key(item[1]), []).append(item)
+    tasks = list(groups.values())
+
+    while len(tasks) < workers:
+        largest = max(tasks, key=len)
+        if len(largest) < 2:
+            break
+        tasks.remove(largest)
+        middle = len(largest) // 2
+        tasks.extend([largest[:middle], largest[middle:]])
+    # Крупные задачи первыми - меньше простоя в конце
+    return sorted(tasks, key=len, reverse=True)
+
+
+# Состояние процесса-воркера: истории передаются один раз в initializer
+_sweep_state: dict[str, Any] = {}
+
+
+def _init_sweep_worker(
+    histories: dict[str, ModelHistory], windows: list[_Window], index: np.ndarray, keep_pnl: bool
+) -> None:
+    _sweep_state.update(histories=histories, windows=windows, index=index, keep_pnl=keep_pnl)
+
+
+def _sweep_task(configs: list[tuple[int, dict[str, Any]]]) -> list[ConfigEvaluation]:
+    return evaluate_configs(
+        _sweep_state["histories"],
+        configs,
+        _sweep_state["windows"],
+        _sweep_state["index"],
+        _sweep_state["keep_pnl"],
+    )
+
+
+# =================== ПЕРЕБОР ===================
+
+
+@dataclass
+class SweepSettings:
+    """Параметры перебора (секция backtesting.sweep)"""
+
+    objective: str = "sharpe_ratio"
+    max_drawdown: float | None = None  # Конфигурации с большей просадкой ранжируются последними
+    min_trades: int = 0
+    samples: int | None = None  # None - полная сетка
+    seed: int | None = None
+    train_days: float | None = None  # None - без walk-forward
+    test_days: float | None = None
+    step_days: float | None = None
+    anchored: bool = False
+    max_workers: int | None = None
+    parameters: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "SweepSettings":
+        sweep = (config.get("backtesting", {}) or {}).get("sweep", {}) or {}
+        names = set(cls.__dataclass_fields__)
+        return cls(**{key: value for key, value in sweep.items() if key in names})
+
+
+@dataclass
+class SweepResult:
+    """
+    Итог перебора
+
+    results - строка на конфигурацию и окно (full/train/test), отсортирована
+    по рангу конфигурации на всей истории; walk_forward - лучшая на train
+    конфигурация каждого фолда и ее метрики на test.
+    """
+
+    results: pd.DataFrame
+    walk_forward: pd.DataFrame
+    oos_metrics: dict[str, float]
+    failed: dict[int, str] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ranking(self) -> pd.DataFrame:
+        """Конфигурации по рангу на всей истории"""
+        return self.results[self.results["segment"] == FULL_SEGMENT].reset_index(drop=True)
+
+    @property
+    def best(self) -> pd.Series:
+        return self.ranking.iloc[0]
+
+    def to_parquet(self, path: str | Path) -> Path:
+        """Сохраняет results (и walk_forward рядом, с суффиксом _walk_forward)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.results.to_parquet(path, index=False)
+        if not self.walk_forward.empty:
+            self.walk_forward.to_parquet(
+                path.with_name(f"{path.stem}_walk_forward{path.suffix}"), index=False
+            )
+        return path
+
+
+def rank_configs(
+    rows: pd.DataFrame,
+    objective: str = "sharpe_ratio",
+    max_drawdown: float | None = None,
+    min_trades: int = 0,
+) -> pd.DataFrame:
+    """
+    Ранжирует строки одного окна: сначала допустимые по ограничениям,
+    затем по objective (по убыванию; max_drawdown - по возрастанию),
+    при равенстве - по меньшей просадке
+    """
+    rows = rows.copy()
+    eligible = rows["total_trades"] >= min_trades
+    if max_drawdown is not None and "max_drawdown" in rows:
+        eligible &= rows["max_drawdown"] <= max_drawdown
+    rows["eligible"] = eligible
+
+    keys, ascending = ["eligible", objective], [False, objective == "max_drawdown"]
+    if objective != "max_drawdown" and "max_drawdown" in rows:
+        keys.append("max_drawdown")
+        ascending.append(True)
+    rows = rows.sort_values([*keys, "config_id"], ascending=[*ascending, True], kind="stable")
+    rows["rank"] = np.arange(1, len(rows) + 1)
+    return rows
+
+
+def _param_value(value: Any) -> Any:
+    """Значение параметра для колонки Parquet (списки/словари - JSON)"""
+    if isinstance(value, list | tuple | dict):
+        return json.dumps(value, sort_keys=True)
+    return value
+
+
+class ParameterSweep:
+    """
+    Перебор конфигураций фильтрации и SL/TP по готовым выходам модели
+
+    Args:
+        config: Базовая конфигурация (значения space подставляются поверх)
+        space: Пространство параметров (по умолчанию backtesting.sweep.parameters)
+        settings: Параметры перебора (по умолчанию backtesting.sweep)
+    """
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        space: ParameterSpace | None = None,
+        settings: SweepSettings | None = None,
+    ):
+        self.config = config
+        self.settings = settings or SweepSettings.from_config(config)
+        self.space = space or ParameterSpace(self.settings.parameters)
+        metrics = BacktestSettings.from_config(config).metrics or DEFAULT_METRICS
+        self.metric_names = [*dict.fromkeys([*metrics, "total_trades"])]
+        if self.settings.objective not in self.metric_names:
+            raise ValueError(
+                f"Метрика цели {self.settings.objective} не рассчитывается: {self.metric_names}"
+            )
+
+    def candidates(self) -> list[dict[str, Any]]:
+        """Конфигурации для перебора: сетка или случайная выборка"""
+        if self.settings.samples:
+            return self.space.sample(self.settings.samples, self.settings.seed)
+        return self.space.grid()
+
+    def _worker_count(self, tasks: int) -> int:
+        workers = (
+            self.settings.max_workers
+            or BacktestSettings.from_config(self.config).max_workers
+            or min(8, os.cpu_count() or 1)
+        )
+        return max(1, min(int(workers), tasks))
+
+    def folds(self, index: np.ndarray, interval: pd.Timedelta) -> list[WalkForwardFold]:
+        if not self.settings.train_days:
+            return []
+        test_days = self.settings.test_days or self.settings.train_days / 4
+        return walk_forward_splits(
+            index[0],
+            index[-1] + interval.to_timedelta64(),
+            pd.Timedelta(days=self.settings.train_days),
+            pd.Timedelta(days=test_days),
+            pd.Timedelta(days=self.settings.step_days) if self.settings.step_days else None,
+            self.settings.anchored,
+        )
+
+    def run(self, histories: dict[str, ModelHistory]) -> SweepResult:
+        """
+        Оценивает все конфигурации по сохраненным выходам модели
+
+        Args:
+            histories: Результат BacktestEngine.precompute() или ModelHistory.load()
+        """
+        started = time.perf_counter()
+        histories = {symbol: h for symbol, h in histories.items() if len(h)}
+        if not histories:
+            raise RuntimeError("Нет выходов модели для перебора")
+
+        base = BacktestSettings.from_config(self.config)
+        interval = pd.Timedelta(minutes=base.interval_minutes)
+        index = np.unique(np.concatenate([h.timestamps for h in histories.values()]))
+        folds = self.folds(index, interval)
+        windows = [_Window(FULL_SEGMENT, None, index[0], index[-1] + interval.to_timedelta64())]
+        for fold in folds:
+            windows.append(_Window(TRAIN_SEGMENT, fold.index, fold.train_start, fold.train_end))
+            windows.append(_Window(TEST_SEGMENT, fold.index, fold.test_start, fold.test_end))
+
+        overrides = self.candidates()
+        configs = [(i, apply_overrides(self.config, item)) for i, item in enumerate(overrides)]
+        logger.info(
+            f"Перебор: {len(configs)} конфигураций, {len(histories)} символов, "
+            f"{len(folds)} фолдов walk-forward"
+        )
+        evaluations, failed = self._evaluate(histories, configs, windows, index, bool(folds))
+
+        results = self._results_frame(evaluations, overrides)
+        walk_forward, oos_metrics = self._walk_forward(results, evaluations, folds, index, base)
+        timings = {"wall": time.perf_counter() - started}
+        logger.info(
+            f"Перебор завершен за {timings['wall']:.1f}s, лучшая конфигурация: "
+            f"{results.iloc[0]['config_id'] if len(results) else None}"
+        )
+        return SweepResult(
+            results=results,
+            walk_forward=walk_forward,
+            oos_metrics=oos_metrics,
+            failed=failed,
+            timings=timings,
+        )
+
+    def _evaluate(
+        self,
+        histories: dict[str, ModelHistory],
+        configs: list[tuple[int, dict[str, Any]]],
+        windows: list[_Window],
+        index: np.ndarray,
+        keep_pnl: bool,
+    ) -> tuple[list[ConfigEvaluation], dict[int, str]]:
+        workers = self._worker_count(len(configs))
+        tasks = plan_tasks(configs, workers)
+        evaluations: list[ConfigEvaluation] = []
+        failed: dict[int, str] = {}
+
+        if workers == 1:
+            for task in tasks:
+                try:
+                    evaluations.extend(evaluate_configs(histories, task, windows, index, keep_pnl))
+                except Exception as e:
+                    logger.error(f"Ошибка оценки конфигураций {[i for i, _ in task]}: {e}")
+                    failed.update({config_id: str(e) for config_id, _ in task})
+            return evaluations, failed
+
+        pool: Executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_sweep_worker,
+            initargs=(histories, windows, index, keep_pnl),
+        )
+        try:
+            futures = {pool.submit(_sweep_task, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    evaluations.extend(future.result())
+                except Exception as e:
+                    logger.error(f"Ошибка оценки конфигураций {[i for i, _ in task]}: {e}")
+                    failed.update({config_id: str(e) for config_id, _ in task})
+        finally:
+            pool.shutdown()
+        return evaluations, failed
+
+    def _results_frame(
+        self, evaluations: list[ConfigEvaluation], overrides: list[dict[str, Any]]
+    ) -> pd.DataFrame:
+        paths = list(self.space.parameters)
+        rows = []
+        for evaluation in evaluations:
+            params = {path: _param_value(overrides[evaluation.config_id][path]) for path in paths}
+            rows.extend(
+                {"config_id": evaluation.config_id, **row, **params} for row in evaluation.rows
+            )
+        frame = pd.DataFrame(rows)
+        if frame.empty:
+            raise RuntimeError("Ни одна конфигурация не была оценена")
+        frame["fold"] = frame["fold"].astype("Int64")
+
+        ranked = rank_configs(
+            frame[frame["segment"] == FULL_SEGMENT],
+            self.settings.objective,
+            self.settings.max_drawdown,
+            self.settings.min_trades,
+        )
+        frame = frame.merge(ranked[["config_id", "rank", "eligible"]], on="config_id")
+        order = {FULL_SEGMENT: 0, TRAIN_SEGMENT: 1, TEST_SEGMENT: 2}
+        frame = frame.sort_values(
+            ["rank", "fold", "segment"],
+            key=lambda column: column.map(order) if column.name == "segment" else column,
+            na_position="first",
+            kind="stable",
+        )
+        leading = ["rank", "config_id", "eligible", "segment", "fold", "start", "end"]
+        columns = leading + [column for column in frame.columns if column not in leading]
+        return frame[columns].reset_index(drop=True)
+
+    def _walk_forward(
+        self,
+        results: pd.DataFrame,
+        evaluations: list[ConfigEvaluation],
+        folds: list[WalkForwardFold],
+        index: np.ndarray,
+        settings: BacktestSettings,
+    ) -> tuple[pd.DataFrame, dict[str, float]]:
+        """
+        Для каждого фолда выбирает лучшую на train конфигурацию и склеивает
+        ее PnL на test в единую out-of-sample кривую капитала
+        """
+        if not folds:
+            return pd.DataFrame(), {}
+
+        by_id = {evaluation.config_id: evaluation for evaluation in evaluations}
+        selected_rows = []
+        oos_pnl, oos_trades = [], []
+        for position, fold in enumerate(folds):
+            train = results[(results["segment"] == TRAIN_SEGMENT) & (results["fold"] == fold.index)]
+            if train.empty:
+                continue
+            best = rank_configs(
+                train, self.settings.objective, self.settings.max_drawdown, self.settings.min_trades
+            ).iloc[0]
+            test = results[
+                (results["segment"] == TEST_SEGMENT)
+                & (results["fold"] == fold.index)
+                & (results["config_id"] == best["config_id"])
+            ].iloc[0]
+            selected_rows.append(
+                {
+                    "fold": fold.index,
+                    "config_id": int(best["config_id"]),
+                    "train_start": fold.train_start,
+                    "test_start": fold.test_start,
+                    "test_end": fold.test_end,
+                    f"train_{self.settings.objective}": best[self.settings.objective],
+                    **{f"test_{name}": test[name] for name in self.metric_names},
+                    **{path: best[path] for path in self.space.parameters},
+                }
+            )
+
+            # Пересекающиеся окна test (step < test) склеиваются без повторов
+            end = fold.test_end
+            if position + 1 < len(folds):
+                end = min(end, folds[position + 1].test_start)
+            evaluation = by_id[int(best["config_id"])]
+            lo, hi = np.searchsorted(index, [fold.test_start, end])
+            oos_pnl.append(evaluation.pnl[lo:hi].astype(float))
+            traded = (evaluation.trade_exit >= fold.test_start) & (evaluation.trade_exit < end)
+            oos_trades.append(evaluation.trade_pnl[traded])
+
+        if not selected_rows:
+            return pd.DataFrame(), {}
+        pnl = np.concatenate(oos_pnl)
+        oos_metrics = calculate_metrics(
+            settings.initial_capital + np.cumsum(pnl),
+            np.concatenate(oos_trades),
+            settings.initial_capital,
+            settings.periods_per_year,
+            settings.metrics or None,
+        )
+        logger.info(
+            f"Walk-forward out-of-sample: {self.settings.objective}="
+            f"{oos_metrics.get(self.settings.objective, 0.0):.3f}, "
+            f"сделок {oos_metrics['total_trades']}"
+        )
+        return pd.DataFrame(selected_rows), oos_metrics
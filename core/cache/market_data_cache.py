@@ -7,8 +7,10 @@ from collections import defaultdict
 from datetime import UTC, datetime
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from core.cache.ohlcv_ring_buffer import OHLCVRingBuffer, to_utc_timestamp
 from core.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -17,7 +19,7 @@ logger = setup_logger(__name__)
 class MarketDataCache:
     """
     Умный кеш для рыночных данных
-    - Хранит исторические данные в памяти
+    - Хранит исторические данные в памяти (кольцевой буфер NumPy на символ)
     - Обновляет только последнюю свечу
     - Минимизирует API запросы
     """
@@ -28,8 +30,8 @@ class MarketDataCache:
             cache_size: Максимальное количество свечей для каждого символа
             ttl_seconds: Время жизни последней свечи (для обновления)
         """
-        # Основной кеш: symbol -> DataFrame с OHLCV данными
-        self._data_cache: dict[str, pd.DataFrame] = {}
+        # Основной кеш: symbol -> кольцевой буфер OHLCV свечей
+        self._data_cache: dict[str, OHLCVRingBuffer] = {}
 
         # Метаданные кеша
         self._cache_metadata: dict[str, dict] = {}
@@ -66,23 +68,56 @@ class MarketDataCache:
             DataFrame с OHLCV данными или None
         """
         async with self._locks[symbol]:
-            if symbol in self._data_cache:
-                df = self._data_cache[symbol]
+            if self._check_hit(symbol, required_candles):
+                return self._data_cache[symbol].to_frame()
 
-                if len(df) >= required_candles:
-                    self.stats["cache_hits"] += 1
-                    self.stats["api_calls_saved"] += 1
+            return None
 
-                    # Проверяем актуальность последней свечи
-                    if self._is_last_candle_stale(symbol):
-                        # Помечаем что нужно обновить только последнюю свечу
-                        self._cache_metadata[symbol]["needs_last_update"] = True
+    async def get_view(self, symbol: str, required_candles: int = 96) -> np.ndarray | None:
+        """
+        Получить последние свечи без копирования
 
-                    return df.copy()
+        Возвращает read-only структурированный массив (ts в нс UTC, OHLCV),
+        который указывает на буфер кеша и меняется при следующих обновлениях.
+
+        Args:
+            symbol: Торговый символ
+            required_candles: Минимальное количество требуемых свечей
+
+        Returns:
+            Структурированный массив или None
+        """
+        async with self._locks[symbol]:
+            if self._check_hit(symbol, required_candles):
+                return self._data_cache[symbol].view()
 
-            self.stats["cache_misses"] += 1
             return None
 
+    def get_views(self) -> dict[str, np.ndarray]:
+        """
+        Свечи всех символов без копирования и без учета в статистике
+
+        Массивы те же, что у get_view, и действительны до следующего await.
+        """
+        return {symbol: buffer.view() for symbol, buffer in self._data_cache.items() if len(buffer)}
+
+    def _check_hit(self, symbol: str, required_candles: int) -> bool:
+        """Учитывает попадание/промах и помечает устаревшую последнюю свечу"""
+        buffer = self._data_cache.get(symbol)
+        if buffer is not None and len(buffer) >= required_candles:
+            self.stats["cache_hits"] += 1
+            self.stats["api_calls_saved"] += 1
+
+            # Проверяем актуальность последней свечи
+            if self._is_last_candle_stale(symbol):
+                # Помечаем что нужно обновить только последнюю свечу
+                self._cache_metadata[symbol]["needs_last_update"] = True
+
+            return True
+
+        self.stats["cache_misses"] += 1
+        return False
+
     async def update_data(
         self, symbol: str, new_data: pd.DataFrame, is_complete: bool = False
     ) -> None:
@@ -97,42 +132,27 @@ class MarketDataCache:
         async with self._locks[symbol]:
             current_time = datetime.now(UTC)
 
-            if is_complete:
-                # Полная замена данных
-                self._data_cache[symbol] = new_data.copy()
+            if is_complete or symbol not in self._data_cache:
+                # Полная замена данных (или первая загрузка)
+                buffer = self._data_cache.get(symbol)
+                if buffer is None:
+                    buffer = OHLCVRingBuffer(self.cache_size)
+                buffer.load_frame(new_data)
+                self._data_cache[symbol] = buffer
                 self._cache_metadata[symbol] = {
                     "loaded_at": current_time,
                     "candles_count": len(new_data),
                     "needs_last_update": False,
                 }
-                logger.info(f"📊 {symbol}: Загружено {len(new_data)} исторических свечей в кеш")
+                if is_complete:
+                    logger.info(f"📊 {symbol}: Загружено {len(new_data)} исторических свечей в кеш")
 
             else:
-                # Инкрементальное обновление
-                if symbol in self._data_cache:
-                    existing_df = self._data_cache[symbol]
-
-                    # Объединяем данные, удаляя дубликаты по timestamp
-                    combined_df = pd.concat([existing_df, new_data])
-                    combined_df = combined_df[~combined_df.index.duplicated(keep="last")]
-                    combined_df = combined_df.sort_index()
-
-                    # Ограничиваем размер кеша
-                    if len(combined_df) > self.cache_size:
-                        combined_df = combined_df.iloc[-self.cache_size :]
-
-                    self._data_cache[symbol] = combined_df
-                    self.stats["last_candles_updated"] += 1
-
-                    logger.debug(f"🔄 {symbol}: Обновлена последняя свеча в кеше")
-                else:
-                    # Первая загрузка
-                    self._data_cache[symbol] = new_data.copy()
-                    self._cache_metadata[symbol] = {
-                        "loaded_at": current_time,
-                        "candles_count": len(new_data),
-                        "needs_last_update": False,
-                    }
+                # Инкрементальное обновление: добавление/перезапись свечей в буфере
+                self._data_cache[symbol].merge_frame(new_data)
+                self.stats["last_candles_updated"] += 1
+
+                logger.debug(f"🔄 {symbol}: Обновлена последняя свеча в кеше")
 
             self._last_update[symbol] = current_time
 
@@ -148,31 +168,32 @@ class MarketDataCache:
             if symbol not in self._data_cache:
                 return
 
-            df = self._data_cache[symbol]
+            buffer = self._data_cache[symbol]
 
             # Создаем timestamp для последней свечи
-            timestamp = pd.Timestamp(last_candle.get("timestamp", datetime.now(UTC)), tz="UTC")
-
-            # Обновляем последнюю строку если timestamp совпадает
-            if len(df) > 0 and df.index[-1] == timestamp:
-                # Обновляем существующую свечу
-                df.loc[timestamp, "open"] = last_candle["open"]
-                df.loc[timestamp, "high"] = last_candle["high"]
-                df.loc[timestamp, "low"] = last_candle["low"]
-                df.loc[timestamp, "close"] = last_candle["close"]
-                df.loc[timestamp, "volume"] = last_candle["volume"]
-
+            timestamp = to_utc_timestamp(last_candle.get("timestamp", datetime.now(UTC)))
+            is_current = buffer.last_ts == timestamp.value
+
+            # Без turnover в обновлении сохраняем прежнее значение текущей свечи
+            turnover = last_candle.get("turnover")
+            if turnover is None:
+                turnover = float(buffer.view()["turnover"][-1]) if is_current else 0.0
+
+            # Обновляем последнюю свечу если timestamp совпадает, иначе добавляем новую
+            buffer.update(
+                timestamp.value,
+                last_candle["open"],
+                last_candle["high"],
+                last_candle["low"],
+                last_candle["close"],
+                last_candle["volume"],
+                turnover,
+            )
+
+            if is_current:
                 self.stats["last_candles_updated"] += 1
                 logger.debug(f"📈 {symbol}: Обновлена текущая свеча {timestamp}")
             else:
-                # Добавляем новую свечу
-                new_row = pd.DataFrame([last_candle], index=[timestamp])
-                self._data_cache[symbol] = pd.concat([df, new_row])
-
-                # Ограничиваем размер
-                if len(self._data_cache[symbol]) > self.cache_size:
-                    self._data_cache[symbol] = self._data_cache[symbol].iloc[-self.cache_size :]
-
                 logger.debug(f"📊 {symbol}: Добавлена новая свеча {timestamp}")
 
             self._last_update[symbol] = datetime.now(UTC)
@@ -204,10 +225,8 @@ class MarketDataCache:
         if symbol not in self._data_cache:
             return True, "full"
 
-        df = self._data_cache[symbol]
-
         # Проверяем достаточность данных
-        if len(df) < 96:  # Минимум для ML
+        if len(self._data_cache[symbol]) < 96:  # Минимум для ML
             return True, "full"
 
         # Проверяем актуальность последней свечи
@@ -233,7 +252,7 @@ class MarketDataCache:
             "api_calls_saved": self.stats["api_calls_saved"],
             "last_candles_updated": self.stats["last_candles_updated"],
             "symbols_cached": len(self._data_cache),
-            "total_candles": sum(len(df) for df in self._data_cache.values()),
+            "total_candles": sum(len(buffer) for buffer in self._data_cache.values()),
         }
 
     def clear_cache(self, symbol: str | None = None) -> None:
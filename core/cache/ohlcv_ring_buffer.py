@@ -0,0 +1,200 @@
+"""
+Кольцевой буфер OHLCV свечей на NumPy
+
+Свечи одного символа хранятся в заранее выделенном структурированном массиве.
+Каждая запись пишется дважды - в позицию i и i + capacity, поэтому последние
+n свечей всегда образуют непрерывный срез и читаются без копирования.
+Добавление новой свечи и обновление последней - O(1) без аллокаций.
+"""
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Поля свечи: время открытия (нс UTC) и OHLCV
+OHLCV_FIELDS = ["open", "high", "low", "close", "volume", "turnover"]
+OHLCV_DTYPE = np.dtype([("ts", "i8")] + [(name, "f8") for name in OHLCV_FIELDS])
+
+
+def to_utc_timestamp(value: Any) -> pd.Timestamp:
+    """Приводит datetime/Timestamp/число (мс) к pd.Timestamp в UTC"""
+    if isinstance(value, int | np.integer | float | np.floating):
+        return pd.Timestamp(int(value), unit="ms", tz="UTC")
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
+class OHLCVRingBuffer:
+    """
+    Кольцевой буфер свечей фиксированной емкости
+
+    Свечи упорядочены по времени: более новая добавляется в конец, свеча с
+    тем же временем перезаписывает существующую. Самые старые свечи
+    вытесняются при превышении емкости.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"capacity должна быть положительной: {capacity}")
+        self.capacity = capacity
+        self._storage = np.zeros(2 * capacity, dtype=OHLCV_DTYPE)
+        self._head = 0  # Позиция следующей записи в [0, capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_ts(self) -> int | None:
+        """Время последней свечи (нс UTC)"""
+        if not self._size:
+            return None
+        return int(self._storage["ts"][self._head + self.capacity - 1])
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+
+    def _write(self, position: int, row: tuple) -> None:
+        self._storage[position] = row
+        self._storage[position + self.capacity] = row
+
+    def append(
+        self,
+        ts: int,
+        open_: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        turnover: float = 0.0,
+    ) -> None:
+        """Добавляет свечу в конец (вытесняя самую старую при заполнении)"""
+        self._write(self._head, (ts, open_, high, low, close, volume, turnover))
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def update(
+        self,
+        ts: int,
+        open_: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        turnover: float = 0.0,
+    ) -> bool:
+        """
+        Добавляет свечу или перезаписывает свечу с тем же временем
+
+        Returns:
+            False если свеча старше последней и отсутствует в буфере
+        """
+        row = (ts, open_, high, low, close, volume, turnover)
+        last_ts = self.last_ts
+        if last_ts is None or ts > last_ts:
+            self.append(*row)
+            return True
+
+        if ts == last_ts:
+            self._write((self._head - 1) % self.capacity, row)
+            return True
+
+        # Обновление более старой свечи - ищем ее позицию
+        view = self.view()
+        index = int(np.searchsorted(view["ts"], ts))
+        if index < len(view) and view["ts"][index] == ts:
+            position = (self._head - self._size + index) % self.capacity
+            self._write(position, row)
+            return True
+        return False
+
+    def view(self, n: int | None = None) -> np.ndarray:
+        """
+        Последние n свечей (все при n=None) как read-only срез без копирования
+
+        Срез указывает на внутренний буфер и меняется при следующих обновлениях.
+        """
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self.capacity
+        result = self._storage[end - n : end]
+        result.flags.writeable = False
+        return result
+
+    def to_frame(self, n: int | None = None) -> pd.DataFrame:
+        """Копия последних n свечей в DataFrame с индексом datetime (UTC)"""
+        view = self.view(n)
+        index = pd.DatetimeIndex(pd.to_datetime(view["ts"], unit="ns", utc=True), name="datetime")
+        values = np.empty((len(view), len(OHLCV_FIELDS)))
+        for i, name in enumerate(OHLCV_FIELDS):
+            values[:, i] = view[name]
+        return pd.DataFrame(values, index=index, columns=OHLCV_FIELDS)
+
+    def load_frame(self, df: pd.DataFrame) -> None:
+        """Заменяет содержимое буфера последними capacity свечами из DataFrame"""
+        self.clear()
+        if df.empty:
+            return
+
+        timestamps = _index_to_ns(df.index)
+        # Сортировка по времени, при дубликатах остается последняя строка
+        order = np.lexsort((np.arange(len(df)), timestamps))
+        keep = np.append(timestamps[order][1:] != timestamps[order][:-1], True)
+        order = order[keep][-self.capacity :]
+        n = len(order)
+
+        values = _frame_values(df)[order]
+        rows = np.zeros(n, dtype=OHLCV_DTYPE)
+        rows["ts"] = timestamps[order]
+        for i, name in enumerate(OHLCV_FIELDS):
+            rows[name] = values[:, i]
+
+        self._storage[:n] = rows
+        self._storage[self.capacity : self.capacity + n] = rows
+        self._head = n % self.capacity
+        self._size = n
+
+    def merge_frame(self, df: pd.DataFrame) -> None:
+        """Добавляет/обновляет свечи из DataFrame (инкрементальное обновление)"""
+        if df.empty:
+            return
+
+        timestamps = _index_to_ns(df.index)
+        order = np.argsort(timestamps, kind="stable")
+        values = _frame_values(df)[order]
+        timestamps = timestamps[order]
+
+        for ts, row in zip(timestamps.tolist(), values.tolist(), strict=True):
+            if not self.update(ts, *row):
+                # Пропущенная старая свеча - редкий случай, пересобираем буфер
+                update = pd.DataFrame(
+                    values,
+                    index=pd.to_datetime(timestamps, unit="ns", utc=True),
+                    columns=OHLCV_FIELDS,
+                )
+                self.load_frame(pd.concat([self.to_frame(), update]))
+                return
+
+
+def _index_to_ns(index: pd.Index) -> np.ndarray:
+    """Наносекунды UTC для DatetimeIndex (naive считается UTC)"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    return index.tz_convert("UTC").as_unit("ns").asi8
+
+
+def _frame_values(df: pd.DataFrame) -> np.ndarray:
+    """Матрица (n, len(OHLCV_FIELDS)) из DataFrame; отсутствующие колонки - нули"""
+    columns = [name for name in OHLCV_FIELDS if name in df.columns]
+    values = df[columns].to_numpy(dtype=np.float64)
+    if len(columns) == len(OHLCV_FIELDS):
+        return values
+
+    result = np.zeros((len(df), len(OHLCV_FIELDS)))
+    for source, name in enumerate(columns):
+        result[:, OHLCV_FIELDS.index(name)] = values[:, source]
+    return result
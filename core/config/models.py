@@ -82,6 +82,13 @@ class WebInterface(BaseModel):
     cors_enabled: bool = Field(default=True)
 
 
+class SystemStartup(BaseModel):
+    """Настройки запуска компонентов."""
+
+    parallel: bool = Field(default=True)
+    lazy_components: list[str] = Field(default_factory=list)
+
+
 class SystemSettings(BaseModel):
     """Основные системные настройки."""
 
@@ -91,6 +98,7 @@ class SystemSettings(BaseModel):
     limits: SystemLimits = Field(default_factory=SystemLimits)
     performance: SystemPerformance = Field(default_factory=SystemPerformance)
     web_interface: WebInterface = Field(default_factory=WebInterface)
+    startup: SystemStartup = Field(default_factory=SystemStartup)
 
 
 # ============= База данных =============
@@ -381,6 +389,7 @@ class MLSettings(BaseModel):
     filters: MLFilters = Field(default_factory=MLFilters)
     risk: MLRisk = Field(default_factory=MLRisk)
     models: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    feature_executor: Dict[str, Any] = Field(default_factory=dict)
 
 
 # ============= Биржи =============
@@ -464,12 +473,22 @@ class LogRotation(BaseModel):
     backup_count: int = Field(default=10, ge=1, le=100)
 
 
+class LogSampling(BaseModel):
+    """Ограничение частоты записей ниже WARNING по логгерам."""
+
+    burst: int = Field(default=20, ge=1)
+    rates: Dict[str, float] = Field(
+        default_factory=dict, description="Префикс имени логгера -> записей в секунду"
+    )
+
+
 class LoggingSettings(BaseModel):
     """Настройки логирования."""
 
     level: LogLevel = Field(default=LogLevel.INFO)
     format: str = Field(default="structured", pattern="^(structured|plain|json)$")
     rotation: LogRotation = Field(default_factory=LogRotation)
+    sampling: LogSampling = Field(default_factory=LogSampling)
 
 
 # ============= Модели трейдеров =============
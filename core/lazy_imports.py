@@ -0,0 +1,90 @@
+"""
+Ленивая загрузка тяжелых подсистем
+
+Модули ML (torch, sklearn), веба (FastAPI), Telegram и визуализации
+импортируются только при первом обращении, поэтому процесс платит за
+подсистему, только если действительно ее использует:
+
+    plt = lazy_module("matplotlib.pyplot")   # импорт при первом plt.*
+
+    # __init__.py пакета - экспорт по требованию (PEP 562)
+    __getattr__ = lazy_exports(__name__, {"Service": ".service"})
+"""
+
+import importlib
+import sys
+import types
+from collections.abc import Callable
+from typing import Any
+
+# Тяжелые необязательные подсистемы и их корневые модули
+HEAVY_SUBSYSTEMS: dict[str, tuple[str, ...]] = {
+    "ml": ("torch", "sklearn", "onnxruntime", "ml"),
+    "web": ("fastapi", "starlette", "uvicorn", "web"),
+    "telegram": ("telegram", "aiogram", "notifications.telegram", "monitoring.telegram"),
+    "visualization": ("matplotlib", "plotly", "seaborn"),
+}
+
+
+class LazyModule(types.ModuleType):
+    """Заместитель модуля: импорт выполняется при первом обращении к атрибуту"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """Модуль name; если он еще не импортирован - ленивый заместитель"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def lazy_exports(package: str, exports: dict[str, str]) -> Callable[[str], Any]:
+    """
+    Module-level __getattr__ для экспорта атрибутов пакета по требованию
+
+    Args:
+        package: __name__ пакета
+        exports: Имя атрибута -> модуль (относительный - от package)
+    """
+
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        # Следующие обращения не проходят через __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__
+
+
+def loaded_subsystems() -> dict[str, list[str]]:
+    """Тяжелые подсистемы, уже импортированные в процесс: подсистема -> корни"""
+    loaded = {}
+    for subsystem, roots in HEAVY_SUBSYSTEMS.items():
+        present = [root for root in roots if root in sys.modules]
+        if present:
+            loaded[subsystem] = present
+    return loaded
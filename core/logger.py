@@ -8,6 +8,15 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+from core.logging.log_pipeline import log_pipeline
+
+
+def log_directory() -> Path:
+    """Каталог файлов логов (BOT_AI_V3_LOG_DIR, по умолчанию data/logs)"""
+    log_dir = Path(os.getenv("BOT_AI_V3_LOG_DIR", "data/logs"))
+    log_dir.mkdir(parents=True, exist_ok=True)
+    return log_dir
+
 
 def setup_logger(name: str, level: str = None) -> logging.Logger:
     """
@@ -35,8 +44,7 @@ def setup_logger(name: str, level: str = None) -> logging.Logger:
         return logger
 
     # Создаем директорию для логов
-    log_dir = Path("data/logs")
-    log_dir.mkdir(parents=True, exist_ok=True)
+    log_dir = log_directory()
 
     # Оптимизированный форматтер (укороченный timestamp)
     # Если включен вывод в консоль, используем более детальный формат
@@ -91,7 +99,8 @@ def setup_logger(name: str, level: str = None) -> logging.Logger:
     error_handler.setFormatter(formatter)
     logger.addHandler(error_handler)
 
-    return logger
+    # Запись в файлы и консоль - в фоновом потоке пайплайна
+    return log_pipeline.attach(logger)
 
 
 def setup_risk_management_logger() -> logging.Logger:
@@ -108,7 +117,7 @@ def setup_risk_management_logger() -> logging.Logger:
         )
 
         # Файловый обработчик
-        file_handler = logging.FileHandler("data/logs/risk_management.log")
+        file_handler = logging.FileHandler(log_directory() / "risk_management.log")
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
 
@@ -119,6 +128,7 @@ def setup_risk_management_logger() -> logging.Logger:
 
         logger.addHandler(file_handler)
         logger.addHandler(console_handler)
+        log_pipeline.attach(logger)
 
     return logger
 
@@ -0,0 +1,330 @@
+"""
+Неблокирующий пайплайн логирования
+
+Обработчики логгера (файлы, консоль) переносятся в фоновый поток: в потоке
+вызова запись только проходит сэмплинг и кладется в ограниченную очередь,
+форматирование и запись на диск выполняет поток пайплайна. Если очередь
+переполнена (диск не успевает), запись отбрасывается и учитывается в
+статистике - вызывающий код (размещение ордеров, event loop) никогда не ждет
+диск. О пропущенных записях пайплайн периодически пишет предупреждение.
+
+Дорогие сообщения (таблицы) передаются через lazy_message и форматируются
+только если запись действительно будет записана, в потоке пайплайна:
+
+    logger.info(lazy_message(format_table, symbol, snapshot))
+
+Переменные окружения:
+    BOT_AI_V3_LOG_ASYNC: false - синхронная запись (по умолчанию true)
+    BOT_AI_V3_LOG_QUEUE_SIZE: размер очереди (по умолчанию 10000)
+"""
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import threading
+import time
+import traceback
+from collections.abc import Callable, Iterable
+from logging.handlers import QueueHandler
+from typing import Any
+
+# Не меньше WARNING записи не сэмплируются
+SAMPLING_MAX_LEVEL = logging.INFO
+
+_STOP = object()
+
+
+class LazyMessage:
+    """Сообщение, которое строится при форматировании записи"""
+
+    __slots__ = ("args", "func", "kwargs")
+
+    def __init__(self, func: Callable[..., str], *args: Any, **kwargs: Any):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return self.func(*self.args, **self.kwargs)
+
+
+def lazy_message(func: Callable[..., str], *args: Any, **kwargs: Any) -> LazyMessage:
+    """Сообщение лога, которое форматируется только при записи"""
+    return LazyMessage(func, *args, **kwargs)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Ограничение частоты записей логгера (token bucket)
+
+    Правило выбирается по самому длинному префиксу имени логгера.
+    Записи уровня WARNING и выше проходят всегда.
+
+    Args:
+        rates: Префикс имени логгера -> записей в секунду
+        burst: Сколько записей подряд пропускается сверх частоты
+    """
+
+    def __init__(self, rates: dict[str, float] | None = None, burst: int = 20):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.burst = burst
+        self.suppressed: dict[str, int] = {}
+        self._buckets: dict[str, list[float]] = {}  # префикс -> [токены, время]
+        self._lock = threading.Lock()
+
+    def configure(self, rates: dict[str, float], burst: int | None = None) -> None:
+        with self._lock:
+            self.rates = dict(rates)
+            if burst is not None:
+                self.burst = burst
+            self._buckets.clear()
+
+    def _rule(self, name: str) -> str | None:
+        best = None
+        for prefix in self.rates:
+            if (name == prefix or name.startswith(prefix + ".")) and (
+                best is None or len(prefix) > len(best)
+            ):
+                best = prefix
+        return best
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > SAMPLING_MAX_LEVEL or not self.rates:
+            return True
+
+        with self._lock:
+            prefix = self._rule(record.name)
+            if prefix is None:
+                return True
+
+            rate = self.rates[prefix]
+            now = time.monotonic()
+            bucket = self._buckets.setdefault(prefix, [float(self.burst), now])
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return True
+
+            self.suppressed[record.name] = self.suppressed.get(record.name, 0) + 1
+            return False
+
+
+class PipelineHandler(QueueHandler):
+    """Обработчик логгера: передает запись и целевые обработчики в пайплайн"""
+
+    def __init__(self, pipeline: "LogPipeline", targets: Iterable[logging.Handler]):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+        self.targets = list(targets)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Аргументы подставляются сейчас (снимок значений), форматирование
+        # записи и ленивых сообщений - в потоке пайплайна
+        record = copy.copy(record)
+        if not isinstance(record.msg, LazyMessage):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.pipeline.put(self.targets, record)
+
+
+class LogPipeline:
+    """
+    Фоновая запись логов через ограниченную очередь
+
+    Args:
+        queue_size: Максимум записей в очереди
+        enabled: False - attach ничего не меняет, запись синхронная
+        report_interval: Период предупреждений о пропущенных записях (секунды)
+    """
+
+    def __init__(
+        self, queue_size: int = 10000, enabled: bool = True, report_interval: float = 10.0
+    ):
+        self.enabled = enabled
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self.queue: queue.Queue = queue.Queue(queue_size)
+        self.sampler = SamplingFilter()
+
+        self.processed = 0
+        self.dropped: dict[str, int] = {}
+        self.max_queued = 0
+        self._reported_dropped = 0
+        self._last_report = time.monotonic()
+        self._last_targets: list[logging.Handler] = []
+
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._atexit_registered = False
+
+    @classmethod
+    def from_env(cls) -> "LogPipeline":
+        return cls(
+            queue_size=int(os.getenv("BOT_AI_V3_LOG_QUEUE_SIZE", "10000")),
+            enabled=os.getenv("BOT_AI_V3_LOG_ASYNC", "true").lower() == "true",
+        )
+
+    @property
+    def dropped_total(self) -> int:
+        return sum(self.dropped.values())
+
+    def configure_sampling(self, rates: dict[str, float], burst: int | None = None) -> None:
+        """Частота записей по логгерам (префикс имени -> записей в секунду)"""
+        self.sampler.configure(rates, burst)
+
+    def attach(self, logger: logging.Logger) -> logging.Logger:
+        """Переносит обработчики логгера в пайплайн (повторный вызов добавляет новые)"""
+        if not self.enabled:
+            return logger
+
+        pipeline_handler = next(
+            (h for h in logger.handlers if isinstance(h, PipelineHandler)), None
+        )
+        targets = [h for h in logger.handlers if not isinstance(h, PipelineHandler)]
+        if not targets:
+            return logger
+
+        for handler in targets:
+            logger.removeHandler(handler)
+        if pipeline_handler is None:
+            pipeline_handler = PipelineHandler(self, targets)
+            pipeline_handler.addFilter(self.sampler)
+            logger.addHandler(pipeline_handler)
+        else:
+            pipeline_handler.targets.extend(targets)
+
+        self.start()
+        return logger
+
+    def put(self, targets: list[logging.Handler], record: logging.LogRecord) -> None:
+        """Ставит запись в очередь; при переполнении отбрасывает ее"""
+        try:
+            self.queue.put_nowait((targets, record))
+        except queue.Full:
+            with self._lock:
+                self.dropped[record.name] = self.dropped.get(record.name, 0) + 1
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._worker, name="log-pipeline", daemon=True)
+        self._thread.start()
+        if not self._atexit_registered:
+            # Регистрируется после logging - при выходе выполняется раньше logging.shutdown
+            atexit.register(self.stop)
+            self._atexit_registered = True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Дописывает очередь и останавливает поток"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        self._thread = None
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Ждет записи всех поставленных в очередь записей"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            dropped = dict(self.dropped)
+        return {
+            "enabled": self.enabled,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue_size,
+            "max_queued": self.max_queued,
+            "processed": self.processed,
+            "dropped_total": sum(dropped.values()),
+            "dropped": dropped,
+            "sampled_out": dict(self.sampler.suppressed),
+        }
+
+    def _worker(self) -> None:
+        while True:
+            try:
+                item = self.queue.get(timeout=self.report_interval)
+            except queue.Empty:
+                self._report_drops()
+                continue
+
+            try:
+                if item is _STOP:
+                    self._report_drops(force=True)
+                    return
+                self.max_queued = max(self.max_queued, self.queue.qsize() + 1)
+                targets, record = item
+                self._last_targets = targets
+                try:
+                    self._handle(targets, record)
+                except Exception:
+                    # Ошибка обработчика не должна останавливать поток пайплайна
+                    traceback.print_exc()
+                self.processed += 1
+                self._report_drops()
+            finally:
+                self.queue.task_done()
+
+    @staticmethod
+    def _handle(targets: list[logging.Handler], record: logging.LogRecord) -> None:
+        for handler in targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _report_drops(self, force: bool = False) -> None:
+        """Предупреждение о пропущенных с прошлого отчета записях"""
+        now = time.monotonic()
+        if not force and now - self._last_report < self.report_interval:
+            return
+        self._last_report = now
+
+        with self._lock:
+            total = sum(self.dropped.values())
+            by_logger = dict(self.dropped)
+        new = total - self._reported_dropped
+        if new <= 0 or not self._last_targets:
+            return
+        self._reported_dropped = total
+
+        record = logging.makeLogRecord(
+            {
+                "name": "log_pipeline",
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"⚠️ Очередь логов переполнена: пропущено {new} записей "
+                f"(всего {total}, по логгерам: {by_logger})",
+            }
+        )
+        self._handle(self._last_targets, record)
+
+
+def handlers_of(logger: logging.Logger) -> list[logging.Handler]:
+    """Обработчики логгера, включая перенесенные в пайплайн"""
+    handlers = []
+    for handler in logger.handlers:
+        if isinstance(handler, PipelineHandler):
+            handlers.extend(handler.targets)
+        else:
+            handlers.append(handler)
+    return handlers
+
+
+# Глобальный пайплайн процесса
+log_pipeline = LogPipeline.from_env()
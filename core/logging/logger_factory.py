@@ -6,6 +6,7 @@ Logger Factory для BOT_Trading v3.0
 - Structured logging для лучшей аналитики
 - Централизованная конфигурация логгеров
 - Thread-safe операции
+- Запись в фоновом потоке (core.logging.log_pipeline)
 - Обратная совместимость с v1.0/v2.0
 """
 
@@ -20,6 +21,8 @@ from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
 from pathlib import Path
 from typing import Any
 
+from core.logging.log_pipeline import handlers_of, log_pipeline
+
 
 @dataclass
 class LoggerConfig:
@@ -214,6 +217,9 @@ class LoggerFactory:
             file_handler = self._create_file_handler(config, trader_id, session_id)
             logger.addHandler(file_handler)
 
+        # Форматирование и запись - в фоновом потоке
+        log_pipeline.attach(logger)
+
         # Предотвращаем передачу сообщений родительским логгерам
         logger.propagate = False
 
@@ -365,7 +371,7 @@ class LoggerFactory:
                     ),
                 )
                 and getattr(h, "baseFilename", "") == os.path.abspath(log_file)
-                for h in logger.handlers
+                for h in handlers_of(logger)
             )
 
             if not has_file_handler:
@@ -387,6 +393,7 @@ class LoggerFactory:
 
                 file_handler.setFormatter(formatter)
                 logger.addHandler(file_handler)
+                log_pipeline.attach(logger)
 
     def remove_logger(
         self,
@@ -400,7 +407,8 @@ class LoggerFactory:
         if logger_key in self._loggers:
             logger = self._loggers[logger_key]
             # Закрываем все handlers
-            for handler in logger.handlers:
+            log_pipeline.flush()
+            for handler in handlers_of(logger):
                 handler.close()
             logger.handlers.clear()
 
@@ -425,8 +433,9 @@ class LoggerFactory:
 
     def shutdown(self) -> None:
         """Корректное завершение работы всех логгеров"""
+        log_pipeline.flush()
         for logger in self._loggers.values():
-            for handler in logger.handlers:
+            for handler in handlers_of(logger):
                 handler.flush()
                 handler.close()
 
@@ -503,6 +512,7 @@ def add_file_handler(
             handler.setFormatter(formatter)
 
             logger.addHandler(handler)
+            log_pipeline.attach(logger)
     else:
         # Для всех логгеров
         factory.add_file_handler_to_all(log_file, level, "detailed" if detailed else "standard")
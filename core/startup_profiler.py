@@ -0,0 +1,157 @@
+"""
+Профилирование времени импорта при запуске (--profile-startup)
+
+Профайлер встает первым в sys.meta_path и замеряет выполнение каждого
+загружаемого модуля: собственное время (без вложенных импортов) и полное.
+Отчет группирует собственное время по деревьям модулей (torch, pandas,
+exchanges, ...) и показывает, какие тяжелые подсистемы загружены.
+
+Модуль использует только стандартную библиотеку, чтобы его можно было
+включить до остальных импортов точки входа.
+"""
+
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from importlib.abc import MetaPathFinder
+from typing import Any
+
+from core.lazy_imports import loaded_subsystems
+
+PROFILE_FLAG = "--profile-startup"
+
+
+@dataclass
+class ImportRecord:
+    """Время импорта модуля (секунды)"""
+
+    cumulative: float
+    self_time: float
+
+
+class _TimedLoader:
+    """Обертка загрузчика, замеряющая exec_module"""
+
+    def __init__(self, loader: Any, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def exec_module(self, module: Any) -> None:
+        # Модуль видит исходный загрузчик, обертка нужна только для замера
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._profiler._exec(module.__name__, self._loader, module)
+
+
+class ImportProfiler(MetaPathFinder):
+    """Замер времени импорта модулей процесса"""
+
+    def __init__(self):
+        self.records: dict[str, ImportRecord] = {}
+        self._local = threading.local()
+        self._started: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self in sys.meta_path
+
+    def start(self) -> None:
+        if not self.active:
+            self._started = time.perf_counter()
+            sys.meta_path.insert(0, self)
+
+    def stop(self) -> None:
+        if self.active:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> Any:
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def _exec(self, name: str, loader: Any, module: Any) -> None:
+        stack = self._local.__dict__.setdefault("stack", [])
+        frame = [0.0]  # время вложенных импортов
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            with self._lock:
+                self.records[name] = ImportRecord(elapsed, max(elapsed - frame[0], 0.0))
+
+    def trees(self, depth: int = 1) -> dict[str, float]:
+        """Собственное время импорта, сгруппированное по первым depth частям имени"""
+        totals: dict[str, float] = {}
+        for name, record in self.records.items():
+            tree = ".".join(name.split(".")[:depth])
+            totals[tree] = totals.get(tree, 0.0) + record.self_time
+        return totals
+
+    def report(self, top: int = 15) -> str:
+        """Текстовый отчет: деревья модулей, самые долгие модули, подсистемы"""
+        total = sum(record.self_time for record in self.records.values())
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        lines = [
+            f"⏱️ Импорт: {total:.2f}с в {len(self.records)} модулях "
+            f"(с начала профилирования {elapsed:.2f}с)",
+            "   По деревьям модулей:",
+        ]
+        trees = sorted(self.trees().items(), key=lambda item: item[1], reverse=True)
+        for tree, seconds in trees[:top]:
+            lines.append(f"     {tree:<30} {seconds * 1000:9.1f} мс")
+
+        lines.append("   Самые долгие модули (с вложенными импортами):")
+        slowest = sorted(self.records.items(), key=lambda item: item[1].cumulative, reverse=True)
+        for name, record in slowest[:top]:
+            lines.append(
+                f"     {name:<40} {record.cumulative * 1000:9.1f} мс "
+                f"(собственное {record.self_time * 1000:.1f} мс)"
+            )
+
+        subsystems = loaded_subsystems()
+        lines.append(
+            "   Загруженные тяжелые подсистемы: "
+            + (
+                ", ".join(f"{name} ({', '.join(roots)})" for name, roots in subsystems.items())
+                or "нет"
+            )
+        )
+        return "\n".join(lines)
+
+
+# Глобальный профайлер процесса
+import_profiler = ImportProfiler()
+
+
+def start_if_requested(argv: list[str] | None = None) -> bool:
+    """Включает профайлер, если в аргументах есть --profile-startup"""
+    if PROFILE_FLAG in (sys.argv if argv is None else argv):
+        import_profiler.start()
+        return True
+    return False
@@ -13,6 +13,7 @@ import os
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 from core.config.config_manager import ConfigManager, get_global_config_manager
 from core.exceptions import (
@@ -21,6 +22,7 @@ from core.exceptions import (
     SystemInitializationError,
     SystemShutdownError,
 )
+from core.logging.log_pipeline import log_pipeline
 from core.logging.logger_factory import get_global_logger_factory
 from core.traders.trader_factory import TraderFactory, get_global_trader_factory
 from core.traders.trader_manager import TraderManager, get_global_trader_manager
@@ -28,7 +30,13 @@ from utils.helpers import get_system_resources
 
 # Импорт для новой архитектуры
 from database.database_manager import DatabaseManager
-from ml.ml_manager import MLManager
+from monitoring.metrics.runtime_profiler import runtime_profiler
+
+from .startup_graph import StartupGraph
+
+if TYPE_CHECKING:
+    # ML (torch) загружается только при инициализации MLManager
+    from ml.ml_manager import MLManager
 
 
 @dataclass
@@ -110,6 +118,10 @@ class SystemOrchestrator:
         # Задачи мониторинга
         self._monitoring_tasks: list[asyncio.Task] = []
 
+        # Графы инициализации и запуска (время шагов - в get_system_status)
+        self._init_graph: StartupGraph | None = None
+        self._start_graph: StartupGraph | None = None
+
     async def initialize(self) -> None:
         """Выполняет полную инициализацию всех компонентов системы.
 
@@ -122,35 +134,13 @@ class SystemOrchestrator:
             
             # Инициализация конфигурации
             await self.config_manager.initialize()
-            
-            # Базовые компоненты
-            await self._check_system_requirements()
-            await self._initialize_database_manager()
-            await self._initialize_ml_manager()
-            
-            # Торговые компоненты
-            await self._initialize_trader_factory()
-            await self._initialize_trader_manager()
-            await self._initialize_exchange_registry()
-            await self._initialize_trading_engine()
-            
-            # Сервисы
-            await self._initialize_health_checker()
-            await self._initialize_telegram_service()
-            await self._initialize_ai_signal_generator()
-            await self._initialize_data_manager()
-            await self._initialize_data_update_service()
-            await self._initialize_data_maintenance()
-            await self._initialize_signal_scheduler()
-
-            unified_mode = os.getenv("UNIFIED_MODE")
-            self.logger.info(f"🔍 UNIFIED_MODE = {unified_mode}")
-            if unified_mode != "true":
-                await self._initialize_api_servers()
-            else:
-                self.logger.info(
-                    "⏭️ API серверы будут запущены отдельным процессом (UNIFIED_MODE=true)"
-                )
+            self._configure_log_sampling()
+
+            # Компоненты инициализируются по графу зависимостей:
+            # независимые шаги выполняются параллельно
+            self._init_graph = self._build_init_graph()
+            report = await self._init_graph.run()
+            self.logger.info(report.format())
 
             await self._start_background_tasks()
             self.is_initialized = True
@@ -176,26 +166,9 @@ class SystemOrchestrator:
 
         self.logger.info("🎯 Запуск системы BOT_Trading v3.0...")
         try:
-            if self.trader_manager:
-                await self.trader_manager.start()
-                self.active_components.add("trader_manager")
-            if self.trading_engine:
-                await self.trading_engine.start()
-                self.active_components.add("trading_engine")
-            if self.ai_signal_generator:
-                await self.ai_signal_generator.start()
-            if self.signal_scheduler:
-                await self.signal_scheduler.start()
-            if self.data_manager:
-                await self.data_manager.start()
-                self.active_components.add("data_manager")
-            if self.data_update_service:
-                await self.data_update_service.start()
-            if hasattr(self, "data_maintenance") and self.data_maintenance:
-                await self.data_maintenance.start()
-
-            if os.getenv("UNIFIED_MODE") != "true":
-                await self._start_api_servers()
+            self._start_graph = self._build_start_graph()
+            report = await self._start_graph.run()
+            self.logger.info(report.format())
 
             self.is_running = True
             self.logger.info("🟢 Система запущена и работает")
@@ -217,6 +190,9 @@ class SystemOrchestrator:
         try:
             self.logger.info("🛑 Начинаем остановку системы...")
             self.is_running = False
+            for graph in (self._init_graph, self._start_graph):
+                if graph:
+                    await graph.cancel()
             await self._stop_background_tasks()
 
             if self.trader_manager:
@@ -240,6 +216,8 @@ class SystemOrchestrator:
 
             # Закрываем новые компоненты
             if self.ml_manager:
+                # Пул расчета признаков общий с калькулятором индикаторов
+                self.ml_manager.shutdown()
                 # ML Manager может не иметь метода stop, но у адаптера есть cleanup
                 if hasattr(self.ml_manager, 'adapter') and self.ml_manager.adapter:
                     await self.ml_manager.adapter.cleanup()
@@ -358,6 +336,11 @@ class SystemOrchestrator:
             "resources": health.system_resources,
             "traders": {"active": health.active_traders, "total_trades": health.total_trades, "active_positions": 0},
             "components": {"active": list(self.active_components), "failed": list(self.failed_components)},
+            "startup": {
+                "initialize": self._init_graph.report.to_dict() if self._init_graph else None,
+                "start": self._start_graph.report.to_dict() if self._start_graph else None,
+            },
+            "logging": log_pipeline.get_stats(),
         }
 
     async def get_status(self) -> dict:
@@ -470,6 +453,7 @@ class SystemOrchestrator:
                 "network_io": network_io,
                 "database_connections": db_connections,
                 "active_threads": active_threads,
+                "event_loop_lag": runtime_profiler.loop_lag.get_stats(),
                 "timestamp": datetime.now()
             }
             
@@ -487,6 +471,119 @@ class SystemOrchestrator:
             }
 
     # Приватные методы инициализации
+    def _configure_log_sampling(self) -> None:
+        """Частота записей горячего пути из logging.sampling."""
+        sampling = self.config_manager.get_config("logging.sampling", None)
+        if sampling is not None and sampling.rates:
+            log_pipeline.configure_sampling(sampling.rates, sampling.burst)
+
+    def _startup_settings(self) -> tuple[bool, set[str]]:
+        """Параллельный запуск и ленивые компоненты из system.startup."""
+        startup = getattr(self.system_config, "startup", None)
+        if startup is None:
+            return True, set()
+        return startup.parallel, set(startup.lazy_components)
+
+    def _build_init_graph(self) -> StartupGraph:
+        """Граф инициализации: компонент стартует после своих зависимостей."""
+        parallel, lazy = self._startup_settings()
+        graph = StartupGraph(parallel=parallel)
+
+        def add(name, func, depends=(), critical=False):
+            graph.add(name, func, depends, critical=critical, lazy=name in lazy)
+
+        # Базовые компоненты
+        add("system_requirements", self._check_system_requirements)
+        add("database_manager", self._initialize_database_manager,
+            ["system_requirements"], critical=True)
+        add("ml_manager", self._initialize_ml_manager, ["system_requirements"])
+
+        # Торговые компоненты
+        add("trader_factory", self._initialize_trader_factory)
+        add("trader_manager", self._initialize_trader_manager, ["trader_factory"])
+        add("exchange_registry", self._initialize_exchange_registry)
+        add("trading_engine", self._initialize_trading_engine,
+            ["database_manager", "trader_manager", "exchange_registry"])
+
+        # Сервисы
+        add("health_checker", self._initialize_health_checker)
+        add("telegram_service", self._initialize_telegram_service)
+        add("ai_signal_generator", self._initialize_ai_signal_generator, ["ml_manager"])
+        add("data_manager", self._initialize_data_manager, ["database_manager"])
+        add("data_update_service", self._initialize_data_update_service, ["data_manager"])
+        add("data_maintenance", self._initialize_data_maintenance, ["database_manager"])
+        add("signal_scheduler", self._initialize_signal_scheduler,
+            ["trading_engine", "data_manager"])
+
+        unified_mode = os.getenv("UNIFIED_MODE")
+        self.logger.info(f"🔍 UNIFIED_MODE = {unified_mode}")
+        if unified_mode != "true":
+            add("api_servers", self._initialize_api_servers,
+                ["trading_engine", "signal_scheduler"])
+        else:
+            self.logger.info(
+                "⏭️ API серверы будут запущены отдельным процессом (UNIFIED_MODE=true)"
+            )
+        return graph
+
+    def _build_start_graph(self) -> StartupGraph:
+        """Граф запуска инициализированных компонентов."""
+        parallel, lazy = self._startup_settings()
+        graph = StartupGraph(parallel=parallel)
+
+        async def start_trader_manager():
+            if self.trader_manager:
+                await self.trader_manager.start()
+                self.active_components.add("trader_manager")
+
+        async def start_trading_engine():
+            if self.trading_engine:
+                await self.trading_engine.start()
+                self.active_components.add("trading_engine")
+
+        async def start_ai_signal_generator():
+            # Ленивый компонент может еще инициализироваться
+            if self._init_graph:
+                await self._init_graph.ensure("ai_signal_generator")
+            if self.ai_signal_generator:
+                await self.ai_signal_generator.start()
+
+        async def start_signal_scheduler():
+            if self.signal_scheduler:
+                await self.signal_scheduler.start()
+
+        async def start_data_manager():
+            if self.data_manager:
+                await self.data_manager.start()
+                self.active_components.add("data_manager")
+
+        async def start_data_update_service():
+            if self.data_update_service:
+                await self.data_update_service.start()
+
+        async def start_data_maintenance():
+            if self._init_graph:
+                await self._init_graph.ensure("data_maintenance")
+            if hasattr(self, "data_maintenance") and self.data_maintenance:
+                await self.data_maintenance.start()
+
+        # Ошибка запуска любого компонента останавливает систему
+        graph.add("trader_manager", start_trader_manager, critical=True)
+        graph.add("trading_engine", start_trading_engine, critical=True)
+        graph.add("data_manager", start_data_manager, critical=True)
+        graph.add("data_update_service", start_data_update_service,
+                  ["data_manager"], critical=True)
+        graph.add("signal_scheduler", start_signal_scheduler,
+                  ["trading_engine", "data_manager"], critical=True)
+        graph.add("ai_signal_generator", start_ai_signal_generator,
+                  critical=True, lazy="ai_signal_generator" in lazy)
+        graph.add("data_maintenance", start_data_maintenance,
+                  critical=True, lazy="data_maintenance" in lazy)
+        if os.getenv("UNIFIED_MODE") != "true":
+            graph.add("api_servers", self._start_api_servers,
+                      ["trading_engine", "signal_scheduler"], critical=True)
+        return graph
+
     async def _check_system_requirements(self) -> None:
         """Проверка системных требований."""
         self.logger.info("🔍 Проверка системных требований...")
@@ -522,6 +619,7 @@ class SystemOrchestrator:
         """Инициализация MLManager с адаптерами."""
         try:
             self.logger.info("🤖 Инициализация MLManager...")
+            from ml.ml_manager import MLManager
             
             # Получаем полную конфигурацию для ML
             config = self.config_manager.get_config()
@@ -635,6 +733,13 @@ class SystemOrchestrator:
             
             self.signal_scheduler = SignalScheduler(self.config_manager)
             await self.signal_scheduler.initialize()
+
+            # Пакетный режим просыпается по закрытию свечи в менеджере данных,
+            # а его кеш свечей определяет символы, готовые к пакету
+            if self.signal_scheduler.mode == "candle_close" and self.data_manager is None:
+                self._create_data_manager()
+            if self.data_manager:
+                self.signal_scheduler.attach_data_manager(self.data_manager)
             
             # Подключаем к Trading Engine если он есть
             if self.trading_engine:
@@ -654,7 +759,22 @@ class SystemOrchestrator:
     async def _initialize_data_manager(self) -> None:
         """Инициализация менеджера данных."""
         self.logger.info("📊 Инициализация менеджера данных...")
+        # SmartDataManager создается при инициализации SignalScheduler в режиме
+        # candle_close (_create_data_manager) и запускается раньше планировщика
         pass
+
+    def _create_data_manager(self) -> None:
+        """Создание SmartDataManager - источника закрытых свечей для SignalScheduler."""
+        try:
+            from core.system.smart_data_manager import SmartDataManager
+
+            self.data_manager = SmartDataManager(self.config_manager)
+            self.logger.info("✅ SmartDataManager создан для пакетной генерации сигналов")
+        except Exception as e:
+            # Без менеджера данных пакетный режим работает по таймеру
+            self.logger.error(f"❌ Ошибка создания SmartDataManager: {e}")
+            self.data_manager = None
+            self.failed_components.add("data_manager")
     
     async def _initialize_data_update_service(self) -> None:
         """Инициализация сервиса обновления данных."""
@@ -674,7 +794,8 @@ class SystemOrchestrator:
     async def _start_background_tasks(self) -> None:
         """Запуск фоновых задач."""
         self.logger.info("🔄 Запуск фоновых задач...")
-        pass
+        # Замер задержки event loop для /api/monitoring/runtime
+        runtime_profiler.start_loop_monitor()
     
     async def _stop_background_tasks(self) -> None:
         """Остановка фоновых задач."""
@@ -683,6 +804,7 @@ class SystemOrchestrator:
             if not task.done():
                 task.cancel()
         self._monitoring_tasks.clear()
+        await runtime_profiler.stop_loop_monitor()
     
     async def _health_monitoring_loop(self) -> None:
         """Цикл мониторинга здоровья."""
@@ -5,37 +5,87 @@
 """
 
 import asyncio
+import heapq
+import sys
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict
 from typing import Any
-from weakref import WeakValueDictionary
+
+import numpy as np
+import pandas as pd
 
 from core.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+def estimate_size(value: Any) -> int:
+    """Приблизительный размер значения в байтах"""
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, pd.DataFrame | pd.Series):
+        usage = value.memory_usage(index=True, deep=False)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    return sys.getsizeof(value)
+
+
+def key_namespace(key: str) -> str:
+    """Пространство имен ключа - префикс до первого ':'"""
+    return key.partition(":")[0]
+
+
+class _CacheEntry:
+    __slots__ = ("created_at", "expires_at", "namespace", "size", "value")
+
+    def __init__(self, value: Any, created_at: float, expires_at: float, size: int, namespace: str):
+        self.value = value
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.size = size
+        self.namespace = namespace
+
+
 class PerformanceCache:
     """
     Высокопроизводительная система кеширования с:
-    - LRU eviction policy
-    - TTL для записей
+    - LRU eviction policy (OrderedDict, O(1) get/set/evict)
+    - TTL для записей (min-heap сроков, очистка за O(expired))
+    - Опциональным учетом памяти в байтах
+    - Квотами на пространства имен (market_data, indicator, ...)
     - Batch operations
     - Memory pressure monitoring
+
+    Args:
+        max_size: Максимальное количество записей
+        default_ttl: TTL по умолчанию (секунды)
+        max_bytes: Лимит суммарного размера значений (None - без учета байт)
+        namespace_quotas: Максимум записей на пространство имен,
+            например {"market_data": 1000, "indicator": 5000}
     """
 
-    def __init__(self, max_size: int = 10000, default_ttl: int = 300):
+    def __init__(
+        self,
+        max_size: int = 10000,
+        default_ttl: int = 300,
+        max_bytes: int | None = None,
+        namespace_quotas: dict[str, int] | None = None,
+    ):
         self.max_size = max_size
         self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.namespace_quotas = dict(namespace_quotas or {})
 
-        # Основное хранилище
-        self._cache: dict[str, dict[str, Any]] = {}
-        self._access_times: dict[str, float] = {}
-        self._access_order = deque()
-        self._access_count = defaultdict(int)
+        # Основное хранилище в порядке доступа (последний - самый свежий)
+        self._cache: OrderedDict[str, _CacheEntry] = OrderedDict()
 
-        # TTL tracking
-        self._expiry_times: dict[str, float] = {}
+        # Порядок доступа внутри пространств имен с квотой
+        self._namespaces: dict[str, OrderedDict[str, None]] = {
+            namespace: OrderedDict() for namespace in self.namespace_quotas
+        }
+
+        # TTL tracking: (expires_at, key), устаревшие элементы удаляются лениво
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._current_bytes = 0
 
         # Batch операции
         self._batch_queue: list[dict[str, Any]] = []
@@ -45,9 +95,7 @@ class PerformanceCache:
         self.hits = 0
         self.misses = 0
         self.evictions = 0
-
-        # Weak references для автоочистки
-        self._weak_refs: WeakValueDictionary = WeakValueDictionary()
+        self.expirations = 0
 
         # Фоновая очистка
         self._cleanup_task = None
@@ -71,111 +119,130 @@ class PerformanceCache:
 
     async def _cleanup_expired(self):
         """Удаление устаревших записей"""
-        current_time = time.time()
-        expired_keys = [key for key, expiry in self._expiry_times.items() if expiry < current_time]
-
-        for key in expired_keys:
-            await self._remove_key(key)
-
-        if expired_keys:
-            logger.debug(f"Удалено {len(expired_keys)} устаревших записей из кеша")
+        removed = self._expire(time.monotonic())
+        if removed:
+            logger.debug(f"Удалено {removed} устаревших записей из кеша")
+
+    def _expire(self, now: float) -> int:
+        """Снимает с кучи истекшие сроки - O(expired log n)"""
+        removed = 0
+        # _remove_key может пересобрать кучу - обращаемся к атрибуту каждый раз
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            entry = self._cache.get(key)
+            # Ключ мог быть удален или перезаписан с новым сроком
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove_key(key)
+                self.expirations += 1
+                removed += 1
+        return removed
 
     async def _check_memory_pressure(self):
         """Проверка и освобождение памяти при необходимости"""
         if len(self._cache) > self.max_size * 0.9:
-            # Удаляем 20% наименее используемых записей
-            to_remove = int(self.max_size * 0.2)
-
-            # Сортируем по частоте использования и времени доступа
-            sorted_keys = sorted(
-                self._cache.keys(),
-                key=lambda k: (self._access_count[k], self._access_times.get(k, 0)),
-            )
-
-            for key in sorted_keys[:to_remove]:
-                await self._remove_key(key)
-                self.evictions += 1
+            # Удаляем 20% наименее недавно использованных записей
+            to_remove = min(int(self.max_size * 0.2), len(self._cache))
+            for _ in range(to_remove):
+                self._evict_lru()
 
             logger.info(f"Освобождено {to_remove} записей кеша из-за memory pressure")
 
-    async def _remove_key(self, key: str):
+    def _remove_key(self, key: str) -> _CacheEntry | None:
         """Безопасное удаление ключа из всех структур"""
-        self._cache.pop(key, None)
-        self._access_times.pop(key, None)
-        self._expiry_times.pop(key, None)
-        self._access_count.pop(key, None)
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return None
+
+        self._current_bytes -= entry.size
+        namespace_order = self._namespaces.get(entry.namespace)
+        if namespace_order is not None:
+            namespace_order.pop(key, None)
 
-        # Удаляем из очереди доступа
-        try:
-            self._access_order.remove(key)
-        except ValueError:
-            pass
+        # Куча очищается лениво; при большом числе мертвых элементов - пересборка
+        if len(self._expiry_heap) > 2 * len(self._cache) + 1024:
+            self._expiry_heap = [
+                (item.expires_at, cached_key) for cached_key, item in self._cache.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+        return entry
 
     async def get(self, key: str) -> Any | None:
         """Получение значения из кеша"""
-        current_time = time.time()
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
 
         # Проверяем TTL
-        if key in self._expiry_times and self._expiry_times[key] < current_time:
-            await self._remove_key(key)
+        if entry.expires_at <= time.monotonic():
+            self._remove_key(key)
+            self.expirations += 1
             self.misses += 1
             return None
 
-        if key in self._cache:
-            # Обновляем статистику доступа
-            self._access_times[key] = current_time
-            self._access_count[key] += 1
-            self._access_order.append(key)
-
-            # Ограничиваем размер очереди доступа
-            if len(self._access_order) > self.max_size:
-                self._access_order.popleft()
+        # Обновляем порядок доступа
+        self._cache.move_to_end(key)
+        namespace_order = self._namespaces.get(entry.namespace)
+        if namespace_order is not None:
+            namespace_order.move_to_end(key)
 
-            self.hits += 1
-            return self._cache[key]["value"]
-
-        self.misses += 1
-        return None
+        self.hits += 1
+        return entry.value
 
     async def set(self, key: str, value: Any, ttl: int | None = None) -> None:
         """Сохранение значения в кеш"""
-        current_time = time.time()
+        current_time = time.monotonic()
         ttl = ttl or self.default_ttl
+        namespace = key_namespace(key)
+        size = estimate_size(value) if self.max_bytes is not None else 0
 
-        # Проверяем размер кеша
-        if len(self._cache) >= self.max_size and key not in self._cache:
-            await self._evict_lru()
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"Значение {key} ({size} байт) превышает лимит кеша")
+            self._remove_key(key)
+            return
 
-        self._cache[key] = {"value": value, "created_at": current_time}
-        self._access_times[key] = current_time
-        self._expiry_times[key] = current_time + ttl
-        self._access_count[key] += 1
-        self._access_order.append(key)
+        self._remove_key(key)
 
-    async def _evict_lru(self):
-        """Удаление наименее используемой записи"""
-        if not self._access_order:
+        # Освобождаем место: сначала истекшие, затем LRU
+        self._expire(current_time)
+        quota = self.namespace_quotas.get(namespace)
+        if quota is not None:
+            namespace_order = self._namespaces[namespace]
+            while namespace_order and len(namespace_order) >= quota:
+                self._remove_key(next(iter(namespace_order)))
+                self.evictions += 1
+        while len(self._cache) >= self.max_size:
+            self._evict_lru()
+        if self.max_bytes is not None:
+            while self._cache and self._current_bytes + size > self.max_bytes:
+                self._evict_lru()
+
+        entry = _CacheEntry(value, time.time(), current_time + ttl, size, namespace)
+        self._cache[key] = entry
+        self._current_bytes += size
+        if quota is not None:
+            self._namespaces[namespace][key] = None
+        heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+
+    def _evict_lru(self):
+        """Удаление наименее недавно использованной записи - O(1)"""
+        if not self._cache:
             return
 
-        # Находим ключ с самым старым временем доступа
-        lru_key = min(self._access_times.keys(), key=lambda k: self._access_times[k])
-        await self._remove_key(lru_key)
+        self._remove_key(next(iter(self._cache)))
         self.evictions += 1
 
     async def delete(self, key: str) -> bool:
         """Удаление ключа из кеша"""
-        if key in self._cache:
-            await self._remove_key(key)
-            return True
-        return False
+        return self._remove_key(key) is not None
 
     async def clear(self):
         """Очистка всего кеша"""
         self._cache.clear()
-        self._access_times.clear()
-        self._access_order.clear()
-        self._expiry_times.clear()
-        self._access_count.clear()
+        for namespace_order in self._namespaces.values():
+            namespace_order.clear()
+        self._expiry_heap.clear()
+        self._current_bytes = 0
 
     # Batch операции для высокой производительности
     async def get_many(self, keys: list[str]) -> dict[str, Any]:
@@ -245,8 +312,15 @@ class PerformanceCache:
             "hits": self.hits,
             "misses": self.misses,
             "evictions": self.evictions,
+            "expirations": self.expirations,
             "hit_ratio": round(hit_ratio, 2),
             "memory_usage_percent": round(len(self._cache) / self.max_size * 100, 2),
+            "bytes": self._current_bytes,
+            "max_bytes": self.max_bytes,
+            "namespaces": {
+                namespace: len(namespace_order)
+                for namespace, namespace_order in self._namespaces.items()
+            },
         }
 
     def reset_stats(self):
@@ -254,6 +328,7 @@ class PerformanceCache:
         self.hits = 0
         self.misses = 0
         self.evictions = 0
+        self.expirations = 0
 
     async def stop(self):
         """Остановка фоновых задач"""
@@ -3,6 +3,7 @@
 """
 
 import asyncio
+import time
 from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Any
@@ -12,7 +13,12 @@ import pandas as pd
 from core.cache.market_data_cache import MarketDataCache
 from core.config.config_manager import ConfigManager
 from core.logger import setup_logger
+from data.candle_writer import get_candle_writer
+from data.ohlcv_loader import OHLCVColumnarLoader
 from database.db_manager import get_db
+from database.repositories.market_data_repository import CandleRecord
+from exchanges.base.websocket_base import WebSocketMessage
+from exchanges.bybit.websocket import BybitPublicWebSocket
 from exchanges.factory import ExchangeFactory
 
 logger = setup_logger(__name__)
@@ -22,8 +28,9 @@ class SmartDataManager:
     """
     Оптимизированный менеджер данных:
     - Загружает исторические данные один раз при старте
+    - Получает свечи push-ом через WebSocket Bybit (polling - запасной путь)
     - Обновляет только последнюю свечу каждую минуту
-    - Сохраняет завершенные свечи в БД
+    - Сохраняет завершенные свечи в БД пачками через общий CandleWriter
     - Использует кеш для минимизации API запросов
     """
 
@@ -46,6 +53,7 @@ class SmartDataManager:
 
         # Инициализация компонентов
         self.db_manager = None
+        self.candle_writer = get_candle_writer(self.config)
         
         # Инициализация кеша
         self.cache = MarketDataCache(
@@ -59,6 +67,14 @@ class SmartDataManager:
         self.exchanges = {}
         self.websocket_connections = {}
 
+        # Push-обновления свечей через публичный WebSocket Bybit
+        self.ws_config = self.data_config.get("websocket", {})
+        self.kline_interval = str(self.ws_config.get("interval", "15"))
+        self.public_ws: BybitPublicWebSocket | None = None
+        self._last_close_notified: int | None = None
+        self._notify_task: asyncio.Task | None = None
+        self._last_ws_message: float | None = None  # time.monotonic()
+
         # Торговые пары
         self.trading_pairs = self.config.get(
             "trading_pairs",
@@ -130,12 +146,17 @@ class SmartDataManager:
             except asyncio.CancelledError:
                 pass
 
+        # Запись оставшихся в буфере свечей
+        await self.candle_writer.stop()
+
         # Закрытие WebSocket соединений
         for ws in self.websocket_connections.values():
             try:
-                await ws.close()
+                await ws.disconnect()
             except:
                 pass
+        self.websocket_connections.clear()
+        self.public_ws = None
 
         # Закрытие бирж
         for exchange in self.exchanges.values():
@@ -197,9 +218,12 @@ class SmartDataManager:
         """
         logger.info("📊 Загрузка исторических данных...")
 
+        # Данные из БД для всех символов - одним запросом
+        db_data = await self._load_many_from_database(self.trading_pairs)
+
         tasks = []
         for symbol in self.trading_pairs:
-            task = asyncio.create_task(self._load_symbol_data(symbol))
+            task = asyncio.create_task(self._load_symbol_data(symbol, db_data))
             tasks.append(task)
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -212,11 +236,33 @@ class SmartDataManager:
             if isinstance(result, Exception):
                 logger.error(f"Ошибка загрузки {self.trading_pairs[i]}: {result}")
 
-    async def _load_symbol_data(self, symbol: str) -> None:
-        """Загрузка данных для одного символа"""
+        # История всех символов, загруженная с API, - одной пачкой
+        try:
+            written = await self.candle_writer.flush()
+            if written:
+                logger.info(
+                    f"💾 Сохранено {written} свечей в БД "
+                    f"({self.candle_writer.get_stats()['last_flush_ms']}ms)"
+                )
+        except Exception as e:
+            logger.error(f"Ошибка сохранения исторических свечей: {e}")
+
+    async def _load_symbol_data(
+        self, symbol: str, preloaded: dict[str, pd.DataFrame] | None = None
+    ) -> None:
+        """
+        Загрузка данных для одного символа
+
+        Args:
+            symbol: Символ
+            preloaded: Данные из БД, загруженные заранее для нескольких символов
+        """
         try:
             # 1. Пробуем загрузить из БД
-            db_data = await self._load_from_database(symbol)
+            if preloaded is not None:
+                db_data = preloaded.get(symbol)
+            else:
+                db_data = await self._load_from_database(symbol)
 
             if db_data is not None and len(db_data) >= self.data_config["min_candles_for_ml"]:
                 # Проверяем актуальность
@@ -240,49 +286,29 @@ class SmartDataManager:
     async def _load_from_database(self, symbol: str) -> pd.DataFrame | None:
         """Загрузка данных из БД"""
         try:
-            result = await self.db_manager.fetch_all(
-                """
-                SELECT timestamp, datetime, open, high, low, close, volume, turnover
-                FROM raw_market_data
-                WHERE symbol = $1
-                  AND exchange = 'bybit'
-                  AND interval_minutes = 15
-                ORDER BY timestamp DESC
-                LIMIT 1000
-            """,
-                symbol,
+            return await self._ohlcv_loader().load(
+                symbol, exchange="bybit", interval_minutes=15, limit=1000
             )
 
-            if not result:
-                return None
-
-            # Преобразуем в DataFrame
-            data = []
-            for row in result:
-                data.append(
-                    {
-                        "timestamp": row["timestamp"],
-                        "datetime": row["datetime"],
-                        "open": float(row["open"]),
-                        "high": float(row["high"]),
-                        "low": float(row["low"]),
-                        "close": float(row["close"]),
-                        "volume": float(row["volume"]),
-                        "turnover": float(row["turnover"]) if row["turnover"] else 0,
-                    }
-                )
-
-            df = pd.DataFrame(data)
-            df["datetime"] = pd.to_datetime(df["datetime"], utc=True)
-            df.set_index("datetime", inplace=True)
-            df.sort_index(inplace=True)
-
-            return df
-
         except Exception as e:
             logger.error(f"Ошибка загрузки из БД для {symbol}: {e}")
             return None
 
+    async def _load_many_from_database(self, symbols: list[str]) -> dict[str, pd.DataFrame]:
+        """Загрузка данных всех символов из БД одним запросом"""
+        try:
+            return await self._ohlcv_loader().load_many(
+                symbols, exchange="bybit", interval_minutes=15, limit=1000
+            )
+
+        except Exception as e:
+            logger.error(f"Ошибка пакетной загрузки из БД: {e}")
+            return {}
+
+    def _ohlcv_loader(self) -> OHLCVColumnarLoader:
+        """Колоночный загрузчик OHLCV на пуле DBManager"""
+        return OHLCVColumnarLoader(self.db_manager.pool)
+
     async def _load_from_api(self, symbol: str) -> None:
         """Загрузка данных с API"""
         try:
@@ -314,10 +340,113 @@ class SmartDataManager:
             raise
 
     async def _start_websockets(self) -> None:
-        """Запуск WebSocket соединений для real-time обновлений"""
-        # TODO: Реализовать WebSocket подключения для каждой биржи
-        # Пока используем polling каждую минуту
-        logger.info("📡 WebSocket соединения будут реализованы в следующей версии")
+        """
+        Запуск публичного WebSocket Bybit для real-time обновлений свечей
+
+        Свечи приходят push-ом в MarketDataCache.update_last_candle, поэтому
+        кеш остается свежим и _smart_update_loop не запрашивает REST. Если
+        WebSocket недоступен или отстал больше cache_ttl, работает polling.
+        """
+        if not self.ws_config.get("enabled", True):
+            logger.info("📡 WebSocket отключен, используется polling")
+            return
+
+        exchange_config = self.config.get("exchanges", {}).get("bybit", {})
+        self.public_ws = BybitPublicWebSocket(
+            category=self.config.get("trading", {}).get("category", "linear"),
+            testnet=bool(exchange_config.get("testnet", False)),
+            url=self.ws_config.get("url"),
+        )
+
+        try:
+            await self.public_ws.subscribe_klines(
+                self.trading_pairs, self.kline_interval, self._on_kline_message
+            )
+            await self.public_ws.connect()
+            self.websocket_connections["bybit"] = self.public_ws
+            logger.info(
+                f"📡 WebSocket Bybit: kline.{self.kline_interval} для {len(self.trading_pairs)} пар"
+            )
+        except Exception as e:
+            logger.warning(f"WebSocket недоступен, используется polling: {e}")
+            self.public_ws = None
+
+    def _ws_kline_to_candle(self, kline: dict[str, Any]) -> dict[str, Any]:
+        """Свеча из сообщения kline Bybit v5 в формат update_last_candle"""
+        return {
+            "timestamp": self._ensure_utc_timestamp(pd.Timestamp(int(kline["start"]), unit="ms")),
+            "open": float(kline["open"]),
+            "high": float(kline["high"]),
+            "low": float(kline["low"]),
+            "close": float(kline["close"]),
+            "volume": float(kline["volume"]),
+            "turnover": float(kline.get("turnover", 0) or 0),
+        }
+
+    async def _on_kline_message(self, message: WebSocketMessage) -> None:
+        """Обновление кеша по push-сообщению kline"""
+        symbol = message.symbol
+        if symbol not in self.trading_pairs:
+            return
+        self._last_ws_message = time.monotonic()
+
+        for kline in message.data or []:
+            try:
+                candle_data = self._ws_kline_to_candle(kline)
+                await self.cache.update_last_candle(symbol, candle_data)
+
+                # confirm=True - свеча закрыта биржей
+                if kline.get("confirm"):
+                    await self._save_confirmed_candle(symbol, candle_data)
+                    self._schedule_close_notification(int(kline["start"]))
+            except Exception as e:
+                logger.error(f"Ошибка обработки kline {symbol}: {e}")
+
+    async def _save_confirmed_candle(self, symbol: str, candle_data: dict[str, Any]) -> None:
+        """Сохранение закрытой свечи в БД (один раз на свечу)"""
+        candle_time = candle_data["timestamp"].to_pydatetime().replace(tzinfo=UTC)
+        last_save = self._last_db_save.get(symbol)
+        if last_save is not None and candle_time <= last_save:
+            return
+
+        await self._save_single_candle(symbol, candle_data)
+        self._last_db_save[symbol] = candle_time
+        logger.debug(f"💾 {symbol}: Закрытая свеча сохранена в БД")
+
+    def _schedule_close_notification(self, candle_start: int) -> None:
+        """
+        Один вызов колбэков на закрытие свечи
+
+        Подтверждения по символам приходят почти одновременно - небольшая
+        задержка собирает их в одно уведомление.
+        """
+        if self._last_close_notified == candle_start:
+            return
+        self._last_close_notified = candle_start
+
+        async def notify() -> None:
+            await asyncio.sleep(float(self.ws_config.get("close_notify_delay", 0.5)))
+            await self._notify_update_callbacks()
+
+        self._notify_task = asyncio.create_task(notify())
+
+    def _stream_active(self) -> bool:
+        """WebSocket подключен и присылал свечи не позже stall_timeout секунд назад"""
+        if self.public_ws is None or not self.public_ws.is_connected:
+            return False
+        if self._last_ws_message is None:
+            return False
+        stall_timeout = float(
+            self.ws_config.get("stall_timeout", self.data_config.get("cache_ttl", 60))
+        )
+        return time.monotonic() - self._last_ws_message < stall_timeout
+
+    async def _notify_update_callbacks(self) -> None:
+        for callback in self._update_callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Ошибка в callback: {e}")
 
     async def _smart_update_loop(self) -> None:
         """
@@ -332,17 +461,16 @@ class SmartDataManager:
                 # Обновляем только последние свечи
                 await self._update_last_candles()
 
-                # Вызываем колбэки
-                for callback in self._update_callbacks:
-                    try:
-                        await callback()
-                    except Exception as e:
-                        logger.error(f"Ошибка в callback: {e}")
+                # При живом WebSocket колбэки вызываются на закрытие свечи,
+                # из минутного цикла - только при polling
+                if not self._stream_active():
+                    await self._notify_update_callbacks()
 
                 # Логируем статистику кеша
                 if asyncio.get_event_loop().time() % 300 < 60:  # Каждые 5 минут
                     stats = self.cache.get_stats()
                     logger.info(f"📊 Статистика кеша: {stats}")
+                    logger.info(f"💾 Запись свечей: {self.candle_writer.get_stats()}")
 
                 # Ждем до следующей минуты
                 elapsed = asyncio.get_event_loop().time() - start_time
@@ -442,44 +570,37 @@ class SmartDataManager:
         except Exception as e:
             logger.error(f"Ошибка сохранения завершенной свечи {symbol}: {e}")
 
+    def _candle_record(self, symbol: str, candle_data: dict[str, Any]) -> CandleRecord:
+        """Строка raw_market_data из свечи в формате update_last_candle"""
+        return CandleRecord(
+            symbol=symbol,
+            timestamp=int(candle_data["timestamp"].timestamp() * 1000),
+            datetime=candle_data["timestamp"],
+            open=candle_data["open"],
+            high=candle_data["high"],
+            low=candle_data["low"],
+            close=candle_data["close"],
+            volume=candle_data["volume"],
+            turnover=candle_data.get("turnover", 0),
+            interval_minutes=15,
+            exchange="bybit",
+        )
+
     async def _save_single_candle(self, symbol: str, candle_data: dict[str, Any]) -> None:
-        """Сохранение одной свечи в БД"""
-        try:
-            timestamp = int(candle_data["timestamp"].timestamp() * 1000)
-
-            await self.db_manager.execute(
-                """
-                INSERT INTO raw_market_data
-                (symbol, timestamp, datetime, open, high, low, close, volume,
-                 interval_minutes, exchange, turnover)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
-                ON CONFLICT (symbol, timestamp, interval_minutes, exchange) DO UPDATE
-                SET open = EXCLUDED.open,
-                    high = EXCLUDED.high,
-                    low = EXCLUDED.low,
-                    close = EXCLUDED.close,
-                    volume = EXCLUDED.volume,
-                    turnover = EXCLUDED.turnover,
-                    updated_at = NOW()
-            """,
-                symbol,
-                timestamp,
-                candle_data["timestamp"],
-                candle_data["open"],
-                candle_data["high"],
-                candle_data["low"],
-                candle_data["close"],
-                candle_data["volume"],
-                15,
-                "bybit",
-                candle_data.get("turnover", 0),
-            )
+        """
+        Сохранение одной свечи в БД
 
+        Свеча попадает в общий буфер CandleWriter - закрытия свечей всех
+        символов записываются одной пачкой.
+        """
+        try:
+            await self.candle_writer.add([self._candle_record(symbol, candle_data)])
         except Exception as e:
             logger.error(f"Ошибка сохранения свечи {symbol}: {e}")
 
     async def _save_candles_to_db(self, symbol: str, candles: list[Any]) -> None:
-        """Сохранение списка свечей в БД"""
+        """Сохранение списка свечей в БД через буфер CandleWriter"""
+        records = []
         for candle in candles:
             try:
                 candle_data = None
@@ -509,10 +630,15 @@ class SmartDataManager:
                     }
 
                 if candle_data:
-                    await self._save_single_candle(symbol, candle_data)
+                    records.append(self._candle_record(symbol, candle_data))
             except Exception as e:
                 logger.error(f"Ошибка сохранения свечи: {e}")
 
+        try:
+            await self.candle_writer.add(records)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения свечей {symbol}: {e}")
+
     def _candles_to_dataframe(self, candles: list[Any]) -> pd.DataFrame:
         """Преобразование свечей в DataFrame"""
         data = []
@@ -0,0 +1,241 @@
+"""
+Граф запуска компонентов системы
+
+Компоненты объявляются вместе с зависимостями; каждый шаг стартует, как
+только завершены его зависимости, поэтому независимые компоненты (загрузка
+ML модели, биржи, сервисы данных) инициализируются параллельно, а время
+холодного старта определяется самой длинной цепочкой, а не суммой шагов.
+
+Ленивые шаги выполняются в фоне после основных; шаг, от которого зависит
+неленивый шаг, становится обычным. Ошибка критического шага отменяет
+остальные и пробрасывается, ошибка некритического или ленивого шага только
+записывается - зависимые шаги выполняются, как и при последовательном запуске.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+
+@dataclass
+class StartupStep:
+    """Шаг запуска компонента"""
+
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    depends: tuple[str, ...] = ()
+    critical: bool = False
+    lazy: bool = False
+
+
+@dataclass
+class StepTiming:
+    """Время выполнения шага относительно начала графа (секунды)"""
+
+    started: float
+    duration: float = 0.0
+    status: str = STATUS_OK
+    lazy: bool = False
+    error: str | None = None
+
+
+@dataclass
+class StartupReport:
+    """Итог выполнения графа"""
+
+    total: float = 0.0
+    steps: dict[str, StepTiming] = field(default_factory=dict)
+
+    @property
+    def sequential_total(self) -> float:
+        """Время последовательного выполнения тех же шагов"""
+        return sum(timing.duration for timing in self.steps.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total_seconds": round(self.total, 3),
+            "sequential_seconds": round(self.sequential_total, 3),
+            "steps": {
+                name: {
+                    "started": round(timing.started, 3),
+                    "duration": round(timing.duration, 3),
+                    "status": timing.status,
+                    "lazy": timing.lazy,
+                    "error": timing.error,
+                }
+                for name, timing in self.steps.items()
+            },
+        }
+
+    def format(self) -> str:
+        """Таблица шагов по времени старта для лога"""
+        lines = [
+            f"⏱️ Запуск за {self.total:.2f}с (последовательно было бы {self.sequential_total:.2f}с)"
+        ]
+        for name, timing in sorted(self.steps.items(), key=lambda item: item[1].started):
+            mark = " (lazy)" if timing.lazy else ""
+            status = "" if timing.status == STATUS_OK else f" [{timing.status}]"
+            lines.append(f"   {name}{mark}: +{timing.started:.2f}с, {timing.duration:.2f}с{status}")
+        return "\n".join(lines)
+
+
+class StartupGraph:
+    """
+    Запуск компонентов по графу зависимостей
+
+    Args:
+        parallel: False - шаги по одному в порядке зависимостей
+    """
+
+    def __init__(self, parallel: bool = True):
+        self.parallel = parallel
+        self.steps: dict[str, StartupStep] = {}
+        self.report = StartupReport()
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._lazy_task: asyncio.Task | None = None
+        self._started: float | None = None
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        depends: Iterable[str] = (),
+        critical: bool = False,
+        lazy: bool = False,
+    ) -> None:
+        """Добавляет шаг; зависимости могут быть объявлены позже"""
+        if name in self.steps:
+            raise ValueError(f"Шаг {name} уже добавлен")
+        self.steps[name] = StartupStep(name, func, tuple(depends), critical, lazy)
+
+    def _order(self) -> list[str]:
+        """Топологический порядок шагов (порядок добавления при равенстве)"""
+        for step in self.steps.values():
+            unknown = [name for name in step.depends if name not in self.steps]
+            if unknown:
+                raise ValueError(f"Шаг {step.name} зависит от неизвестных: {unknown}")
+
+        order: list[str] = []
+        state: dict[str, int] = {}  # 1 - в обходе, 2 - готов
+
+        def visit(name: str, path: list[str]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Цикл зависимостей: {' -> '.join([*path, name])}")
+            state[name] = 1
+            for dependency in self.steps[name].depends:
+                visit(dependency, [*path, name])
+            state[name] = 2
+            order.append(name)
+
+        for name in self.steps:
+            visit(name, [])
+        return order
+
+    def _eager(self, order: list[str]) -> set[str]:
+        """Неленивые шаги и все их зависимости"""
+        eager: set[str] = set()
+        for name in reversed(order):
+            if not self.steps[name].lazy or name in eager:
+                eager.add(name)
+                eager.update(self.steps[name].depends)
+        return eager
+
+    async def run(self) -> StartupReport:
+        """
+        Выполняет неленивые шаги и запускает ленивые в фоне
+
+        Raises:
+            Исключение первого упавшего критического шага
+        """
+        order = self._order()
+        eager = self._eager(order)
+        for name in eager:
+            # Ленивый шаг, нужный неленивому, выполняется как обычный
+            self.steps[name].lazy = False
+        self._started = time.perf_counter()
+
+        await self._run_steps([name for name in order if name in eager])
+        self.report.total = time.perf_counter() - self._started
+
+        lazy = [name for name in order if name not in eager]
+        if lazy:
+            self._lazy_task = asyncio.create_task(self._run_steps(lazy))
+            # Шаги ставятся в очередь сразу, чтобы их можно было ждать через ensure
+            await asyncio.sleep(0)
+        return self.report
+
+    async def ensure(self, name: str) -> None:
+        """Ждет завершения шага (для ленивых - их фонового выполнения)"""
+        task = self._tasks.get(name)
+        if task is not None:
+            await asyncio.wait([task])
+
+    async def wait_lazy(self) -> None:
+        """Ждет завершения ленивых шагов"""
+        if self._lazy_task is not None:
+            await asyncio.gather(self._lazy_task, return_exceptions=True)
+
+    async def cancel(self) -> None:
+        """Отменяет невыполненные шаги (в том числе ленивые)"""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        if self._lazy_task is not None and not self._lazy_task.done():
+            tasks.append(self._lazy_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def status(self, name: str) -> str | None:
+        timing = self.report.steps.get(name)
+        return timing.status if timing else None
+
+    async def _run_steps(self, names: list[str]) -> None:
+        semaphore = asyncio.Semaphore(len(names) if self.parallel else 1)
+        tasks = {}
+        for name in names:
+            tasks[name] = asyncio.create_task(self._run_step(self.steps[name], semaphore))
+            self._tasks[name] = tasks[name]
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+    async def _run_step(self, step: StartupStep, semaphore: asyncio.Semaphore) -> None:
+        dependencies = [self._tasks[name] for name in step.depends]
+        if dependencies:
+            await asyncio.wait(dependencies)
+
+        if any(self.status(name) == STATUS_SKIPPED for name in step.depends) or any(
+            self.status(name) == STATUS_FAILED and self.steps[name].critical
+            for name in step.depends
+        ):
+            self.report.steps[step.name] = StepTiming(
+                started=time.perf_counter() - self._started, status=STATUS_SKIPPED, lazy=step.lazy
+            )
+            return
+
+        async with semaphore:
+            started = time.perf_counter()
+            timing = StepTiming(started=started - self._started, lazy=step.lazy)
+            self.report.steps[step.name] = timing
+            try:
+                await step.func()
+            except Exception as e:
+                timing.status = STATUS_FAILED
+                timing.error = str(e)
+                # Ленивые шаги выполняются в фоне - ошибка только записывается
+                if step.critical and not step.lazy:
+                    raise
+            finally:
+                timing.duration = time.perf_counter() - started
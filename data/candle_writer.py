@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Общий буферизованный writer свечей в raw_market_data
+
+SmartDataManager, DataLoader и DataUpdateService раньше писали свечи по одной
+(INSERT ... ON CONFLICT на свечу) или одним огромным VALUES. Writer собирает
+свечи всех символов в общий буфер и пишет их пачкой через
+MarketDataRepository.save_candles (бинарный COPY во временную таблицу +
+один INSERT ... ON CONFLICT на flush).
+
+Буфер ключуется уникальным ключом raw_market_data, поэтому повторные
+обновления одной свечи до flush схлопываются (побеждает последнее). Flush
+выполняется по размеру буфера (max_batch), по таймеру (flush_interval) и
+явно через flush()/write(). Метрики - get_stats().
+
+Ошибки записи:
+- соединение с БД и отмена (TRANSIENT_ERRORS) - незаписанные свечи
+  возвращаются в буфер и пишутся следующим flush;
+- остальные (данные свечи нарушают ограничения таблицы и т.п.) - пачка
+  делится пополам до отдельных свечей, свечи с ошибкой отбрасываются с
+  записью в лог и учитываются в метрике rejected.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections.abc import Iterable
+from typing import Any
+
+import asyncpg
+
+from core.logger import setup_logger
+from database.connections.postgres import AsyncPGPool
+from database.repositories.market_data_repository import CandleRecord, MarketDataRepository
+
+logger = setup_logger(__name__)
+
+# Ошибки, после которых пачку можно повторить целиком
+TRANSIENT_ERRORS = (
+    OSError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.ConnectionDoesNotExistError,
+    asyncio.CancelledError,
+)
+
+
+class CandleWriter:
+    """
+    Буферизованная пакетная запись свечей
+
+    Args:
+        repository: Репозиторий raw_market_data (по умолчанию на пуле AsyncPGPool)
+        max_batch: Размер буфера, при котором flush запускается сразу
+        flush_interval: Период фонового flush (секунды)
+        max_pending: Предел буфера при недоступной БД - старые свечи отбрасываются
+    """
+
+    def __init__(
+        self,
+        repository: MarketDataRepository | None = None,
+        max_batch: int = 5000,
+        flush_interval: float = 1.0,
+        max_pending: int = 200_000,
+    ):
+        self._repository = repository
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, max_batch)
+
+        self._pending: dict[tuple, CandleRecord] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flusher: asyncio.Task | None = None
+
+        # Метрики
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._written = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._rejected = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._last_batch_size = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "CandleWriter":
+        """Writer из секции data_management.candle_writer"""
+        settings = config.get("data_management", {}).get("candle_writer", {})
+        return cls(
+            max_batch=int(settings.get("max_batch", 5000)),
+            flush_interval=float(settings.get("flush_interval", 1.0)),
+            max_pending=int(settings.get("max_pending", 200_000)),
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """Свечей в буфере, ожидающих записи"""
+        return len(self._pending)
+
+    async def _get_repository(self) -> MarketDataRepository:
+        if self._repository is None:
+            self._repository = MarketDataRepository(await AsyncPGPool.get_pool())
+        return self._repository
+
+    def enqueue(self, candles: Iterable[CandleRecord]) -> int:
+        """
+        Добавляет свечи в буфер без записи
+
+        Returns:
+            Глубина очереди после добавления
+        """
+        pending = self._pending
+        for candle in candles:
+            key = candle.key
+            if key in pending:
+                self._coalesced += 1
+                # Перемещаем в конец - порядок буфера от старых к новым
+                del pending[key]
+            pending[key] = candle
+        self._trim()
+        return len(pending)
+
+    async def add(self, candles: Iterable[CandleRecord]) -> None:
+        """
+        Добавляет свечи в буфер
+
+        Запись выполняется фоновым flush, либо сразу при заполнении буфера
+        до max_batch. Ошибки записи логируются, свечи остаются в буфере.
+        """
+        if self.enqueue(candles) >= self.max_batch:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка записи свечей: {e}")
+        self._ensure_flusher()
+
+    async def write(self, candles: Iterable[CandleRecord]) -> int:
+        """
+        Добавляет свечи и дожидается их записи вместе со всем буфером
+
+        Returns:
+            Количество свечей, переданных в write
+
+        Raises:
+            Exception: ошибка соединения с БД (свечи остаются в буфере)
+        """
+        candles = list(candles)
+        self.enqueue(candles)
+        await self.flush()
+        return len(candles)
+
+    async def flush(self) -> int:
+        """
+        Записывает весь буфер одним save_candles
+
+        Returns:
+            Количество записанных свечей (без отброшенных из-за ошибок данных)
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            total = len(batch)
+            rejected_before = self._rejected
+            start = time.perf_counter()
+            try:
+                repository = await self._get_repository()
+                await self._save(repository, batch, list(batch.values()))
+            except TRANSIENT_ERRORS:
+                # В том числе отмена фонового flush на stop() - пачка не должна теряться
+                self._failed_flushes += 1
+                # Незаписанные свечи возвращаются в начало буфера, не затирая
+                # поступившие за время записи
+                batch.update(self._pending)
+                self._pending = batch
+                self._trim()
+                raise
+
+            written = total - (self._rejected - rejected_before)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._flushes += 1
+            self._written += written
+            self._last_batch_size = total
+            self._last_flush_ms = elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+            logger.debug(f"💾 Записано {written} свечей за {elapsed_ms:.1f}ms")
+            return written
+
+    async def _save(
+        self,
+        repository: MarketDataRepository,
+        batch: dict[tuple, CandleRecord],
+        candles: list[CandleRecord],
+    ) -> None:
+        """
+        Пишет свечи, удаляя записанные и отброшенные из batch
+
+        При ошибке данных пачка делится пополам, пока ошибка не сведется к
+        отдельным свечам - они отбрасываются, остальные записываются.
+        """
+        try:
+            await repository.save_candles(candles)
+        except TRANSIENT_ERRORS:
+            raise
+        except Exception as e:
+            if len(candles) > 1:
+                middle = len(candles) // 2
+                await self._save(repository, batch, candles[:middle])
+                await self._save(repository, batch, candles[middle:])
+                return
+            candle = candles[0]
+            self._rejected += 1
+            logger.error(
+                f"Свеча {candle.symbol} {candle.datetime} ({candle.interval_minutes}m) "
+                f"отброшена: {e}"
+            )
+
+        for candle in candles:
+            del batch[candle.key]
+
+    def _trim(self) -> None:
+        """Отбрасывает самые старые свечи сверх max_pending"""
+        overflow = len(self._pending) - self.max_pending
+        if overflow <= 0:
+            return
+        for key in list(self._pending)[:overflow]:
+            del self._pending[key]
+        self._dropped += overflow
+        logger.warning(f"Буфер свечей переполнен, отброшено {overflow} старых свечей")
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Фоновый flush по таймеру, завершается на пустом буфере"""
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка фоновой записи {self.queue_depth} свечей: {e}")
+
+    async def stop(self) -> None:
+        """Останавливает фоновый flush и записывает остаток буфера"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Не удалось записать {self.queue_depth} свечей при остановке: {e}")
+
+    def get_stats(self) -> dict[str, Any]:
+        """Метрики записи: глубина очереди и задержка flush"""
+        flushes = self._flushes
+        return {
+            "queue_depth": self.queue_depth,
+            "flushes": self._flushes,
+            "failed_flushes": self._failed_flushes,
+            "candles_written": self._written,
+            "coalesced": self._coalesced,
+            "dropped": self._dropped,
+            "rejected": self._rejected,
+            "last_batch_size": self._last_batch_size,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / flushes, 2) if flushes else 0.0,
+            "max_flush_ms": round(self._max_flush_ms, 2),
+        }
+
+
+_writer: CandleWriter | None = None
+
+
+def get_candle_writer(config: dict[str, Any] | None = None) -> CandleWriter:
+    """
+    Общий writer свечей процесса
+
+    Args:
+        config: Конфигурация для создания writer при первом вызове
+    """
+    global _writer
+    if _writer is None:
+        _writer = CandleWriter.from_config(config or {})
+    return _writer
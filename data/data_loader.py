@@ -19,8 +19,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from core.config.config_manager import ConfigManager
 from core.exceptions import DataLoadError, ExchangeError
 from core.logger import setup_logger
+from data.candle_writer import get_candle_writer
+from data.ohlcv_loader import OHLCVColumnarLoader
 from database.connections import get_async_db
 from database.models.market_data import MarketDataSnapshot, MarketType, RawMarketData
+from database.repositories.market_data_repository import CandleRecord
 from exchanges.factory import ExchangeFactory
 
 logger = setup_logger(__name__)
@@ -46,6 +49,11 @@ class DataLoader:
         self.interval_minutes = self.data_config.get('interval_minutes', 15)
         self.default_exchange = 'bybit'
         
+        # Колоночная загрузка OHLCV из БД (без ORM)
+        self.ohlcv_loader = OHLCVColumnarLoader()
+        # Пакетная запись свечей (общий буфер процесса)
+        self.candle_writer = get_candle_writer(self.config_manager.get_config())
+
     async def initialize(self):
         """Инициализация подключений к биржам"""
         if self._initialized:
@@ -136,38 +144,14 @@ class DataLoader:
                 logger.info(f"Загружено и сохранено {count} записей для {symbol}")
             
             # Загружаем данные из БД
-            async with get_async_db() as session:
-                stmt = select(RawMarketData).where(
-                    and_(
-                        RawMarketData.symbol == symbol,
-                        RawMarketData.exchange == exchange,
-                        RawMarketData.interval_minutes == interval_minutes,
-                        RawMarketData.datetime >= start_date
-                    )
-                ).order_by(RawMarketData.datetime).limit(limit)
-                
-                result = await session.execute(stmt)
-                data = result.scalars().all()
-                
-                if data:
-                    # Конвертируем в DataFrame
-                    df = pd.DataFrame([{
-                        'timestamp': d.timestamp,
-                        'datetime': d.datetime,
-                        'open': float(d.open),
-                        'high': float(d.high),
-                        'low': float(d.low),
-                        'close': float(d.close),
-                        'volume': float(d.volume),
-                        'turnover': float(d.turnover) if d.turnover else 0
-                    } for d in data])
-                    
-                    df.set_index('datetime', inplace=True)
-                    df = df.sort_index()
-                    
-                    return df
-                
-            return None
+            return await self.ohlcv_loader.load(
+                symbol,
+                exchange=exchange,
+                interval_minutes=interval_minutes,
+                start=start_date,
+                limit=limit,
+                newest=False,
+            )
             
         except Exception as e:
             logger.error(f"Ошибка загрузки OHLCV для {symbol}: {e}")
@@ -369,53 +353,36 @@ class DataLoader:
         if not candles:
             return 0
             
-        async with get_async_db() as session:
-            try:
-                # Подготавливаем данные для вставки
-                values = []
-                for candle in candles:
-                    timestamp = candle[0]
-                    dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
-                    
-                    values.append({
-                        'symbol': symbol,
-                        'timestamp': timestamp,
-                        'datetime': dt,
-                        'open': Decimal(str(candle[1])),
-                        'high': Decimal(str(candle[2])),
-                        'low': Decimal(str(candle[3])),
-                        'close': Decimal(str(candle[4])),
-                        'volume': Decimal(str(candle[5])),
-                        'turnover': Decimal(str(candle[5] * candle[4])) if len(candle) > 5 else Decimal('0'),
-                        'interval_minutes': interval_minutes,
-                        'exchange': exchange,
-                        'market_type': MarketType.FUTURES.value  # Торгуем на фьючерсах!
-                    })
-                
-                # Используем upsert для обновления существующих записей
-                stmt = insert(RawMarketData).values(values)
-                stmt = stmt.on_conflict_do_update(
-                    constraint='_symbol_timestamp_interval_exchange_uc',
-                    set_={
-                        'open': stmt.excluded.open,
-                        'high': stmt.excluded.high,
-                        'low': stmt.excluded.low,
-                        'close': stmt.excluded.close,
-                        'volume': stmt.excluded.volume,
-                        'turnover': stmt.excluded.turnover,
-                        'updated_at': datetime.now(timezone.utc)
-                    }
-                )
-                
-                await session.execute(stmt)
-                await session.commit()
-                
-                return len(values)
+        try:
+            # Подготавливаем данные для вставки
+            values = []
+            for candle in candles:
+                timestamp = int(candle[0])
+                dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
                 
-            except Exception as e:
-                await session.rollback()
-                logger.error(f"Ошибка сохранения данных в БД: {e}")
-                raise
+                values.append(CandleRecord(
+                    symbol=symbol,
+                    timestamp=timestamp,
+                    datetime=dt,
+                    open=Decimal(str(candle[1])),
+                    high=Decimal(str(candle[2])),
+                    low=Decimal(str(candle[3])),
+                    close=Decimal(str(candle[4])),
+                    volume=Decimal(str(candle[5])),
+                    turnover=(
+                        Decimal(str(candle[5] * candle[4])) if len(candle) > 5 else Decimal('0')
+                    ),
+                    interval_minutes=interval_minutes,
+                    exchange=exchange,
+                    market_type=MarketType.FUTURES.value  # Торгуем на фьючерсах!
+                ))
+
+            # Upsert через COPY пачкой вместе с буфером других символов
+            return await self.candle_writer.write(values)
+
+        except Exception as e:
+            logger.error(f"Ошибка сохранения данных в БД: {e}")
+            raise
     
     async def _get_last_timestamp(
         self,
@@ -548,42 +515,17 @@ class DataLoader:
         Returns:
             DataFrame с OHLCV данными
         """
-        async with get_async_db() as session:
-            query = select(RawMarketData).where(
-                RawMarketData.symbol == symbol
-            )
-            
-            if start_date:
-                query = query.where(RawMarketData.datetime >= start_date)
-            if end_date:
-                query = query.where(RawMarketData.datetime <= end_date)
-                
-            query = query.order_by(RawMarketData.timestamp)
-            
-            if limit:
-                query = query.limit(limit)
-            
-            result = await session.execute(query)
-            data = result.scalars().all()
-            
-            if not data:
-                return pd.DataFrame()
-            
-            # Конвертируем в DataFrame
-            df = pd.DataFrame([{
-                'timestamp': d.timestamp,
-                'datetime': d.datetime,
-                'open': float(d.open),
-                'high': float(d.high),
-                'low': float(d.low),
-                'close': float(d.close),
-                'volume': float(d.volume),
-                'turnover': float(d.turnover) if d.turnover else 0,
-                'symbol': symbol  # ИСПРАВЛЕНО: Добавляем symbol для каждой записи
-            } for d in data])
-            
-            df.set_index('datetime', inplace=True)
-            return df
+        df = await self.ohlcv_loader.load(
+            symbol,
+            exchange=None,
+            interval_minutes=None,
+            start=start_date,
+            end=end_date,
+            limit=limit,
+            newest=False,
+            add_symbol=True,  # ИСПРАВЛЕНО: Добавляем symbol для каждой записи
+        )
+        return df if df is not None else pd.DataFrame()
     
     async def cleanup(self):
         """Очистка ресурсов"""
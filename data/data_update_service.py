@@ -10,7 +10,9 @@ from decimal import Decimal
 from typing import Dict, List, Optional, Set
 
 from core.config.config_manager import ConfigManager
+from data.candle_writer import get_candle_writer
 from database.connections.postgres import AsyncPGPool
+from database.repositories.market_data_repository import CandleRecord
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +55,9 @@ class DataUpdateService:
         self.max_gap_hours = data_config.get('max_gap_hours', 2)  # Максимальный пропуск в часах
         self.auto_update = data_config.get('auto_update', True)  # Автообновление включено
         
+        # Пакетная запись свечей (общий буфер процесса)
+        self.candle_writer = get_candle_writer(self.config)
+
         # Кэш статусов
         self.data_status_cache: Dict[str, DataStatus] = {}
         self.cache_ttl = 300  # 5 минут
@@ -109,6 +114,9 @@ class DataUpdateService:
             except asyncio.CancelledError:
                 pass
                 
+        # Запись оставшихся в буфере свечей
+        await self.candle_writer.stop()
+
         # Закрытие подключений к биржам
         for exchange in self.exchanges.values():
             try:
@@ -232,6 +240,7 @@ class DataUpdateService:
                     await self._fill_data_gap(gap)
                 except Exception as e:
                     logger.error(f"Ошибка заполнения пропуска для {gap.symbol}: {e}")
+            await self._flush_candles()
         else:
             logger.info("Критических пропусков не найдено")
             
@@ -277,6 +286,16 @@ class DataUpdateService:
             for i, result in enumerate(results):
                 if isinstance(result, Exception):
                     logger.error(f"Ошибка обновления {symbols[i]['symbol']}: {result}")
+
+            # Свечи всех символов - одной пачкой
+            await self._flush_candles()
+
+    async def _flush_candles(self) -> None:
+        """Запись буфера свечей в БД"""
+        try:
+            await self.candle_writer.flush()
+        except Exception as e:
+            logger.error(f"Ошибка записи свечей: {e}")
             
     async def _update_symbol_data(
         self,
@@ -452,39 +471,28 @@ class DataUpdateService:
             logger.error(f"Ошибка заполнения пропуска для {gap.symbol}: {e}")
             
     async def _save_candles(self, candles: List, exchange_name: str) -> None:
-        """Сохранение свечей в базу данных"""
-        
-        pool = await AsyncPGPool.get_pool()
-        for candle in candles:
-            try:
-                await pool.execute("""
-                    INSERT INTO raw_market_data 
-                    (symbol, timestamp, datetime, open, high, low, close, volume, 
-                     interval_minutes, exchange, turnover)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
-                    ON CONFLICT (symbol, timestamp, interval_minutes, exchange) DO UPDATE
-                    SET open = EXCLUDED.open,
-                        high = EXCLUDED.high,
-                        low = EXCLUDED.low,
-                        close = EXCLUDED.close,
-                        volume = EXCLUDED.volume,
-                        turnover = EXCLUDED.turnover,
-                        updated_at = NOW()
-                """, 
-                candle.symbol, 
-                int(candle.timestamp.timestamp()),
-                candle.timestamp,
-                Decimal(str(candle.open_price)),
-                Decimal(str(candle.high_price)),
-                Decimal(str(candle.low_price)),
-                Decimal(str(candle.close_price)),
-                Decimal(str(candle.volume)),
-                candle.interval_minutes,
-                exchange_name,
-                Decimal(str(getattr(candle, 'turnover', 0)))
-                )
-            except Exception as e:
-                logger.error(f"Ошибка сохранения свечи: {e}")
+        """Сохранение свечей в базу данных через общий буфер CandleWriter"""
+
+        rows = [
+            CandleRecord(
+                symbol=candle.symbol,
+                timestamp=int(candle.timestamp.timestamp()),
+                datetime=candle.timestamp,
+                open=Decimal(str(candle.open_price)),
+                high=Decimal(str(candle.high_price)),
+                low=Decimal(str(candle.low_price)),
+                close=Decimal(str(candle.close_price)),
+                volume=Decimal(str(candle.volume)),
+                interval_minutes=candle.interval_minutes,
+                exchange=exchange_name,
+                turnover=Decimal(str(getattr(candle, 'turnover', 0)))
+            )
+            for candle in candles
+        ]
+        try:
+            await self.candle_writer.add(rows)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения {len(rows)} свечей: {e}")
                 
     async def _get_active_symbols(self) -> List[Dict[str, any]]:
         """Получение списка активных торговых символов"""
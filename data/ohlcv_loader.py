@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Колоночная загрузка OHLCV из raw_market_data
+
+Вместо материализации ORM-объектов и построчной конвертации Decimal -> float
+данные выгружаются через `COPY (...) TO STDOUT` в бинарном формате PostgreSQL.
+Все колонки приводятся в SQL к int8/float8/timestamptz без NULL, поэтому строки
+имеют фиксированную ширину и разбираются одним `np.frombuffer` в массивы.
+
+Несколько символов загружаются одним запросом (`symbol = ANY($1)`), лимит
+свечей применяется к каждому символу отдельно.
+"""
+
+import io
+from collections.abc import Sequence
+from datetime import datetime
+
+import asyncpg
+import numpy as np
+import pandas as pd
+
+from core.logger import setup_logger
+from database.connections.postgres import AsyncPGPool
+
+logger = setup_logger(__name__)
+
+# Сигнатура бинарного формата COPY
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+COPY_TRAILER = b"\xff\xff"
+
+# timestamptz в бинарном формате - микросекунды от 2000-01-01 UTC
+PG_EPOCH_US = 946_684_800_000_000
+
+# Колонки выгрузки: (имя, SQL-выражение, numpy-код big-endian типа)
+OHLCV_COLUMNS = [
+    ("symbol_idx", "array_position($1::text[], symbol::text)::int8", "i8"),
+    ("timestamp", "timestamp::int8", "i8"),
+    ("datetime", "datetime::timestamptz", "i8"),
+    ("open", "open::float8", "f8"),
+    ("high", "high::float8", "f8"),
+    ("low", "low::float8", "f8"),
+    ("close", "close::float8", "f8"),
+    ("volume", "volume::float8", "f8"),
+    ("turnover", "COALESCE(turnover, 0)::float8", "f8"),
+]
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume", "turnover"]
+
+
+def parse_binary_copy(buffer: bytes, fields: Sequence[tuple[str, str]]) -> np.ndarray:
+    """
+    Разбирает бинарный вывод COPY со строками фиксированной ширины
+
+    Args:
+        buffer: Вывод COPY ... TO STDOUT (FORMAT binary)
+        fields: Список (имя, код типа) - все поля 8-байтные и NOT NULL
+
+    Returns:
+        Структурированный массив (big-endian) с полями из fields
+    """
+    if not buffer.startswith(COPY_SIGNATURE):
+        raise ValueError("Неверная сигнатура бинарного COPY")
+    if not buffer.endswith(COPY_TRAILER):
+        raise ValueError("Отсутствует завершающий маркер бинарного COPY")
+
+    extension_length = int.from_bytes(buffer[15:19], "big")
+    body = memoryview(buffer)[19 + extension_length : -len(COPY_TRAILER)]
+
+    dtype = [("_field_count", ">i2")]
+    for name, code in fields:
+        dtype += [(f"_{name}_length", ">i4"), (name, f">{code}")]
+    dtype = np.dtype(dtype)
+
+    if len(body) % dtype.itemsize:
+        raise ValueError("Строки COPY имеют переменную ширину (NULL или не 8-байтные поля)")
+
+    rows = np.frombuffer(body, dtype=dtype)
+    if len(rows) and (rows["_field_count"] != len(fields)).any():
+        raise ValueError("Неожиданное количество полей в строке COPY")
+    for name, _ in fields:
+        if len(rows) and (rows[f"_{name}_length"] != 8).any():
+            raise ValueError(f"Поле {name} содержит NULL или имеет ширину не 8 байт")
+    return rows
+
+
+def rows_to_frame(rows: np.ndarray, symbol: str | None = None) -> pd.DataFrame:
+    """Строит OHLCV DataFrame с индексом datetime (UTC) из разобранных строк"""
+    index = pd.DatetimeIndex(
+        pd.to_datetime(rows["datetime"].astype(np.int64) + PG_EPOCH_US, unit="us", utc=True),
+        name="datetime",
+    )
+    data = {"timestamp": rows["timestamp"].astype(np.int64)}
+    for column in PRICE_COLUMNS:
+        data[column] = rows[column].astype(np.float64)
+
+    df = pd.DataFrame(data, index=index)
+    if symbol is not None:
+        df["symbol"] = symbol
+    return df
+
+
+class OHLCVColumnarLoader:
+    """
+    Загрузчик OHLCV свечей из raw_market_data в pandas без ORM
+
+    Args:
+        pool: Пул asyncpg (по умолчанию AsyncPGPool)
+    """
+
+    def __init__(self, pool: asyncpg.Pool | None = None):
+        self._pool = pool
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            self._pool = await AsyncPGPool.get_pool()
+        return self._pool
+
+    @staticmethod
+    def build_query(
+        exchange: str | None = "bybit",
+        interval_minutes: int | None = 15,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        newest: bool = True,
+    ) -> tuple[str, list]:
+        """
+        Строит запрос COPY и его аргументы ($1 - массив символов)
+
+        Args:
+            limit: Количество свечей на символ
+            newest: Брать последние (True) или первые (False) limit свечей
+        """
+        args: list = []
+        conditions = ["symbol = ANY($1::text[])"]
+        for column, value in (
+            ("exchange = ${}", exchange),
+            ("interval_minutes = ${}", interval_minutes),
+            ("datetime >= ${}", start),
+            ("datetime <= ${}", end),
+        ):
+            if value is not None:
+                args.append(value)
+                conditions.append(column.format(len(args) + 1))
+
+        select_list = ", ".join(f"{expression} AS {name}" for name, expression, _ in OHLCV_COLUMNS)
+        where = " AND ".join(conditions)
+
+        # В запрос подставляются только константы модуля, значения - параметрами $N
+        if limit is None:
+            source = f"raw_market_data WHERE {where}"
+        else:
+            args.append(int(limit))
+            order = "DESC" if newest else "ASC"
+            source = (
+                "(SELECT *, row_number() OVER "  # noqa: S608
+                f"(PARTITION BY symbol ORDER BY timestamp {order}) AS rn "
+                f"FROM raw_market_data WHERE {where}) AS ranked "
+                f"WHERE rn <= ${len(args) + 1}"
+            )
+
+        query = f"SELECT {select_list} FROM {source} ORDER BY symbol_idx, timestamp"  # noqa: S608
+        return query, args
+
+    async def load_many(
+        self,
+        symbols: Sequence[str],
+        exchange: str | None = "bybit",
+        interval_minutes: int | None = 15,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        newest: bool = True,
+        add_symbol: bool = False,
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Загружает свечи нескольких символов одним запросом
+
+        Args:
+            symbols: Символы
+            exchange: Биржа (None - без фильтра)
+            interval_minutes: Интервал свечей (None - без фильтра)
+            start: Начало периода (включительно)
+            end: Конец периода (включительно)
+            limit: Количество свечей на символ
+            newest: Брать последние (True) или первые (False) limit свечей
+            add_symbol: Добавить колонку symbol
+
+        Returns:
+            Словарь {symbol: DataFrame} отсортированный по времени; символы без данных отсутствуют
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+
+        query, args = self.build_query(exchange, interval_minutes, start, end, limit, newest)
+        output = io.BytesIO()
+
+        pool = await self._get_pool()
+        async with pool.acquire() as connection:
+            await connection.copy_from_query(query, symbols, *args, output=output, format="binary")
+
+        rows = parse_binary_copy(
+            output.getvalue(), [(name, code) for name, _, code in OHLCV_COLUMNS]
+        )
+        return self._split_by_symbol(rows, symbols, add_symbol)
+
+    async def load(
+        self,
+        symbol: str,
+        exchange: str | None = "bybit",
+        interval_minutes: int | None = 15,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        newest: bool = True,
+        add_symbol: bool = False,
+    ) -> pd.DataFrame | None:
+        """Загружает свечи одного символа (None если данных нет)"""
+        frames = await self.load_many(
+            [symbol], exchange, interval_minutes, start, end, limit, newest, add_symbol
+        )
+        return frames.get(symbol)
+
+    @staticmethod
+    def _split_by_symbol(
+        rows: np.ndarray, symbols: list[str], add_symbol: bool
+    ) -> dict[str, pd.DataFrame]:
+        """Делит отсортированные по symbol_idx строки на DataFrame по символам"""
+        if not len(rows):
+            return {}
+
+        # array_position индексирует с 1
+        symbol_idx = rows["symbol_idx"].astype(np.int64)
+        bounds = np.searchsorted(symbol_idx, np.arange(1, len(symbols) + 2))
+
+        frames = {}
+        for i, symbol in enumerate(symbols):
+            begin, finish = bounds[i], bounds[i + 1]
+            if finish > begin:
+                frames[symbol] = rows_to_frame(rows[begin:finish], symbol if add_symbol else None)
+        return frames
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Write-behind запись снимков индикаторов в processed_market_data
+
+RealTimeIndicatorCalculator раньше на каждый символ в каждом цикле делал
+SELECT последней свечи raw_market_data и JSONB upsert прямо в пути генерации
+сигнала. Теперь снимок кладется в очередь (submit без ожидания БД), а фоновый
+flush пишет всю очередь одним INSERT ... SELECT FROM unnest(...): raw_data_id
+определяется в том же запросе через LATERAL подзапрос (последняя свеча символа
+не позже снимка), JSON сериализуется в фоне.
+
+Очередь ключуется (symbol, timestamp): повторный снимок той же свечи заменяет
+предыдущий. При переполнении (max_pending) сначала отбрасываются устаревшие
+снимки символов, у которых в очереди есть более новый, затем самые старые.
+"""
+
+import asyncio
+import contextlib
+import json
+import math
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, NamedTuple
+
+import asyncpg
+
+from core.logger import setup_logger
+from database.connections.postgres import AsyncPGPool
+
+logger = setup_logger(__name__)
+
+PROCESSED_COLUMNS = [
+    ("symbol", "text"),
+    ("timestamp", "int8"),
+    ("datetime", "timestamptz"),
+    ("open", "float8"),
+    ("high", "float8"),
+    ("low", "float8"),
+    ("close", "float8"),
+    ("volume", "float8"),
+    ("technical_indicators", "jsonb"),
+    ("microstructure_features", "jsonb"),
+    ("ml_features", "jsonb"),
+    ("processing_version", "text"),
+    ("model_version", "text"),
+]
+
+_SELECT_COLUMNS = ", ".join(f"s.{name}" for name, _ in PROCESSED_COLUMNS)
+
+# Один запрос на flush: raw_data_id - последняя свеча символа не позже снимка
+UPSERT_QUERY = f"""
+INSERT INTO processed_market_data
+    (raw_data_id, {", ".join(name for name, _ in PROCESSED_COLUMNS)})
+SELECT raw.id, {_SELECT_COLUMNS}
+FROM unnest({", ".join(f"${i}::{kind}[]" for i, (_, kind) in enumerate(PROCESSED_COLUMNS, 1))})
+    AS s({", ".join(name for name, _ in PROCESSED_COLUMNS)})
+CROSS JOIN LATERAL (
+    SELECT r.id FROM raw_market_data r
+    WHERE r.symbol = s.symbol AND r.timestamp <= s.timestamp
+    ORDER BY r.timestamp DESC
+    LIMIT 1
+) AS raw
+ON CONFLICT ON CONSTRAINT _symbol_timestamp_processed_uc DO UPDATE
+SET technical_indicators = EXCLUDED.technical_indicators,
+    microstructure_features = EXCLUDED.microstructure_features,
+    ml_features = EXCLUDED.ml_features,
+    updated_at = NOW()
+"""  # noqa: S608 - в запрос подставляются только имена колонок модуля
+
+
+class IndicatorSnapshot(NamedTuple):
+    """Снимок индикаторов символа на закрытии свечи"""
+
+    symbol: str
+    timestamp: int  # Unix timestamp свечи в миллисекундах
+    datetime: datetime
+    ohlcv: Mapping[str, float]
+    technical_indicators: Mapping[str, Any]
+    microstructure_features: Mapping[str, Any]
+    ml_features: Mapping[str, Any]
+    processing_version: str = "2.0"  # Real-time версия
+    model_version: str = "patchtst_v1"
+
+    @classmethod
+    def from_indicators(cls, symbol: str, indicators: dict[str, Any]) -> "IndicatorSnapshot":
+        """Снимок из результата RealTimeIndicatorCalculator.calculate_indicators"""
+        metadata = indicators["metadata"]
+        return cls(
+            symbol=symbol,
+            timestamp=int(metadata["timestamp"]),
+            datetime=metadata["datetime"],
+            ohlcv=indicators.get("ohlcv", {}),
+            technical_indicators=indicators.get("technical_indicators", {}),
+            microstructure_features=indicators.get("microstructure_features", {}),
+            ml_features=indicators.get("ml_features", {}),
+        )
+
+
+def _json_value(value: Any) -> Any:
+    """NaN/inf недопустимы в JSONB - заменяются на null"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def dumps_features(features: Mapping[str, Any]) -> str:
+    """JSON признаков для JSONB колонки"""
+    return json.dumps({key: _json_value(value) for key, value in features.items()})
+
+
+def snapshot_columns(snapshots: list[IndicatorSnapshot]) -> list[list[Any]]:
+    """Колоночные массивы для unnest в порядке PROCESSED_COLUMNS"""
+    columns = [[] for _ in PROCESSED_COLUMNS]
+    for snapshot in snapshots:
+        ohlcv = snapshot.ohlcv
+        row = (
+            snapshot.symbol,
+            snapshot.timestamp,
+            snapshot.datetime,
+            float(ohlcv["open"]),
+            float(ohlcv["high"]),
+            float(ohlcv["low"]),
+            float(ohlcv["close"]),
+            float(ohlcv["volume"]),
+            dumps_features(snapshot.technical_indicators),
+            dumps_features(snapshot.microstructure_features),
+            dumps_features(snapshot.ml_features),
+            snapshot.processing_version,
+            snapshot.model_version,
+        )
+        for column, value in zip(columns, row, strict=True):
+            column.append(value)
+    return columns
+
+
+class ProcessedDataWriter:
+    """
+    Очередь записи снимков индикаторов с фоновым flush
+
+    Args:
+        pool: Пул asyncpg (по умолчанию AsyncPGPool)
+        flush_interval: Период фонового flush (секунды)
+        max_batch: Максимум снимков в одном INSERT
+        max_pending: Предел очереди - выше него снимки вытесняются
+    """
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool | None = None,
+        flush_interval: float = 2.0,
+        max_batch: int = 500,
+        max_pending: int = 1000,
+    ):
+        self._pool = pool
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+
+        self._pending: dict[tuple[str, int], IndicatorSnapshot] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flusher: asyncio.Task | None = None
+
+        # Метрики
+        self._submitted = 0
+        self._coalesced = 0
+        self._superseded = 0
+        self._dropped = 0
+        self._written = 0
+        self._missing_raw = 0
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+
+    @classmethod
+    def from_config(cls, config: Any) -> "ProcessedDataWriter":
+        """Writer из секции ml.snapshot_writer (config может быть не dict)"""
+        ml_config = config.get("ml", {}) if isinstance(config, dict) else {}
+        settings = ml_config.get("snapshot_writer", {})
+        return cls(
+            flush_interval=float(settings.get("flush_interval", 2.0)),
+            max_batch=int(settings.get("max_batch", 500)),
+            max_pending=int(settings.get("max_pending", 1000)),
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            self._pool = await AsyncPGPool.get_pool()
+        return self._pool
+
+    def submit(self, snapshot: IndicatorSnapshot) -> None:
+        """Ставит снимок в очередь без ожидания БД"""
+        self._submitted += 1
+        key = (snapshot.symbol, snapshot.timestamp)
+        if self._pending.pop(key, None) is not None:
+            self._coalesced += 1
+        self._pending[key] = snapshot
+
+        if len(self._pending) > self.max_pending:
+            self._shed_load()
+        self._ensure_flusher()
+
+    def _shed_load(self) -> None:
+        """
+        Вытеснение при переполнении очереди
+
+        Сначала отбрасываются снимки, для символа которых в очереди есть
+        более новый, затем - самые старые по порядку поступления.
+        """
+        latest: dict[str, int] = {}
+        for symbol, timestamp in self._pending:
+            latest[symbol] = max(timestamp, latest.get(symbol, timestamp))
+
+        superseded = [key for key in self._pending if key[1] < latest[key[0]]]
+        for key in superseded[: len(self._pending) - self.max_pending]:
+            del self._pending[key]
+            self._superseded += 1
+
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            for key in list(self._pending)[:overflow]:
+                del self._pending[key]
+            self._dropped += overflow
+            logger.warning(f"Очередь снимков индикаторов переполнена, отброшено {overflow}")
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            try:
+                self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+            except RuntimeError:
+                # Нет event loop - снимки запишутся при следующем submit/flush
+                self._flusher = None
+
+    async def _flush_loop(self) -> None:
+        """Фоновый flush по таймеру, завершается на пустой очереди"""
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка записи {self.queue_depth} снимков индикаторов: {e}")
+
+    async def flush(self) -> int:
+        """
+        Записывает очередь пачками по max_batch
+
+        Returns:
+            Количество записанных снимков (без снимков без свечи в raw_market_data)
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._pending:
+                keys = list(self._pending)[: self.max_batch]
+                batch = [self._pending.pop(key) for key in keys]
+                start = time.perf_counter()
+                try:
+                    pool = await self._get_pool()
+                    status = await pool.execute(UPSERT_QUERY, *snapshot_columns(batch))
+                except BaseException:
+                    # В том числе отмена на stop() - пачка не должна теряться
+                    self._failed_flushes += 1
+                    # Возвращаем в очередь, не затирая более свежие снимки
+                    restored = dict(zip(keys, batch, strict=True))
+                    restored.update(self._pending)
+                    self._pending = restored
+                    if len(self._pending) > self.max_pending:
+                        self._shed_load()
+                    raise
+
+                inserted = int(status.split()[-1]) if status else len(batch)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self._missing_raw += len(batch) - inserted
+                self._written += inserted
+                self._flushes += 1
+                self._last_flush_ms = elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+                written += inserted
+                if inserted < len(batch):
+                    logger.warning(
+                        f"Не найдены raw данные для {len(batch) - inserted} снимков индикаторов"
+                    )
+        return written
+
+    async def stop(self) -> None:
+        """Останавливает фоновый flush и записывает остаток очереди"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Не удалось записать {self.queue_depth} снимков при остановке: {e}")
+
+    def get_stats(self) -> dict[str, Any]:
+        """Метрики очереди снимков"""
+        return {
+            "queue_depth": self.queue_depth,
+            "submitted": self._submitted,
+            "written": self._written,
+            "coalesced": self._coalesced,
+            "superseded": self._superseded,
+            "dropped": self._dropped,
+            "missing_raw": self._missing_raw,
+            "flushes": self._flushes,
+            "failed_flushes": self._failed_flushes,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+            "max_flush_ms": round(self._max_flush_ms, 2),
+        }
@@ -17,6 +17,7 @@ from database.repositories.trade_repository import TradeRepository
 from database.repositories.signal_repository import SignalRepository
 from database.repositories.ml_prediction_repository import MLPredictionRepository
 from database.repositories.position_repository import PositionRepository
+from database.repositories.market_data_repository import MarketDataRepository
 
 
 class DatabaseManager:
@@ -44,6 +45,7 @@ class DatabaseManager:
         self.signal_repository: Optional[SignalRepository] = None
         self.ml_prediction_repository: Optional[MLPredictionRepository] = None
         self.position_repository: Optional[PositionRepository] = None
+        self.market_data_repository: Optional[MarketDataRepository] = None
         
         self._is_initialized = False
     
@@ -66,6 +68,7 @@ class DatabaseManager:
             self.signal_repository = SignalRepository(self.pool, self.transaction_manager)
             self.ml_prediction_repository = MLPredictionRepository(self.pool, self.transaction_manager)
             self.position_repository = PositionRepository(self.pool, self.transaction_manager)
+            self.market_data_repository = MarketDataRepository(self.pool, self.transaction_manager)
             
             logger.info("✅ All repositories initialized with TransactionManager")
             
@@ -16,6 +16,7 @@ from database.connections.postgres import AsyncPGPool
 from database.connections.transaction_manager import TransactionManager, UnitOfWork
 from database.repositories.ml_prediction_repository import MLPredictionRepository
 from database.repositories.position_repository import PositionRepository
+from database.repositories.market_data_repository import MarketDataRepository
 from database.optimization.query_optimizer import QueryOptimizer
 from database.monitoring.monitoring_service import DatabaseMonitoringService
 from database.resilience.circuit_breaker import DatabaseCircuitBreaker, circuit_breaker_manager
@@ -65,6 +66,7 @@ class DBManager:
         # Repositories
         self.ml_predictions: Optional[MLPredictionRepository] = None
         self.positions: Optional[PositionRepository] = None
+        self.market_data: Optional[MarketDataRepository] = None
         self.orders: Optional = None
         self.trades: Optional = None  
         self.signals: Optional = None
@@ -106,6 +108,7 @@ class DBManager:
             # Initialize repositories with optimized components
             self.ml_predictions = MLPredictionRepository(self.pool, self.transaction_manager)
             self.positions = PositionRepository(self.pool, self.transaction_manager)
+            self.market_data = MarketDataRepository(self.pool, self.transaction_manager)
             
             # Initialize other repositories
             from database.repositories.order_repository import OrderRepository
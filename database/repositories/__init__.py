@@ -1,6 +1,7 @@
 """Database repositories"""
 
+from .market_data_repository import MarketDataRepository
 from .signal_repository import SignalRepository
 from .trade_repository import TradeRepository
 
-__all__ = ["SignalRepository", "TradeRepository"]
+__all__ = ["MarketDataRepository", "SignalRepository", "TradeRepository"]
@@ -6,6 +6,7 @@ optimized bulk operations for high-throughput scenarios like ML predictions.
 """
 
 import asyncio
+import itertools
 from typing import TypeVar, Generic, List, Dict, Any, Optional, Type, Union, Tuple, Callable
 from datetime import datetime
 import asyncpg
@@ -16,6 +17,17 @@ from abc import ABC, abstractmethod
 # Type variable for generic model support
 T = TypeVar('T')
 
+# Bulk write strategies
+BULK_MODE_VALUES = "values"  # multi-row INSERT ... VALUES with one $n per cell
+BULK_MODE_COPY = "copy"  # binary COPY (into a staging table for conflicts/RETURNING)
+BULK_WRITE_MODES = (BULK_MODE_VALUES, BULK_MODE_COPY)
+
+# PostgreSQL bind parameter limit per statement
+PG_MAX_PARAMS = 32767
+
+# Unique staging table suffixes within the process
+_staging_ids = itertools.count(1)
+
 
 class BaseRepository(Generic[T], ABC):
     """
@@ -27,14 +39,20 @@ class BaseRepository(Generic[T], ABC):
     - Transaction-aware operations
     - Performance metrics
     - Automatic retry logic
+
+    Bulk writes use ``bulk_write_mode`` of the repository class ("values" by
+    default); high-volume repositories switch to "copy".
     """
     
+    bulk_write_mode: str = BULK_MODE_VALUES
+
     def __init__(
         self,
         pool: asyncpg.Pool,
         table_name: str,
         model_class: Type[T],
-        transaction_manager=None
+        transaction_manager=None,
+        bulk_write_mode: Optional[str] = None
     ):
         """
         Initialize base repository.
@@ -44,12 +62,17 @@ class BaseRepository(Generic[T], ABC):
             table_name: Database table name
             model_class: Model class for type hints
             transaction_manager: Transaction manager for atomic operations
+            bulk_write_mode: "values" or "copy" (None = class default)
         """
         self.pool = pool
         self.transaction_manager = transaction_manager
         self.table_name = table_name
         self.model_class = model_class
         self._prepared_statements: Dict[str, str] = {}
+        if bulk_write_mode is not None:
+            self.bulk_write_mode = bulk_write_mode
+        if self.bulk_write_mode not in BULK_WRITE_MODES:
+            raise ValueError(f"Unknown bulk write mode: {self.bulk_write_mode}")
         
     @abstractmethod
     def _to_dict(self, model: T) -> Dict[str, Any]:
@@ -66,7 +89,9 @@ class BaseRepository(Generic[T], ABC):
         items: List[T],
         returning_fields: Optional[List[str]] = None,
         on_conflict: Optional[str] = None,
-        chunk_size: int = 1000
+        chunk_size: int = 1000,
+        mode: Optional[str] = None,
+        dedupe_columns: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Bulk insert multiple items with optimized performance.
@@ -75,40 +100,134 @@ class BaseRepository(Generic[T], ABC):
             items: List of items to insert
             returning_fields: Fields to return after insert
             on_conflict: SQL for handling conflicts (e.g., "ON CONFLICT DO NOTHING")
-            chunk_size: Number of items to insert per batch
+            chunk_size: Number of items to insert per batch (values mode)
+            mode: "values" or "copy" (None = repository bulk_write_mode)
+            dedupe_columns: Copy mode only - keep the last item per key, so
+                ON CONFLICT DO UPDATE never touches the same row twice
         
         Returns:
             List of inserted records (if returning_fields specified)
         
         Performance:
             - 20x faster than individual inserts for ML predictions
-            - Automatically chunks large datasets
+            - Values mode chunks below the 32767 bind parameter limit
+            - Copy mode streams all rows in one binary COPY
         """
         if not items:
             return []
         
+        mode = mode or self.bulk_write_mode
+        if mode not in BULK_WRITE_MODES:
+            raise ValueError(f"Unknown bulk write mode: {mode}")
+
         start_time = time.time()
         total_items = len(items)
         results = []
         
-        # Process in chunks for memory efficiency
-        for i in range(0, total_items, chunk_size):
-            chunk = items[i:i + chunk_size]
-            chunk_results = await self._insert_chunk(
-                chunk,
+        if mode == BULK_MODE_COPY:
+            results = await self._copy_insert(
+                [self._to_dict(item) for item in items],
                 returning_fields,
-                on_conflict
+                on_conflict,
+                dedupe_columns
             )
-            results.extend(chunk_results)
+        else:
+            # Every cell is a bind parameter - keep chunks under the limit
+            columns_count = max(1, len(self._to_dict(items[0])))
+            chunk_size = max(1, min(chunk_size, PG_MAX_PARAMS // columns_count))
+
+            # Process in chunks for memory efficiency
+            for i in range(0, total_items, chunk_size):
+                chunk = items[i:i + chunk_size]
+                chunk_results = await self._insert_chunk(
+                    chunk,
+                    returning_fields,
+                    on_conflict
+                )
+                results.extend(chunk_results)
         
         duration_ms = (time.time() - start_time) * 1000
         logger.info(
-            f"Bulk inserted {total_items} items into {self.table_name} "
-            f"in {duration_ms:.2f}ms ({total_items/duration_ms*1000:.0f} items/sec)"
+            f"Bulk inserted {total_items} items into {self.table_name} ({mode}) "
+            f"in {duration_ms:.2f}ms ({total_items/max(duration_ms, 1e-3)*1000:.0f} items/sec)"
         )
         
         return results
     
+    async def _copy_insert(
+        self,
+        items_data: List[Dict[str, Any]],
+        returning_fields: Optional[List[str]],
+        on_conflict: Optional[str],
+        dedupe_columns: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert rows with asyncpg binary COPY.
+
+        Plain inserts are copied straight into the table. Conflict handling
+        and RETURNING need a regular INSERT, so rows are copied into a
+        temporary staging table with the target column types and merged
+        with a single INSERT ... SELECT in input order.
+        """
+        columns = list(items_data[0].keys())
+
+        connection = (
+            self.transaction_manager.transaction()
+            if self.transaction_manager
+            else self.pool.acquire()
+        )
+        async with connection as conn:
+            if not on_conflict and not returning_fields and not dedupe_columns:
+                records = [tuple(item_data[col] for col in columns) for item_data in items_data]
+                await conn.copy_records_to_table(
+                    self.table_name, records=records, columns=columns
+                )
+                return []
+
+            column_list = ",".join(columns)
+            staging = f"_copy_{self.table_name.replace('.', '_')}_{next(_staging_ids)}"
+            records = [
+                (*(item_data[col] for col in columns), row)
+                for row, item_data in enumerate(items_data)
+            ]
+
+            # Savepoint inside an outer transaction, own transaction otherwise
+            async with conn.transaction():
+                await conn.execute(
+                    f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                    f"SELECT {column_list}, 0::bigint AS _row FROM {self.table_name} WITH NO DATA"
+                )
+                await conn.copy_records_to_table(
+                    staging, records=records, columns=[*columns, "_row"]
+                )
+
+                source = staging
+                if dedupe_columns:
+                    keys = ",".join(dedupe_columns)
+                    source = (
+                        f"(SELECT DISTINCT ON ({keys}) * FROM {staging} "
+                        f"ORDER BY {keys}, _row DESC) AS deduped"
+                    )
+
+                query_parts = [
+                    f"INSERT INTO {self.table_name} ({column_list})",
+                    f"SELECT {column_list} FROM {source} ORDER BY _row"
+                ]
+                if on_conflict:
+                    query_parts.append(on_conflict)
+                if returning_fields:
+                    query_parts.append(f"RETURNING {','.join(returning_fields)}")
+                query = " ".join(query_parts)
+
+                if returning_fields:
+                    records = await conn.fetch(query)
+                    result = [dict(record) for record in records]
+                else:
+                    await conn.execute(query)
+                    result = []
+                await conn.execute(f"DROP TABLE {staging}")
+                return result
+
     async def _insert_chunk(
         self,
         chunk: List[T],
@@ -330,16 +449,25 @@ class BaseRepository(Generic[T], ABC):
         items: List[T],
         conflict_columns: List[str],
         update_columns: Optional[List[str]] = None,
-        chunk_size: int = 500
+        chunk_size: int = 500,
+        mode: Optional[str] = None,
+        returning_fields: Optional[List[str]] = None,
+        touch_columns: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Bulk upsert (INSERT ... ON CONFLICT UPDATE) operation.
         
+        In copy mode rows are COPY-ed into a staging table and merged with one
+        INSERT ... ON CONFLICT; duplicate keys within the batch keep the last item.
+
         Args:
             items: List of items to upsert
             conflict_columns: Columns that define uniqueness
             update_columns: Columns to update on conflict (None = all)
-            chunk_size: Number of items per batch
+            chunk_size: Number of items per batch (values mode)
+            mode: "values" or "copy" (None = repository bulk_write_mode)
+            returning_fields: Fields to return (default ["id"], [] = none)
+            touch_columns: Columns set to NOW() on conflict (e.g. updated_at)
         
         Returns:
             List of upserted records
@@ -364,17 +492,23 @@ class BaseRepository(Generic[T], ABC):
             # Update all columns except conflict columns
             update_columns = [col for col in all_columns if col not in conflict_columns]
         
+        assignments = [f'{col} = EXCLUDED.{col}' for col in update_columns]
+        assignments.extend(f'{col} = NOW()' for col in touch_columns or [])
+
         # Build ON CONFLICT clause
         on_conflict = f"""
         ON CONFLICT ({','.join(conflict_columns)})
-        DO UPDATE SET {','.join([f'{col} = EXCLUDED.{col}' for col in update_columns])}
+        DO UPDATE SET {','.join(assignments)}
         """
         
+        mode = mode or self.bulk_write_mode
         return await self.bulk_insert(
             items,
-            returning_fields=["id"],
+            returning_fields=["id"] if returning_fields is None else returning_fields,
             on_conflict=on_conflict,
-            chunk_size=chunk_size
+            chunk_size=chunk_size,
+            mode=mode,
+            dedupe_columns=conflict_columns if mode == BULK_MODE_COPY else None
         )
     
     async def execute_in_transaction(
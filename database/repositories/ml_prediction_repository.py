@@ -12,7 +12,7 @@ import json
 from loguru import logger
 import numpy as np
 
-from database.repositories.base_repository import BaseRepository
+from database.repositories.base_repository import BaseRepository, BULK_MODE_COPY
 from database.models.ml_predictions import MLPrediction
 
 
@@ -27,9 +27,18 @@ class MLPredictionRepository(BaseRepository[MLPrediction]):
     - Deduplication and caching support
     """
     
-    def __init__(self, pool: asyncpg.Pool, transaction_manager=None):
+    bulk_write_mode = BULK_MODE_COPY
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        transaction_manager=None,
+        bulk_write_mode: Optional[str] = None
+    ):
         """Initialize ML Prediction Repository."""
-        super().__init__(pool, "ml_predictions", MLPrediction, transaction_manager)
+        super().__init__(
+            pool, "ml_predictions", MLPrediction, transaction_manager, bulk_write_mode
+        )
         self._insert_buffer: List[MLPrediction] = []
         self._buffer_size = 50  # Flush every 50 predictions
         self._last_flush = datetime.now()
@@ -122,7 +131,7 @@ class MLPredictionRepository(BaseRepository[MLPrediction]):
             List of prediction IDs
         
         Performance:
-            20x faster than individual inserts
+            20x faster than individual inserts; one COPY per batch in copy mode
         """
         if not predictions:
             return []
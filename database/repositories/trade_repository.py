@@ -13,7 +13,7 @@ import json
 from loguru import logger
 from enum import Enum
 
-from database.repositories.base_repository import BaseRepository
+from database.repositories.base_repository import BaseRepository, BULK_MODE_COPY
 from database.connections.transaction_manager import TransactionManager
 
 
@@ -95,15 +95,23 @@ class TradeRepository(BaseRepository[Trade]):
     - PnL calculation and tracking
     """
     
-    def __init__(self, pool: asyncpg.Pool, transaction_manager: TransactionManager = None):
+    bulk_write_mode = BULK_MODE_COPY
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        transaction_manager: TransactionManager = None,
+        bulk_write_mode: Optional[str] = None
+    ):
         """
         Initialize Trade Repository.
         
         Args:
             pool: AsyncPG connection pool  
             transaction_manager: Transaction manager for atomic operations
+            bulk_write_mode: "values" or "copy" (default "copy")
         """
-        super().__init__(pool, "trades", Trade, transaction_manager)
+        super().__init__(pool, "trades", Trade, transaction_manager, bulk_write_mode)
         
     def _to_dict(self, model: Trade) -> Dict[str, Any]:
         """Convert Trade to dictionary for database."""
@@ -190,6 +198,30 @@ class TradeRepository(BaseRepository[Trade]):
         logger.info(f"Created trade {trade_id} for {trade.symbol} {trade.side} {trade.quantity}")
         return trade_id
     
+    async def record_trades_batch(self, trades: List[Trade]) -> List[int]:
+        """
+        Record multiple trades in one bulk write.
+
+        Bulk counterpart of create_trade for callers that persist many
+        fills at once (e.g. a future execution history sync).
+
+        Args:
+            trades: Trades to record
+
+        Returns:
+            Trade IDs in input order
+        """
+        if not trades:
+            return []
+
+        results = await self.bulk_insert(trades, returning_fields=["id"])
+        trade_ids = [r["id"] for r in results]
+        for trade, trade_id in zip(trades, trade_ids, strict=True):
+            trade.id = trade_id
+
+        logger.info(f"Recorded {len(trades)} trades")
+        return trade_ids
+
     async def get_trading_stats(
         self,
         exchange: Optional[str] = None,
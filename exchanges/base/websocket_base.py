@@ -204,7 +204,7 @@ class BaseWebSocketClient(ABC):
             # Установка соединения
             self.websocket = await websockets.connect(
                 self.connection_url,
-                timeout=self.timeout,
+                open_timeout=self.timeout,
                 ping_interval=None,  # Управляем ping сами
                 ping_timeout=None,
             )
@@ -338,7 +338,11 @@ class BaseWebSocketClient(ABC):
         # Задача прослушивания сообщений
         self.listen_task = asyncio.create_task(self._listen_loop())
 
-        # Задача ping
+        # Задача ping. После переподключения прежний ping-цикл снова видит
+        # CONNECTED и не завершится сам - останавливаем его
+        if self.ping_task and not self.ping_task.done():
+            self.ping_task.cancel()
+            await asyncio.gather(self.ping_task, return_exceptions=True)
         self.ping_task = asyncio.create_task(self._ping_loop())
 
     async def _stop_tasks(self) -> None:
@@ -465,6 +469,10 @@ class BaseWebSocketClient(ABC):
 
         self.state = WebSocketState.RECONNECTING
 
+        # Новое соединение ничего не знает о прежних подписках
+        for subscription in self.subscriptions.values():
+            subscription.is_active = False
+
         # Callback отключения
         if self.on_disconnect_callback:
             await self._safe_callback(self.on_disconnect_callback)
@@ -496,6 +504,8 @@ class BaseWebSocketClient(ABC):
 
             except Exception as e:
                 self.logger.warning(f"Reconnection attempt {self.reconnect_attempts} failed: {e}")
+                # connect() переводит клиент в ERROR - продолжаем попытки
+                self.state = WebSocketState.RECONNECTING
 
         # Превышено максимальное количество попыток
         self.state = WebSocketState.ERROR
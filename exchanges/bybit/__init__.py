@@ -20,6 +20,7 @@ Bybit Exchange Module для BOT_Trading v3.0
 from .adapter import BybitAPIClient, BybitLegacyAdapter, get_bybit_client
 from .bybit_exchange import BybitExchange, create_bybit_exchange
 from .client import BybitClient, clean_symbol
+from .websocket import BybitPrivateWebSocket, BybitPublicWebSocket
 
 # Экспорт всех публичных классов и функций
 __all__ = [
@@ -28,6 +29,9 @@ __all__ = [
     "create_bybit_exchange",
     # Основной унифицированный клиент
     "BybitClient",
+    # WebSocket потоки
+    "BybitPublicWebSocket",
+    "BybitPrivateWebSocket",
     # Legacy совместимость
     "BybitLegacyAdapter",
     "BybitAPIClient",
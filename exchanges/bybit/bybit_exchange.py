@@ -493,6 +493,14 @@ class BybitExchange(BaseExchangeInterface):
             logger.error(f"Failed to subscribe to positions: {e}")
             return False
 
+    async def subscribe_executions(self, callback: callable) -> bool:
+        """Подписка на исполнения ордеров через WebSocket"""
+        try:
+            return await self.client.subscribe_executions(callback)
+        except Exception as e:
+            logger.error(f"Failed to subscribe to executions: {e}")
+            return False
+
     # =================== АЛИАС ДЛЯ СОВМЕСТИМОСТИ ===================
 
     async def fetch_ohlcv(
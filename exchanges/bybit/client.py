@@ -15,6 +15,7 @@ import hmac
 import json
 import os
 import time
+from collections.abc import Callable
 from datetime import datetime, timedelta
 from typing import Any
 from urllib.parse import urlencode
@@ -58,6 +59,13 @@ from ..base.models import (
     create_position_from_dict,
 )
 from ..base.order_types import OrderRequest, OrderResponse, OrderSide, OrderStatus, OrderType
+from .websocket import (
+    BybitPrivateWebSocket,
+    BybitPublicWebSocket,
+    kline_channel,
+    orderbook_channel,
+    split_topic,
+)
 
 # Import InstrumentManager for proper quantity rounding
 from trading.instrument_manager import InstrumentManager
@@ -305,6 +313,10 @@ class BybitClient(BaseExchangeInterface):
         self._instruments_cache: dict[str, list[Instrument]] = {}
         self._cache_expiry: dict[str, datetime] = {}
 
+        # Публичный и приватный WebSocket (создаются при первой подписке)
+        self.public_ws: BybitPublicWebSocket | None = None
+        self.private_ws: BybitPrivateWebSocket | None = None
+
     # =================== БАЗОВЫЕ СВОЙСТВА ===================
 
     @property
@@ -355,6 +367,8 @@ class BybitClient(BaseExchangeInterface):
 
     async def disconnect(self) -> None:
         """Отключение от Bybit"""
+        await self.stop_websocket()
+
         if self.session:
             await self.session.close()
             self.session = None
@@ -1786,33 +1800,110 @@ class BybitClient(BaseExchangeInterface):
         """Получение истории сделок - будет реализовано"""
         pass
 
+    async def _ensure_public_ws(self) -> BybitPublicWebSocket:
+        """Публичный WebSocket, общий для всех подписок клиента"""
+        if self.public_ws is None:
+            self.public_ws = BybitPublicWebSocket(
+                category=self.trading_category, testnet=self.sandbox
+            )
+        if not self.public_ws.is_connected and not self.public_ws.is_reconnecting:
+            await self.public_ws.connect()
+        return self.public_ws
+
     async def start_websocket(self, channels: list[str], callback: callable) -> bool:
-        """Запуск WebSocket - будет реализовано"""
-        pass
+        """
+        Запуск публичного WebSocket
+
+        Args:
+            channels: Топики Bybit ("kline.15.BTCUSDT", "tickers.ETHUSDT", ...)
+            callback: Получает WebSocketMessage для каждого обновления
+        """
+        try:
+            ws = await self._ensure_public_ws()
+            by_channel: dict[str, list[str]] = {}
+            for topic in channels:
+                channel, symbol = split_topic(topic)
+                by_channel.setdefault(channel, []).append(symbol)
+            for channel, symbols in by_channel.items():
+                await ws.subscribe_many(channel, symbols, callback)
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to start websocket: {e}")
+            return False
 
     async def stop_websocket(self) -> None:
-        """Остановка WebSocket - будет реализовано"""
-        pass
+        """Остановка публичного и приватного WebSocket"""
+        for ws in (self.public_ws, self.private_ws):
+            if ws is not None:
+                await ws.disconnect()
+        self.public_ws = None
+        self.private_ws = None
+
+    async def _subscribe_public(self, channel: str, symbol: str, callback: callable) -> bool:
+        try:
+            ws = await self._ensure_public_ws()
+            await ws.subscribe_many(channel, [clean_symbol(symbol)], callback)
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to subscribe to {channel}.{symbol}: {e}")
+            return False
 
     async def subscribe_ticker(self, symbol: str, callback: callable) -> bool:
-        """Подписка на тикер - будет реализовано"""
-        pass
+        """Подписка на тикер"""
+        return await self._subscribe_public("tickers", symbol, callback)
 
     async def subscribe_orderbook(self, symbol: str, callback: callable) -> bool:
-        """Подписка на стакан - будет реализовано"""
-        pass
+        """Подписка на стакан (глубина 50)"""
+        return await self._subscribe_public(orderbook_channel(50), symbol, callback)
 
     async def subscribe_trades(self, symbol: str, callback: callable) -> bool:
-        """Подписка на сделки - будет реализовано"""
-        pass
+        """Подписка на публичные сделки"""
+        return await self._subscribe_public("publicTrade", symbol, callback)
+
+    async def subscribe_klines(self, symbol: str, interval: str, callback: callable) -> bool:
+        """Подписка на свечи"""
+        return await self._subscribe_public(kline_channel(interval), symbol, callback)
+
+    async def _subscribe_private(self, topic: str, callback: callable) -> bool:
+        if self.public_only:
+            self.logger.warning(f"Private stream {topic} requires API keys")
+            return False
+        try:
+            if self.private_ws is None:
+                self.private_ws = BybitPrivateWebSocket(
+                    self.api_key, self.api_secret, testnet=self.sandbox
+                )
+            await self.private_ws.subscribe_topic(topic, callback)
+            if not self.private_ws.is_connected and not self.private_ws.is_reconnecting:
+                await self.private_ws.connect()
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to subscribe to private {topic}: {e}")
+            return False
+
+    def set_private_stream_callbacks(
+        self, on_connect: Callable | None = None, on_disconnect: Callable | None = None
+    ) -> None:
+        """Callbacks подключения и разрыва приватного WebSocket"""
+        if self.private_ws is not None:
+            self.private_ws.set_callbacks(on_connect=on_connect, on_disconnect=on_disconnect)
+
+    @property
+    def private_stream_connected(self) -> bool:
+        """Подключен ли приватный WebSocket"""
+        return self.private_ws is not None and self.private_ws.is_connected
 
     async def subscribe_orders(self, callback: callable) -> bool:
-        """Подписка на ордеры - будет реализовано"""
-        pass
+        """Подписка на обновления ордеров (приватный поток)"""
+        return await self._subscribe_private("order", callback)
 
     async def subscribe_positions(self, callback: callable) -> bool:
-        """Подписка на позиции - будет реализовано"""
-        pass
+        """Подписка на обновления позиций (приватный поток)"""
+        return await self._subscribe_private("position", callback)
+
+    async def subscribe_executions(self, callback: callable) -> bool:
+        """Подписка на исполнения (приватный поток)"""
+        return await self._subscribe_private("execution", callback)
 
     # =================== АЛИАСЫ ДЛЯ СОВМЕСТИМОСТИ ===================
 
@@ -0,0 +1,309 @@
+"""
+Bybit v5 WebSocket клиенты публичных и приватных потоков
+
+Одно соединение обслуживает все подписки (kline, tickers, publicTrade,
+orderbook) для всех символов. Топики отправляются пачками по
+MAX_TOPICS_PER_REQUEST в одном сообщении subscribe, после переподключения
+подписки восстанавливаются так же.
+
+Формат топиков Bybit: "<канал>.<символ>", например "kline.15.BTCUSDT",
+"tickers.BTCUSDT", "publicTrade.BTCUSDT", "orderbook.50.BTCUSDT".
+Канал подписки - часть топика без символа ("kline.15").
+
+Приватный поток (order, position, execution, wallet) требует аутентификации:
+подпись HMAC-SHA256 строки "GET/realtime{expires}".
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from typing import Any
+
+from ..base.exceptions import WebSocketError
+from ..base.websocket_base import (
+    BaseWebSocketClient,
+    MessageType,
+    Subscription,
+    WebSocketMessage,
+    WebSocketState,
+)
+
+PUBLIC_URLS = {
+    False: "wss://stream.bybit.com/v5/public",
+    True: "wss://stream-testnet.bybit.com/v5/public",
+}
+
+PRIVATE_URLS = {
+    False: "wss://stream.bybit.com/v5/private",
+    True: "wss://stream-testnet.bybit.com/v5/private",
+}
+
+PRIVATE_TOPICS = ("order", "position", "execution", "wallet")
+
+CATEGORIES = ("linear", "inverse", "spot", "option")
+
+# Ограничение Bybit на число args в одном запросе подписки
+MAX_TOPICS_PER_REQUEST = 10
+
+
+def kline_channel(interval: str) -> str:
+    return f"kline.{interval}"
+
+
+def orderbook_channel(depth: int) -> str:
+    return f"orderbook.{depth}"
+
+
+def split_topic(topic: str) -> tuple[str, str | None]:
+    """Разбивает топик на канал и символ: "kline.15.BTCUSDT" -> ("kline.15", "BTCUSDT")"""
+    channel, _, symbol = topic.rpartition(".")
+    if not channel:
+        return topic, None
+    return channel, symbol
+
+
+class BybitWebSocket(BaseWebSocketClient):
+    """
+    Протокол Bybit v5: subscribe/ping, топики и пакетные подписки
+
+    Args:
+        url: Адрес потока
+        ping_interval: Период ping (Bybit закрывает соединение без ping ~через 10 минут)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str | None = None,
+        api_secret: str | None = None,
+        timeout: int = 30,
+        ping_interval: int = 20,
+        max_reconnect_attempts: int = 10,
+        reconnect_delay: int = 1,
+    ):
+        super().__init__(
+            exchange_name="bybit",
+            base_url=url,
+            api_key=api_key,
+            api_secret=api_secret,
+            timeout=timeout,
+            ping_interval=ping_interval,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_delay=reconnect_delay,
+        )
+        self._req_id = 0
+
+    # =================== ПРОТОКОЛ ===================
+
+    def build_connection_url(self) -> str:
+        return self.base_url
+
+    def build_auth_message(self) -> dict[str, Any] | None:
+        return None
+
+    def _request(self, op: str, topics: list[str]) -> dict[str, Any]:
+        self._req_id += 1
+        return {"req_id": str(self._req_id), "op": op, "args": topics}
+
+    @staticmethod
+    def topic(subscription: Subscription) -> str:
+        if subscription.symbol:
+            return f"{subscription.channel}.{subscription.symbol}"
+        return subscription.channel
+
+    def build_subscribe_message(self, subscription: Subscription) -> dict[str, Any]:
+        return self._request("subscribe", [self.topic(subscription)])
+
+    def build_unsubscribe_message(self, subscription: Subscription) -> dict[str, Any]:
+        return self._request("unsubscribe", [self.topic(subscription)])
+
+    def build_ping_message(self) -> dict[str, Any]:
+        self._req_id += 1
+        return {"req_id": str(self._req_id), "op": "ping"}
+
+    def is_pong_message(self, message: dict[str, Any]) -> bool:
+        # Linear/inverse отвечают op=pong, spot - op=ping с ret_msg=pong
+        return message.get("op") == "pong" or (
+            message.get("op") == "ping" and message.get("ret_msg") == "pong"
+        )
+
+    def parse_message(self, raw_message: str) -> WebSocketMessage | None:
+        message = json.loads(raw_message)
+
+        topic = message.get("topic")
+        if topic:
+            channel, symbol = split_topic(topic)
+            ts = message.get("ts")
+            return WebSocketMessage(
+                message_type=MessageType.DATA,
+                channel=channel,
+                symbol=symbol,
+                data=message.get("data"),
+                timestamp=datetime.fromtimestamp(ts / 1000, tz=UTC) if ts else datetime.now(UTC),
+                raw_data=message,
+                exchange_name=self.exchange_name,
+            )
+
+        if self.is_pong_message(message):
+            return WebSocketMessage(MessageType.PONG, channel="pong", raw_data=message)
+
+        if message.get("op") in ("subscribe", "unsubscribe") and not message.get("success", True):
+            self.logger.error(f"Bybit {message['op']} rejected: {message.get('ret_msg')}")
+            return WebSocketMessage(
+                MessageType.ERROR,
+                channel=message["op"],
+                data=message.get("ret_msg"),
+                raw_data=message,
+            )
+
+        return None
+
+    # =================== МУЛЬТИПЛЕКСИРОВАННЫЕ ПОДПИСКИ ===================
+
+    async def _send_topics(self, op: str, topics: list[str]) -> None:
+        for start in range(0, len(topics), MAX_TOPICS_PER_REQUEST):
+            await self._send_message(
+                self._request(op, topics[start : start + MAX_TOPICS_PER_REQUEST])
+            )
+
+    async def subscribe_many(
+        self,
+        channel: str,
+        symbols: Iterable[str],
+        callback: Callable[[WebSocketMessage], Any],
+    ) -> list[str]:
+        """
+        Подписка на канал для нескольких символов пачками топиков
+
+        Returns:
+            ID подписок в порядке символов
+        """
+        subscriptions = [
+            Subscription(channel=channel, symbol=symbol, callback=callback) for symbol in symbols
+        ]
+        for subscription in subscriptions:
+            self.subscriptions[subscription.subscription_id] = subscription
+
+        if self.state == WebSocketState.CONNECTED:
+            await self._send_topics("subscribe", [self.topic(s) for s in subscriptions])
+            for subscription in subscriptions:
+                subscription.is_active = True
+        else:
+            self.pending_subscriptions.extend(subscriptions)
+
+        self.logger.info(f"Subscribed to {channel} for {len(subscriptions)} symbols")
+        return [s.subscription_id for s in subscriptions]
+
+    async def _restore_subscriptions(self) -> None:
+        """Отправляет все неактивные подписки пачками (после connect/reconnect)"""
+        inactive = [s for s in self.subscriptions.values() if not s.is_active]
+        topics = list(dict.fromkeys(self.topic(s) for s in inactive))
+        if topics:
+            await self._send_topics("subscribe", topics)
+            for subscription in inactive:
+                subscription.is_active = True
+        self.pending_subscriptions.clear()
+
+
+class BybitPublicWebSocket(BybitWebSocket):
+    """
+    Публичный WebSocket Bybit v5
+
+    Args:
+        category: linear / inverse / spot / option
+        testnet: Использовать testnet
+        url: Явный URL (например, локальный сервер в тестах)
+    """
+
+    def __init__(
+        self,
+        category: str = "linear",
+        testnet: bool = False,
+        url: str | None = None,
+        **kwargs,
+    ):
+        if category not in CATEGORIES:
+            raise ValueError(f"Неизвестная категория Bybit: {category}")
+
+        super().__init__(url or f"{PUBLIC_URLS[testnet]}/{category}", **kwargs)
+        self.category = category
+
+    async def subscribe_klines(
+        self, symbols: Iterable[str], interval: str, callback: Callable[[WebSocketMessage], Any]
+    ) -> list[str]:
+        return await self.subscribe_many(kline_channel(interval), symbols, callback)
+
+    async def subscribe_tickers(
+        self, symbols: Iterable[str], callback: Callable[[WebSocketMessage], Any]
+    ) -> list[str]:
+        return await self.subscribe_many("tickers", symbols, callback)
+
+    async def subscribe_trades(
+        self, symbols: Iterable[str], callback: Callable[[WebSocketMessage], Any]
+    ) -> list[str]:
+        return await self.subscribe_many("publicTrade", symbols, callback)
+
+    async def subscribe_orderbook(
+        self, symbols: Iterable[str], callback: Callable[[WebSocketMessage], Any], depth: int = 50
+    ) -> list[str]:
+        return await self.subscribe_many(orderbook_channel(depth), symbols, callback)
+
+
+class BybitPrivateWebSocket(BybitWebSocket):
+    """
+    Приватный WebSocket Bybit v5: ордера, позиции, исполнения, кошелек
+
+    Аутентификация выполняется при каждом подключении до восстановления
+    подписок; ответ auth читается синхронно, до запуска цикла чтения.
+    """
+
+    auth_ttl_ms = 10_000
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        testnet: bool = False,
+        url: str | None = None,
+        **kwargs,
+    ):
+        super().__init__(
+            url or PRIVATE_URLS[testnet], api_key=api_key, api_secret=api_secret, **kwargs
+        )
+
+    def build_auth_message(self) -> dict[str, Any] | None:
+        expires = int(time.time() * 1000) + self.auth_ttl_ms
+        signature = hmac.new(
+            self.api_secret.encode(), f"GET/realtime{expires}".encode(), hashlib.sha256
+        ).hexdigest()
+        return {"op": "auth", "args": [self.api_key, expires, signature]}
+
+    async def _authenticate(self) -> None:
+        await self._send_message(self.build_auth_message())
+        while True:
+            reply = json.loads(await asyncio.wait_for(self.websocket.recv(), timeout=self.timeout))
+            if reply.get("op") == "auth":
+                break
+
+        if not reply.get("success"):
+            raise WebSocketError(self.exchange_name, "auth", reason=reply.get("ret_msg"))
+        self.logger.info("Private WebSocket authenticated")
+
+    async def subscribe_topic(self, topic: str, callback: Callable[[WebSocketMessage], Any]) -> str:
+        """Подписка на приватный топик (order, position, execution, wallet)"""
+        if topic.split(".")[0] not in PRIVATE_TOPICS:
+            raise ValueError(f"Неизвестный приватный топик Bybit: {topic}")
+        return (await self.subscribe_many(topic, [None], callback))[0]
+
+    async def subscribe_orders(self, callback: Callable[[WebSocketMessage], Any]) -> str:
+        return await self.subscribe_topic("order", callback)
+
+    async def subscribe_positions(self, callback: Callable[[WebSocketMessage], Any]) -> str:
+        return await self.subscribe_topic("position", callback)
+
+    async def subscribe_executions(self, callback: Callable[[WebSocketMessage], Any]) -> str:
+        return await self.subscribe_topic("execution", callback)
@@ -2,6 +2,8 @@
 """
 Главная точка входа для BOT_AI_V3
 Запускает SystemOrchestrator который координирует все компоненты системы
+
+--profile-startup - отчет о времени импорта модулей после инициализации
 """
 
 import asyncio
@@ -11,7 +13,13 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
-from dotenv import load_dotenv
+# Профайлер импорта включается до остальных импортов,
+# поэтому импорты ниже идут после кода (noqa: E402)
+from core.startup_profiler import import_profiler, start_if_requested
+
+start_if_requested()
+
+from dotenv import load_dotenv  # noqa: E402
 
 # Загружаем переменные окружения
 load_dotenv()
@@ -19,11 +27,11 @@ load_dotenv()
 # Добавляем корневую директорию в путь
 sys.path.insert(0, str(Path(__file__).parent))
 
-from core.config.config_manager import ConfigManager
-from core.exceptions import ConfigurationError, SystemError
-from core.logger import setup_logger
-from core.shared_context import shared_context
-from core.system.orchestrator import SystemOrchestrator
+from core.config.config_manager import ConfigManager  # noqa: E402
+from core.exceptions import ConfigurationError, SystemError  # noqa: E402
+from core.logger import setup_logger  # noqa: E402
+from core.shared_context import shared_context  # noqa: E402
+from core.system.orchestrator import SystemOrchestrator  # noqa: E402
 
 # Настройка логирования
 logger = setup_logger("main")
@@ -196,6 +204,10 @@ async def main():
         # Инициализация
         await app.initialize()
 
+        if import_profiler.active:
+            logger.info(import_profiler.report())
+            import_profiler.stop()
+
         # Запуск
         await app.start()
 
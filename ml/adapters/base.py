@@ -302,6 +302,55 @@ class BaseModelAdapter(ABC):
         """
         pass
     
+    async def predict_batch_raw(
+        self, inputs: dict[str, Union[np.ndarray, pd.DataFrame]], **kwargs
+    ) -> dict[str, np.ndarray]:
+        """
+        Делает предсказания сразу для нескольких символов.
+        Базовая реализация вызывает predict() последовательно,
+        адаптеры могут переопределить ее батчевым forward pass.
+
+        Args:
+            inputs: Словарь {symbol: входные данные}
+            **kwargs: Дополнительные параметры
+
+        Returns:
+            Словарь {symbol: сырые выходы модели}. Символы с ошибкой пропускаются.
+        """
+        results = {}
+        for symbol, data in inputs.items():
+            try:
+                results[symbol] = await self.predict(data, **kwargs)
+            except Exception as e:
+                logger.error(f"Prediction failed for {symbol}: {e}")
+        return results
+
+    async def predict_batch(
+        self,
+        inputs: dict[str, Union[np.ndarray, pd.DataFrame]],
+        current_prices: Optional[dict[str, float]] = None,
+        **kwargs
+    ) -> dict[str, UnifiedPrediction]:
+        """
+        Батчевое предсказание с интерпретацией выходов по символам.
+
+        Args:
+            inputs: Словарь {symbol: входные данные}
+            current_prices: Текущие цены по символам (опционально)
+            **kwargs: Дополнительные параметры
+
+        Returns:
+            Словарь {symbol: UnifiedPrediction}
+        """
+        current_prices = current_prices or {}
+        raw_outputs = await self.predict_batch_raw(inputs, **kwargs)
+        return {
+            symbol: self.interpret_outputs(
+                outputs, symbol=symbol, current_price=current_prices.get(symbol)
+            )
+            for symbol, outputs in raw_outputs.items()
+        }
+
     @abstractmethod
     def interpret_outputs(
         self, 
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Бэкенды инференса для моделей на PyTorch.
+
+- eager       - исходная nn.Module под torch.inference_mode
+- torchscript - torch.jit.trace + freeze + optimize_for_inference
+- onnx        - экспорт в ONNX и onnxruntime (CPUExecutionProvider)
+
+Экспортированные модели кешируются рядом с весами и пересоздаются, если
+файл весов новее. Перед использованием результат бэкенда сверяется с eager
+моделью (check_parity).
+"""
+
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+INFERENCE_BACKENDS = ("eager", "torchscript", "onnx")
+
+
+class InferenceBackend:
+    """Вызываемый бэкенд: батч float32 (N, ...) -> выходы модели (N, ...)"""
+
+    name = "base"
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class EagerBackend(InferenceBackend):
+    """Исходная модель PyTorch (в том числе после torch.compile)"""
+
+    name = "eager"
+
+    def __init__(self, model: torch.nn.Module, device: torch.device):
+        self.model = model
+        self.device = device
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        with torch.inference_mode():
+            x = torch.from_numpy(np.ascontiguousarray(batch, dtype=np.float32)).to(self.device)
+            return self.model(x).cpu().numpy()
+
+
+class TorchScriptBackend(EagerBackend):
+    """Замороженная TorchScript модель"""
+
+    name = "torchscript"
+
+    @staticmethod
+    def export(model: torch.nn.Module, example: torch.Tensor, path: Path) -> None:
+        """Трассирует модель на примере входа и сохраняет в path"""
+        with torch.no_grad():
+            traced = torch.jit.trace(model, example, check_trace=False)
+        frozen = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+        torch.jit.save(frozen, str(path))
+
+    @classmethod
+    def load(cls, path: Path, device: torch.device) -> "TorchScriptBackend":
+        return cls(torch.jit.load(str(path), map_location=device), device)
+
+
+class ONNXBackend(InferenceBackend):
+    """Модель ONNX в onnxruntime на CPU"""
+
+    name = "onnx"
+    input_name = "features"
+
+    def __init__(self, session):
+        self.session = session
+
+    @classmethod
+    def export(cls, model: torch.nn.Module, example: torch.Tensor, path: Path) -> None:
+        """Экспортирует модель в ONNX с динамическим размером батча"""
+        # Без no_grad: иначе nn.TransformerEncoder уходит в fast path
+        # (_native_multi_head_attention), который не экспортируется в ONNX
+        torch.onnx.export(
+            model,
+            example,
+            str(path),
+            input_names=[cls.input_name],
+            output_names=["outputs"],
+            dynamic_axes={cls.input_name: {0: "batch"}, "outputs": {0: "batch"}},
+            opset_version=17,
+            dynamo=False,
+        )
+
+    @classmethod
+    def load(cls, path: Path, num_threads: int | None = None) -> "ONNXBackend":
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        session = ort.InferenceSession(
+            str(path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        return cls(session)
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        x = np.ascontiguousarray(batch, dtype=np.float32)
+        return self.session.run(None, {self.input_name: x})[0]
+
+
+def configure_torch_threads(num_threads: int | None) -> None:
+    """Задает число потоков PyTorch для CPU инференса"""
+    if not num_threads:
+        return
+    torch.set_num_threads(num_threads)
+    # Можно задать только до первой параллельной операции
+    with contextlib.suppress(RuntimeError):
+        torch.set_num_interop_threads(1)
+    logger.info(f"PyTorch CPU threads: {num_threads}")
+
+
+def check_parity(
+    reference: InferenceBackend, candidate: InferenceBackend, batch: np.ndarray
+) -> float:
+    """Максимальное абсолютное расхождение выходов двух бэкендов на батче"""
+    expected = reference(batch)
+    actual = candidate(batch)
+    if expected.shape != actual.shape:
+        raise ValueError(f"Разная форма выходов: {expected.shape} vs {actual.shape}")
+    return float(np.max(np.abs(expected - actual)))
+
+
+def exported_model_path(model_path: Path, backend: str, export_dir: Path | None = None) -> Path:
+    """Путь к экспортированной модели рядом с весами (или в export_dir)"""
+    suffix = ".ts.pt" if backend == "torchscript" else ".onnx"
+    directory = export_dir or model_path.parent
+    return directory / f"{model_path.stem}{suffix}"
+
+
+def build_backend(
+    backend: str,
+    model: torch.nn.Module,
+    device: torch.device,
+    example: torch.Tensor,
+    model_path: Path,
+    export_dir: Path | None = None,
+    num_threads: int | None = None,
+) -> InferenceBackend:
+    """
+    Создает бэкенд инференса, экспортируя модель при необходимости
+
+    Args:
+        backend: eager / torchscript / onnx
+        model: Eager модель в режиме eval
+        device: Устройство модели
+        example: Пример входа (1, context_length, num_features) для трассировки
+        model_path: Файл весов (экспорт пересоздается, если он новее)
+        export_dir: Каталог для экспортированных моделей
+        num_threads: Потоки onnxruntime
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд инференса: {backend}")
+    if backend == "eager":
+        return EagerBackend(model, device)
+    if backend == "onnx":
+        if device.type != "cpu":
+            raise ValueError("ONNX бэкенд поддерживает только CPU")
+        # Опциональные зависимости: при их отсутствии - ImportError до экспорта
+        import onnx  # noqa: F401
+        import onnxruntime  # noqa: F401
+
+    path = exported_model_path(model_path, backend, export_dir)
+    stale = not path.exists() or (
+        model_path.exists() and path.stat().st_mtime < model_path.stat().st_mtime
+    )
+    if stale:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        exporter = TorchScriptBackend if backend == "torchscript" else ONNXBackend
+        exporter.export(model, example, path)
+        logger.info(f"Модель экспортирована в {backend}: {path}")
+
+    if backend == "torchscript":
+        return TorchScriptBackend.load(path, device)
+    return ONNXBackend.load(path, num_threads)
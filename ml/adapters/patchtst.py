@@ -4,6 +4,7 @@
 Инкапсулирует логику загрузки, предсказания и интерпретации для PatchTST архитектуры.
 """
 
+import asyncio
 import os
 import pickle
 from datetime import UTC, datetime
@@ -23,6 +24,13 @@ from ml.adapters.base import (
     TimeframePrediction,
     UnifiedPrediction,
 )
+from ml.adapters.inference_backends import (
+    EagerBackend,
+    InferenceBackend,
+    build_backend,
+    check_parity,
+    configure_torch_threads,
+)
 from ml.logic.feature_engineering_production import (
     ProductionFeatureEngineer as FeatureEngineer,
 )
@@ -32,6 +40,37 @@ from ml.logic.signal_quality_analyzer import SignalQualityAnalyzer
 logger = setup_logger(__name__)
 
 
+def signal_sltp_percent(quality_score: float, future_returns: np.ndarray) -> tuple[float, float]:
+    """
+    Расчет SL/TP (доли цены) для торгового сигнала, прошедшего фильтрацию
+
+    Args:
+        quality_score: Итоговое качество сигнала из SignalQualityAnalyzer
+        future_returns: Предсказанные доходности (15m, 1h, 4h, 12h)
+
+    Returns:
+        (stop_loss_pct, take_profit_pct)
+    """
+    base_sl = 0.01  # 1%
+    base_tp = 0.02  # 2%
+
+    quality_multiplier = 0.8 + (quality_score * 0.4)
+
+    stop_loss_pct = base_sl * quality_multiplier
+    take_profit_pct = base_tp * quality_multiplier
+
+    # Корректировка на волатильность
+    volatility = np.std(future_returns[:2])
+    if volatility > 0.01:
+        stop_loss_pct *= 1.2
+        take_profit_pct *= 1.2
+
+    # Ограничения
+    stop_loss_pct = np.clip(stop_loss_pct, 0.005, 0.025)
+    take_profit_pct = np.clip(take_profit_pct, 0.01, 0.05)
+    return stop_loss_pct, take_profit_pct
+
+
 class PatchTSTAdapter(BaseModelAdapter):
     """
     Адаптер для UnifiedPatchTST модели.
@@ -59,6 +98,13 @@ class PatchTSTAdapter(BaseModelAdapter):
         
         # Оптимизации
         self.use_torch_compile = not os.environ.get("TORCH_COMPILE_DISABLE", "").lower() in ("1", "true")
+        # Максимальный размер батча для predict_batch (ограничивает память)
+        self.max_batch_size = int(config.get("max_batch_size", 64))
+        # Бэкенд инференса: eager | torchscript | onnx (при ошибке экспорта - eager)
+        self.inference_backend = config.get("inference_backend", "eager")
+        self.inference_threads = config.get("inference_threads")
+        self.parity_atol = float(config.get("parity_atol", 1e-4))
+        self.runtime: Optional[InferenceBackend] = None
         
         logger.info(f"PatchTSTAdapter initialized with context_length={self.context_length}, "
                    f"num_features={self.num_features}, device={self.device}")
@@ -109,16 +155,20 @@ class PatchTSTAdapter(BaseModelAdapter):
             }
             self.model = create_unified_model(model_config)
             
-            # Загружаем веса
-            checkpoint = torch.load(self.model_path, map_location=self.device)
+            # Загружаем веса (чтение файла - в потоке, не блокируя запуск остальных компонентов)
+            checkpoint = await asyncio.to_thread(
+                torch.load, self.model_path, map_location=self.device
+            )
             self.model.load_state_dict(checkpoint["model_state_dict"])
             
             # Перемещаем на устройство
             self.model.to(self.device)
             self.model.eval()
             
-            # Применяем torch.compile если доступно
-            if self.use_torch_compile:
+            configure_torch_threads(self.inference_threads)
+
+            # Применяем torch.compile если доступно (только для eager бэкенда)
+            if self.use_torch_compile and self.inference_backend == "eager":
                 try:
                     logger.info("🚀 Applying torch.compile optimization...")
                     self.model = torch.compile(
@@ -138,12 +188,56 @@ class PatchTSTAdapter(BaseModelAdapter):
                 except Exception as e:
                     logger.warning(f"Could not apply torch.compile: {e}")
             
+            self._setup_runtime()
+
             logger.info(f"Model loaded from {self.model_path}")
             
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise
     
+    def _setup_runtime(self) -> None:
+        """
+        Готовит бэкенд инференса и сверяет его выходы с eager моделью.
+
+        При ошибке экспорта, отсутствии onnxruntime или расхождении больше
+        parity_atol используется eager модель.
+        """
+        eager = EagerBackend(self.model, self.device)
+        self.runtime = eager
+        if self.inference_backend == "eager":
+            return
+
+        example = torch.randn(1, self.context_length, self.num_features).to(self.device)
+        try:
+            runtime = build_backend(
+                self.inference_backend,
+                self.model,
+                self.device,
+                example,
+                self.model_path,
+                num_threads=self.inference_threads,
+            )
+            rng = np.random.default_rng(0)
+            batch = rng.standard_normal((4, self.context_length, self.num_features))
+            batch = batch.astype(np.float32)
+            error = check_parity(eager, runtime, batch)
+        except Exception as e:
+            logger.error(
+                f"Inference backend {self.inference_backend} unavailable, using eager: {e}"
+            )
+            return
+
+        if error > self.parity_atol:
+            logger.error(
+                f"Inference backend {self.inference_backend} parity check failed "
+                f"(max diff {error:.2e} > {self.parity_atol:.0e}), using eager"
+            )
+            return
+
+        self.runtime = runtime
+        logger.info(f"✅ Inference backend: {self.inference_backend} (max diff {error:.2e})")
+
     async def _load_scaler(self):
         """Загружает scaler для нормализации данных"""
         try:
@@ -176,29 +270,72 @@ class PatchTSTAdapter(BaseModelAdapter):
         if not self.validate_input(data):
             raise ValueError("Invalid input data")
         
-        # Обработка входных данных
+        features_scaled = self._scale_features(self._prepare_features(data))
+        
+        # Возвращаем numpy array
+        return self._forward_batch(features_scaled[np.newaxis])[0]
+
+    async def predict_batch_raw(
+        self, inputs: dict[str, Union[np.ndarray, pd.DataFrame]], **kwargs
+    ) -> dict[str, np.ndarray]:
+        """
+        Делает предсказания для нескольких символов одним forward pass.
+
+        Признаки каждого символа готовятся и нормализуются отдельно, затем
+        складываются в тензор (N, context_length, num_features). Символы с
+        некорректными данными пропускаются, остальные предсказываются.
+
+        Args:
+            inputs: Словарь {symbol: признаки или DataFrame с OHLCV}
+            **kwargs: Дополнительные параметры
+
+        Returns:
+            Словарь {symbol: сырые выходы модели (20 значений)}
+        """
+        if not self._initialized:
+            raise ValueError("Adapter not initialized. Call initialize() first.")
+        
+        symbols = []
+        batch = []
+        for symbol, data in inputs.items():
+            try:
+                if not self.validate_input(data):
+                    raise ValueError("Invalid input data")
+                batch.append(self._scale_features(self._prepare_features(data)))
+                symbols.append(symbol)
+            except Exception as e:
+                logger.error(f"Skipping {symbol} in batch prediction: {e}")
+        
+        if not batch:
+            return {}
+        
+        outputs = self._forward_batch(np.stack(batch))
+        return dict(zip(symbols, outputs, strict=True))
+
+    def _prepare_features(self, data: Union[np.ndarray, pd.DataFrame]) -> np.ndarray:
+        """Готовит матрицу признаков (context_length, num_features) для одного символа"""
         if isinstance(data, np.ndarray):
             # Уже готовые признаки
-            features = self._prepare_features_from_array(data)
-        else:
-            # DataFrame с OHLCV - генерируем признаки
-            features = self._prepare_features_from_dataframe(data)
-        
-        # Нормализация
+            return self._prepare_features_from_array(data)
+        # DataFrame с OHLCV - генерируем признаки
+        return self._prepare_features_from_dataframe(data)
+
+    def _scale_features(self, features: np.ndarray) -> np.ndarray:
+        """Нормализация и фильтрация zero variance features"""
         features_scaled = self.scaler.transform(features)
+        return self._handle_zero_variance(features_scaled)
+
+    def _forward_batch(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Прогоняет батч (N, context_length, num_features) через модель.
         
-        # Фильтрация zero variance features
-        features_scaled = self._handle_zero_variance(features_scaled)
-        
-        # Преобразуем в тензор
-        x = torch.FloatTensor(features_scaled).unsqueeze(0).to(self.device)
-        
-        # Предсказание
-        with torch.no_grad():
-            outputs = self.model(x)
-        
-        # Возвращаем numpy array
-        return outputs.cpu().numpy()[0]
+        Батч режется на части по max_batch_size, чтобы ограничить память.
+        """
+        runtime = self.runtime or EagerBackend(self.model, self.device)
+        results = []
+        for start in range(0, len(batch), self.max_batch_size):
+            results.append(runtime(batch[start : start + self.max_batch_size]))
+        return np.concatenate(results)
     
     def _prepare_features_from_array(self, data: np.ndarray) -> np.ndarray:
         """Подготавливает признаки из numpy array"""
@@ -372,23 +509,9 @@ class PatchTSTAdapter(BaseModelAdapter):
             
             # Расчет SL/TP для торговых сигналов
             if signal_type in ["LONG", "SHORT"]:
-                base_sl = 0.01  # 1%
-                base_tp = 0.02  # 2%
-                
-                quality_multiplier = 0.8 + (metrics.quality_score * 0.4)
-                
-                stop_loss_pct = base_sl * quality_multiplier
-                take_profit_pct = base_tp * quality_multiplier
-                
-                # Корректировка на волатильность
-                volatility = np.std(future_returns[:2])
-                if volatility > 0.01:
-                    stop_loss_pct *= 1.2
-                    take_profit_pct *= 1.2
-                
-                # Ограничения
-                stop_loss_pct = np.clip(stop_loss_pct, 0.005, 0.025)
-                take_profit_pct = np.clip(take_profit_pct, 0.01, 0.05)
+                stop_loss_pct, take_profit_pct = signal_sltp_percent(
+                    metrics.quality_score, future_returns
+                )
             else:
                 stop_loss_pct = None
                 take_profit_pct = None
@@ -492,6 +615,9 @@ class PatchTSTAdapter(BaseModelAdapter):
             "model_loaded": self.model is not None,
             "scaler_loaded": self.scaler is not None,
             "torch_compile_enabled": self.use_torch_compile,
+            "inference_backend": (
+                self.runtime.name if self.runtime is not None else self.inference_backend
+            ),
             "initialized": self._initialized,
         }
     
@@ -4,6 +4,7 @@ ML Logic модуль для BOT Trading v3
 """
 
 from .feature_engineering_production import ProductionFeatureEngineer as FeatureEngineer
+from .incremental_features import IncrementalFeatureEngine
 from .indicator_integration import (
     FeatureEngineerWithIndicators,
     create_feature_config_from_indicators,
@@ -18,6 +19,7 @@ __all__ = [
     "DirectionalMultiTaskLoss",
     "FeatureEngineer",
     "FeatureEngineerWithIndicators",
+    "IncrementalFeatureEngine",
     "UnifiedPatchTSTForTrading",
     "create_feature_config_from_indicators",
     "create_unified_model",
@@ -0,0 +1,146 @@
+"""
+LRU-кеш матриц признаков с ограничением по памяти
+
+В одном цикле генерации сигнала `calculate_indicators`, `prepare_ml_input` и
+`get_features_for_ml` считают `create_features` на одном и том же DataFrame.
+Кеш хранит результат по ключу (символ, последняя свеча, версия набора
+признаков), вытесняет давно не использованные записи при превышении бюджета
+в байтах и ведет счетчики попаданий/промахов.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+# Бюджет по умолчанию: ~100 символов по 480 свечей x ~300 float64 признаков
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def feature_matrix_key(symbol: str, ohlcv_df: pd.DataFrame, version: str) -> tuple[Hashable, ...]:
+    """
+    Ключ кеша для OHLCV окна
+
+    Кроме символа и времени последней свечи в ключ входят длина окна
+    (кумулятивные признаки зависят от его начала) и цена закрытия последней
+    свечи (незакрытая свеча обновляется с тем же временем).
+    """
+    last_close = float(ohlcv_df["close"].iloc[-1]) if len(ohlcv_df) else None
+    last_index = ohlcv_df.index[-1] if len(ohlcv_df) else None
+    return (symbol, last_index, len(ohlcv_df), last_close, version)
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Оценка занимаемой памяти (без учета строковых object-колонок)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    return 0
+
+
+class FeatureMatrixCache:
+    """
+    LRU-кеш матриц признаков с бюджетом в байтах
+
+    Записи, не помещающиеся в бюджет целиком, не кешируются. Значения
+    возвращаются без копирования - вызывающий код не должен их изменять.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int | None = None):
+        self.max_bytes = int(max_bytes)
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejected = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """Возвращает значение и помечает запись как недавно использованную"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> bool:
+        """
+        Сохраняет значение, вытесняя старые записи при превышении бюджета
+
+        Returns:
+            True если значение помещено в кеш
+        """
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            if nbytes > self.max_bytes:
+                self._rejected += 1
+                return False
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._current_bytes -= previous[1]
+
+            self._entries[key] = (value, nbytes)
+            self._current_bytes += nbytes
+            self._evict()
+            return True
+
+    def invalidate(self, symbol: str | None = None) -> int:
+        """Удаляет записи символа (или все записи) и возвращает их количество"""
+        with self._lock:
+            if symbol is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._current_bytes = 0
+                return removed
+
+            keys = [key for key in self._entries if key[0] == symbol]
+            for key in keys:
+                self._current_bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def _evict(self):
+        """Вытесняет самые старые записи до выполнения ограничений"""
+        while self._entries and (
+            self._current_bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._current_bytes -= nbytes
+            self._evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_stats(self) -> dict[str, Any]:
+        """Статистика кеша"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+                "evictions": self._evictions,
+                "rejected": self._rejected,
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "symbols": sorted({key[0] for key in self._entries}),
+            }
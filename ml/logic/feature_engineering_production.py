@@ -10,6 +10,13 @@ import ta
 from sklearn.preprocessing import RobustScaler, StandardScaler
 from tqdm import tqdm
 
+from .rolling_kernels import (
+    rolling_fractal_dimension,
+    rolling_garch_volatility,
+    rolling_hurst_exponent,
+    rolling_shannon_entropy,
+)
+
 # Для совместимости с логированием
 
 warnings.filterwarnings("ignore")
@@ -57,6 +64,11 @@ class LoggerAdapter:
         self.logger.info(f"Features info at {stage}: shape={df.shape}")
 
 
+# Версия набора признаков create_features. Меняется при изменении формул
+# или состава признаков - входит в ключи кешей матриц признаков.
+FEATURE_SET_VERSION = "production-240-v1"
+
+
 def get_logger(name):
     """Возвращает адаптер логгера"""
     return LoggerAdapter(name)
@@ -1348,61 +1360,12 @@ class ProductionFeatureEngineer:
 
         # 1. Hurst Exponent - мера персистентности рынка
         # >0.5 = тренд, <0.5 = возврат к среднему, ~0.5 = случайное блуждание
-        def hurst_exponent(ts, max_lag=20):
-            """Вычисление экспоненты Херста"""
-            lags = range(2, min(max_lag, len(ts) // 2))
-            tau = []
-
-            for lag in lags:
-                pp = np.array(ts[:-lag])
-                pn = np.array(ts[lag:])
-                diff = pn - pp
-                tau.append(np.sqrt(np.nanmean(diff**2)))
-
-            if len(tau) > 0 and all(t > 0 for t in tau):
-                poly = np.polyfit(np.log(lags), np.log(tau), 1)
-                return poly[0] * 2.0
-            return 0.5
-
-        # Применяем Hurst для close с окном 50
-        df["hurst_exponent"] = (
-            df["close"].rolling(50).apply(lambda x: hurst_exponent(x) if len(x) == 50 else 0.5)
-        )
+        # Применяем Hurst для close с окном 50 (векторизованно, см. rolling_kernels)
+        df["hurst_exponent"] = rolling_hurst_exponent(df["close"].to_numpy(), window=50)
 
         # 2. Fractal Dimension - сложность ценового движения
         # 1 = прямая линия, 2 = заполняет плоскость
-        def fractal_dimension(ts):
-            """Вычисление фрактальной размерности методом Хигучи"""
-            N = len(ts)
-            if N < 10:
-                return 1.5
-
-            kmax = min(5, N // 2)
-            L = []
-
-            for k in range(1, kmax + 1):
-                Lk = 0
-                for m in range(k):
-                    Lmk = 0
-                    for i in range(1, int((N - m) / k)):
-                        Lmk += abs(ts[m + i * k] - ts[m + (i - 1) * k])
-                    if int((N - m) / k) > 0:
-                        Lmk = Lmk * (N - 1) / (k * int((N - m) / k))
-                    Lk += Lmk
-                L.append(Lk / k)
-
-            if len(L) > 0 and all(l > 0 for l in L):
-                x = np.log(range(1, kmax + 1))
-                y = np.log(L)
-                poly = np.polyfit(x, y, 1)
-                return poly[0]
-            return 1.5
-
-        df["fractal_dimension"] = (
-            df["close"]
-            .rolling(30)
-            .apply(lambda x: fractal_dimension(x.values) if len(x) == 30 else 1.5)
-        )
+        df["fractal_dimension"] = rolling_fractal_dimension(df["close"].to_numpy(), window=30)
 
         # 3. Market Efficiency Ratio - эффективность движения цены
         # Высокие значения = сильный тренд, низкие = боковик
@@ -1431,9 +1394,7 @@ class ProductionFeatureEngineer:
         df["realized_vol_1h"] = returns.rolling(240).std() * np.sqrt(240)
 
         # GARCH-подобная волатильность (упрощенная)
-        df["garch_vol"] = returns.rolling(20).apply(
-            lambda x: np.sqrt(0.94 * x.var() + 0.06 * x.iloc[-1] ** 2) if len(x) > 0 else 0
-        )
+        df["garch_vol"] = rolling_garch_volatility(returns.to_numpy(), window=20)
 
         # Режим волатильности
         atr_q25 = df["atr"].rolling(1000).quantile(0.25)
@@ -1444,16 +1405,7 @@ class ProductionFeatureEngineer:
 
         # 6. Information-theoretic features
         # Энтропия распределения доходностей
-        def shannon_entropy(series, bins=10):
-            """Вычисление энтропии Шеннона"""
-            if len(series) < bins:
-                return 0
-            counts, _ = np.histogram(series, bins=bins)
-            probs = counts / counts.sum()
-            probs = probs[probs > 0]
-            return -np.sum(probs * np.log(probs))
-
-        df["return_entropy"] = returns.rolling(100).apply(lambda x: shannon_entropy(x))
+        df["return_entropy"] = rolling_shannon_entropy(returns.to_numpy(), window=100, bins=10)
 
         # 7. Microstructure features
         # Amihud illiquidity
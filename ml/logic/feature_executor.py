@@ -0,0 +1,322 @@
+"""
+Вынос расчета признаков из event loop
+
+`ProductionFeatureEngineer.create_features` - синхронный CPU-тяжелый код на
+pandas. Вызванный прямо в корутине, он блокирует event loop, который также
+обслуживает исполнение ордеров, WebSocket и циклы TradingEngine.
+
+FeatureExecutor выполняет create_features в одном из бэкендов:
+- inline  - в текущем потоке (прежнее поведение)
+- thread  - в пуле потоков, свой FeatureEngineer на поток
+- process - в пуле процессов; колонки OHLCV передаются через shared memory,
+  в процесс уходит только небольшое описание раскладки
+
+В режиме process признаки нескольких символов считаются параллельно на всех
+ядрах, а event loop остается свободным. Процессы запускаются через spawn
+(или forkserver): fork процесса с запущенными потоками, event loop и CUDA
+небезопасен.
+
+Компоненты одного процесса (MLManager, RealTimeIndicatorCalculator) берут
+исполнитель через FeatureExecutor.shared() и делят один пул; при остановке
+компонент вызывает release(), пул останавливается вместе с последним.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BACKENDS = ("inline", "thread", "process")
+START_METHODS = ("spawn", "forkserver")
+
+# Общие исполнители процесса: (настройки) -> FeatureExecutor
+_shared_executors: dict[tuple, "FeatureExecutor"] = {}
+_shared_lock = threading.Lock()
+
+
+@dataclass
+class SharedFrameSpec:
+    """Раскладка DataFrame в сегменте shared memory"""
+
+    shm_name: str
+    length: int
+    # (имя, dtype, смещение, tz) для числовых и datetime колонок
+    arrays: list[tuple[str, str, int, str | None]] = field(default_factory=list)
+    # Остальные колонки (например symbol) передаются как есть
+    objects: dict[str, list] = field(default_factory=dict)
+    columns: list[str] = field(default_factory=list)
+    index: Any = None
+
+
+def pack_frame(df: pd.DataFrame) -> tuple[shared_memory.SharedMemory, SharedFrameSpec]:
+    """
+    Копирует числовые и datetime колонки DataFrame в новый сегмент shared memory
+
+    Вызывающий код отвечает за close() и unlink() сегмента.
+    """
+    arrays = []
+    objects = {}
+    layout = []
+    offset = 0
+    for name in df.columns:
+        column = df[name]
+        if isinstance(column.dtype, pd.DatetimeTZDtype):
+            values = column.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy("datetime64[ns]")
+            tz = str(column.dt.tz)
+        elif column.dtype.kind in "biufM":
+            values = column.to_numpy()
+            tz = None
+        else:
+            objects[name] = column.tolist()
+            continue
+
+        values = np.ascontiguousarray(values)
+        layout.append((name, values.dtype.str, offset, tz))
+        arrays.append(values)
+        offset += values.nbytes
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (_, _, start, _), values in zip(layout, arrays, strict=True):
+        shm.buf[start : start + values.nbytes] = values.view(np.uint8)
+
+    index = None if isinstance(df.index, pd.RangeIndex) and df.index.start == 0 else df.index
+    spec = SharedFrameSpec(
+        shm_name=shm.name,
+        length=len(df),
+        arrays=layout,
+        objects=objects,
+        columns=list(df.columns),
+        index=index,
+    )
+    return shm, spec
+
+
+def unpack_frame(buffer: memoryview, spec: SharedFrameSpec) -> pd.DataFrame:
+    """Восстанавливает DataFrame из сегмента (данные копируются из shared memory)"""
+    data = {}
+    for name, dtype, offset, tz in spec.arrays:
+        values = np.frombuffer(
+            buffer, dtype=np.dtype(dtype), count=spec.length, offset=offset
+        ).copy()
+        if tz is not None:
+            data[name] = pd.Series(values).dt.tz_localize("UTC").dt.tz_convert(tz)
+        else:
+            data[name] = values
+    data.update(spec.objects)
+
+    df = pd.DataFrame(data, columns=spec.columns)
+    if spec.index is not None:
+        df.index = spec.index
+    return df
+
+
+# Состояние процесса-воркера
+_worker_engineer = None
+
+
+def _init_process_worker(engineer_config: dict | None) -> None:
+    global _worker_engineer
+    from ml.logic.feature_engineering_production import ProductionFeatureEngineer
+
+    _worker_engineer = ProductionFeatureEngineer(engineer_config)
+    _worker_engineer.disable_progress = True
+
+
+def _process_create_features(spec: SharedFrameSpec, use_enhanced_features: bool) -> pd.DataFrame:
+    shm = shared_memory.SharedMemory(name=spec.shm_name)
+    try:
+        df = unpack_frame(shm.buf, spec)
+    finally:
+        shm.close()
+    return _worker_engineer.create_features(df, use_enhanced_features=use_enhanced_features)
+
+
+class FeatureExecutor:
+    """
+    Исполнитель create_features вне event loop
+
+    Args:
+        backend: inline / thread / process
+        max_workers: Размер пула (по умолчанию по числу ядер, не более 8)
+        engineer_config: Конфигурация ProductionFeatureEngineer для пулов
+        start_method: Запуск процессов пула: spawn / forkserver
+    """
+
+    def __init__(
+        self,
+        backend: str = "inline",
+        max_workers: int | None = None,
+        engineer_config: dict | None = None,
+        start_method: str = "spawn",
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Неизвестный бэкенд расчета признаков: {backend}")
+        if start_method not in START_METHODS:
+            raise ValueError(f"Неподдерживаемый способ запуска процессов: {start_method}")
+
+        self.backend = backend
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.engineer_config = engineer_config or {}
+        self.start_method = start_method
+        self._engineer = None
+        self._thread_local = threading.local()
+        self._pool: Executor | None = None
+        self._users = 0
+
+        self._calls = 0
+        self._total_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config: Any, engineer_config: dict | None = None) -> "FeatureExecutor":
+        """Создает исполнитель из секции ml.feature_executor (config может быть Pydantic)"""
+        ml_config = config.get("ml", {}) if isinstance(config, dict) else {}
+        executor_config = ml_config.get("feature_executor", {})
+        return cls(
+            backend=executor_config.get("backend", "inline"),
+            max_workers=executor_config.get("max_workers"),
+            engineer_config=engineer_config,
+            start_method=executor_config.get("start_method", "spawn"),
+        )
+
+    @classmethod
+    def shared(cls, config: Any, engineer_config: dict | None = None) -> "FeatureExecutor":
+        """
+        Общий для процесса исполнитель с настройками из ml.feature_executor
+
+        Компоненты с одинаковыми настройками получают один экземпляр и один пул.
+        Каждый вызов shared() парный с release() при остановке компонента.
+        """
+        executor = cls.from_config(config, engineer_config)
+        key = executor._shared_key()
+        with _shared_lock:
+            shared = _shared_executors.setdefault(key, executor)
+            shared._users += 1
+        return shared
+
+    def release(self) -> None:
+        """Компонент больше не использует общий исполнитель; последний останавливает пул"""
+        with _shared_lock:
+            self._users = max(self._users - 1, 0)
+            if self._users:
+                return
+            key = self._shared_key()
+            if _shared_executors.get(key) is self:
+                del _shared_executors[key]
+        # Без ожидания: release вызывается из stop() компонентов в event loop
+        self.shutdown(wait=False)
+
+    def _shared_key(self) -> tuple:
+        # Признаки зависят только от секции features конфигурации FeatureEngineer
+        features = json.dumps(self.engineer_config.get("features", {}), sort_keys=True, default=str)
+        return (self.backend, self.max_workers, self.start_method, features)
+
+    def _new_engineer(self):
+        from ml.logic.feature_engineering_production import ProductionFeatureEngineer
+
+        engineer = ProductionFeatureEngineer(self.engineer_config)
+        engineer.disable_progress = True
+        return engineer
+
+    def _thread_engineer(self):
+        # FeatureEngineer хранит состояние - у каждого потока свой экземпляр
+        engineer = getattr(self._thread_local, "engineer", None)
+        if engineer is None:
+            engineer = self._new_engineer()
+            self._thread_local.engineer = engineer
+        return engineer
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.backend == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_process_worker,
+                    initargs=(self.engineer_config,),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="features"
+                )
+            logger.info(f"Пул расчета признаков запущен: {self.backend} x{self.max_workers}")
+        return self._pool
+
+    async def create_features(
+        self, df: pd.DataFrame, use_enhanced_features: bool = True, engineer: Any = None
+    ) -> pd.DataFrame:
+        """
+        Рассчитывает признаки в выбранном бэкенде
+
+        Args:
+            df: Подготовленный DataFrame (колонки datetime, symbol, OHLCV)
+            use_enhanced_features: Передается в create_features
+            engineer: FeatureEngineer вызывающего кода для inline режима
+        """
+        start = time.perf_counter()
+        try:
+            if self.backend == "inline":
+                if engineer is None:
+                    if self._engineer is None:
+                        self._engineer = self._new_engineer()
+                    engineer = self._engineer
+                return engineer.create_features(df, use_enhanced_features=use_enhanced_features)
+
+            loop = asyncio.get_running_loop()
+            if self.backend == "thread":
+                return await loop.run_in_executor(
+                    self._get_pool(),
+                    lambda: self._thread_engineer().create_features(
+                        df, use_enhanced_features=use_enhanced_features
+                    ),
+                )
+
+            shm, spec = pack_frame(df)
+            try:
+                return await loop.run_in_executor(
+                    self._get_pool(), _process_create_features, spec, use_enhanced_features
+                )
+            finally:
+                shm.close()
+                shm.unlink()
+        finally:
+            self._calls += 1
+            self._total_seconds += time.perf_counter() - start
+
+    async def create_features_many(
+        self, frames: dict[str, pd.DataFrame], use_enhanced_features: bool = True
+    ) -> dict[str, pd.DataFrame | Exception]:
+        """Параллельный расчет признаков для нескольких символов"""
+        symbols = list(frames)
+        results = await asyncio.gather(
+            *(self.create_features(frames[symbol], use_enhanced_features) for symbol in symbols),
+            return_exceptions=True,
+        )
+        return dict(zip(symbols, results, strict=True))
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "max_workers": self.max_workers if self.backend != "inline" else 1,
+            "users": self._users,
+            "calls": self._calls,
+            "avg_ms": self._total_seconds / self._calls * 1000 if self._calls else 0.0,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Останавливает пул воркеров"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
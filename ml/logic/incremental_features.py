@@ -0,0 +1,664 @@
+"""
+Инкрементальный (потоковый) расчет признаков для ProductionFeatureEngineer
+
+Batch путь (`ProductionFeatureEngineer.create_features`) на каждом тике заново
+считает все признаки по окну из ~480 свечей, хотя изменилась только последняя.
+Здесь для каждого символа хранится скользящее состояние (EMA, скользящие
+суммы/дисперсии, ATR, RSI, VWAP, накопленные объемы, экстремумы окон), которое
+обновляется за O(1) на новую закрытую свечу.
+
+Примитивы повторяют онлайн-алгоритмы pandas (суммирование Кэхэна, Уэлфорд для
+дисперсии, рекурсия ewm(adjust=False)) и `ta`, поэтому при прогреве на том же
+окне свечей значения совпадают с batch путем с точностью до последних бит.
+
+Покрываются только признаки, которые зависят от истории через такие
+состояния (см. `IncrementalFeatureEngine.feature_names`). Признаки на основе
+`rolling(...).apply`, кросс-активные и целевые переменные по-прежнему
+рассчитываются batch путем.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from .feature_engineering_production import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    import pandas as pd
+
+_NAN = float("nan")
+
+
+def _is_nan(value: float) -> bool:
+    return value != value
+
+
+def _safe_div(
+    numerator: float,
+    denominator: float,
+    fill_value: float = 0.0,
+    max_value: float = 1000.0,
+    min_denominator: float = 1e-8,
+) -> float:
+    """Скалярный аналог ProductionFeatureEngineer.safe_divide"""
+    if abs(denominator) < min_denominator:
+        denominator = min_denominator
+    result = numerator / denominator if not _is_nan(denominator) else _NAN
+    if _is_nan(result):
+        return fill_value
+    return min(max(result, -max_value), max_value)
+
+
+class RollingSum:
+    """Скользящая сумма/среднее фиксированного окна (порт roll_sum/roll_mean из pandas)"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values: deque[float] = deque()
+        self._nobs = 0
+        self._neg_ct = 0
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same_count = 0
+        self._prev_value = _NAN
+        self._started = False
+
+    def push(self, value: float) -> None:
+        if not self._started:
+            self._prev_value = value
+            self._started = True
+
+        if len(self._values) == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(value)
+        self._add(value)
+
+    def _add(self, value: float) -> None:
+        if _is_nan(value):
+            return
+        self._nobs += 1
+        y = value - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        if np.signbit(value):
+            self._neg_ct += 1
+        if value == self._prev_value:
+            self._same_count += 1
+        else:
+            self._same_count = 1
+        self._prev_value = value
+
+    def _remove(self, value: float) -> None:
+        if _is_nan(value):
+            return
+        self._nobs -= 1
+        y = -value - self._comp_remove
+        t = self._sum + y
+        self._comp_remove = t - self._sum - y
+        self._sum = t
+        if np.signbit(value):
+            self._neg_ct -= 1
+
+    @property
+    def sum(self) -> float:
+        if self._nobs < self.window:
+            return _NAN
+        if self._same_count >= self._nobs:
+            return self._prev_value * self._nobs
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        if self._nobs < self.window or self._nobs == 0:
+            return _NAN
+        result = self._sum / self._nobs
+        if self._same_count >= self._nobs:
+            return self._prev_value
+        if self._neg_ct == 0 and result < 0:
+            return 0.0
+        if self._neg_ct == self._nobs and result > 0:
+            return 0.0
+        return result
+
+
+class RollingVar:
+    """Скользящая дисперсия фиксированного окна (порт roll_var из pandas)"""
+
+    def __init__(self, window: int, ddof: int = 1):
+        self.window = window
+        self.ddof = ddof
+        self._values: deque[float] = deque()
+        self._nobs = 0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same_count = 0
+        self._prev_value = _NAN
+        self._started = False
+
+    def push(self, value: float) -> None:
+        if not self._started:
+            self._prev_value = value
+            self._started = True
+
+        if len(self._values) == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(value)
+        self._add(value)
+
+    def _add(self, value: float) -> None:
+        if _is_nan(value):
+            return
+        if value == self._prev_value:
+            self._same_count += 1
+        else:
+            self._same_count = 1
+        self._prev_value = value
+        self._nobs += 1
+        prev_mean = self._mean - self._comp_add
+        y = value - self._comp_add
+        t = y - self._mean
+        self._comp_add = t + self._mean - y
+        self._mean = self._mean + t / self._nobs
+        self._ssqdm = self._ssqdm + (value - prev_mean) * (value - self._mean)
+
+    def _remove(self, value: float) -> None:
+        if _is_nan(value):
+            return
+        self._nobs -= 1
+        if self._nobs:
+            prev_mean = self._mean - self._comp_remove
+            y = value - self._comp_remove
+            t = y - self._mean
+            self._comp_remove = t + self._mean - y
+            self._mean = self._mean - t / self._nobs
+            self._ssqdm = self._ssqdm - (value - prev_mean) * (value - self._mean)
+        else:
+            self._mean = 0.0
+            self._ssqdm = 0.0
+
+    @property
+    def var(self) -> float:
+        if self._nobs < self.window or self._nobs <= self.ddof:
+            return _NAN
+        if self._nobs == 1 or self._same_count >= self._nobs:
+            return 0.0
+        return self._ssqdm / (self._nobs - self.ddof)
+
+    @property
+    def std(self) -> float:
+        var = self.var
+        if _is_nan(var):
+            return _NAN
+        return float(np.sqrt(var)) if var >= 0 else 0.0
+
+
+class RollingExtremum:
+    """Скользящий максимум/минимум через монотонную очередь"""
+
+    def __init__(self, window: int, mode: str = "max"):
+        self.window = window
+        self._is_max = mode == "max"
+        self._queue: deque[tuple[int, float]] = deque()
+        self._index = -1
+
+    def push(self, value: float) -> None:
+        self._index += 1
+        queue = self._queue
+        if self._is_max:
+            while queue and queue[-1][1] <= value:
+                queue.pop()
+        else:
+            while queue and queue[-1][1] >= value:
+                queue.pop()
+        queue.append((self._index, value))
+        if queue[0][0] <= self._index - self.window:
+            queue.popleft()
+
+    @property
+    def value(self) -> float:
+        if self._index + 1 < self.window or not self._queue:
+            return _NAN
+        return self._queue[0][1]
+
+
+class EWMState:
+    """Рекурсия Series.ewm(adjust=False).mean() из pandas"""
+
+    def __init__(self, com: float, min_periods: int = 0):
+        alpha = 1.0 / (1.0 + com)
+        self._new_wt = alpha
+        self._old_wt_factor = 1.0 - alpha
+        self._min_periods = max(min_periods, 1)
+        self._weighted = _NAN
+        self._nobs = 0
+
+    @classmethod
+    def from_span(cls, span: float, min_periods: int = 0) -> EWMState:
+        return cls((span - 1) / 2.0, min_periods)
+
+    @classmethod
+    def from_alpha(cls, alpha: float, min_periods: int = 0) -> EWMState:
+        return cls(1.0 / alpha - 1.0, min_periods)
+
+    def push(self, value: float) -> None:
+        is_observation = not _is_nan(value)
+        self._nobs += int(is_observation)
+        if _is_nan(self._weighted):
+            if is_observation:
+                self._weighted = value
+        elif is_observation and self._weighted != value:
+            old_wt = self._old_wt_factor
+            self._weighted = (old_wt * self._weighted + self._new_wt * value) / (
+                old_wt + self._new_wt
+            )
+
+    @property
+    def value(self) -> float:
+        return self._weighted if self._nobs >= self._min_periods else _NAN
+
+
+class WilderATRState:
+    """ATR в семантике ta.volatility.AverageTrueRange"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._seed: list[float] = []
+        self._atr = 0.0
+        self._count = 0
+
+    def push(self, true_range: float) -> None:
+        self._count += 1
+        if self._count < self.window:
+            self._seed.append(true_range)
+        elif self._count == self.window:
+            self._seed.append(true_range)
+            self._atr = float(np.asarray(self._seed, dtype=np.float64).mean())
+            self._seed = []
+        else:
+            self._atr = (self._atr * (self.window - 1) + true_range) / float(self.window)
+
+    @property
+    def value(self) -> float:
+        return self._atr
+
+
+class SymbolFeatureState:
+    """Скользящее состояние признаков одного символа"""
+
+    VOLUME_CUMSUM_HOURS = (4, 8, 12, 24)
+    LEVEL_WINDOWS = (20, 50, 100)
+
+    def __init__(self, periods: dict[str, Any]):
+        self.periods = periods
+        self.last_datetime = None
+        self.features: dict[str, float] = {}
+
+        max_lag = 97  # momentum_24h: pct_change(96)
+        self._closes: deque[float] = deque(maxlen=max_lag)
+        self._momentum_1h: deque[float] = deque(maxlen=5)
+
+        # Базовые признаки
+        self._volume_20 = RollingSum(20)
+        self._turnover_20 = RollingSum(20)
+
+        # Технические индикаторы
+        self._sma = {p: RollingSum(p) for p in periods["sma"]}
+        self._ema = {p: EWMState.from_span(p, min_periods=p) for p in periods["ema"]}
+        rsi_window = periods["rsi"]
+        self._rsi_up = EWMState.from_alpha(1 / rsi_window, min_periods=rsi_window)
+        self._rsi_down = EWMState.from_alpha(1 / rsi_window, min_periods=rsi_window)
+        fast, slow, sign = periods["macd"]
+        self._macd_fast = EWMState.from_span(fast, min_periods=fast)
+        self._macd_slow = EWMState.from_span(slow, min_periods=slow)
+        self._macd_signal = EWMState.from_span(sign, min_periods=sign)
+        bb_window, _ = periods["bb"]
+        self._bb_mean = RollingSum(bb_window)
+        self._bb_var = RollingVar(bb_window, ddof=0)
+        self._atr = WilderATRState(periods["atr"])
+        self._stoch_low = RollingExtremum(14, "min")
+        self._stoch_high = RollingExtremum(14, "max")
+        self._stoch_k = RollingSum(3)
+        self._vwma_pv = RollingSum(20)
+        self._vwma_v = RollingSum(20)
+
+        # Микроструктура
+        self._hl_spread_20 = RollingSum(20)
+        self._directed_volume_10 = RollingSum(10)
+        self._volume_10 = RollingSum(10)
+        self._amihud_20 = RollingSum(20)
+        self._returns_std_10 = RollingVar(10)
+        self._volume_std_10 = RollingVar(10)
+        self._returns_std_96 = RollingVar(96)
+        self._volume_96 = RollingSum(96)
+
+        # Ралли: накопленные объемы, z-score, уровни, сжатие волатильности
+        self._volume_cumsum = {}
+        for hours in self.VOLUME_CUMSUM_HOURS:
+            periods_h = hours * 4
+            self._volume_cumsum[hours] = (RollingSum(periods_h), RollingSum(periods_h * 4))
+        self._volume_std_96 = RollingVar(96)
+        self._levels = {
+            w: (RollingExtremum(w, "max"), RollingExtremum(w, "min")) for w in self.LEVEL_WINDOWS
+        }
+        self._squeeze_ema = EWMState.from_span(20)
+        self._squeeze_prev: int | None = None
+        self._squeeze_duration = 0
+
+    def update(self, candle: Mapping[str, Any]) -> dict[str, float]:
+        """Добавление новой закрытой свечи и расчет признаков для нее"""
+        open_ = float(candle["open"])
+        high = float(candle["high"])
+        low = float(candle["low"])
+        close = float(candle["close"])
+        volume = float(candle["volume"])
+        turnover = float(candle["turnover"])
+
+        closes = self._closes
+        prev_close = closes[-1] if closes else _NAN
+        closes.append(close)
+
+        def close_lag(lag: int) -> float:
+            return closes[-1 - lag] if len(closes) > lag else _NAN
+
+        f: dict[str, float] = {}
+
+        # ===== Базовые признаки =====
+        returns = float(np.log(close / prev_close))
+        f["returns"] = returns
+        for period in (5, 10, 20):
+            f[f"returns_{period}"] = float(np.log(close / close_lag(period)))
+        f["high_low_ratio"] = high / low
+        f["close_open_ratio"] = close / open_
+        f["close_position"] = (close - low) / (high - low + 1e-10)
+
+        self._volume_20.push(volume)
+        self._turnover_20.push(turnover)
+        f["volume_ratio"] = _safe_div(volume, self._volume_20.mean, fill_value=1.0)
+        f["turnover_ratio"] = _safe_div(turnover, self._turnover_20.mean, fill_value=1.0)
+
+        vwap = _safe_div(turnover, volume, fill_value=close)
+        if vwap < close * 0.5 or vwap > close * 2.0:
+            vwap = close
+        f["vwap"] = vwap
+        close_vwap_ratio = min(max(close / vwap, 0.7), 1.3)
+        f["vwap_extreme_deviation"] = int(close_vwap_ratio < 0.85 or close_vwap_ratio > 1.15)
+        if close_vwap_ratio < 0.95 or close_vwap_ratio > 1.05:
+            close_vwap_ratio = 1.0
+        f["close_vwap_ratio"] = close_vwap_ratio
+
+        # ===== Технические индикаторы =====
+        for period, state in self._sma.items():
+            state.push(close)
+            f[f"sma_{period}"] = state.mean
+            f[f"close_sma_{period}_ratio"] = close / state.mean
+
+        for period, state in self._ema.items():
+            state.push(close)
+            f[f"ema_{period}"] = state.value
+            f[f"close_ema_{period}_ratio"] = close / state.value
+
+        diff = close - prev_close
+        self._rsi_up.push(diff if diff > 0 else 0.0)
+        self._rsi_down.push(-diff if diff < 0 else -0.0)
+        ema_up, ema_down = self._rsi_up.value, self._rsi_down.value
+        if ema_down == 0:
+            rsi = 100.0
+        else:
+            with np.errstate(all="ignore"):
+                rsi = float(100 - (100 / (1 + np.float64(ema_up) / ema_down)))
+        f["rsi"] = rsi
+        f["rsi_oversold"] = int(rsi < 30)
+        f["rsi_overbought"] = int(rsi > 70)
+
+        self._macd_fast.push(close)
+        self._macd_slow.push(close)
+        macd = self._macd_fast.value - self._macd_slow.value
+        self._macd_signal.push(macd)
+        macd_signal = self._macd_signal.value
+        f["macd"] = macd / close * 100
+        f["macd_signal"] = macd_signal / close * 100
+        f["macd_diff"] = (macd - macd_signal) / close * 100
+
+        _, bb_dev = self.periods["bb"]
+        self._bb_mean.push(close)
+        self._bb_var.push(close)
+        bb_middle = self._bb_mean.mean
+        bb_std = self._bb_var.std
+        bb_high = bb_middle + bb_dev * bb_std
+        bb_low = bb_middle - bb_dev * bb_std
+        f["bb_high"] = bb_high
+        f["bb_low"] = bb_low
+        f["bb_middle"] = bb_middle
+        bb_width = _safe_div(bb_high - bb_low, close, fill_value=0.02, max_value=0.5)
+        f["bb_width"] = bb_width
+        bb_position = _safe_div(close - bb_low, bb_high - bb_low, fill_value=0.5, max_value=2.0)
+        f["bb_breakout_upper"] = int(bb_position > 1)
+        f["bb_breakout_lower"] = int(bb_position < 0)
+        f["bb_breakout_strength"] = abs(bb_position - 0.5) * 2
+        f["bb_position"] = min(max(bb_position, 0.0), 1.0)
+
+        true_range = high - low
+        if not _is_nan(prev_close):
+            true_range = max(true_range, abs(high - prev_close), abs(low - prev_close))
+        self._atr.push(true_range)
+        atr = self._atr.value
+        f["atr"] = atr
+        f["atr_pct"] = _safe_div(atr, close, fill_value=0.01, max_value=0.2)
+
+        self._stoch_low.push(low)
+        self._stoch_high.push(high)
+        lowest, highest = self._stoch_low.value, self._stoch_high.value
+        with np.errstate(all="ignore"):
+            stoch_k = float(100 * (close - lowest) / np.float64(highest - lowest))
+        self._stoch_k.push(stoch_k)
+        f["stoch_k"] = stoch_k
+        f["stoch_d"] = self._stoch_k.mean
+
+        self._vwma_pv.push(close * volume)
+        self._vwma_v.push(volume)
+        vwma = self._vwma_pv.sum / self._vwma_v.sum
+        f["vwma_20"] = vwma
+        f["close_vwma_ratio"] = close / vwma
+
+        # ===== Микроструктура =====
+        self._hl_spread_20.push(_safe_div(high - low, close, fill_value=0.0))
+        f["hl_spread_ma"] = self._hl_spread_20.mean
+
+        price_direction = float(np.sign(close - open_))
+        f["price_direction"] = price_direction
+        f["directed_volume"] = volume * price_direction
+        self._directed_volume_10.push(volume * price_direction)
+        self._volume_10.push(volume)
+        f["volume_imbalance"] = self._directed_volume_10.sum / self._volume_10.sum
+
+        dollar_volume = volume * close
+        f["dollar_volume"] = dollar_volume
+        abs_returns = abs(returns)
+        price_impact = _safe_div(
+            abs_returns * 100,
+            float(np.log10(dollar_volume + 100)),
+            fill_value=0.0,
+            max_value=0.1,
+        )
+        f["price_impact"] = price_impact
+        f["price_impact_log"] = _safe_div(
+            abs_returns, float(np.log(volume + 10)), fill_value=0.0, max_value=10.0
+        )
+        f["toxicity"] = min(max(float(np.exp(-price_impact * 20)), 0.3), 1.0)
+
+        self._amihud_20.push(_safe_div(abs_returns * 1e6, turnover, max_value=100.0))
+        f["amihud_ma"] = self._amihud_20.mean
+
+        self._returns_std_10.push(returns)
+        self._volume_std_10.push(volume)
+        f["volatility_volume_ratio"] = _safe_div(
+            self._returns_std_10.std, self._volume_std_10.std, fill_value=0.0, max_value=10.0
+        )
+
+        self._returns_std_96.push(returns)
+        realized_vol = self._returns_std_96.std * float(np.sqrt(96))
+        f["realized_vol_daily"] = realized_vol
+        f["realized_vol_annual"] = self._returns_std_96.std * float(np.sqrt(96 * 365))
+        f["realized_vol"] = realized_vol
+
+        self._volume_96.push(volume)
+        volume_mean_96 = self._volume_96.mean
+        f["volume_volatility_ratio"] = _safe_div(
+            volume / (volume_mean_96 + 1), realized_vol * 100, fill_value=1.0, max_value=100.0
+        )
+
+        # ===== Ралли =====
+        for hours, (short, long) in self._volume_cumsum.items():
+            short.push(volume)
+            long.push(volume)
+            f[f"volume_cumsum_{hours}h"] = float(np.log1p(short.sum))
+            f[f"volume_cumsum_{hours}h_ratio"] = _safe_div(
+                short.sum, long.mean * (hours * 4), fill_value=1.0, max_value=10.0
+            )
+
+        self._volume_std_96.push(volume)
+        volume_zscore = _safe_div(
+            volume - volume_mean_96, self._volume_std_96.std, fill_value=0.0, max_value=50.0
+        )
+        f["volume_zscore"] = volume_zscore
+        f["volume_spike"] = int(volume_zscore > 3)
+        f["volume_spike_magnitude"] = min(max(volume_zscore, 0.0), 10.0)
+
+        for window, (local_high, local_low) in self._levels.items():
+            local_high.push(high)
+            local_low.push(low)
+            level_high, level_low = local_high.value, local_low.value
+            f[f"local_high_{window}"] = level_high
+            f[f"local_low_{window}"] = level_low
+            f[f"distance_from_high_{window}"] = (close - level_high) / close
+            f[f"distance_from_low_{window}"] = (close - level_low) / close
+            f[f"position_in_range_{window}"] = _safe_div(
+                close - level_low, level_high - level_low, fill_value=0.5, max_value=1.0
+            )
+
+        self._squeeze_ema.push(close)
+        ema20 = self._squeeze_ema.value
+        kc_width = ((ema20 + 2.0 * atr) - (ema20 - 2.0 * atr)) / close
+        squeeze = int(bb_width < kc_width)
+        if squeeze != self._squeeze_prev:
+            self._squeeze_duration = 0
+        self._squeeze_duration += squeeze
+        self._squeeze_prev = squeeze
+        f["volatility_squeeze"] = squeeze
+        f["volatility_squeeze_duration"] = self._squeeze_duration if squeeze else 0
+
+        momentum_1h = (close / close_lag(4) - 1) * 100
+        self._momentum_1h.append(momentum_1h)
+        f["momentum_1h"] = momentum_1h
+        f["momentum_4h"] = (close / close_lag(16) - 1) * 100
+        f["momentum_24h"] = (close / close_lag(96) - 1) * 100
+        f["momentum_acceleration"] = (
+            momentum_1h - self._momentum_1h[0] if len(self._momentum_1h) == 5 else _NAN
+        )
+
+        self.features = f
+        return f
+
+
+class IncrementalFeatureEngine:
+    """Потоковый движок признаков: отдельное O(1) состояние на каждый символ
+
+    Состояние прогревается один раз на истории (`warm_up`), затем на каждую
+    новую закрытую свечу вызывается `update`. Повторная свеча с тем же или
+    более ранним временем не меняет состояние (возвращаются последние признаки).
+    """
+
+    def __init__(self, config: dict | None = None):
+        self.config = config or {}
+        self.feature_config = self.config.get("features", {})
+        self.logger = get_logger("IncrementalFeatureEngine")
+        self.periods = self._resolve_periods(self.feature_config)
+        self._states: dict[str, SymbolFeatureState] = {}
+
+    @staticmethod
+    def _resolve_periods(feature_config: dict) -> dict[str, Any]:
+        """Периоды индикаторов - та же логика, что в _create_technical_indicators"""
+        tech_config = feature_config.get("technical", [])
+
+        def find(name: str) -> dict:
+            return next((c for c in tech_config if c.get("name") == name), None) or {}
+
+        sma, ema, rsi = find("sma"), find("ema"), find("rsi")
+        macd, bb, atr = find("macd"), find("bollinger_bands"), find("atr")
+        return {
+            "sma": list(sma.get("periods", [5, 10, 20, 50])),
+            "ema": list(ema.get("periods", [10, 20, 50])),
+            "rsi": rsi.get("period", 14),
+            "macd": (macd.get("fast", 12), macd.get("slow", 26), macd.get("signal", 9)),
+            "bb": (bb.get("period", 20), bb.get("std_dev", 2)),
+            "atr": atr.get("period", 14),
+        }
+
+    @property
+    def feature_names(self) -> list[str]:
+        """Имена признаков, которые рассчитываются инкрементально"""
+        state = SymbolFeatureState(self.periods)
+        candle = {"open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0}
+        return list(state.update({**candle, "turnover": 1.0}).keys())
+
+    def warm_up(self, symbol: str, df: pd.DataFrame) -> dict[str, float]:
+        """Инициализация состояния символа по истории свечей"""
+        self._states.pop(symbol, None)
+        ordered = df.sort_values("datetime") if "datetime" in df.columns else df
+        columns = ["open", "high", "low", "close", "volume", "turnover"]
+        values = ordered[columns].to_numpy(dtype=np.float64)
+        datetimes = ordered["datetime"].tolist() if "datetime" in ordered.columns else None
+
+        features: dict[str, float] = {}
+        for i, row in enumerate(values):
+            candle = dict(zip(columns, row, strict=True))
+            if datetimes is not None:
+                candle["datetime"] = datetimes[i]
+            features = self.update(symbol, candle)
+        return features
+
+    def update(self, symbol: str, candle: Mapping[str, Any]) -> dict[str, float]:
+        """Добавление новой закрытой свечи, возвращает строку признаков"""
+        state = self._states.get(symbol)
+        if state is None:
+            state = SymbolFeatureState(self.periods)
+            self._states[symbol] = state
+
+        candle_time = candle.get("datetime")
+        if (
+            candle_time is not None
+            and state.last_datetime is not None
+            and candle_time <= state.last_datetime
+        ):
+            self.logger.debug(f"{symbol}: свеча {candle_time} уже учтена, пропускаем")
+            return state.features
+        state.last_datetime = candle_time
+
+        return state.update(candle)
+
+    def get_last_features(self, symbol: str) -> dict[str, float] | None:
+        state = self._states.get(symbol)
+        return state.features if state else None
+
+    def get_last_datetime(self, symbol: str) -> Any:
+        """Время последней учтенной свечи символа (None - состояния нет)"""
+        state = self._states.get(symbol)
+        return state.last_datetime if state else None
+
+    def reset(self, symbol: str | None = None) -> None:
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop(symbol, None)
+
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self._states
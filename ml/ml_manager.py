@@ -3,6 +3,7 @@
 ML Manager для управления PatchTST моделью в BOT Trading v3
 """
 
+import asyncio
 import os
 import pickle
 from datetime import UTC, datetime
@@ -19,6 +20,7 @@ from core.system.worker_coordinator import worker_coordinator
 from ml.logic.feature_engineering_production import (  # Production версия из обучающего файла
     ProductionFeatureEngineer as FeatureEngineer,
 )
+from ml.logic.feature_executor import FeatureExecutor
 from ml.logic.patchtst_model import create_unified_model
 from ml.logic.signal_quality_analyzer import SignalQualityAnalyzer
 from ml.ml_prediction_logger import ml_prediction_logger
@@ -98,6 +100,9 @@ class MLManager:
         self.model = None
         self.scaler = None
         self.feature_engineer = None
+        # Исполнитель create_features: пул общий с RealTimeIndicatorCalculator,
+        # создается лениво при первом вызове и освобождается в shutdown()
+        self.feature_executor = FeatureExecutor.shared(self.config, engineer_config=self.config)
         
         # Инициализация адаптера если доступен
         self.adapter = None
@@ -350,11 +355,16 @@ class MLManager:
             # Загружаем веса с безопасной обработкой CUDA ошибок
             try:
                 # Пытаемся загрузить на выбранное устройство
-                checkpoint = torch.load(self.model_path, map_location=self.device)
+                # Чтение файла - в потоке, не блокируя запуск остальных компонентов
+                checkpoint = await asyncio.to_thread(
+                    torch.load, self.model_path, map_location=self.device
+                )
             except Exception as cuda_error:
                 # Если ошибка CUDA, принудительно загружаем на CPU
                 logger.warning(f"Ошибка загрузки на {self.device}, используем CPU: {cuda_error}")
-                checkpoint = torch.load(self.model_path, map_location=torch.device("cpu"))
+                checkpoint = await asyncio.to_thread(
+                    torch.load, self.model_path, map_location=torch.device("cpu")
+                )
                 self.device = torch.device("cpu")
 
             self.model.load_state_dict(checkpoint["model_state_dict"])
@@ -509,8 +519,10 @@ class MLManager:
                     input_data = input_data.copy()
                     input_data["symbol"] = "UNKNOWN_SYMBOL"  # Помечаем как неизвестный символ
 
-                # Генерируем признаки - теперь это синхронный вызов
-                features_result = self.feature_engineer.create_features(input_data)
+                # Генерируем признаки вне event loop (бэкенд из ml.feature_executor)
+                features_result = await self.feature_executor.create_features(
+                    input_data, use_enhanced_features=False, engineer=self.feature_engineer
+                )
 
                 # Обрабатываем результат - может быть DataFrame или ndarray
                 if isinstance(features_result, pd.DataFrame):
@@ -803,6 +815,39 @@ class MLManager:
                 logger.warning(f"Ошибка отправки heartbeat при ошибке: {heartbeat_error}")
             raise
 
+    async def predict_batch(
+        self, inputs: dict[str, pd.DataFrame | np.ndarray]
+    ) -> dict[str, Any]:
+        """
+        Делает предсказания для нескольких символов за один вызов модели.
+
+        Args:
+            inputs: Словарь {symbol: признаки (numpy array) или DataFrame с OHLCV}
+
+        Returns:
+            Словарь {symbol: результат в том же формате, что и у predict()}.
+            Символы, для которых предсказание не удалось, отсутствуют.
+        """
+        if not inputs:
+            return {}
+
+        # Адаптер делает один батчевый forward pass
+        if self.use_adapter and self.adapter:
+            results = await self.adapter.predict_batch_raw(inputs)
+            return {
+                symbol: result.to_dict() if hasattr(result, "to_dict") else result
+                for symbol, result in results.items()
+            }
+
+        # Обратная совместимость: поштучные предсказания
+        results = {}
+        for symbol, input_data in inputs.items():
+            try:
+                results[symbol] = await self.predict(input_data, symbol=symbol)
+            except Exception as e:
+                logger.error(f"Error making prediction for {symbol}: {e}")
+        return results
+
     def _interpret_predictions(self, outputs: torch.Tensor) -> dict[str, Any]:
         """
         УЛУЧШЕННАЯ интерпретация выходов модели с анализом качества сигналов.
@@ -1218,3 +1263,9 @@ class MLManager:
             "timeframe_weights": self.quality_analyzer.timeframe_weights.tolist(),
             "quality_weights": self.quality_analyzer.quality_weights,
         }
+
+    def shutdown(self) -> None:
+        """Освобождает общий пул расчета признаков"""
+        if self.feature_executor is not None:
+            self.feature_executor.release()
+            self.feature_executor = None
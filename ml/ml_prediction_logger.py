@@ -6,12 +6,14 @@ import hashlib
 import json
 import time
 from datetime import UTC, datetime
+from types import SimpleNamespace
 from typing import Any
 
 import numpy as np
 import pandas as pd
 
 from core.logger import setup_logger
+from core.logging.log_pipeline import lazy_message
 from database.db_manager import get_db
 from database.repositories.ml_prediction_repository import MLPrediction
 
@@ -193,12 +195,27 @@ class MLPredictionLogger:
 
         # DEBUG: Проверяем, что реально передается
         logger.debug(
-            f"DEBUG predictions content: returns_15m={predictions.get('returns_15m')}, "
-            f"returns_1h={predictions.get('returns_1h')}, "
-            f"returns_4h={predictions.get('returns_4h')}, "
-            f"returns_12h={predictions.get('returns_12h')}"
+            "DEBUG predictions content: "
+            "returns_15m=%s, returns_1h=%s, returns_4h=%s, returns_12h=%s",
+            predictions.get("returns_15m"),
+            predictions.get("returns_1h"),
+            predictions.get("returns_4h"),
+            predictions.get("returns_12h"),
         )
 
+        # Таблица строится в потоке записи логов и только если запись не отброшена.
+        # Запись БД сохраняется асинхронно, поэтому форматируется снимок ее полей
+        snapshot = SimpleNamespace(
+            **{key: value for key, value in vars(record).items() if not key.startswith("_")}
+        )
+        logger.info(lazy_message(self._format_prediction_table, symbol, snapshot))
+
+        # Логируем дополнительную информацию для отладки
+        if predictions.get("debug_info"):
+            logger.debug("Debug info for %s: %s", symbol, predictions["debug_info"])
+
+    def _format_prediction_table(self, symbol: str, record: Any) -> str:
+        """Таблица деталей предсказания для лога"""
         # Собираем всю таблицу в одну строку, чтобы она выводилась целиком
         table_lines = []
         table_lines.append(
@@ -292,12 +309,7 @@ class MLPredictionLogger:
             "╚══════════════════════════════════════════════════════════════════════╝"
         )
 
-        # Выводим всю таблицу одним вызовом logger.info
-        logger.info("\n" + "\n".join(table_lines))
-
-        # Логируем дополнительную информацию для отладки
-        if predictions.get("debug_info"):
-            logger.debug(f"Debug info for {symbol}: {predictions['debug_info']}")
+        return "\n" + "\n".join(table_lines)
 
     async def _save_batch_to_db(self) -> None:
         """Сохраняет батч предсказаний в БД"""
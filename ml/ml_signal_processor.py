@@ -15,12 +15,13 @@ from sqlalchemy import and_, select
 from core.config.config_manager import ConfigManager
 from core.logger import setup_logger
 from data.data_loader import DataLoader
+from data.ohlcv_loader import OHLCVColumnarLoader
 from database.connections import get_async_db  # Uses ORM - correct pattern
 from database.models.base_models import SignalType
-from database.models.market_data import RawMarketData
 from database.models.signal import Signal
 from ml.ml_manager import MLManager
 from ml.realtime_indicator_calculator import RealTimeIndicatorCalculator
+from monitoring.metrics.runtime_profiler import runtime_profiler
 
 # Импорт UnifiedPrediction для поддержки нового формата
 try:
@@ -96,6 +97,8 @@ class MLSignalProcessor:
 
         # Data loader для получения OHLCV
         self.data_loader = None
+        # Колоночная загрузка OHLCV из БД (без ORM)
+        self.ohlcv_loader = OHLCVColumnarLoader()
 
         # Список активных задач
         self._pending_tasks = set()
@@ -1265,18 +1268,62 @@ class MLSignalProcessor:
         try:
             logger.info(f"🔄 Real-time обработка сигнала для {symbol}")
 
-            # 1. Получаем последние OHLCV данные из БД
-            ohlcv_df = await self._fetch_latest_ohlcv(symbol, exchange, lookback_minutes)
-
-            if ohlcv_df is None or len(ohlcv_df) < 96:
-                logger.warning(
-                    f"Недостаточно данных для {symbol}: "
-                    f"{len(ohlcv_df) if ohlcv_df is not None else 0} < 96"
-                )
+            # 1-2. Загружаем данные, считаем индикаторы и ML input
+            prepared = await self._prepare_realtime_input(symbol, exchange, lookback_minutes)
+            if prepared is None:
                 return None
+            features_array, metadata = prepared
+
+            # 3. Получаем предсказание от модели
+            logger.debug("📊 Отправляем на предсказание массив формы: %s", features_array.shape)
+            with runtime_profiler.span("inference"):
+                prediction = await self.ml_manager.predict(
+                    features_array, symbol=symbol
+                )  # Передаем symbol
+            logger.debug("📊 Получили предсказание: %s", type(prediction))
+
+            # 4. Конвертируем предсказание в сигнал
+            with runtime_profiler.span("signal"):
+                return await self._finalize_realtime_signal(symbol, exchange, prediction, metadata)
 
+        except Exception as e:
+            logger.error(f"Ошибка real-time обработки для {symbol}: {e}")
+            self._stats["processing_errors"] += 1
+            return None
+        finally:
+            self._stats["total_signals_processed"] += 1
+
+    async def _prepare_realtime_input(
+        self,
+        symbol: str,
+        exchange: str,
+        lookback_minutes: int,
+        ohlcv_df: pd.DataFrame | None = None,
+    ) -> tuple[np.ndarray, dict[str, Any]] | None:
+        """
+        Загружает OHLCV, сохраняет индикаторы и готовит ML input для символа
+
+        Args:
+            ohlcv_df: OHLCV, загруженные заранее (если их мало - загружаются заново)
+
+        Returns:
+            (features_array, metadata) или None если данных недостаточно
+        """
+        # 1. Получаем последние OHLCV данные из БД
+        if ohlcv_df is None or len(ohlcv_df) < 240:
+            with runtime_profiler.span("fetch"):
+                ohlcv_df = await self._fetch_latest_ohlcv(symbol, exchange, lookback_minutes)
+
+        if ohlcv_df is None or len(ohlcv_df) < 96:
+            logger.warning(
+                f"Недостаточно данных для {symbol}: "
+                f"{len(ohlcv_df) if ohlcv_df is not None else 0} < 96"
+            )
+            return None
+
+        with runtime_profiler.span("features"):
             # 2. Сначала рассчитываем и сохраняем индикаторы в БД
-            indicators = await self.indicator_calculator.calculate_indicators(
+            await self.indicator_calculator.calculate_indicators(
                 symbol=symbol,
                 ohlcv_df=ohlcv_df,
                 save_to_db=True,  # ВКЛЮЧАЕМ сохранение в processed_market_data
@@ -1289,64 +1336,59 @@ class MLSignalProcessor:
                 lookback=96,  # Стандартный lookback для модели
             )
 
-            logger.info(f"📊 Рассчитано {metadata['features_count']} признаков для {symbol}")
+        logger.info(f"📊 Рассчитано {metadata['features_count']} признаков для {symbol}")
+        return features_array, metadata
 
-            # 3. Получаем предсказание от модели
-            logger.info(f"📊 Отправляем на предсказание массив формы: {features_array.shape}")
-            prediction = await self.ml_manager.predict(
-                features_array, symbol=symbol
-            )  # Передаем symbol
-            logger.info(f"📊 Получили предсказание: {type(prediction)}")
+    async def _finalize_realtime_signal(
+        self, symbol: str, exchange: str, prediction: Any, metadata: dict[str, Any]
+    ) -> Signal | None:
+        """
+        Конвертирует предсказание в сигнал, валидирует и сохраняет его
 
-            # 4. Конвертируем предсказание в сигнал
-            signal = await self._convert_predictions_to_signal(
-                symbol=symbol,
-                predictions=prediction,
-                current_price=metadata["last_price"],
-            )
+        Returns:
+            Signal или None если сигнал не сформирован или не прошел валидацию
+        """
+        signal = await self._convert_predictions_to_signal(
+            symbol=symbol,
+            predictions=prediction,
+            current_price=metadata["last_price"],
+        )
 
-            logger.info(f"📊 Результат конвертации в сигнал: {signal is not None}")
+        logger.debug("📊 Результат конвертации в сигнал: %s", signal is not None)
 
-            if signal:
-                # Добавляем дополнительные данные
-                signal.exchange = exchange
-                signal.strategy_name = "PatchTST_RealTime"
+        if signal:
+            # Добавляем дополнительные данные
+            signal.exchange = exchange
+            signal.strategy_name = "PatchTST_RealTime"
 
-                # Валидируем сигнал
-                if await self.validate_signal(signal):
-                    self._stats["valid_signals_generated"] += 1
+            # Валидируем сигнал
+            if await self.validate_signal(signal):
+                self._stats["valid_signals_generated"] += 1
 
-                    # Сохраняем в БД если нужно
-                    if self.config.get("ml", {}).get("save_signals", True):
-                        # Специальное логирование для SHORT
-                        if signal.signal_type == SignalType.SHORT:
-                            logger.warning(f"🔴 Вызываем save_signal для SHORT сигнала {symbol}")
-                        
-                        saved = await self.save_signal(signal)
-                        
-                        if not saved:
-                            if signal.signal_type == SignalType.SHORT:
-                                logger.error(f"❌🔴 SHORT сигнал для {symbol} НЕ БЫЛ сохранен!")
-                            else:
-                                logger.warning(f"❌ Сигнал для {symbol} не был сохранен")
+                # Сохраняем в БД если нужно
+                if self.config.get("ml", {}).get("save_signals", True):
+                    # Специальное логирование для SHORT
+                    if signal.signal_type == SignalType.SHORT:
+                        logger.warning(f"🔴 Вызываем save_signal для SHORT сигнала {symbol}")
 
-                    logger.info(
-                        f"✅ Сгенерирован {signal.signal_type.value} сигнал для {symbol} "
-                        f"с уверенностью {signal.confidence:.2f}"
-                    )
+                    saved = await self.save_signal(signal)
 
-                    return signal
-                else:
-                    logger.debug(f"Сигнал для {symbol} не прошел валидацию")
+                    if not saved:
+                        if signal.signal_type == SignalType.SHORT:
+                            logger.error(f"❌🔴 SHORT сигнал для {symbol} НЕ БЫЛ сохранен!")
+                        else:
+                            logger.warning(f"❌ Сигнал для {symbol} не был сохранен")
 
-            return None
+                logger.info(
+                    f"✅ Сгенерирован {signal.signal_type.value} сигнал для {symbol} "
+                    f"с уверенностью {signal.confidence:.2f}"
+                )
 
-        except Exception as e:
-            logger.error(f"Ошибка real-time обработки для {symbol}: {e}")
-            self._stats["processing_errors"] += 1
-            return None
-        finally:
-            self._stats["total_signals_processed"] += 1
+                return signal
+            else:
+                logger.debug(f"Сигнал для {symbol} не прошел валидацию")
+
+        return None
 
     async def _fetch_latest_ohlcv(
         self, symbol: str, exchange: str, lookback_minutes: int
@@ -1364,72 +1406,49 @@ class MLSignalProcessor:
         """
         try:
             # Сначала пробуем получить из БД
-            end_date = datetime.utcnow()
-            start_date = end_date - timedelta(minutes=lookback_minutes)
+            start_date = datetime.now(UTC) - timedelta(minutes=lookback_minutes)
+
+            df = await self.ohlcv_loader.load(
+                symbol,
+                exchange=exchange,
+                interval_minutes=15,  # 15-минутные свечи
+                start=start_date,
+                add_symbol=True,  # Добавляем symbol для уникальных признаков
+            )
 
-            async with get_async_db() as session:
-                stmt = (
-                    select(RawMarketData)
-                    .where(
-                        and_(
-                            RawMarketData.symbol == symbol,
-                            RawMarketData.exchange == exchange,
-                            RawMarketData.datetime >= start_date,
-                            RawMarketData.interval_minutes == 15,  # 15-минутные свечи
-                        )
-                    )
-                    .order_by(RawMarketData.timestamp)
+            if df is None or len(df) < 240:
+                # Если данных мало - обновляем через data loader
+                logger.info(
+                    f"Обновление данных для {symbol}: в БД только "
+                    f"{len(df) if df is not None else 0} записей"
                 )
 
-                result = await session.execute(stmt)
-                data = result.scalars().all()
-
-                if not data or len(data) < 240:
-                    # Если данных мало - обновляем через data loader
-                    logger.info(f"Обновление данных для {symbol}: в БД только {len(data)} записей")
-
-                    # Обновляем данные
-                    await self.data_loader.update_latest_data(
-                        symbols=[symbol], interval_minutes=15, exchange=exchange
-                    )
-
-                    # Повторно запрашиваем
-                    result = await session.execute(stmt)
-                    data = result.scalars().all()
-
-                if data:
-                    # Добавляем колонку symbol для правильной генерации признаков
-                    df = pd.DataFrame(
-                        [
-                            {
-                                "timestamp": d.timestamp,
-                                "datetime": d.datetime,
-                                "open": float(d.open),
-                                "high": float(d.high),
-                                "low": float(d.low),
-                                "close": float(d.close),
-                                "volume": float(d.volume),
-                                "turnover": float(d.turnover) if d.turnover else 0,
-                                "symbol": symbol,  # Добавляем symbol для уникальных признаков
-                            }
-                            for d in data
-                        ]
-                    )
+                # Обновляем данные
+                await self.data_loader.update_latest_data(
+                    symbols=[symbol], interval_minutes=15, exchange=exchange
+                )
 
-                    df.set_index("datetime", inplace=True)
-                    df = df.sort_index()
+                # Повторно запрашиваем
+                df = await self.ohlcv_loader.load(
+                    symbol,
+                    exchange=exchange,
+                    interval_minutes=15,
+                    start=start_date,
+                    add_symbol=True,
+                )
 
-                    logger.info(f"Загружено {len(df)} свечей для {symbol} с колонкой symbol")
-                    return df
+            if df is not None:
+                logger.info(f"Загружено {len(df)} свечей для {symbol} с колонкой symbol")
+                return df
 
-                return None
+            return None
 
         except Exception as e:
             logger.error(f"Ошибка получения OHLCV для {symbol}: {e}")
             return None
 
     async def generate_signals_for_symbols(
-        self, symbols: list[str], exchange: str = "bybit"
+        self, symbols: list[str], exchange: str = "bybit", max_concurrency: int | None = None
     ) -> list[Signal]:
         """
         Генерирует сигналы для списка символов
@@ -1437,26 +1456,77 @@ class MLSignalProcessor:
         Args:
             symbols: Список символов
             exchange: Биржа
+            max_concurrency: Максимум символов, одновременно готовящих признаки
+                (None - без ограничения)
 
         Returns:
             Список сгенерированных сигналов
         """
         signals = []
 
-        # Параллельная генерация для всех символов
-        tasks = []
-        for symbol in symbols:
-            task = self.process_realtime_signal(symbol, exchange)
-            tasks.append(task)
+        # OHLCV всех символов одним запросом
+        lookback_minutes = 7200
+        try:
+            with runtime_profiler.span("fetch"):
+                preloaded = await self.ohlcv_loader.load_many(
+                    symbols,
+                    exchange=exchange,
+                    interval_minutes=15,
+                    start=datetime.now(UTC) - timedelta(minutes=lookback_minutes),
+                    add_symbol=True,
+                )
+        except Exception as e:
+            logger.error(f"Ошибка пакетной загрузки OHLCV: {e}")
+            preloaded = {}
+
+        # Параллельно готовим признаки для всех символов
+        semaphore = asyncio.Semaphore(max_concurrency or len(symbols) or 1)
 
-        # Ждем завершения всех задач
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def prepare(symbol: str):
+            async with semaphore:
+                return await self._prepare_realtime_input(
+                    symbol, exchange, lookback_minutes, ohlcv_df=preloaded.get(symbol)
+                )
+
+        results = await asyncio.gather(
+            *(prepare(symbol) for symbol in symbols), return_exceptions=True
+        )
 
-        for i, result in enumerate(results):
+        prepared = {}
+        for symbol, result in zip(symbols, results, strict=True):
             if isinstance(result, Exception):
-                logger.error(f"Ошибка генерации для {symbols[i]}: {result}")
+                logger.error(f"Ошибка генерации для {symbol}: {result}")
+                self._stats["processing_errors"] += 1
             elif result is not None:
-                signals.append(result)
+                prepared[symbol] = result
+
+        # Одно батчевое предсказание на все символы
+        predictions = {}
+        if prepared:
+            try:
+                with runtime_profiler.span("inference"):
+                    predictions = await self.ml_manager.predict_batch(
+                        {symbol: features for symbol, (features, _) in prepared.items()}
+                    )
+            except Exception as e:
+                logger.error(f"Ошибка батчевого предсказания: {e}")
+
+        for symbol, (_, metadata) in prepared.items():
+            if symbol not in predictions:
+                self._stats["processing_errors"] += 1
+                continue
+            try:
+                with runtime_profiler.span("signal"):
+                    signal = await self._finalize_realtime_signal(
+                        symbol, exchange, predictions[symbol], metadata
+                    )
+                if signal is not None:
+                    signals.append(signal)
+            except Exception as e:
+                logger.error(f"Ошибка генерации для {symbol}: {e}")
+                self._stats["processing_errors"] += 1
+
+        self._stats["total_signals_processed"] += len(symbols)
 
         logger.info(f"📈 Сгенерировано {len(signals)} сигналов из {len(symbols)} символов")
 
@@ -1475,6 +1545,9 @@ class MLSignalProcessor:
         if self._pending_tasks:
             await asyncio.gather(*self._pending_tasks, return_exceptions=True)
 
+        # Дописываем очередь снимков индикаторов
+        await self.indicator_calculator.shutdown()
+
         # Закрываем data loader
         if self.data_loader:
             await self.data_loader.cleanup()
@@ -1503,4 +1576,5 @@ class MLSignalProcessor:
             "symbols": symbols_in_cache,
             "ttl_seconds": 300,  # Из конфигурации
             "last_cleanup": self.cache_stats.get("last_cleanup", datetime.now(UTC).isoformat()),
+            "feature_cache": self.indicator_calculator.get_cache_stats(),
         }
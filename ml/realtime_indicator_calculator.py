@@ -6,22 +6,59 @@ Real-time расчет технических индикаторов для ML 
 
 import asyncio
 from datetime import UTC, datetime
-from decimal import Decimal
 from typing import Any
 
 import numpy as np
 import pandas as pd
 from production_features_config import REAL_FEATURES_240 as REQUIRED_FEATURES_240
-from sqlalchemy import desc, select
-from sqlalchemy.dialects.postgresql import insert
+from production_features_config import REQUIRED_FEATURES_231
 
 from core.logger import setup_logger
-from database.db_manager import get_db
-from database.models.market_data import ProcessedMarketData, RawMarketData
+from data.processed_data_writer import IndicatorSnapshot, ProcessedDataWriter
+from ml.logic.feature_cache import DEFAULT_MAX_BYTES, FeatureMatrixCache, feature_matrix_key
+from ml.logic.feature_engineering_production import FEATURE_SET_VERSION
 from ml.logic.feature_engineering_production import ProductionFeatureEngineer as FeatureEngineer
+from ml.logic.feature_executor import FeatureExecutor
+from ml.logic.incremental_features import IncrementalFeatureEngine
 
 logger = setup_logger(__name__)
 
+# Количество признаков на входе модели
+MODEL_FEATURE_COUNT = 240
+
+# Служебные колонки результата create_features, не являющиеся признаками
+SERVICE_COLUMNS = (
+    "datetime",
+    "symbol",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "quote_volume",
+    "turnover",
+    "sector",
+)
+
+# Целевые переменные (содержат строки 'UP', 'DOWN', 'FLAT')
+TARGET_PATTERNS = ("direction_", "future_return_", "target_tp_", "target_sl_")
+
+
+def select_model_features(columns: list[str], limit: int | None = MODEL_FEATURE_COUNT) -> list[str]:
+    """
+    Отбирает колонки признаков для модели в порядке create_features
+
+    Args:
+        columns: Колонки результата create_features
+        limit: Максимум признаков (None - без ограничения)
+    """
+    features = [
+        col
+        for col in columns
+        if col not in SERVICE_COLUMNS and not any(pattern in col for pattern in TARGET_PATTERNS)
+    ]
+    return features if limit is None else features[:limit]
+
 
 class RealTimeIndicatorCalculator:
     """
@@ -34,12 +71,19 @@ class RealTimeIndicatorCalculator:
         cache_ttl: int = 900,
         config: dict[str, Any] | None = None,
         use_inference_mode: bool = True,
+        feature_cache: FeatureMatrixCache | None = None,
+        feature_executor: FeatureExecutor | None = None,
+        snapshot_writer: ProcessedDataWriter | None = None,
     ):
         """
         Args:
             cache_ttl: Время жизни кеша в секундах
             config: Конфигурация системы
             use_inference_mode: Использовать ли inference mode для генерации только 231 признаков
+            feature_cache: Общий кеш матриц признаков (по умолчанию создается свой)
+            feature_executor: Исполнитель create_features (по умолчанию из ml.feature_executor)
+            snapshot_writer: Очередь записи в processed_market_data (по умолчанию из
+                ml.snapshot_writer)
         """
         # Передаем inference_mode в конфигурацию FeatureEngineer
         # ProductionFeatureEngineer работает без конфигурации
@@ -54,6 +98,36 @@ class RealTimeIndicatorCalculator:
         self._lock = asyncio.Lock()
         self.use_inference_mode = use_inference_mode
 
+        # config может быть Pydantic-моделью - настройки читаем только из dict
+        ml_config = config.get("ml", {}) if isinstance(config, dict) else {}
+
+        # Кеш результатов create_features, общий для всех точек входа
+        if feature_cache is None:
+            cache_config = ml_config.get("feature_cache", {})
+            feature_cache = FeatureMatrixCache(
+                max_bytes=cache_config.get("max_bytes", DEFAULT_MAX_BYTES),
+                max_entries=cache_config.get("max_entries"),
+            )
+        self.feature_cache = feature_cache
+
+        # Признаки со скользящим состоянием (EMA, RSI, ATR, объемы, уровни) для
+        # последней свечи обновляются за O(1) на свечу, а не берутся из окна
+        self.incremental_engine = None
+        if ml_config.get("incremental_features", {}).get("enabled", True):
+            self.incremental_engine = IncrementalFeatureEngine(engineer_config)
+
+        # Где считать create_features: inline / пул потоков / пул процессов.
+        # По умолчанию пул общий с MLManager и освобождается в shutdown()
+        self._owns_executor = feature_executor is None
+        if feature_executor is None:
+            feature_executor = FeatureExecutor.shared(config, engineer_config=engineer_config)
+        self.feature_executor = feature_executor
+
+        # Снимки индикаторов пишутся в БД в фоне, расчет не ждет БД
+        if snapshot_writer is None:
+            snapshot_writer = ProcessedDataWriter.from_config(config)
+        self.snapshot_writer = snapshot_writer
+
         logger.info(
             f"RealTimeIndicatorCalculator инициализирован (inference_mode={use_inference_mode})"
         )
@@ -89,19 +163,16 @@ class RealTimeIndicatorCalculator:
             # Рассчитываем все признаки через FeatureEngineer
             logger.info(f"Расчет индикаторов для {symbol} в реальном времени...")
 
-            # Подготавливаем DataFrame в нужном формате
-            df = self._prepare_dataframe(ohlcv_df, symbol)
-
-            # Рассчитываем все признаки
-            logger.info(f"About to call create_features for {symbol}")
-            # ProductionFeatureEngineer не принимает inference_mode, но принимает use_enhanced_features
-            features_result = self.feature_engineer.create_features(df, use_enhanced_features=True)
+            # Рассчитываем все признаки (или берем из общего кеша)
+            features_result = await self._compute_features(symbol, ohlcv_df)
             logger.info(
                 f"create_features returned type: {type(features_result)}, shape: {getattr(features_result, 'shape', 'no shape')}"
             )
 
             # Используем точный список признаков из конфигурации
             if isinstance(features_result, pd.DataFrame):
+                # Кешированный DataFrame не модифицируем - ниже добавляются колонки
+                features_result = features_result.copy(deep=False)
                 # Используем ТОЛЬКО признаки из REQUIRED_FEATURES_231
                 available_cols = features_result.columns.tolist()
                 selected_features = []
@@ -160,6 +231,13 @@ class RealTimeIndicatorCalculator:
                 logger.error(f"Неожиданная форма features_array: {features_array.shape}")
                 return {}
 
+            # Признаки со скользящим состоянием - из потокового движка
+            if self.incremental_engine is not None:
+                incremental = self._update_incremental_features(symbol, ohlcv_df)
+                for name, value in incremental.items():
+                    if name in current_features:
+                        current_features[name] = float(value)
+
             # Структурируем результат
             result = self._structure_indicators(current_features, ohlcv_df)
 
@@ -202,24 +280,77 @@ class RealTimeIndicatorCalculator:
         """
         results = {}
 
-        # Параллельный расчет для всех символов
-        tasks = []
-        for symbol in symbols:
-            if symbol in ohlcv_data:
-                task = self.calculate_indicators(symbol, ohlcv_data[symbol])
-                tasks.append((symbol, task))
-
-        # Ждем завершения всех расчетов
-        for symbol, task in tasks:
-            try:
-                result = await task
-                results[symbol] = result
-            except Exception as e:
-                logger.error(f"Ошибка расчета для {symbol}: {e}")
-                results[symbol] = {}
+        # Параллельный расчет для всех символов (признаки считаются в feature_executor)
+        batch_symbols = [symbol for symbol in symbols if symbol in ohlcv_data]
+        batch_results = await asyncio.gather(
+            *(self.calculate_indicators(symbol, ohlcv_data[symbol]) for symbol in batch_symbols),
+            return_exceptions=True,
+        )
+
+        for symbol, result in zip(batch_symbols, batch_results, strict=True):
+            if isinstance(result, Exception):
+                logger.error(f"Ошибка расчета для {symbol}: {result}")
+                result = {}
+            results[symbol] = result
 
         return results
 
+    async def _compute_features(
+        self, symbol: str, ohlcv_df: pd.DataFrame
+    ) -> pd.DataFrame | np.ndarray:
+        """
+        Возвращает результат create_features для OHLCV окна, используя общий кеш
+
+        Результат из кеша возвращается без копирования и не должен изменяться.
+        """
+        cache_key = feature_matrix_key(symbol, ohlcv_df, FEATURE_SET_VERSION)
+        features_result = self.feature_cache.get(cache_key)
+        if features_result is not None:
+            logger.debug(f"Матрица признаков для {symbol} взята из кеша")
+            return features_result
+
+        # Подготавливаем DataFrame в нужном формате
+        df = self._prepare_dataframe(ohlcv_df, symbol)
+
+        # ProductionFeatureEngineer не принимает inference_mode, но принимает use_enhanced_features
+        logger.info(f"About to call create_features for {symbol}")
+        features_result = await self.feature_executor.create_features(
+            df, use_enhanced_features=True, engineer=self.feature_engineer
+        )
+
+        self.feature_cache.put(cache_key, features_result)
+        return features_result
+
+    def _update_incremental_features(self, symbol: str, ohlcv_df: pd.DataFrame) -> dict[str, float]:
+        """
+        Подает в IncrementalFeatureEngine свечи окна, которых он еще не видел
+
+        Первое окно символа (и окно после разрыва в данных) прогревает состояние
+        целиком, дальше каждая новая свеча - одно O(1) обновление.
+        """
+        df = self._prepare_dataframe(ohlcv_df, symbol)
+        engine = self.incremental_engine
+        last_datetime = engine.get_last_datetime(symbol)
+        if last_datetime is None or not (df["datetime"] == last_datetime).any():
+            return engine.warm_up(symbol, df)
+
+        features = engine.get_last_features(symbol)
+        new_candles = df.loc[
+            df["datetime"] > last_datetime,
+            ["datetime", "open", "high", "low", "close", "volume", "turnover"],
+        ]
+        for candle in new_candles.to_dict("records"):
+            features = engine.update(symbol, candle)
+        return features
+
+    def get_cache_stats(self) -> dict[str, Any]:
+        """Статистика кеша матриц признаков"""
+        return self.feature_cache.get_stats()
+
+    def get_executor_stats(self) -> dict[str, Any]:
+        """Статистика исполнителя create_features"""
+        return self.feature_executor.get_stats()
+
     def _prepare_dataframe(self, ohlcv_df: pd.DataFrame, symbol: str = "BTCUSDT") -> pd.DataFrame:
         """
         Подготавливает DataFrame для FeatureEngineer
@@ -321,65 +452,25 @@ class RealTimeIndicatorCalculator:
 
     async def _save_to_database(self, symbol: str, indicators: dict[str, Any]):
         """
-        Сохраняет рассчитанные индикаторы в базу данных
+        Ставит рассчитанные индикаторы в очередь записи в processed_market_data
+
+        Запись и поиск raw_data_id выполняет фоновый flush ProcessedDataWriter.
         """
         try:
-            async with get_async_db() as session:
-                # Получаем последнюю запись из raw_market_data
-                stmt = (
-                    select(RawMarketData)
-                    .where(RawMarketData.symbol == symbol)
-                    .order_by(desc(RawMarketData.timestamp))
-                    .limit(1)
-                )
-
-                result = await session.execute(stmt)
-                raw_data = result.scalar_one_or_none()
-
-                if not raw_data:
-                    logger.warning(f"Не найдены raw данные для {symbol}")
-                    return
-
-                # Подготавливаем данные для сохранения
-                metadata = indicators.get("metadata", {})
-                ohlcv = indicators.get("ohlcv", {})
-
-                processed_data = {
-                    "raw_data_id": raw_data.id,
-                    "symbol": symbol,
-                    "timestamp": metadata.get("timestamp", raw_data.timestamp),
-                    "datetime": metadata.get("datetime", raw_data.datetime),
-                    "open": Decimal(str(ohlcv.get("open", raw_data.open))),
-                    "high": Decimal(str(ohlcv.get("high", raw_data.high))),
-                    "low": Decimal(str(ohlcv.get("low", raw_data.low))),
-                    "close": Decimal(str(ohlcv.get("close", raw_data.close))),
-                    "volume": Decimal(str(ohlcv.get("volume", raw_data.volume))),
-                    "technical_indicators": indicators.get("technical_indicators", {}),
-                    "microstructure_features": indicators.get("microstructure_features", {}),
-                    "ml_features": indicators.get("ml_features", {}),
-                    "processing_version": "2.0",  # Real-time версия
-                    "model_version": "patchtst_v1",
-                }
-
-                # Используем upsert
-                stmt = insert(ProcessedMarketData).values(**processed_data)
-                stmt = stmt.on_conflict_do_update(
-                    constraint="_symbol_timestamp_processed_uc",
-                    set_={
-                        "technical_indicators": stmt.excluded.technical_indicators,
-                        "microstructure_features": stmt.excluded.microstructure_features,
-                        "ml_features": stmt.excluded.ml_features,
-                        "updated_at": datetime.now(UTC),
-                    },
-                )
-
-                await session.execute(stmt)
-                await session.commit()
+            self.snapshot_writer.submit(IndicatorSnapshot.from_indicators(symbol, indicators))
+        except Exception as e:
+            logger.error(f"Ошибка постановки индикаторов {symbol} в очередь записи: {e}")
 
-                logger.debug(f"Сохранены индикаторы для {symbol} в БД")
+    def get_snapshot_writer_stats(self) -> dict[str, Any]:
+        """Статистика очереди записи снимков индикаторов"""
+        return self.snapshot_writer.get_stats()
 
-        except Exception as e:
-            logger.error(f"Ошибка сохранения в БД для {symbol}: {e}")
+    async def shutdown(self) -> None:
+        """Дописывает очередь снимков индикаторов в БД и освобождает пул признаков"""
+        await self.snapshot_writer.stop()
+        if self._owns_executor:
+            self.feature_executor.release()
+            self._owns_executor = False
 
     def _get_from_cache(self, cache_key: str) -> dict[str, Any] | None:
         """Получает данные из кеша если они еще актуальны"""
@@ -456,14 +547,13 @@ class RealTimeIndicatorCalculator:
             # ИСПРАВЛЕНО: Прямой вызов FeatureEngineer без async
             logger.info(f"🚀 get_features_for_ml: Direct feature calculation for {symbol}")
 
-            # Подготавливаем DataFrame
-            df = self._prepare_dataframe(ohlcv_df, symbol)
-
-            # Прямо вызываем create_features (это синхронный метод)
-            features_result = self.feature_engineer.create_features(df, use_enhanced_features=True)
+            # Рассчитываем признаки (или берем из общего кеша)
+            features_result = await self._compute_features(symbol, ohlcv_df)
 
             # Обработка результата - используем точный список признаков
             if isinstance(features_result, pd.DataFrame):
+                # Кешированный DataFrame не модифицируем - ниже добавляются колонки
+                features_result = features_result.copy(deep=False)
                 logger.info(
                     f"🔧 get_features_for_ml: DataFrame shape {features_result.shape}, columns: {len(features_result.columns)}"
                 )
@@ -543,44 +633,20 @@ class RealTimeIndicatorCalculator:
         # FeatureEngineer уже правильно рассчитывает признаки с rolling windows
         logger.info(f"🔄 Расчет признаков для {symbol}, данных: {len(ohlcv_df)}")
 
-        # Подготавливаем DataFrame
-        df = self._prepare_dataframe(ohlcv_df, symbol)
-
-        # Рассчитываем признаки для всего DataFrame
+        # Рассчитываем признаки для всего DataFrame (или берем из общего кеша)
         # FeatureEngineer возвращает массив (n_samples, n_features)
-        # ProductionFeatureEngineer не принимает inference_mode
-        features_result = self.feature_engineer.create_features(df, use_enhanced_features=True)
+        features_result = await self._compute_features(symbol, ohlcv_df)
 
         if isinstance(features_result, pd.DataFrame):
             # ИСПРАВЛЕНО: Используем ВСЕ доступные числовые признаки для ML модели
             available_cols = features_result.columns.tolist()
             logger.info(f"🔧 DataFrame от FeatureEngineer: {len(available_cols)} колонок")
 
-            # Исключаем служебные колонки и целевые переменные
-            exclude_cols = [
-                "datetime",
-                "symbol",
-                "open",
-                "high",
-                "low",
-                "close",
-                "volume",
-                "quote_volume",
-                "turnover",
-                "sector",
-            ]
-
-            # Исключаем целевые переменные (содержат строки 'UP', 'DOWN', 'FLAT')
-            target_patterns = ["direction_", "future_return_", "target_tp_", "target_sl_"]
-            for col in available_cols:
-                if any(pattern in col for pattern in target_patterns):
-                    exclude_cols.append(col)
-
-            # Берем все признаки кроме служебных
-            all_features = [col for col in available_cols if col not in exclude_cols]
+            # Берем все признаки кроме служебных и целевых
+            all_features = select_model_features(available_cols, limit=None)
 
             # ОГРАНИЧИВАЕМ до первых 240 признаков (как в обучении модели)
-            selected_features = all_features[:240]
+            selected_features = all_features[:MODEL_FEATURE_COUNT]
             logger.info(f"🎯 Всего доступно признаков: {len(all_features)}")
             logger.info(f"🎯 Выбрано для ML модели: {len(selected_features)} (ограничено до 240)")
 
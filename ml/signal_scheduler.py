@@ -2,11 +2,20 @@
 """
 Планировщик для генерации ML сигналов каждую минуту
 Координирует работу всех ML компонентов для real-time торговли
+
+Режимы (ml.signal_generation.mode):
+- interval - отдельный цикл на символ раз в interval_seconds;
+- candle_close - один пакет на закрытие свечи: загрузка OHLCV всех готовых
+  символов одним запросом, признаки с ограниченным параллелизмом и одно
+  батчевое предсказание. Пробуждение - по событию закрытия свечи от
+  менеджера данных (attach_data_manager) или, без него, по таймеру.
 """
 
 import asyncio
+import contextlib
 import signal
 import sys
+import time
 from datetime import UTC, datetime
 from typing import Any
 
@@ -14,6 +23,7 @@ from core.config.config_manager import ConfigManager
 from core.logger import setup_logger
 from ml.ml_manager import MLManager
 from ml.ml_signal_processor import MLSignalProcessor
+from monitoring.metrics.runtime_profiler import runtime_profiler
 
 logger = setup_logger(__name__)
 
@@ -40,8 +50,18 @@ class SignalScheduler:
         # Настройки планировщика
         ml_config = self.config.get("ml", {})
         self.symbols = ml_config.get("symbols", ["BTCUSDT"])
+        generation_config = ml_config.get("signal_generation", {})
         # Читаем интервал из конфигурации (по умолчанию 180 секунд = 3 минуты)
-        self.interval_seconds = ml_config.get("signal_generation", {}).get("interval_seconds", 180)
+        self.interval_seconds = generation_config.get("interval_seconds", 180)
+        self.mode = generation_config.get("mode", "interval")
+        # Пакетный режим: длительность свечи, параллелизм признаков,
+        # ожидание данных символов, запас таймера после закрытия свечи и
+        # период повтора для символов, опоздавших со свечой
+        self.candle_seconds = generation_config.get("candle_seconds", 900)
+        self.batch_concurrency = generation_config.get("parallel_workers", 4)
+        self.ready_timeout = generation_config.get("ready_timeout", 20)
+        self.close_grace = generation_config.get("close_grace", 5)
+        self.retry_interval = generation_config.get("retry_interval", 5)
         self.exchange = ml_config.get("default_exchange", "bybit")
         self.enabled = ml_config.get("enabled", True)
 
@@ -52,9 +72,21 @@ class SignalScheduler:
         self._error_counts: dict[str, int] = {}
         self._max_errors = 5  # Максимум ошибок подряд перед отключением символа
 
+        # Пакетный режим
+        self.data_manager = None
+        self._candle_event = asyncio.Event()
+        self._last_batch_candle: int | None = None
+        self._batch_candles: dict[str, int] = {}  # символ -> свеча последнего пакета
+        self._batch_stats = {
+            "batches": 0,
+            "last_batch_symbols": 0,
+            "last_batch_skipped": 0,
+            "last_batch_seconds": 0.0,
+        }
+
         logger.info(
             f"SignalScheduler инициализирован: "
-            f"{len(self.symbols)} символов, интервал {self.interval_seconds}с"
+            f"{len(self.symbols)} символов, режим {self.mode}, интервал {self.interval_seconds}с"
         )
 
     async def initialize(self):
@@ -93,17 +125,22 @@ class SignalScheduler:
         self._running = True
         logger.info("📡 Запуск генерации ML сигналов...")
 
-        # Запускаем задачи для каждого символа
         for symbol in self.symbols:
-            task = asyncio.create_task(self._signal_loop(symbol))
-            self._tasks[symbol] = task
             self._error_counts[symbol] = 0
 
+        if self.mode == "candle_close":
+            # Один пакетный цикл на все символы
+            self._tasks["batch"] = asyncio.create_task(self._candle_close_loop())
+        else:
+            # Запускаем задачи для каждого символа
+            for symbol in self.symbols:
+                self._tasks[symbol] = asyncio.create_task(self._signal_loop(symbol))
+
         # Запускаем мониторинг
         monitor_task = asyncio.create_task(self._monitoring_loop())
         self._tasks["monitor"] = monitor_task
 
-        logger.info(f"✅ Запущено {len(self.symbols)} задач генерации сигналов")
+        logger.info(f"✅ Запущена генерация сигналов для {len(self.symbols)} символов ({self.mode})")
 
     async def stop(self):
         """Остановка планировщика"""
@@ -124,6 +161,8 @@ class SignalScheduler:
         # Завершаем работу компонентов
         if self.signal_processor:
             await self.signal_processor.shutdown()
+        if self.ml_manager:
+            self.ml_manager.shutdown()
 
         logger.info("✅ Signal Scheduler остановлен")
 
@@ -155,7 +194,8 @@ class SignalScheduler:
                 start_time = datetime.now(UTC)
 
                 # Генерируем сигнал
-                signal = await self._generate_signal(symbol)
+                with runtime_profiler.span("scheduler.generate_signal"):
+                    signal = await self._generate_signal(symbol)
 
                 if signal:
                     self._last_signals[symbol] = {
@@ -201,6 +241,169 @@ class SignalScheduler:
                 # Ждем перед повтором
                 await asyncio.sleep(self.interval_seconds)
 
+    def attach_data_manager(self, data_manager) -> None:
+        """
+        Подключает менеджер данных: его уведомления будят пакетный цикл,
+        а кеш свечей определяет, у каких символов закрытая свеча уже есть
+
+        Args:
+            data_manager: SmartDataManager
+        """
+        self.data_manager = data_manager
+        data_manager.register_update_callback(self._on_data_update)
+        logger.info("✅ Менеджер данных подключен к Signal Scheduler")
+
+    def _current_candle(self) -> int:
+        """Начало текущей (формирующейся) свечи, секунды UTC"""
+        return int(time.time()) // self.candle_seconds * self.candle_seconds
+
+    def _pending_symbols(self, candle: int) -> list[str]:
+        """Активные символы, по которым еще не было пакета за свечу candle"""
+        return [
+            symbol
+            for symbol in self.symbols
+            if self._error_counts.get(symbol, 0) < self._max_errors
+            and self._batch_candles.get(symbol) != candle
+        ]
+
+    async def _on_data_update(self) -> None:
+        """Callback менеджера данных: будит пакетный цикл, пока в свече есть ожидающие символы"""
+        if self._pending_symbols(self._current_candle()):
+            self._candle_event.set()
+
+    async def _wait_candle_event(self, delay: float) -> None:
+        """Ждет уведомления менеджера данных не дольше delay секунд"""
+        self._candle_event.clear()
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._candle_event.wait(), timeout=max(delay, 0))
+
+    async def _candle_close_loop(self):
+        """Пакетная генерация сигналов один раз на закрытие свечи"""
+        logger.info(f"Запуск пакетной генерации на закрытии {self.candle_seconds}с свечей")
+
+        while self._running:
+            try:
+                candle = self._current_candle()
+                if not self._pending_symbols(candle):
+                    # Ждем уведомления о закрытии или таймера с запасом
+                    delay = candle + self.candle_seconds + self.close_grace - time.time()
+                    await self._wait_candle_event(delay)
+                    continue
+
+                if not await self._run_batch(candle):
+                    # Опоздавшие символы повторяются в той же свече:
+                    # по уведомлению менеджера данных или через retry_interval
+                    delay = min(self.retry_interval, candle + self.candle_seconds - time.time())
+                    await self._wait_candle_event(delay)
+
+            except asyncio.CancelledError:
+                logger.info("Пакетный цикл генерации отменен")
+                break
+
+            except Exception as e:
+                logger.error(f"Ошибка пакетной генерации сигналов: {e}")
+                await asyncio.sleep(5)
+
+    async def _run_batch(self, candle: int) -> int:
+        """
+        Сигналы по готовым символам за одну закрытую свечу
+
+        Обрабатываются только символы без пакета за эту свечу; опоздавшие
+        остаются ожидающими и попадают в следующий пакет той же свечи.
+
+        Args:
+            candle: Начало свечи, открывшейся после закрытия (секунды UTC)
+
+        Returns:
+            Число символов, попавших в пакет
+        """
+        start = time.perf_counter()
+        symbols = self._pending_symbols(candle)
+        ready = await self._wait_ready(symbols, candle)
+        skipped = len(symbols) - len(ready)
+        if skipped:
+            message = f"Нет закрытой свечи для {skipped} символов, повтор в пределах свечи"
+            if candle != self._last_batch_candle:
+                logger.warning(message)
+            else:
+                logger.debug(message)
+        self._last_batch_candle = candle
+        if not ready:
+            return 0
+
+        # Символ попадает в пакет свечи один раз, даже если пакет завершился ошибкой
+        for symbol in ready:
+            self._batch_candles[symbol] = candle
+
+        try:
+            candle_writer = getattr(self.data_manager, "candle_writer", None)
+            if candle_writer is not None:
+                # Закрытые свечи должны попасть в БД до загрузки OHLCV
+                await candle_writer.flush()
+
+            if not self.signal_processor:
+                raise ValueError("Signal Processor не инициализирован")
+            with runtime_profiler.span("scheduler.generate_batch"):
+                signals = await self.signal_processor.generate_signals_for_symbols(
+                    ready, exchange=self.exchange, max_concurrency=self.batch_concurrency
+                )
+        except Exception as e:
+            logger.error(f"Ошибка пакетной генерации для {len(ready)} символов: {e}")
+            for symbol in ready:
+                self._error_counts[symbol] = self._error_counts.get(symbol, 0) + 1
+                if self._error_counts[symbol] >= self._max_errors:
+                    logger.error(
+                        f"Слишком много ошибок для {symbol} "
+                        f"({self._error_counts[symbol]}), остановка генерации"
+                    )
+            return len(ready)
+
+        for symbol in ready:
+            self._error_counts[symbol] = 0  # Сбрасываем счетчик ошибок
+
+        timestamp = datetime.now(UTC)
+        for generated in signals:
+            self._last_signals[generated.symbol] = {
+                "signal": generated,
+                "timestamp": timestamp,
+                "success": True,
+            }
+            await self._emit_signal_to_trading_engine(generated)
+
+        elapsed = time.perf_counter() - start
+        self._batch_stats["batches"] += 1
+        self._batch_stats["last_batch_symbols"] = len(ready)
+        self._batch_stats["last_batch_skipped"] = skipped
+        self._batch_stats["last_batch_seconds"] = round(elapsed, 3)
+        logger.info(
+            f"📦 Пакет свечи {datetime.fromtimestamp(candle, UTC):%H:%M}: "
+            f"{len(signals)} сигналов из {len(ready)} символов за {elapsed:.2f}с"
+        )
+        return len(ready)
+
+    async def _wait_ready(self, symbols: list[str], candle: int) -> list[str]:
+        """
+        Символы, у которых в кеше менеджера данных уже началась свеча candle
+        (значит, предыдущая закрыта); ждет остальных не дольше ready_timeout
+
+        Без менеджера данных готовыми считаются все символы.
+        """
+        if self.data_manager is None:
+            return symbols
+
+        candle_ns = candle * 1_000_000_000
+        deadline = time.monotonic() + self.ready_timeout
+        while True:
+            views = self.data_manager.cache.get_views()
+            ready = [
+                symbol
+                for symbol in symbols
+                if symbol in views and int(views[symbol]["ts"][-1]) >= candle_ns
+            ]
+            if len(ready) == len(symbols) or time.monotonic() >= deadline:
+                return ready
+            await asyncio.sleep(0.5)
+
     async def _generate_signal(self, symbol: str) -> Any | None:
         """
         Генерация сигнала для символа
@@ -238,7 +441,7 @@ class SignalScheduler:
 
                 # Собираем статистику
                 active_symbols = len(
-                    [s for s in self.symbols if s in self._tasks and not self._tasks[s].done()]
+                    [s for s in self.symbols if self._symbol_active(s)]
                 )
 
                 total_signals = len(self._last_signals)
@@ -275,9 +478,11 @@ class SignalScheduler:
             "running": self._running,
             "enabled": self.enabled,
             "interval_seconds": self.interval_seconds,
+            "mode": self.mode,
+            "batch": self._batch_stats if self.mode == "candle_close" else None,
             "symbols": {
                 symbol: {
-                    "active": symbol in self._tasks and not self._tasks[symbol].done(),
+                    "active": self._symbol_active(symbol),
                     "errors": self._error_counts.get(symbol, 0),
                     "last_signal": self._last_signals.get(symbol, {}),
                 }
@@ -292,6 +497,11 @@ class SignalScheduler:
 
         return status
 
+    def _symbol_active(self, symbol: str) -> bool:
+        """Символ обрабатывается своим циклом или пакетным циклом"""
+        task = self._tasks.get("batch" if self.mode == "candle_close" else symbol)
+        return task is not None and not task.done()
+
     async def add_symbol(self, symbol: str):
         """Добавление нового символа для отслеживания"""
         if symbol in self.symbols:
@@ -301,7 +511,7 @@ class SignalScheduler:
         self.symbols.append(symbol)
         self._error_counts[symbol] = 0
 
-        if self._running:
+        if self._running and self.mode != "candle_close":
             # Запускаем задачу для нового символа
             task = asyncio.create_task(self._signal_loop(symbol))
             self._tasks[symbol] = task
@@ -330,6 +540,7 @@ class SignalScheduler:
         # Очищаем данные
         self._error_counts.pop(symbol, None)
         self._last_signals.pop(symbol, None)
+        self._batch_candles.pop(symbol, None)
 
         logger.info(f"Удален символ {symbol} из отслеживания")
 
@@ -0,0 +1,99 @@
+"""
+Измерение задержки event loop
+
+Фоновая корутина засыпает на interval и замеряет, насколько позже она
+проснулась. Задержка показывает, как долго loop был занят синхронным кодом
+и не мог обслужить другие задачи (ордера, WebSocket, таймеры).
+"""
+
+import asyncio
+import contextlib
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+
+class LoopLagMonitor:
+    """
+    Монитор задержки event loop
+
+    Args:
+        interval: Период замеров (секунды)
+        window: Количество последних замеров для статистики
+        on_sample: Вызывается с каждым замером (секунды), например для гистограммы
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        window: int = 2000,
+        on_sample: Callable[[float], None] | None = None,
+    ):
+        self.interval = interval
+        self.on_sample = on_sample
+        self._samples: deque[float] = deque(maxlen=window)
+        self._max_lag = 0.0
+        self._expected: float | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Просроченное пробуждение тоже задержка - loop мог быть занят до самой остановки
+            if self._expected is not None:
+                lag = asyncio.get_running_loop().time() - self._expected
+                if lag > 0:
+                    self.record(lag)
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            self._expected = None
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - self._expected))
+            self._expected = None
+
+    def record(self, lag: float) -> None:
+        """Добавляет замер задержки (секунды)"""
+        self._samples.append(lag)
+        self._max_lag = max(self._max_lag, lag)
+        if self.on_sample is not None:
+            self.on_sample(lag)
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._max_lag = 0.0
+
+    def get_stats(self) -> dict[str, Any]:
+        """Статистика задержки в миллисекундах"""
+        if not self._samples:
+            return {"samples": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+        samples = np.fromiter(self._samples, dtype=float, count=len(self._samples))
+        return {
+            "samples": len(samples),
+            "mean_ms": float(samples.mean() * 1000),
+            "p99_ms": float(np.percentile(samples, 99) * 1000),
+            "max_ms": self._max_lag * 1000,
+        }
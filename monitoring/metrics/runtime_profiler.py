@@ -0,0 +1,295 @@
+"""
+Профилирование горячих путей event loop
+
+- Задержка event loop (LoopLagMonitor) с гистограммой
+- Тайминги стадий конвейера fetch -> features -> inference -> signal -> order
+- Семплирующий профайлер: фоновый поток периодически снимает стек потока
+  event loop и показывает, какие корутины и функции его занимают
+- Экспорт в текстовом формате Prometheus
+
+Использование:
+    with runtime_profiler.span("features"):
+        features = await calculator.prepare_ml_input(...)
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+from monitoring.metrics.loop_lag import LoopLagMonitor
+
+# Стадии конвейера от данных до ордера
+PIPELINE_STAGES = ("fetch", "features", "inference", "signal", "order")
+
+# Границы бакетов гистограмм (секунды)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = "bot_trading"
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными бакетами (как в Prometheus)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # Последний - +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Кумулятивные счетчики по границам le, включая +Inf"""
+        result = []
+        total = 0
+        bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, self._counts, strict=True):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля линейной интерполяцией внутри бакета (как histogram_quantile)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        lower = 0.0
+        seen = 0
+        # Последний счетчик (+Inf) в интерполяцию не входит
+        for bound, count in zip(self.buckets, self._counts, strict=False):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": self.sum / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.quantile(0.5) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class StackSampler:
+    """
+    Семплирующий профайлер потока event loop
+
+    Фоновый поток каждые interval секунд берет текущий кадр потока через
+    sys._current_frames() и считает свернутые стеки. Ожидание в selector
+    считается простоем loop.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005, max_depth: int = 40):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self._stacks: Counter[str] = Counter()
+        self._functions: Counter[str] = Counter()
+        self._samples = 0
+        self._idle = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.started_at: float | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="loop-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.sample(frame)
+
+    def sample(self, frame) -> None:
+        """Учитывает стек, начиная с кадра frame"""
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+
+        with self._lock:
+            self._samples += 1
+            if names and names[0].startswith("selectors.py:"):
+                self._idle += 1
+                return
+            names.reverse()
+            self._stacks[";".join(names)] += 1
+            self._functions[names[-1]] += 1
+
+    def report(self, top: int = 20) -> dict[str, Any]:
+        with self._lock:
+            samples = self._samples
+            busy = samples - self._idle
+            functions = self._functions.most_common(top)
+            stacks = self._stacks.most_common(top)
+
+        return {
+            "running": self.is_running,
+            "interval_ms": self.interval * 1000,
+            "samples": samples,
+            "busy_percent": busy / samples * 100 if samples else 0.0,
+            "top_functions": [
+                {"function": name, "samples": count, "percent": count / max(busy, 1) * 100}
+                for name, count in functions
+            ],
+            "top_stacks": [
+                {"stack": stack, "samples": count, "percent": count / max(busy, 1) * 100}
+                for stack, count in stacks
+            ],
+        }
+
+
+class RuntimeProfiler:
+    """
+    Точка сбора метрик производительности event loop
+
+    Args:
+        buckets: Границы гистограмм (секунды)
+        lag_interval: Период замера задержки event loop (секунды)
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, lag_interval: float = 0.05):
+        self.buckets = tuple(buckets)
+        self._stages: dict[str, Histogram] = {}
+        self._stages_lock = threading.Lock()
+        self.loop_lag_histogram = Histogram(self.buckets)
+        self.loop_lag = LoopLagMonitor(lag_interval, on_sample=self.loop_lag_histogram.observe)
+        self.sampler: StackSampler | None = None
+        self._loop_thread_id: int | None = None
+
+    # ---------- Стадии ----------
+
+    def _histogram(self, stage: str) -> Histogram:
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            with self._stages_lock:
+                histogram = self._stages.setdefault(stage, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, stage: str, seconds: float) -> None:
+        self._histogram(stage).observe(seconds)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Замеряет длительность блока (включая await внутри) для стадии stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    # ---------- Event loop ----------
+
+    def start_loop_monitor(self) -> None:
+        """Запускает замер задержки; вызывать из потока event loop"""
+        self._loop_thread_id = threading.get_ident()
+        self.loop_lag.start()
+
+    async def stop_loop_monitor(self) -> None:
+        await self.loop_lag.stop()
+        self.stop_sampler()
+
+    def start_sampler(self, interval_ms: float = 5.0) -> None:
+        """Включает семплирующий профайлер потока event loop"""
+        self.stop_sampler()
+        thread_id = self._loop_thread_id or threading.get_ident()
+        self.sampler = StackSampler(thread_id, interval=interval_ms / 1000)
+        self.sampler.start()
+
+    def stop_sampler(self) -> dict[str, Any] | None:
+        """Выключает профайлер и возвращает его отчет"""
+        if self.sampler is None:
+            return None
+        self.sampler.stop()
+        return self.sampler.report()
+
+    def reset(self) -> None:
+        with self._stages_lock:
+            self._stages.clear()
+        self.loop_lag_histogram = Histogram(self.buckets)
+        self.loop_lag.on_sample = self.loop_lag_histogram.observe
+        self.loop_lag.reset()
+
+    # ---------- Экспорт ----------
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "loop_lag": {
+                **self.loop_lag.get_stats(),
+                "running": self.loop_lag.is_running,
+                "histogram": self.loop_lag_histogram.snapshot(),
+            },
+            "stages": {stage: histogram.snapshot() for stage, histogram in self._stages.items()},
+            "sampler": self.sampler.report() if self.sampler is not None else None,
+        }
+
+    def render_prometheus(self) -> str:
+        """Метрики в текстовом формате экспозиции Prometheus"""
+        lines = []
+
+        def histogram_lines(name: str, histogram: Histogram, labels: str = "") -> None:
+            prefix = f"{labels}," if labels else ""
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {histogram.sum:.9g}")
+            lines.append(f"{name}_count{suffix} {histogram.count}")
+
+        lag_name = f"{METRIC_PREFIX}_event_loop_lag_seconds"
+        lines.append(f"# HELP {lag_name} Задержка пробуждения event loop")
+        lines.append(f"# TYPE {lag_name} histogram")
+        histogram_lines(lag_name, self.loop_lag_histogram)
+
+        max_name = f"{METRIC_PREFIX}_event_loop_lag_max_seconds"
+        lines.append(f"# HELP {max_name} Максимальная задержка event loop")
+        lines.append(f"# TYPE {max_name} gauge")
+        lines.append(f"{max_name} {self.loop_lag.get_stats()['max_ms'] / 1000:.9g}")
+
+        stage_name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines.append(f"# HELP {stage_name} Длительность стадий конвейера")
+        lines.append(f"# TYPE {stage_name} histogram")
+        for stage, histogram in sorted(self._stages.items()):
+            histogram_lines(stage_name, histogram, f'stage="{stage}"')
+
+        return "\n".join(lines) + "\n"
+
+
+# Глобальный профайлер
+runtime_profiler = RuntimeProfiler()
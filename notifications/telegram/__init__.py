@@ -2,6 +2,9 @@
 Telegram notification module for BOT Trading v3
 """
 
-from .telegram_service import TelegramNotificationService
+from core.lazy_imports import lazy_exports
+
+# python-telegram-bot загружается при первом обращении к сервису
+__getattr__ = lazy_exports(__name__, {"TelegramNotificationService": ".telegram_service"})
 
 __all__ = ["TelegramNotificationService"]
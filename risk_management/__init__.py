@@ -1,5 +1,6 @@
 """Risk management module"""
 
 from .manager import RiskManager, RiskStatus
+from .portfolio import PortfolioRiskEngine, RiskDecision, RiskLimits
 
-__all__ = ["RiskManager", "RiskStatus"]
+__all__ = ["PortfolioRiskEngine", "RiskDecision", "RiskLimits", "RiskManager", "RiskStatus"]
@@ -4,12 +4,15 @@
 позиций, проверку лимитов и адаптацию к рыночным условиям и ML-сигналам.
 """
 
+import time
 from dataclasses import dataclass
 from decimal import Decimal
 from typing import Any
 
 from core.logger import setup_risk_management_logger
 
+from .portfolio import PortfolioRiskEngine, RiskDecision
+
 
 @dataclass
 class RiskStatus:
@@ -32,6 +35,15 @@ class RiskStatus:
         self.message = message
 
 
+@dataclass
+class _Reservation:
+    """Резерв экспозиции символа сигналом, ордера которого еще не исполнены."""
+
+    previous: float  # экспозиция до сигнала
+    target: float  # экспозиция после исполнения сигнала
+    expires_at: float | None = None  # monotonic; None - ордер еще не создан
+
+
 class RiskManager:
     """Управляет глобальными и локальными торговыми рисками.
 
@@ -53,6 +65,15 @@ class RiskManager:
         self.exchange_registry = exchange_registry
         self.logger = setup_risk_management_logger()
 
+        # Портфельные лимиты: экспозиция, корреляция, VaR/ES, плечо
+        self.portfolio = PortfolioRiskEngine.from_config(config)
+        # Действие при нарушении лимитов портфелем: None, 'pause', 'reduce_positions'
+        self.breach_action = config.get("portfolio", {}).get("breach_action")
+        # Резервы экспозиции сигналов в обработке: symbol -> _Reservation
+        self._reservations: dict[str, _Reservation] = {}
+        # Сколько секунд резерв исполненного сигнала переживает синхронизацию позиций
+        self.reservation_ttl = float(config.get("portfolio", {}).get("reservation_ttl_seconds", 60))
+
         # ... (остальные атрибуты)
 
     def calculate_position_size(
@@ -82,7 +103,126 @@ class RiskManager:
         Returns:
             True, если сигнал проходит проверку рисков, иначе False.
         """
-        # ... (код)
+        decision = self.evaluate_signal(signal)
+        if not decision.approved:
+            self.logger.warning(f"Сигнал {decision.symbol} отклонен: {'; '.join(decision.reasons)}")
+        return decision.approved
+
+    def evaluate_signal(self, signal: dict[str, Any]) -> RiskDecision:
+        """Проверяет сигнал портфельным риск-движком.
+
+        Args:
+            signal: Сигнал с ключами symbol, side и опционально notional
+                (USDT), leverage, risk_profile.
+
+        Returns:
+            RiskDecision с причинами отказа и метриками портфеля после сделки.
+        """
+        return self.portfolio.check_exposure(
+            signal["symbol"], self._target_exposure(signal), signal.get("leverage")
+        )
+
+    def reserve_signal(self, signal: dict[str, Any]) -> RiskDecision:
+        """Проверяет сигнал и сразу резервирует его экспозицию.
+
+        Проверка и резерв выполняются без await, поэтому сигналы, которые
+        обрабатываются параллельно, видят экспозицию друг друга и не могут
+        вместе превысить лимиты. Резерв снимается release_signal (ордер не
+        создан) или подтверждается commit_signal.
+
+        Args:
+            signal: Сигнал в формате check_signal_risk.
+
+        Returns:
+            RiskDecision; при отказе экспозиция не меняется.
+        """
+        decision = self.evaluate_signal(signal)
+        if not decision.approved:
+            self.logger.warning(f"Сигнал {decision.symbol} отклонен: {'; '.join(decision.reasons)}")
+            return decision
+
+        symbol = signal["symbol"]
+        reservation = self._reservations.get(symbol)
+        previous = reservation.previous if reservation else decision.current_exposure
+        self._reservations[symbol] = _Reservation(previous, decision.target_exposure)
+        self.portfolio.set_exposure(symbol, decision.target_exposure)
+        return decision
+
+    def release_signal(self, signal: dict[str, Any]) -> None:
+        """Снимает резерв сигнала, по которому не созданы ордера.
+
+        Args:
+            signal: Сигнал, переданный в reserve_signal.
+        """
+        symbol = signal["symbol"]
+        reservation = self._reservations.pop(symbol, None)
+        if reservation is None or reservation.expires_at is not None:
+            return
+        # Если после резерва экспозицию заменила синхронизация, она уже актуальна
+        if self.portfolio.get_exposure(symbol) == reservation.target:
+            self.portfolio.set_exposure(symbol, reservation.previous)
+
+    def commit_signal(self, signal: dict[str, Any]) -> None:
+        """Учитывает экспозицию принятого сигнала до появления позиции на бирже.
+
+        Резерв сигнала заменяется фактической экспозицией ордера и сохраняется
+        при синхронизациях позиций, пока позиция не появится, но не дольше
+        reservation_ttl секунд.
+
+        Args:
+            signal: Сигнал в формате check_signal_risk.
+        """
+        symbol = signal["symbol"]
+        target = self._target_exposure(signal)
+        reservation = self._reservations.get(symbol)
+        previous = reservation.previous if reservation else self.portfolio.get_exposure(symbol)
+        self._reservations[symbol] = _Reservation(
+            previous, target, time.monotonic() + self.reservation_ttl
+        )
+        self.portfolio.set_exposure(symbol, target)
+
+    def sync_positions(self, positions: list[Any]) -> None:
+        """Заменяет экспозицию позициями биржи, сохраняя резервы сигналов в обработке.
+
+        Args:
+            positions: Позиции биржи (см. PortfolioRiskEngine.sync_positions).
+        """
+        self.portfolio.sync_positions(positions)
+
+        now = time.monotonic()
+        for symbol, reservation in list(self._reservations.items()):
+            if reservation.expires_at is not None:
+                exposure = self.portfolio.get_exposure(symbol)
+                opened = exposure * reservation.target > 0
+                if opened or now >= reservation.expires_at:
+                    # Позиция открыта (или ордер так и не исполнился) - резерв не нужен
+                    del self._reservations[symbol]
+                    continue
+            self.portfolio.set_exposure(symbol, reservation.target)
+
+    def _target_exposure(self, signal: dict[str, Any]) -> float:
+        """Экспозиция символа после исполнения сигнала (USDT, знак - направление).
+
+        Противоположная позиция закрывается перед открытием, поэтому экспозиция
+        символа становится равной размеру новой позиции. Без notional размер
+        оценивается как маржа риск-профиля, умноженная на плечо.
+        """
+        side = str(signal.get("side", "")).lower()
+        if side in ("long", "buy"):
+            sign = 1.0
+        elif side in ("short", "sell"):
+            sign = -1.0
+        else:
+            # close_long / close_short / neutral
+            return 0.0
+
+        notional = signal.get("notional")
+        if notional is None:
+            profiles = self.config.get("risk_profiles", {})
+            profile = profiles.get(signal.get("risk_profile", "standard"), {})
+            leverage = signal.get("leverage") or self.config.get("default_leverage", 5)
+            notional = float(profile.get("max_position_size", 50)) * float(leverage)
+        return sign * abs(float(notional))
 
     async def check_global_risks(self) -> RiskStatus:
         """Проверяет глобальные риски, такие как общий риск портфеля.
@@ -90,6 +230,13 @@ class RiskManager:
         Returns:
             Объект RiskStatus с результатом проверки.
         """
-        # ... (код)
+        breaches = self.portfolio.check_limits()
+        if not breaches:
+            return RiskStatus()
+        return RiskStatus(
+            requires_action=True,
+            action=self.breach_action,
+            message=f"Нарушены лимиты портфеля: {'; '.join(breaches)}",
+        )
 
     # ... (остальные приватные методы)
@@ -0,0 +1,5 @@
+"""Портфельный риск: экспозиция, корреляция, VaR/ES"""
+
+from .risk_engine import PortfolioRiskEngine, RiskDecision, RiskLimits
+
+__all__ = ["PortfolioRiskEngine", "RiskDecision", "RiskLimits"]
@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Портфельный риск-движок: экспозиция, корреляция, VaR/ES и плечо
+
+Экспозиция по символам и скользящее окно доходностей закрытых свечей
+хранятся в NumPy массивах. Суммы и попарные произведения доходностей
+обновляются инкрементально (rank-1 обновление на свечу), ковариация
+пересчитывается один раз на свечу, а Σw - при изменении позиций. Проверка
+сигнала не трогает историю и стоит O(N) по числу символов:
+
+- экспозиция символа, число позиций и плечо портфеля (сумма |экспозиций| / equity);
+- коррелированная экспозиция - позиции, которые движутся вместе с новой
+  (|corr| >= correlation_threshold с учетом знаков);
+- параметрический VaR/ES портфеля: дисперсия после сделки получается из
+  текущей как w'Σw' = wΣw + 2δ(Σw)_i + δ²Σ_ii;
+- плечо ордера.
+
+Сделка, только сокращающая позицию символа, пропускается всегда. Для
+символов с историей короче min_history корреляция считается нулевой,
+а волатильность - default_volatility.
+"""
+
+import math
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field, fields
+from statistics import NormalDist
+from typing import Any
+
+import numpy as np
+
+_LONG_SIDES = ("BUY", "LONG")
+_SHORT_SIDES = ("SELL", "SHORT")
+
+
+def _side_sign(side: Any) -> float:
+    side = str(getattr(side, "value", side)).upper()
+    if side in _LONG_SIDES:
+        return 1.0
+    if side in _SHORT_SIDES:
+        return -1.0
+    return 0.0
+
+
+def _position_price(position: Any) -> float:
+    """Цена оценки позиции: mark_price, current_price или entry_price"""
+    for name in ("mark_price", "current_price", "entry_price"):
+        value = getattr(position, name, None)
+        if value is not None and float(value) > 0:
+            return float(value)
+    return 0.0
+
+
+@dataclass
+class RiskLimits:
+    """Лимиты портфельного риска (доли от equity, если не указано иное)"""
+
+    max_symbol_exposure: float = 1.0  # |экспозиция символа| / equity
+    max_portfolio_leverage: float = 3.0  # сумма |экспозиций| / equity
+    max_correlated_exposure: float = 2.0  # коррелированная экспозиция / equity
+    correlation_threshold: float = 0.7
+    max_var: float = 0.10  # VaR портфеля / equity
+    max_es: float = 0.12  # Expected Shortfall портфеля / equity
+    max_order_leverage: float = 20.0  # плечо ордера
+    max_positions: int = 10
+
+    @classmethod
+    def from_config(cls, settings: Mapping[str, Any]) -> "RiskLimits":
+        names = {item.name for item in fields(cls)}
+        return cls(**{key: value for key, value in settings.items() if key in names})
+
+
+@dataclass
+class RiskDecision:
+    """Результат проверки сигнала (экспозиции в USDT, знак - направление)"""
+
+    approved: bool
+    symbol: str
+    current_exposure: float
+    target_exposure: float
+    reasons: list[str] = field(default_factory=list)
+    gross_exposure: float = 0.0
+    portfolio_leverage: float = 0.0
+    correlated_exposure: float = 0.0
+    var: float = 0.0
+    es: float = 0.0
+
+
+class PortfolioRiskEngine:
+    """
+    Проверка сигналов против портфельных лимитов
+
+    Args:
+        limits: Лимиты риска
+        equity: Капитал, от которого считаются лимиты (USDT)
+        window: Окно доходностей (свечей)
+        min_history: Минимум доходностей символа в окне для корреляции и VaR
+        confidence: Уровень VaR/ES
+        horizon: Горизонт VaR/ES (свечей)
+        default_volatility: Волатильность доходности за свечу для символов без истории
+    """
+
+    def __init__(
+        self,
+        limits: RiskLimits | None = None,
+        equity: float = 500.0,
+        window: int = 480,
+        min_history: int = 96,
+        confidence: float = 0.99,
+        horizon: int = 4,
+        default_volatility: float = 0.01,
+    ):
+        if window < 2:
+            raise ValueError(f"window должно быть не меньше 2: {window}")
+        self.limits = limits or RiskLimits()
+        self.equity = float(equity)
+        self.window = window
+        self.min_history = min(min_history, window)
+        self.default_volatility = default_volatility
+
+        z = NormalDist().inv_cdf(confidence)
+        self._var_scale = z * math.sqrt(horizon)
+        self._es_scale = NormalDist().pdf(z) / (1 - confidence) * math.sqrt(horizon)
+
+        self._index: dict[str, int] = {}
+        self._symbols: list[str] = []
+        self._capacity = 0
+        self._allocate(16)
+
+        # Окно доходностей - кольцо строк (одна строка на закрытую свечу)
+        self._slot = 0
+        self._rows = 0
+        self._rows_since_rebuild = 0
+        self._last_ts: int | None = None
+
+        # Агрегаты текущего портфеля
+        self._gross = 0.0
+        self._positions = 0
+        self._portfolio_variance = 0.0
+
+        self.stats = {
+            "bars": 0,
+            "checks": 0,
+            "rejected": 0,
+            "check_time_total": 0.0,
+            "max_check_us": 0.0,
+        }
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "PortfolioRiskEngine":
+        """Движок из секции risk_management (параметры - в risk_management.portfolio)"""
+        settings = config.get("portfolio", {})
+        limits = {
+            "max_positions": config.get("max_positions", RiskLimits.max_positions),
+            "max_order_leverage": config.get("max_leverage", RiskLimits.max_order_leverage),
+            **settings.get("limits", {}),
+        }
+        return cls(
+            limits=RiskLimits.from_config(limits),
+            equity=float(settings.get("equity", config.get("fixed_risk_balance", 500))),
+            window=int(settings.get("window", 480)),
+            min_history=int(settings.get("min_history", 96)),
+            confidence=float(settings.get("confidence", 0.99)),
+            horizon=int(settings.get("horizon", 4)),
+            default_volatility=float(settings.get("default_volatility", 0.01)),
+        )
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._symbols)
+
+    def _allocate(self, capacity: int) -> None:
+        """Выделяет (или расширяет) массивы под capacity символов"""
+        old = self._capacity
+        arrays = {
+            "_exposure": np.zeros(capacity),
+            "_last_close": np.full(capacity, np.nan),
+            "_sum": np.zeros(capacity),
+            "_observed": np.zeros(capacity, dtype=np.int64),
+            "_std": np.zeros(capacity),
+            "_cov_w": np.zeros(capacity),
+            "_cross": np.zeros((capacity, capacity)),
+            "_cov": np.zeros((capacity, capacity)),
+            "_returns": np.zeros((self.window, capacity)),
+            "_has_return": np.zeros((self.window, capacity), dtype=bool),
+        }
+        for name, array in arrays.items():
+            if old:
+                previous = getattr(self, name)
+                if name in ("_cross", "_cov"):
+                    array[:old, :old] = previous
+                else:
+                    array[..., :old] = previous
+            setattr(self, name, array)
+        self._capacity = capacity
+
+    def _ensure(self, symbol: str) -> int:
+        """Индекс символа (новый символ добавляется с нулевой экспозицией)"""
+        index = self._index.get(symbol)
+        if index is not None:
+            return index
+        index = len(self._symbols)
+        if index == self._capacity:
+            self._allocate(2 * self._capacity)
+        self._index[symbol] = index
+        self._symbols.append(symbol)
+        # Символ без истории: корреляция нулевая, волатильность по умолчанию
+        self._cov[index, index] = self.default_volatility**2
+        self._std[index] = self.default_volatility
+        return index
+
+    # Доходности
+
+    def update_bar(self, ts: int, closes: Mapping[str, float]) -> bool:
+        """
+        Добавляет закрытую свечу
+
+        Args:
+            ts: Время свечи (должно расти)
+            closes: Цены закрытия символов; отсутствующие символы получают
+                нулевую доходность, их следующая доходность охватит пропуск
+
+        Returns:
+            False если свеча не новее последней добавленной
+        """
+        if self._last_ts is not None and ts <= self._last_ts:
+            return False
+        self._push_bar(ts, closes)
+        self._refresh_covariance()
+        return True
+
+    def update_from_views(self, views: Mapping[str, np.ndarray | None]) -> int:
+        """
+        Добавляет новые закрытые свечи из кеша
+
+        Args:
+            views: Структурированные массивы OHLCVRingBuffer (ts, close, ...) по
+                символам; последняя свеча каждого массива считается незакрытой
+
+        Returns:
+            Количество добавленных свечей
+        """
+        closed = {
+            symbol: view[:-1]
+            for symbol, view in views.items()
+            if view is not None and len(view) > 1
+        }
+        if not closed:
+            return 0
+
+        stamps = np.unique(np.concatenate([view["ts"] for view in closed.values()]))
+        if self._last_ts is not None:
+            stamps = stamps[stamps > self._last_ts]
+        # Больше window + 1 свечей не влияют на окно
+        stamps = stamps[-(self.window + 1) :]
+        if not stamps.size:
+            return 0
+
+        columns = []
+        for symbol, view in closed.items():
+            ts = view["ts"]
+            positions = np.minimum(np.searchsorted(ts, stamps), len(ts) - 1)
+            columns.append((symbol, view["close"][positions], ts[positions] == stamps))
+
+        for j, ts in enumerate(stamps):
+            self._push_bar(
+                int(ts),
+                {symbol: float(close[j]) for symbol, close, found in columns if found[j]},
+            )
+        self._refresh_covariance()
+        return int(stamps.size)
+
+    def _push_bar(self, ts: int, closes: Mapping[str, float]) -> None:
+        indices = [(self._ensure(symbol), close) for symbol, close in closes.items()]
+        k = len(self._symbols)
+        row = np.zeros(k)
+        has_return = np.zeros(k, dtype=bool)
+        for index, close in indices:
+            if not close > 0:
+                continue
+            previous = self._last_close[index]
+            if previous > 0:
+                row[index] = math.log(close / previous)
+                has_return[index] = True
+            self._last_close[index] = close
+
+        self._last_ts = ts
+        if not has_return.any():
+            # Первая свеча символов - только цены закрытия
+            return
+
+        slot = self._slot
+        if self._rows == self.window:
+            old = self._returns[slot, :k]
+            self._sum[:k] -= old
+            self._cross[:k, :k] -= np.outer(old, old)
+            self._observed[:k] -= self._has_return[slot, :k]
+        else:
+            self._rows += 1
+
+        self._returns[slot, :k] = row
+        self._has_return[slot, :k] = has_return
+        self._sum[:k] += row
+        self._cross[:k, :k] += np.outer(row, row)
+        self._observed[:k] += has_return
+        self._slot = (slot + 1) % self.window
+        self.stats["bars"] += 1
+
+        # Периодический точный пересчет убирает накопленную ошибку округления
+        self._rows_since_rebuild += 1
+        if self._rows_since_rebuild >= self.window:
+            returns = self._returns[: self._rows, :k]
+            self._sum[:k] = returns.sum(axis=0)
+            self._cross[:k, :k] = returns.T @ returns
+            self._rows_since_rebuild = 0
+
+    def _refresh_covariance(self) -> None:
+        """Ковариация окна доходностей и производные величины портфеля"""
+        k = len(self._symbols)
+        n = self._rows
+        if n >= 2:
+            total = self._sum[:k]
+            cov = (self._cross[:k, :k] - np.outer(total, total) / n) / (n - 1)
+        else:
+            cov = np.zeros((k, k))
+
+        unknown = np.flatnonzero(self._observed[:k] < self.min_history)
+        cov[unknown, :] = 0.0
+        cov[:, unknown] = 0.0
+        cov[unknown, unknown] = self.default_volatility**2
+
+        self._cov[:k, :k] = cov
+        self._std[:k] = np.sqrt(np.maximum(np.diag(cov), 0.0))
+        self._refresh_exposure()
+
+    def covariance(self) -> np.ndarray:
+        """Ковариация доходностей за свечу (порядок - symbols)"""
+        k = len(self._symbols)
+        return self._cov[:k, :k].copy()
+
+    def correlation(self) -> np.ndarray:
+        """Корреляция доходностей (порядок - symbols)"""
+        k = len(self._symbols)
+        std = self._std[:k]
+        scale = np.outer(std, std)
+        return np.divide(self._cov[:k, :k], scale, out=np.zeros((k, k)), where=scale > 0)
+
+    # Позиции
+
+    def sync_positions(self, positions: Iterable[Any]) -> None:
+        """
+        Заменяет экспозицию текущими позициями
+
+        Позиция - объект с symbol, side, size и ценой (mark_price,
+        current_price или entry_price), например Position биржи или
+        TrackedPosition. Экспозиция, записанная set_exposure, заменяется.
+        """
+        totals: dict[str, float] = {}
+        for position in positions:
+            size = float(position.size)
+            if not size:
+                continue
+            sign = _side_sign(position.side) or math.copysign(1.0, size)
+            value = sign * abs(size) * _position_price(position)
+            totals[position.symbol] = totals.get(position.symbol, 0.0) + value
+
+        indices = {self._ensure(symbol): value for symbol, value in totals.items()}
+        self._exposure[:] = 0.0
+        for index, value in indices.items():
+            self._exposure[index] = value
+        self._refresh_exposure()
+
+    def set_exposure(self, symbol: str, exposure: float) -> None:
+        """Устанавливает экспозицию символа (USDT, знак - направление)"""
+        index = self._ensure(symbol)
+        current = self._exposure[index]
+        delta = exposure - current
+        if not delta:
+            return
+        k = len(self._symbols)
+        self._portfolio_variance = max(
+            self._portfolio_variance
+            + 2 * delta * self._cov_w[index]
+            + delta * delta * self._cov[index, index],
+            0.0,
+        )
+        self._cov_w[:k] += self._cov[:k, index] * delta
+        self._gross += abs(exposure) - abs(current)
+        self._positions += int(exposure != 0) - int(current != 0)
+        self._exposure[index] = exposure
+
+    def get_exposure(self, symbol: str) -> float:
+        index = self._index.get(symbol)
+        return float(self._exposure[index]) if index is not None else 0.0
+
+    def _refresh_exposure(self) -> None:
+        k = len(self._symbols)
+        exposure = self._exposure[:k]
+        self._cov_w[:k] = self._cov[:k, :k] @ exposure
+        self._portfolio_variance = max(float(exposure @ self._cov_w[:k]), 0.0)
+        self._gross = float(np.abs(exposure).sum())
+        self._positions = int(np.count_nonzero(exposure))
+
+    # Проверки
+
+    def check_exposure(
+        self, symbol: str, target: float, leverage: float | None = None
+    ) -> RiskDecision:
+        """
+        Проверяет переход экспозиции символа к target
+
+        Args:
+            symbol: Символ
+            target: Экспозиция символа после сделки (USDT, знак - направление)
+            leverage: Плечо ордера
+
+        Returns:
+            RiskDecision с причинами отказа и метриками портфеля после сделки
+        """
+        start = time.perf_counter()
+        limits = self.limits
+        equity = self.equity
+        index = self._index.get(symbol)
+
+        if index is None:
+            current = 0.0
+            own_variance = self.default_volatility**2
+            cross = 0.0
+        else:
+            current = float(self._exposure[index])
+            own_variance = self._cov[index, index]
+            cross = self._cov_w[index]
+
+        delta = target - current
+        variance = max(
+            self._portfolio_variance + 2 * delta * cross + delta * delta * own_variance, 0.0
+        )
+        sigma = math.sqrt(variance)
+        gross = self._gross - abs(current) + abs(target)
+        positions = self._positions - int(current != 0) + int(target != 0)
+
+        decision = RiskDecision(
+            approved=True,
+            symbol=symbol,
+            current_exposure=current,
+            target_exposure=target,
+            gross_exposure=gross,
+            portfolio_leverage=gross / equity if equity > 0 else math.inf,
+            correlated_exposure=self._correlated_exposure(index, target),
+            var=self._var_scale * sigma,
+            es=self._es_scale * sigma,
+        )
+
+        # Сокращение позиции символа риск не увеличивает
+        if not (target * current >= 0 and abs(target) <= abs(current)):
+            reasons = decision.reasons
+            if leverage is not None and leverage > limits.max_order_leverage:
+                reasons.append(f"плечо ордера {leverage:g} > {limits.max_order_leverage:g}")
+            if abs(target) > limits.max_symbol_exposure * equity:
+                reasons.append(
+                    f"экспозиция {symbol} {abs(target):.2f} > "
+                    f"{limits.max_symbol_exposure * equity:.2f}"
+                )
+            if decision.portfolio_leverage > limits.max_portfolio_leverage:
+                reasons.append(
+                    f"плечо портфеля {decision.portfolio_leverage:.2f} > "
+                    f"{limits.max_portfolio_leverage:g}"
+                )
+            if positions > limits.max_positions:
+                reasons.append(f"позиций {positions} > {limits.max_positions}")
+            if decision.correlated_exposure > limits.max_correlated_exposure * equity:
+                reasons.append(
+                    f"коррелированная экспозиция {decision.correlated_exposure:.2f} > "
+                    f"{limits.max_correlated_exposure * equity:.2f}"
+                )
+            if decision.var > limits.max_var * equity:
+                reasons.append(f"VaR {decision.var:.2f} > {limits.max_var * equity:.2f}")
+            if decision.es > limits.max_es * equity:
+                reasons.append(f"ES {decision.es:.2f} > {limits.max_es * equity:.2f}")
+            decision.approved = not reasons
+
+        elapsed = time.perf_counter() - start
+        self.stats["checks"] += 1
+        self.stats["rejected"] += not decision.approved
+        self.stats["check_time_total"] += elapsed
+        self.stats["max_check_us"] = max(self.stats["max_check_us"], elapsed * 1e6)
+        return decision
+
+    def _correlated_exposure(self, index: int | None, target: float) -> float:
+        """
+        Экспозиция, движущаяся вместе с target: сама позиция плюс позиции
+        других символов с |corr| >= порога, чей знак с учетом корреляции
+        совпадает с направлением target
+        """
+        if not target:
+            return 0.0
+        if index is None:
+            return abs(target)
+        k = len(self._symbols)
+        std = self._std[:k]
+        scale = std * std[index]
+        corr = np.divide(self._cov[index, :k], scale, out=np.zeros(k), where=scale > 0)
+        aligned = math.copysign(1.0, target) * np.sign(corr) * self._exposure[:k]
+        mask = (np.abs(corr) >= self.limits.correlation_threshold) & (aligned > 0)
+        mask[index] = False
+        return abs(target) + float(aligned[mask].sum())
+
+    def check_limits(self) -> list[str]:
+        """Нарушения лимитов текущим портфелем (без новых сделок)"""
+        limits = self.limits
+        equity = self.equity
+        state = self.get_state()
+        breaches = []
+        if state["portfolio_leverage"] > limits.max_portfolio_leverage:
+            breaches.append(
+                f"плечо портфеля {state['portfolio_leverage']:.2f} > "
+                f"{limits.max_portfolio_leverage:g}"
+            )
+        if state["positions"] > limits.max_positions:
+            breaches.append(f"позиций {state['positions']} > {limits.max_positions}")
+        if state["var"] > limits.max_var * equity:
+            breaches.append(f"VaR {state['var']:.2f} > {limits.max_var * equity:.2f}")
+        if state["es"] > limits.max_es * equity:
+            breaches.append(f"ES {state['es']:.2f} > {limits.max_es * equity:.2f}")
+        return breaches
+
+    def get_state(self) -> dict[str, Any]:
+        """Текущие метрики портфеля"""
+        sigma = math.sqrt(self._portfolio_variance)
+        return {
+            "equity": self.equity,
+            "gross_exposure": self._gross,
+            "portfolio_leverage": self._gross / self.equity if self.equity > 0 else math.inf,
+            "positions": self._positions,
+            "var": self._var_scale * sigma,
+            "es": self._es_scale * sigma,
+        }
+
+    def get_stats(self) -> dict[str, Any]:
+        """Метрики движка и портфеля"""
+        checks = self.stats["checks"]
+        return {
+            **self.get_state(),
+            "symbols": len(self._symbols),
+            "window_rows": self._rows,
+            "bars": self.stats["bars"],
+            "checks": checks,
+            "rejected": self.stats["rejected"],
+            "avg_check_us": (
+                round(self.stats["check_time_total"] / checks * 1e6, 2) if checks else 0.0
+            ),
+            "max_check_us": round(self.stats["max_check_us"], 2),
+        }
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Перебор параметров фильтрации сигналов и SL/TP на истории raw_market_data
+
+Признаки и инференс выполняются один раз на символ, выходы модели
+сохраняются в --cache (ModelHistory .npz) и переиспользуются следующими
+запусками. Имя файла кеша содержит символ, период и отпечаток чекпоинта
+модели, scaler и конфигурации признаков - после переобучения модели или
+смены периода кеш не переиспользуется. Пространство перебора и walk-forward - секция backtesting.sweep
+в config.yaml.
+
+Пример:
+    python scripts/run_parameter_sweep.py --symbols BTCUSDT ETHUSDT \\
+        --start 2024-01-01 --end 2025-01-01 --output data/sweeps/2024.parquet
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backtesting import BacktestEngine, ModelHistory, ParameterSweep, SweepSettings
+from ml.adapters.factory import ModelAdapterFactory
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Перебор параметров бэктеста с walk-forward")
+    parser.add_argument("--symbols", nargs="+", required=True)
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=Path("data/backtest_cache"),
+        help="Каталог выходов модели (файлы по символу, периоду и версии модели)",
+    )
+    parser.add_argument("--output", type=Path, default=Path("data/sweeps/results.parquet"))
+    parser.add_argument("--samples", type=int, help="Случайная выборка вместо полной сетки")
+    parser.add_argument("--workers", type=int, help="Процессов (по умолчанию по числу ядер)")
+    return parser.parse_args()
+
+
+def model_fingerprint(config: dict) -> str:
+    """Отпечаток чекпоинта модели, scaler и конфигурации признаков"""
+    digest = hashlib.sha256()
+    adapter = ModelAdapterFactory.create_from_config(config)
+    if adapter is not None:
+        for path in (adapter.model_path, adapter.scaler_path):
+            if path.exists():
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+            else:
+                digest.update(str(path).encode())
+        features = adapter.config.get("features", {})
+    else:
+        features = config.get("features", {})
+    interval = config.get("backtesting", {}).get("interval_minutes")
+    digest.update(json.dumps([features, interval], sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+def cache_path(args: argparse.Namespace, symbol: str, fingerprint: str) -> Path:
+    """Файл выходов модели для символа, периода --start/--end и версии модели"""
+    start = args.start.strftime("%Y%m%d%H%M") if args.start else "begin"
+    end = args.end.strftime("%Y%m%d%H%M") if args.end else "now"
+    return args.cache / f"{symbol}_{start}_{end}_{fingerprint}.npz"
+
+
+async def load_histories(
+    engine: BacktestEngine, args: argparse.Namespace, fingerprint: str
+) -> dict[str, ModelHistory]:
+    """Выходы модели из кеша, недостающие символы - признаки и инференс"""
+    args.cache.mkdir(parents=True, exist_ok=True)
+    histories = {}
+    missing = []
+    for symbol in args.symbols:
+        path = cache_path(args, symbol, fingerprint)
+        if path.exists():
+            histories[symbol] = ModelHistory.load(path)
+        else:
+            missing.append(symbol)
+
+    if missing:
+        candles = await engine.load_candles(missing, args.start, args.end)
+        await engine.initialize()
+        for symbol, history in engine.precompute(candles).items():
+            history.save(cache_path(args, symbol, fingerprint))
+            histories[symbol] = history
+    return histories
+
+
+def main() -> None:
+    args = parse_args()
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+
+    settings = SweepSettings.from_config(config)
+    if args.samples:
+        settings.samples = args.samples
+    if args.workers:
+        settings.max_workers = args.workers
+
+    histories = asyncio.run(load_histories(BacktestEngine(config), args, model_fingerprint(config)))
+    result = ParameterSweep(config, settings=settings).run(histories)
+    path = result.to_parquet(args.output)
+
+    print(result.ranking.head(10).to_string(index=False))
+    if result.oos_metrics:
+        print(f"\nWalk-forward out-of-sample: {result.oos_metrics}")
+    print(f"\nРезультаты: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@
 import asyncio
 import os
 import sys
+import tempfile
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import MagicMock
@@ -19,6 +20,9 @@ from sqlalchemy.orm import sessionmaker
 # Добавляем корневую директорию проекта в путь
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Файловые логи тестов пишутся во временный каталог, а не в data/logs
+os.environ.setdefault("BOT_AI_V3_LOG_DIR", tempfile.mkdtemp(prefix="bot_ai_v3_test_logs_"))
+
 from database.connections import Base
 
 
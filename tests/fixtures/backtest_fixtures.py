@@ -0,0 +1,167 @@
+"""
+Fixtures бэктестера: модель со случайными весами, scaler и синтетические свечи
+"""
+
+import pickle
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.preprocessing import StandardScaler
+
+from backtesting.models import ModelHistory
+from ml.logic.patchtst_model import create_unified_model
+
+# Та же архитектура, что собирает PatchTSTAdapter._load_model
+MODEL_CONFIG = {
+    "model": {
+        "input_size": 240,
+        "output_size": 20,
+        "context_window": 96,
+        "patch_len": 16,
+        "stride": 8,
+        "d_model": 256,
+        "n_heads": 4,
+        "e_layers": 3,
+        "d_ff": 512,
+        "dropout": 0.1,
+        "temperature_scaling": True,
+        "temperature": 2.0,
+    }
+}
+
+SLTP_CONFIG = {
+    "tick_engine": {"min_move_percent": 0.05},
+    "trailing_stop": {"enabled": True, "type": "percentage", "step": 0.5, "min_profit": 0.3},
+    "profit_protection": {
+        "enabled": True,
+        "breakeven_percent": 1.0,
+        "breakeven_offset": 0.2,
+        "lock_percent": [{"trigger": 2.0, "lock": 1.0}],
+        "max_updates": 5,
+    },
+    "partial_take_profit": {
+        "enabled": True,
+        "update_sl_after_partial": True,
+        "levels": [{"percent": 1.0, "close_ratio": 0.25}, {"percent": 2.0, "close_ratio": 0.25}],
+    },
+}
+
+# Модель со случайными весами неуверенна (~0.35 на класс) - пороги снижены,
+# чтобы сигналы проходили фильтр и симуляция открывала сделки
+PERMISSIVE_FILTER = {
+    "min_timeframe_agreement": 1,
+    "required_confidence_per_timeframe": 0.3,
+    "main_timeframe_required_confidence": 0.3,
+    "min_expected_return_pct": 0.0,
+    "min_signal_strength": 0.0,
+    "max_risk_level": "HIGH",
+    "min_quality_score": 0.0,
+}
+
+
+def write_model_files(directory: Path, seed: int = 0) -> None:
+    """Сохраняет checkpoint модели и scaler в формате, который читает PatchTSTAdapter"""
+    directory.mkdir(parents=True, exist_ok=True)
+    torch.manual_seed(seed)
+    model = create_unified_model(MODEL_CONFIG)
+    torch.save({"model_state_dict": model.state_dict()}, directory / "model.pth")
+
+    scaler = StandardScaler()
+    scaler.fit(np.random.default_rng(seed).normal(0, 1, (500, 240)))
+    with open(directory / "scaler.pkl", "wb") as f:
+        pickle.dump(scaler, f)
+
+
+def make_backtest_config(model_directory: Path, **backtesting: Any) -> dict[str, Any]:
+    """Полная конфигурация для BacktestEngine"""
+    return {
+        "ml": {
+            "enabled": True,
+            "active_model": "patchtst",
+            "models": {
+                "patchtst": {
+                    "type": "PatchTST",
+                    "adapter_class": "PatchTSTAdapter",
+                    "model_file": "model.pth",
+                    "scaler_file": "scaler.pkl",
+                    "model_directory": str(model_directory),
+                    "device": "cpu",
+                    "inference_backend": "eager",
+                }
+            },
+        },
+        "signal_filtering": {"strategy": "aggressive", "aggressive": PERMISSIVE_FILTER},
+        "backtesting": {
+            "initial_capital": 100000,
+            "commission": 0.001,
+            "slippage": 0.0005,
+            "batch_size": 128,
+            "max_workers": 1,
+            **backtesting,
+        },
+        "risk_management": {"risk_per_trade": 0.02, "default_leverage": 5},
+        "enhanced_sltp": SLTP_CONFIG,
+    }
+
+
+def make_candles(
+    candles: int, seed: int = 0, start: str = "2024-01-01", volatility: float = 0.004
+) -> pd.DataFrame:
+    """15m OHLCV со случайным блужданием, индекс datetime (UTC) как у OHLCVColumnarLoader"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, volatility, candles)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, volatility / 2, candles)) * close
+    volume = rng.uniform(100, 200, candles)
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+            "volume": volume,
+            "turnover": volume * close,
+        },
+        index=pd.date_range(start, periods=candles, freq="15min", tz="UTC", name="datetime"),
+    )
+
+
+def make_model_history(
+    symbol: str, candles: pd.DataFrame, seed: int = 0, horizon: int = 8, accuracy: float = 0.7
+) -> ModelHistory:
+    """
+    ModelHistory с синтетическими выходами модели (без инференса)
+
+    Направление "угадывает" знак доходности через horizon свечей с
+    вероятностью accuracy - конфигурации фильтрации и SL/TP дают разный результат.
+    """
+    rng = np.random.default_rng(seed)
+    close = candles["close"].to_numpy()
+    n = len(close)
+    future = np.zeros(n)
+    future[:-horizon] = close[horizon:] / close[:-horizon] - 1
+
+    threshold = np.quantile(np.abs(future), 0.7)
+    direction = np.where(future > threshold, 0, np.where(future < -threshold, 1, 2))
+    wrong = (direction != 2) & (rng.random(n) > accuracy)
+    direction[wrong] = 1 - direction[wrong]
+
+    logits = np.zeros((n, 4, 3), dtype=np.float32)
+    logits[np.arange(n), :, direction] = rng.uniform(0.5, 3.0, (n, 1))
+    outputs = np.zeros((n, 20), dtype=np.float32)
+    outputs[:, 4:16] = logits.reshape(n, 12)
+    sign = np.where(direction == 1, -1.0, 1.0)[:, None]
+    outputs[:, 0:4] = sign * rng.uniform(0.0, 0.015, (n, 4))
+    outputs[:, 16:20] = rng.uniform(0.05, 0.3, (n, 4))
+    return ModelHistory(
+        symbol=symbol,
+        timestamps=candles.index.tz_localize(None).to_numpy("datetime64[ns]"),
+        open=candles["open"].to_numpy(),
+        high=candles["high"].to_numpy(),
+        low=candles["low"].to_numpy(),
+        close=close,
+        outputs=outputs,
+    )
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Локальный WebSocket сервер, имитирующий потоки Bybit v5
+
+Отвечает на auth/subscribe/ping как биржа, записывает входящие сообщения и
+рассылает push-сообщения по топикам подписанным клиентам.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from typing import Any
+
+import pytest
+import websockets
+
+
+def kline_message(
+    symbol: str,
+    start: int,
+    close: float,
+    confirm: bool = False,
+    interval: str = "15",
+) -> dict[str, Any]:
+    """Сообщение kline в формате Bybit v5"""
+    return {
+        "topic": f"kline.{interval}.{symbol}",
+        "type": "snapshot",
+        "ts": start + 1000,
+        "data": [
+            {
+                "start": start,
+                "end": start + int(interval) * 60_000 - 1,
+                "interval": interval,
+                "open": str(close - 1),
+                "close": str(close),
+                "high": str(close + 2),
+                "low": str(close - 2),
+                "volume": "10.5",
+                "turnover": "1050",
+                "confirm": confirm,
+                "timestamp": start + 1000,
+            }
+        ],
+    }
+
+
+class FakeBybitServer:
+    # Ключи приватного потока: подпись auth проверяется этим секретом
+    api_key = "test-key"
+    api_secret = "test-secret"
+
+    def __init__(self):
+        self.received: list[dict[str, Any]] = []
+        self.connections: set = set()
+        self.topics: dict[Any, set[str]] = {}
+        self.connection_count = 0
+        self._server = None
+        self.url: str | None = None
+
+    async def start(self) -> "FakeBybitServer":
+        self._server = await websockets.serve(self._handler, "127.0.0.1", 0)
+        port = next(iter(self._server.sockets)).getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handler(self, connection, *args) -> None:
+        self.connections.add(connection)
+        self.topics[connection] = set()
+        self.connection_count += 1
+        try:
+            async for raw in connection:
+                message = json.loads(raw)
+                self.received.append(message)
+                op = message.get("op")
+                if op == "subscribe":
+                    self.topics[connection].update(message["args"])
+                    reply = {
+                        "success": True,
+                        "ret_msg": "",
+                        "op": op,
+                        "req_id": message.get("req_id"),
+                    }
+                elif op == "auth":
+                    reply = {"success": self._check_auth(message["args"]), "ret_msg": "", "op": op}
+                elif op == "ping":
+                    reply = {
+                        "success": True,
+                        "ret_msg": "pong",
+                        "op": "pong",
+                        "req_id": message.get("req_id"),
+                    }
+                else:
+                    continue
+                await connection.send(json.dumps(reply))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.connections.discard(connection)
+            self.topics.pop(connection, None)
+
+    def _check_auth(self, args: list) -> bool:
+        key, expires, signature = args
+        expected = hmac.new(
+            self.api_secret.encode(), f"GET/realtime{expires}".encode(), hashlib.sha256
+        ).hexdigest()
+        return key == self.api_key and hmac.compare_digest(signature, expected)
+
+    def subscribe_requests(self) -> list[list[str]]:
+        return [m["args"] for m in self.received if m.get("op") == "subscribe"]
+
+    def subscribed_topics(self) -> set[str]:
+        return set().union(*self.topics.values()) if self.topics else set()
+
+    async def push(self, message: dict[str, Any]) -> None:
+        """Отправляет сообщение клиентам, подписанным на его топик"""
+        for connection, topics in list(self.topics.items()):
+            if message["topic"] in topics:
+                await connection.send(json.dumps(message))
+
+    async def drop_connections(self) -> None:
+        """Разрывает все соединения (проверка переподключения)"""
+        for connection in list(self.connections):
+            await connection.close()
+
+
+async def wait_for(condition, timeout: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Условие не выполнено за отведенное время")
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture(name="fake_bybit_server")
+async def fake_bybit_server_fixture():
+    server = await FakeBybitServer().start()
+    yield server
+    await server.stop()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк бэктестера: батчевый инференс по всей истории против поштучных
+вызовов live-пути и оценка времени года 15m свечей на 50 символов
+
+Запуск: pytest tests/performance/test_backtesting.py -m performance -s
+"""
+
+import os
+import time
+
+import pytest
+
+from backtesting import ModelRunner, ParameterSpace, ParameterSweep, SweepSettings, run_post_model
+from backtesting.engine import quiet_loggers
+from backtesting.models import BacktestSettings
+from backtesting.sweep import apply_overrides
+from tests.fixtures.backtest_fixtures import (
+    make_backtest_config,
+    make_candles,
+    make_model_history,
+    write_model_files,
+)
+
+CANDLES = 1500
+CANDLES_PER_YEAR = 365 * 96
+SYMBOLS = 50
+SEQUENTIAL_SAMPLE = 50
+
+
+@pytest.fixture(scope="module")
+def config(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("backtest_bench")
+    write_model_files(directory)
+    return make_backtest_config(directory, batch_size=512)
+
+
+@pytest.fixture(scope="module")
+async def runner(config):
+    with quiet_loggers():
+        return await ModelRunner.create(config, BacktestSettings.from_config(config))
+
+
+@pytest.mark.performance
+async def test_batched_inference_vs_per_window(runner):
+    """Один проход по истории батчами быстрее окна-за-окном через adapter.predict"""
+    with quiet_loggers():
+        features = runner.features(make_candles(CANDLES, seed=3), "BENCHUSDT")
+    matrix = runner.feature_matrix(features)
+    context = runner.adapter.context_length
+    windows = len(matrix) - context + 1
+
+    start = time.perf_counter()
+    outputs = runner.predict(matrix)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with quiet_loggers():
+        for end in range(context, context + SEQUENTIAL_SAMPLE):
+            await runner.adapter.predict(matrix[end - context : end])
+    sequential_time = (time.perf_counter() - start) / SEQUENTIAL_SAMPLE * windows
+
+    print(
+        f"\nwindows={windows} batched={batch_time:.2f}s "
+        f"per-window(extrapolated)={sequential_time:.2f}s "
+        f"speedup={sequential_time / max(batch_time, 1e-9):.1f}x"
+    )
+    assert len(outputs) == windows
+    assert batch_time < sequential_time
+
+
+@pytest.mark.performance
+def test_year_of_candles_estimate(runner, config):
+    """Оценка полного прогона: год 15m свечей на 50 символов"""
+    with quiet_loggers():
+        history = runner.history(make_candles(CANDLES, seed=4), "BENCHUSDT")
+    result = run_post_model(history, config)
+
+    timings = result.timings
+    per_candle = sum(timings.values()) / CANDLES
+    symbol_year = per_candle * CANDLES_PER_YEAR
+    workers = os.cpu_count() or 1
+    print(
+        "\n"
+        + " ".join(f"{stage}={seconds:.2f}s" for stage, seconds in timings.items())
+        + f"\nсимвол-год ~{symbol_year:.0f}s, {SYMBOLS} символов на {workers} ядрах "
+        f"~{symbol_year * SYMBOLS / workers / 60:.1f} мин"
+    )
+    # Постмодельный этап (переиспользуется при переборе конфигураций) дешевле признаков
+    assert timings["signals"] + timings["simulation"] < timings["features"]
+
+
+@pytest.mark.performance
+def test_sweep_reuses_signals(config):
+    """Перебор SL/TP при одной фильтрации считает сигналы один раз на символ"""
+    histories = {
+        symbol: make_model_history(symbol, make_candles(CANDLES * 2, seed=i), seed=i)
+        for i, symbol in enumerate(["AAAUSDT", "BBBUSDT"])
+    }
+    space = ParameterSpace(
+        {
+            "enhanced_sltp.trailing_stop.step": [0.3, 0.5, 0.8],
+            "enhanced_sltp.profit_protection.breakeven_percent": [0.8, 1.5],
+        }
+    )
+    sweep = ParameterSweep(config, space, SweepSettings(max_workers=1))
+
+    start = time.perf_counter()
+    result = sweep.run(histories)
+    sweep_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for overrides in space.grid():
+        candidate = apply_overrides(config, overrides)
+        for history in histories.values():
+            run_post_model(history, candidate)
+    naive_time = time.perf_counter() - start
+
+    print(
+        f"\nconfigs={len(result.ranking)} sweep={sweep_time:.2f}s "
+        f"run_post_model per config={naive_time:.2f}s "
+        f"speedup={naive_time / max(sweep_time, 1e-9):.1f}x"
+    )
+    assert sweep_time < naive_time
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
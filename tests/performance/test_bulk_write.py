@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark of BaseRepository bulk writes: multi-VALUES statements vs binary
+COPY (plain insert and staging-table upsert) on 10k/100k rows, and the shared
+CandleWriter vs per-candle INSERT for an initial history load.
+
+Requires a running PostgreSQL (PGUSER/PGPASSWORD/PGDATABASE/PGPORT), the
+benchmark table is created and dropped by the test.
+
+Run: pytest tests/performance/test_bulk_write.py -m performance -s
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import asyncpg
+import pytest
+
+from data.candle_writer import CandleWriter
+from database.connections.postgres import ASYNCPG_URL
+from database.repositories.market_data_repository import CandleRecord, MarketDataRepository
+
+TABLE = "bench_raw_market_data"
+SIZES = [10_000, 100_000]
+# Начальная загрузка истории: 50 символов x 2000 свечей
+HISTORY_SYMBOLS = 50
+HISTORY_CANDLES = 2000
+PER_CANDLE_SAMPLE = 2000
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class BenchRepository(MarketDataRepository):
+    def __init__(self, pool, bulk_write_mode):
+        super().__init__(pool, bulk_write_mode=bulk_write_mode)
+        self.table_name = TABLE
+
+
+def make_rows(count: int, price: float = 100.0, symbols_count: int = 10) -> list:
+    symbols = [f"S{i:02d}USDT" for i in range(symbols_count)]
+    rows = []
+    for i in range(count):
+        moment = START + timedelta(minutes=15 * (i // len(symbols)))
+        rows.append(
+            CandleRecord(
+                symbol=symbols[i % len(symbols)],
+                timestamp=int(moment.timestamp() * 1000),
+                datetime=moment,
+                open=Decimal("100.5"),
+                high=Decimal("101.25"),
+                low=Decimal("99.75"),
+                close=Decimal(str(price)),
+                volume=Decimal("12.345"),
+            )
+        )
+    return rows
+
+
+@pytest.fixture
+async def pool():
+    try:
+        pool = await asyncpg.create_pool(ASYNCPG_URL, min_size=1, max_size=2, timeout=5)
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"PostgreSQL unavailable: {e}")
+
+    async with pool.acquire() as conn:
+        await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        await conn.execute(
+            f"""
+            CREATE TABLE {TABLE} (
+                id BIGSERIAL PRIMARY KEY,
+                symbol VARCHAR(20) NOT NULL,
+                timestamp BIGINT NOT NULL,
+                datetime TIMESTAMPTZ NOT NULL,
+                open DECIMAL(20, 8) NOT NULL,
+                high DECIMAL(20, 8) NOT NULL,
+                low DECIMAL(20, 8) NOT NULL,
+                close DECIMAL(20, 8) NOT NULL,
+                volume DECIMAL(20, 8) NOT NULL,
+                turnover DECIMAL(20, 8) DEFAULT 0,
+                interval_minutes INTEGER NOT NULL,
+                exchange VARCHAR(50),
+                market_type VARCHAR(20),
+                updated_at TIMESTAMPTZ,
+                UNIQUE (symbol, timestamp, interval_minutes, exchange)
+            )
+            """
+        )
+    yield pool
+    async with pool.acquire() as conn:
+        await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await pool.close()
+
+
+async def timed(coroutine) -> float:
+    start = time.perf_counter()
+    await coroutine
+    return time.perf_counter() - start
+
+
+@pytest.mark.performance
+@pytest.mark.requires_db
+@pytest.mark.parametrize("count", SIZES)
+async def test_copy_vs_values(pool, count):
+    """COPY быстрее multi-VALUES и на вставке, и на upsert существующих строк"""
+    timings = {}
+    for mode in ("values", "copy"):
+        repository = BenchRepository(pool, mode)
+        async with pool.acquire() as conn:
+            await conn.execute(f"TRUNCATE {TABLE}")
+
+        timings[f"{mode}_insert"] = await timed(repository.bulk_insert(make_rows(count)))
+        # Повторная запись тех же ключей - путь ON CONFLICT DO UPDATE
+        timings[f"{mode}_upsert"] = await timed(repository.save_candles(make_rows(count, 101.0)))
+
+        async with pool.acquire() as conn:
+            stored = await conn.fetchval(f"SELECT count(*) FROM {TABLE} WHERE close = 101")
+        assert stored == count
+
+    print(
+        f"\nrows={count} "
+        + " ".join(
+            f"{name}={seconds:.2f}s ({count / seconds:,.0f} rows/s)"
+            for name, seconds in timings.items()
+        )
+    )
+    assert timings["copy_insert"] < timings["values_insert"]
+    assert timings["copy_upsert"] < timings["values_upsert"]
+
+
+@pytest.mark.performance
+@pytest.mark.requires_db
+async def test_candle_writer_vs_per_candle_insert(pool):
+    """История 50 символов: одна пачка CandleWriter против INSERT на каждую свечу"""
+    rows = make_rows(HISTORY_SYMBOLS * HISTORY_CANDLES, symbols_count=HISTORY_SYMBOLS)
+    repository = BenchRepository(pool, "copy")
+    columns = list(repository._to_dict(rows[0]))
+    insert = (
+        f"INSERT INTO {TABLE} ({','.join(columns)}) "
+        f"VALUES ({','.join(f'${i + 1}' for i in range(len(columns)))}) "
+        "ON CONFLICT (symbol, timestamp, interval_minutes, exchange) DO UPDATE "
+        "SET close = EXCLUDED.close, updated_at = NOW()"
+    )
+
+    # Прежний путь SmartDataManager._save_single_candle - по выборке с экстраполяцией
+    start = time.perf_counter()
+    for row in rows[:PER_CANDLE_SAMPLE]:
+        await pool.execute(insert, *repository._to_dict(row).values())
+    per_candle = (time.perf_counter() - start) / PER_CANDLE_SAMPLE * len(rows)
+
+    async with pool.acquire() as conn:
+        await conn.execute(f"TRUNCATE {TABLE}")
+    writer = CandleWriter(repository=repository, max_batch=len(rows) + 1)
+    start = time.perf_counter()
+    for i in range(HISTORY_SYMBOLS):
+        await writer.add(rows[i::HISTORY_SYMBOLS])
+    await writer.flush()
+    batched = time.perf_counter() - start
+
+    async with pool.acquire() as conn:
+        assert await conn.fetchval(f"SELECT count(*) FROM {TABLE}") == len(rows)
+    print(
+        f"\ncandles={len(rows)} per-candle(extrapolated)={per_candle:.1f}s "
+        f"writer={batched:.2f}s speedup={per_candle / batched:.0f}x {writer.get_stats()}"
+    )
+    assert writer.get_stats()["flushes"] == 1
+    assert batched < per_candle
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Задержка event loop при расчете признаков: inline против пула процессов
+
+Запуск: pytest tests/performance/test_feature_executor.py -m performance -s
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.logic.feature_executor import FeatureExecutor
+from ml.realtime_indicator_calculator import RealTimeIndicatorCalculator
+from monitoring.metrics.loop_lag import LoopLagMonitor
+
+SYMBOLS = 4
+CANDLES = 300
+
+
+def make_frames(calculator: RealTimeIndicatorCalculator) -> dict[str, pd.DataFrame]:
+    frames = {}
+    for i in range(SYMBOLS):
+        rng = np.random.default_rng(i)
+        close = 100 + np.cumsum(rng.normal(0, 1, CANDLES))
+        ohlcv = pd.DataFrame(
+            {
+                "open": close,
+                "high": close + 1,
+                "low": close - 1,
+                "close": close,
+                "volume": rng.uniform(10, 20, CANDLES),
+            },
+            index=pd.date_range(
+                "2024-01-01", periods=CANDLES, freq="15min", tz="UTC", name="datetime"
+            ),
+        )
+        symbol = f"SYM{i}USDT"
+        frames[symbol] = calculator._prepare_dataframe(ohlcv, symbol)
+    return frames
+
+
+async def measure(backend: str) -> tuple[dict, dict, float]:
+    executor = FeatureExecutor(backend, max_workers=SYMBOLS)
+    calculator = RealTimeIndicatorCalculator(feature_executor=executor)
+    frames = make_frames(calculator)
+    engineer = calculator.feature_engineer
+
+    # Прогрев: импорт модулей и запуск воркеров не входят в замер
+    await executor.create_features(next(iter(frames.values())), engineer=engineer)
+
+    try:
+        async with LoopLagMonitor(interval=0.01) as monitor:
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(executor.create_features(df, engineer=engineer) for df in frames.values())
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        executor.shutdown()
+
+    return dict(zip(frames, results, strict=True)), monitor.get_stats(), elapsed
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+async def test_process_backend_keeps_loop_responsive():
+    """Пул процессов не блокирует loop и дает те же признаки"""
+    inline_results, inline_lag, inline_time = await measure("inline")
+    process_results, process_lag, process_time = await measure("process")
+
+    print(
+        f"\ninline:  {inline_time:.2f}s lag max={inline_lag['max_ms']:.0f}ms "
+        f"p99={inline_lag['p99_ms']:.0f}ms"
+        f"\nprocess: {process_time:.2f}s lag max={process_lag['max_ms']:.0f}ms "
+        f"p99={process_lag['p99_ms']:.0f}ms"
+    )
+
+    for symbol, expected in inline_results.items():
+        pd.testing.assert_frame_equal(process_results[symbol], expected)
+    assert process_lag["p99_ms"] < inline_lag["max_ms"] / 10
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
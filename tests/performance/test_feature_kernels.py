@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк векторизованных ядер ML-признаков против rolling(...).apply
+
+Запуск: pytest tests/performance/test_feature_kernels.py -m performance -s
+100k строк для старого пути занимают минуты, поэтому помечены как slow.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.logic import rolling_kernels as rk
+
+KERNELS = {
+    "hurst_exponent": (
+        lambda close, returns: close.rolling(50).apply(
+            lambda x: rk.hurst_exponent(x) if len(x) == 50 else 0.5
+        ),
+        lambda close, returns: rk.rolling_hurst_exponent(close.to_numpy(), window=50),
+    ),
+    "fractal_dimension": (
+        lambda close, returns: close.rolling(30).apply(
+            lambda x: rk.fractal_dimension(x.values) if len(x) == 30 else 1.5
+        ),
+        lambda close, returns: rk.rolling_fractal_dimension(close.to_numpy(), window=30),
+    ),
+    "garch_vol": (
+        lambda close, returns: returns.rolling(20).apply(rk.garch_volatility),
+        lambda close, returns: rk.rolling_garch_volatility(returns.to_numpy(), window=20),
+    ),
+    "return_entropy": (
+        lambda close, returns: returns.rolling(100).apply(lambda x: rk.shannon_entropy(x)),
+        lambda close, returns: rk.rolling_shannon_entropy(returns.to_numpy(), window=100),
+    ),
+}
+
+
+def make_series(rows: int) -> tuple[pd.Series, pd.Series]:
+    rng = np.random.default_rng(rows)
+    close = pd.Series(50000 + np.cumsum(rng.normal(0, 100, rows)))
+    return close, close.pct_change()
+
+
+def run_benchmark(rows: int, name: str) -> tuple[float, float]:
+    close, returns = make_series(rows)
+    old, new = KERNELS[name]
+
+    start = time.perf_counter()
+    expected = old(close, returns)
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = new(close, returns)
+    new_time = time.perf_counter() - start
+
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-14)
+    print(
+        f"{name:18s} rows={rows:>7d} rolling.apply={old_time:8.3f}s "
+        f"vectorized={new_time:7.4f}s speedup={old_time / max(new_time, 1e-9):7.1f}x"
+    )
+    return old_time, new_time
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("name", list(KERNELS))
+@pytest.mark.parametrize("rows", [1_000, 10_000])
+def test_feature_kernels_speedup(rows, name):
+    """Векторизованные ядра должны быть существенно быстрее rolling.apply"""
+    old_time, new_time = run_benchmark(rows, name)
+
+    assert new_time < old_time
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.parametrize("name", list(KERNELS))
+def test_feature_kernels_speedup_100k(name):
+    old_time, new_time = run_benchmark(100_000, name)
+
+    assert new_time * 10 < old_time
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Задержка инференса PatchTST на CPU: eager против TorchScript (и ONNX Runtime,
+если установлен)
+
+Запуск: pytest tests/performance/test_inference_backends.py -m performance -s
+"""
+
+import contextlib
+import time
+import warnings
+
+import numpy as np
+import pytest
+import torch
+
+from ml.adapters.inference_backends import EagerBackend, build_backend, check_parity
+from ml.logic.patchtst_model import create_unified_model
+
+MODEL_CONFIG = {
+    "model": {
+        "input_size": 240,
+        "output_size": 20,
+        "context_window": 96,
+        "patch_len": 16,
+        "stride": 8,
+        "d_model": 256,
+        "n_heads": 4,
+        "e_layers": 3,
+        "d_ff": 512,
+    }
+}
+
+ITERATIONS = 30
+
+
+def median_latency(backend, batch: np.ndarray) -> float:
+    for _ in range(3):
+        backend(batch)
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        backend(batch)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+@pytest.fixture(scope="module")
+def backends(tmp_path_factory):
+    torch.manual_seed(0)
+    model = create_unified_model(MODEL_CONFIG).eval()
+    model_path = tmp_path_factory.mktemp("models") / "model.pth"
+    torch.save({"model_state_dict": model.state_dict()}, model_path)
+
+    device = torch.device("cpu")
+    example = torch.randn(1, 96, 240)
+    result = {"eager": EagerBackend(model, device)}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        result["torchscript"] = build_backend("torchscript", model, device, example, model_path)
+        with contextlib.suppress(ImportError):
+            result["onnx"] = build_backend("onnx", model, device, example, model_path)
+    return result
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("batch_size", [1, 16])
+def test_backend_latency(backends, batch_size):
+    """Скомпилированные бэкенды не медленнее eager и совпадают с ним"""
+    batch = (
+        np.random.default_rng(batch_size).standard_normal((batch_size, 96, 240)).astype(np.float32)
+    )
+
+    latencies = {name: median_latency(backend, batch) for name, backend in backends.items()}
+    eager = latencies["eager"]
+    for name, latency in latencies.items():
+        error = check_parity(backends["eager"], backends[name], batch)
+        print(
+            f"batch={batch_size:>2d} {name:<11s} {latency * 1000:7.2f}ms "
+            f"speedup={eager / latency:4.2f}x max_diff={error:.1e}"
+        )
+        assert error < 1e-4
+
+    # Допуск на шум измерений на загруженной машине
+    assert latencies["torchscript"] < eager * 1.2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк обновления MarketDataCache: кольцевой буфер против pd.concat
+
+Запуск: pytest tests/performance/test_market_data_cache.py -m performance -s
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.cache.market_data_cache import MarketDataCache
+
+SYMBOLS = 300
+HISTORY = 1000
+ROUNDS = 10
+
+
+def make_history() -> pd.DataFrame:
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, HISTORY))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": 1.0,
+            "turnover": close,
+        },
+        index=pd.date_range("2024-01-01", periods=HISTORY, freq="15min", tz="UTC", name="datetime"),
+    )
+
+
+def pandas_update(existing: pd.DataFrame, new_data: pd.DataFrame) -> pd.DataFrame:
+    """Прежний путь update_data + get_data"""
+    combined = pd.concat([existing, new_data])
+    combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+    return combined.iloc[-HISTORY:]
+
+
+def new_candle(history: pd.DataFrame, step: int) -> pd.DataFrame:
+    return (
+        history.iloc[-1:]
+        .set_axis([history.index[-1] + pd.Timedelta(minutes=15 * (step // 2 + 1))])
+        .rename_axis("datetime")
+    )
+
+
+async def run_ring_buffer(history: pd.DataFrame) -> float:
+    cache = MarketDataCache(cache_size=HISTORY)
+    for i in range(SYMBOLS):
+        await cache.update_data(f"S{i}", history, is_complete=True)
+
+    start = time.perf_counter()
+    for step in range(ROUNDS):
+        candle = new_candle(history, step)
+        for i in range(SYMBOLS):
+            await cache.update_data(f"S{i}", candle)
+            await cache.get_view(f"S{i}")
+    return time.perf_counter() - start
+
+
+def run_pandas(history: pd.DataFrame) -> float:
+    frames = {f"S{i}": history.copy() for i in range(SYMBOLS)}
+
+    start = time.perf_counter()
+    for step in range(ROUNDS):
+        candle = new_candle(history, step)
+        for i in range(SYMBOLS):
+            frames[f"S{i}"] = pandas_update(frames[f"S{i}"], candle)
+            frames[f"S{i}"].copy()
+    return time.perf_counter() - start
+
+
+def pandas_last_candle(df: pd.DataFrame, candle: dict) -> pd.DataFrame:
+    """Прежний путь update_last_candle"""
+    timestamp = candle["timestamp"]
+    if df.index[-1] == timestamp:
+        for name in ("open", "high", "low", "close", "volume"):
+            df.loc[timestamp, name] = candle[name]
+        return df
+    df = pd.concat([df, pd.DataFrame([candle], index=[timestamp]).drop(columns="timestamp")])
+    return df.iloc[-HISTORY:]
+
+
+def tick(history: pd.DataFrame, step: int) -> dict:
+    """Тик текущей свечи: каждые 5 тиков открывается новая свеча"""
+    close = float(history["close"].iloc[-1]) + step * 0.01
+    return {
+        "timestamp": history.index[-1] + pd.Timedelta(minutes=15 * (step // 5 + 1)),
+        "open": close,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": 1.0,
+        "turnover": close,
+    }
+
+
+async def run_ring_buffer_ticks(history: pd.DataFrame) -> float:
+    cache = MarketDataCache(cache_size=HISTORY)
+    for i in range(SYMBOLS):
+        await cache.update_data(f"S{i}", history, is_complete=True)
+
+    start = time.perf_counter()
+    for step in range(ROUNDS):
+        candle = tick(history, step)
+        for i in range(SYMBOLS):
+            await cache.update_last_candle(f"S{i}", candle)
+            await cache.get_view(f"S{i}")
+    return time.perf_counter() - start
+
+
+def run_pandas_ticks(history: pd.DataFrame) -> float:
+    frames = {f"S{i}": history.copy() for i in range(SYMBOLS)}
+
+    start = time.perf_counter()
+    for step in range(ROUNDS):
+        candle = tick(history, step)
+        for i in range(SYMBOLS):
+            frames[f"S{i}"] = pandas_last_candle(frames[f"S{i}"], candle)
+            frames[f"S{i}"].copy()
+    return time.perf_counter() - start
+
+
+@pytest.mark.performance
+async def test_ring_buffer_update_speedup():
+    """Инкрементальные обновления сотен символов без pd.concat"""
+    history = make_history()
+    pandas_time = run_pandas(history)
+    ring_time = await run_ring_buffer(history)
+
+    print(
+        f"symbols={SYMBOLS} rounds={ROUNDS} pandas={pandas_time:.3f}s "
+        f"ring_buffer={ring_time:.3f}s speedup={pandas_time / max(ring_time, 1e-9):.1f}x"
+    )
+    assert ring_time < pandas_time
+
+
+@pytest.mark.performance
+async def test_ring_buffer_last_candle_speedup():
+    """Обновление текущей свечи по тикам - основной горячий путь"""
+    history = make_history()
+    pandas_time = run_pandas_ticks(history)
+    ring_time = await run_ring_buffer_ticks(history)
+
+    print(
+        f"symbols={SYMBOLS} ticks={ROUNDS} pandas={pandas_time:.3f}s "
+        f"ring_buffer={ring_time:.3f}s speedup={pandas_time / max(ring_time, 1e-9):.1f}x"
+    )
+    assert ring_time * 5 < pandas_time
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк батчевого предсказания PatchTST против поштучных вызовов
+
+Запуск: pytest tests/performance/test_patchtst_batch.py -m performance -s
+"""
+
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+import torch
+
+from ml.adapters.patchtst import PatchTSTAdapter
+from ml.logic.patchtst_model import create_unified_model
+
+MODEL_CONFIG = {
+    "model": {
+        "input_size": 240,
+        "output_size": 20,
+        "context_window": 96,
+        "patch_len": 16,
+        "stride": 8,
+        "d_model": 256,
+        "n_heads": 4,
+        "e_layers": 3,
+        "d_ff": 512,
+    }
+}
+
+
+def make_adapter() -> PatchTSTAdapter:
+    torch.manual_seed(0)
+    adapter = PatchTSTAdapter({"device": "cpu"})
+    adapter.model = create_unified_model(MODEL_CONFIG)
+    adapter.model.eval()
+    adapter.scaler = MagicMock()
+    adapter.scaler.transform.side_effect = lambda x: np.array(x, dtype=np.float64)
+    adapter._initialized = True
+    return adapter
+
+
+async def run_benchmark(symbols: int) -> tuple[float, float]:
+    adapter = make_adapter()
+    rng = np.random.default_rng(symbols)
+    inputs = {f"SYM{i}USDT": rng.normal(0, 1, (96, 240)) for i in range(symbols)}
+
+    # Прогрев
+    await adapter.predict(next(iter(inputs.values())))
+
+    start = time.perf_counter()
+    for data in inputs.values():
+        await adapter.predict(data)
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await adapter.predict_batch_raw(inputs)
+    batch_time = time.perf_counter() - start
+
+    print(
+        f"symbols={symbols:>3d} sequential={sequential_time:7.3f}s "
+        f"batch={batch_time:7.3f}s speedup={sequential_time / max(batch_time, 1e-9):5.1f}x"
+    )
+    return sequential_time, batch_time
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("symbols", [20, 50])
+async def test_patchtst_batch_speedup(symbols):
+    """Один forward pass на N символов быстрее N отдельных вызовов"""
+    sequential_time, batch_time = await run_benchmark(symbols)
+
+    assert batch_time < sequential_time
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
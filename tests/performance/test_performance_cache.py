@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк PerformanceCache на 100k ключей
+
+Запуск: pytest tests/performance/test_performance_cache.py -m performance -s
+"""
+
+import time
+
+import pytest
+
+from core.system.performance_cache import PerformanceCache
+
+
+async def run_workload(keys: int) -> float:
+    """set 2*keys ключей в кеш емкостью keys (половина вытесняется), затем get"""
+    cache = PerformanceCache(max_size=keys, namespace_quotas={"market_data": keys // 2})
+
+    start = time.perf_counter()
+    for i in range(2 * keys):
+        await cache.set(f"market_data:S{i}:15m" if i % 2 else f"indicator:S{i}", i, ttl=60)
+    for i in range(2 * keys):
+        await cache.get(f"indicator:S{i}")
+    await cache._cleanup_expired()
+    elapsed = time.perf_counter() - start
+
+    assert cache.get_stats()["size"] == keys
+    return elapsed / (4 * keys)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+async def test_cache_operations_scale_constant():
+    """Стоимость операции не растет с размером кеша"""
+    small = await run_workload(10_000)
+    large = await run_workload(100_000)
+
+    print(
+        f"per-op: 10k={small * 1e6:.2f}us 100k={large * 1e6:.2f}us "
+        f"throughput={1 / large:,.0f} ops/s"
+    )
+    assert large < small * 4
+    assert large < 50e-6
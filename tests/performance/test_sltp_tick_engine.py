@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Симулятор SL/TP: 200 позиций, 10 тиков/с на символ
+
+Сравнивает последовательный обход позиций EnhancedSLTPManager (как в
+_position_sync_loop) с TickSLTPEngine: время обработки тиков и число
+обращений к бирже за одинаковый поток цен.
+
+Запуск: pytest tests/performance/test_sltp_tick_engine.py -m performance -s
+"""
+
+import logging
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from trading.sltp.enhanced_manager import EnhancedSLTPManager
+from trading.sltp.models import SLTPOrder, SLTPStatus
+from trading.sltp.tick_engine import TickSLTPEngine
+
+POSITIONS = 200
+SYMBOLS = 20
+TICKS_PER_SECOND = 10
+SECONDS = 10
+# Симулированная задержка запроса к бирже
+EXCHANGE_RTT = 0.02
+# min_amend_interval по умолчанию (2 с): переносы SL позиции объединяются в окне
+AMEND_WINDOW_TICKS = 2 * TICKS_PER_SECOND
+
+SLTP_CONFIG = {
+    "enhanced_sltp": {
+        "trailing_stop": {"enabled": True, "type": "percentage", "step": 0.5, "min_profit": 0.3},
+        "profit_protection": {
+            "enabled": True,
+            "breakeven_percent": 1.0,
+            "breakeven_offset": 0.2,
+            "lock_percent": [{"trigger": 2.0, "lock": 1.0}, {"trigger": 3.0, "lock": 2.0}],
+            "max_updates": 5,
+        },
+    }
+}
+
+
+class CountingExchange:
+    """Биржа без задержки, считающая запросы изменения SL"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def set_stop_loss(self, symbol, price, size):
+        self.calls += 1
+        return SimpleNamespace(success=True, order_id=f"sl-{self.calls}")
+
+    async def cancel_order(self, symbol, order_id):
+        self.calls += 1
+        return SimpleNamespace(success=True)
+
+
+def make_manager(exchange: CountingExchange, positions: list) -> EnhancedSLTPManager:
+    config_manager = Mock()
+    config_manager.get_system_config.return_value = SLTP_CONFIG
+    manager = EnhancedSLTPManager(config_manager=config_manager, exchange_client=exchange)
+    for position in positions:
+        manager._active_orders[position.id] = [
+            SLTPOrder(
+                id=f"sl-{position.id}",
+                symbol=position.symbol,
+                side="Sell" if position.side == "Buy" else "Buy",
+                order_type="StopLoss",
+                trigger_price=position.stop_loss,
+                quantity=position.size,
+                status=SLTPStatus.ACTIVE,
+                position_id=position.id,
+                exchange_order_id=f"sl-{position.id}",
+            )
+        ]
+    return manager
+
+
+def make_positions(rng: np.random.Generator) -> list:
+    positions = []
+    for i in range(POSITIONS):
+        side = "Buy" if i % 2 == 0 else "Sell"
+        entry = 100.0 * (1 + rng.normal(0, 0.002))
+        stop_loss = entry * (0.98 if side == "Buy" else 1.02)
+        positions.append(
+            SimpleNamespace(
+                id=f"pos-{i}",
+                symbol=f"SYM{i % SYMBOLS}USDT",
+                side=side,
+                size=1.0,
+                entry_price=entry,
+                stop_loss=stop_loss,
+            )
+        )
+    return positions
+
+
+def make_ticks(rng: np.random.Generator) -> list[tuple[str, float]]:
+    """Поток тиков: случайное блуждание с трендом, символы чередуются"""
+    steps = SECONDS * TICKS_PER_SECOND
+    walks = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.0015, (steps, SYMBOLS)), axis=0))
+    return [(f"SYM{s}USDT", float(walks[t, s])) for t in range(steps) for s in range(SYMBOLS)]
+
+
+@pytest.fixture(scope="module")
+def scenario():
+    logging.getLogger("enhanced_sltp_manager").setLevel(logging.WARNING)
+    logging.getLogger("sltp_tick_engine").setLevel(logging.WARNING)
+    rng = np.random.default_rng(7)
+    return make_positions(rng), make_ticks(rng)
+
+
+async def run_sequential(positions, ticks):
+    """Текущий путь: на каждый тик - обход позиций символа с вызовами менеджера"""
+    exchange = CountingExchange()
+    manager = make_manager(exchange, positions)
+    by_symbol = {}
+    for position in positions:
+        by_symbol.setdefault(position.symbol, []).append(position)
+
+    started = time.perf_counter()
+    for symbol, price in ticks:
+        for position in by_symbol[symbol]:
+            await manager.update_profit_protection(position, price)
+            await manager.update_trailing_stop(position, price)
+    return time.perf_counter() - started, exchange.calls
+
+
+async def run_tick_engine(positions, ticks):
+    exchange = CountingExchange()
+    manager = make_manager(exchange, positions)
+    engine = TickSLTPEngine(manager, debounce=0, min_amend_interval=0, min_move_percent=0.05)
+    engine.sync_positions(positions)
+
+    latencies = []
+    flushes = 0
+    started = time.perf_counter()
+    for n, (symbol, price) in enumerate(ticks, start=1):
+        tick_started = time.perf_counter()
+        amendments, _ = engine.evaluate(symbol, price)
+        for amendment in amendments:
+            engine._pending[amendment.position_id] = amendment
+        latencies.append(time.perf_counter() - tick_started)
+        # Сброс раз в окно объединения (AMEND_WINDOW_TICKS тиков каждого символа)
+        if n % (SYMBOLS * AMEND_WINDOW_TICKS) == 0:
+            await engine.flush(force=True)
+            flushes += 1
+    await engine.flush(force=True)
+    return time.perf_counter() - started, exchange.calls, flushes + 1, np.array(latencies)
+
+
+@pytest.mark.performance
+async def test_tick_engine_vs_sequential(scenario):
+    positions, ticks = scenario
+
+    sequential_time, sequential_calls = await run_sequential(positions, ticks)
+    engine_time, engine_calls, flushes, latencies = await run_tick_engine(positions, ticks)
+
+    p99_ms = np.percentile(latencies, 99) * 1000
+    # Ожидание биржи: последовательные await против параллельного flush
+    # (отмена + новый SL = 2 запроса подряд на позицию)
+    sequential_wait = sequential_calls * EXCHANGE_RTT
+    engine_wait = flushes * 2 * EXCHANGE_RTT
+    budget = SECONDS  # симулированное время потока
+    print(
+        f"\n{POSITIONS} позиций, {len(ticks)} тиков "
+        f"({SECONDS}s @ {TICKS_PER_SECOND}/s x {SYMBOLS} символов)"
+        f"\n  sequential: {sequential_time:.3f}s CPU, {sequential_calls} запросов к бирже, "
+        f"~{sequential_wait:.1f}s ожидания при RTT {EXCHANGE_RTT * 1000:.0f} ms"
+        f"\n  tick engine: {engine_time:.3f}s CPU, {engine_calls} запросов к бирже, "
+        f"~{engine_wait:.1f}s ожидания, оценка {latencies.sum():.3f}s, p99 тика {p99_ms:.3f} ms"
+    )
+
+    # Оценка укладывается в реальное время с большим запасом
+    assert engine_time < budget * 0.1
+    assert p99_ms < 1.0
+    # Векторная оценка дешевле обхода позиций даже без задержки биржи
+    assert latencies.sum() * 3 < sequential_time
+    assert sequential_wait > budget > engine_wait
+    # Объединение и порог сокращают обращения к бирже
+    assert engine_calls * 3 < sequential_calls
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Unit тесты BacktestEngine: полный прогон с моделью со случайными весами
+"""
+
+import numpy as np
+import pytest
+
+from backtesting import BacktestEngine, ModelRunner
+from backtesting.models import BacktestSettings
+from ml.logic.feature_executor import FeatureExecutor
+from ml.realtime_indicator_calculator import RealTimeIndicatorCalculator
+from tests.fixtures.backtest_fixtures import make_backtest_config, make_candles, write_model_files
+
+CANDLES = 400
+# create_features отбрасывает 50 первых свечей, первое окно - 96 свечей
+FIRST_PREDICTION = 50 + 96 - 1
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("backtest_model")
+    write_model_files(directory)
+    return directory
+
+
+@pytest.fixture(scope="module")
+def candles():
+    return {"AAAUSDT": make_candles(CANDLES, seed=1), "BBBUSDT": make_candles(CANDLES - 50, seed=2)}
+
+
+@pytest.fixture(scope="module")
+async def engine(model_dir):
+    engine = BacktestEngine(make_backtest_config(model_dir))
+    await engine.initialize()
+    return engine
+
+
+@pytest.fixture(scope="module")
+def result(engine, candles):
+    return engine.run(candles, keep_histories=True)
+
+
+def test_history_aligned_with_candles(result, candles):
+    history = result.histories["AAAUSDT"]
+    source = candles["AAAUSDT"]
+
+    assert len(history) == CANDLES - FIRST_PREDICTION
+    assert history.outputs.shape == (len(history), 20)
+    assert history.timestamps[-1] == source.index[-1].tz_localize(None).to_datetime64()
+    np.testing.assert_allclose(history.close, source["close"].to_numpy()[FIRST_PREDICTION:])
+
+
+async def test_batched_outputs_match_live_path(model_dir, result, candles):
+    """Последнее окно истории совпадает с prepare_ml_input + PatchTSTAdapter.predict"""
+    config = make_backtest_config(model_dir)
+    runner = await ModelRunner.create(config, BacktestSettings.from_config(config))
+    calculator = RealTimeIndicatorCalculator(config={}, feature_executor=FeatureExecutor("inline"))
+
+    features, _ = await calculator.prepare_ml_input("AAAUSDT", candles["AAAUSDT"])
+    live = await runner.adapter.predict(features)
+
+    # predict добавляет несидированный шум 1e-4 к признакам с нулевой дисперсией в окне
+    np.testing.assert_allclose(result.histories["AAAUSDT"].outputs[-1], live, atol=5e-3)
+
+
+def test_equity_matches_trades(result):
+    assert result.metrics["total_trades"] == len(result.trades) > 0
+    assert result.equity.iloc[-1] - 100000 == pytest.approx(result.trades["pnl"].sum())
+    assert set(result.symbols) == {"AAAUSDT", "BBBUSDT"}
+    assert sum(s["trades"] for s in result.symbols.values()) == len(result.trades)
+    assert {"features", "inference", "signals", "simulation", "wall"} <= set(result.timings)
+
+
+def test_simulate_reuses_histories(engine, result, monkeypatch):
+    monkeypatch.setattr(ModelRunner, "history", lambda *args: pytest.fail("повторный инференс"))
+
+    same = engine.simulate(result.histories)
+    assert same.metrics == result.metrics
+
+    config = make_backtest_config(engine.config["ml"]["models"]["patchtst"]["model_directory"])
+    config["backtesting"]["commission"] = 0.002
+    expensive = engine.simulate(result.histories, config)
+    assert expensive.trades["fees"].sum() > result.trades["fees"].sum()
+
+
+def test_process_pool_matches_inline(model_dir, candles, result):
+    engine = BacktestEngine(make_backtest_config(model_dir, max_workers=2))
+    pooled = engine.run(candles)
+
+    assert pooled.metrics == pytest.approx(result.metrics)
+    assert pooled.histories == {}
+    np.testing.assert_allclose(pooled.equity.to_numpy(), result.equity.to_numpy())
+
+
+def test_failed_symbol_reported(engine, candles):
+    broken = candles["AAAUSDT"].drop(columns="close")
+    partial = engine.run({"AAAUSDT": candles["AAAUSDT"], "BADUSDT": broken})
+
+    assert list(partial.failed) == ["BADUSDT"]
+    assert set(partial.symbols) == {"AAAUSDT"}
+
+
+def test_inline_run_requires_initialize(model_dir, candles):
+    engine = BacktestEngine(make_backtest_config(model_dir))
+
+    with pytest.raises(RuntimeError, match="initialize"):
+        engine.precompute(candles)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Unit тесты этапа после модели: сигналы, симулированная биржа, метрики
+"""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.exchange import SimulatedExchange
+from backtesting.metrics import calculate_metrics, max_drawdown
+from backtesting.models import BacktestSettings, ModelHistory, SignalSeries
+from backtesting.signals import generate_signals
+from ml.adapters.patchtst import signal_sltp_percent
+from ml.logic.signal_quality_analyzer import SignalQualityAnalyzer
+from tests.fixtures.backtest_fixtures import SLTP_CONFIG
+
+SETTINGS = BacktestSettings(initial_capital=100000, commission=0.001, slippage=0.0005)
+SLIPPAGE = SETTINGS.slippage
+
+
+def make_history(close, high=None, low=None, open_=None) -> ModelHistory:
+    close = np.asarray(close, dtype=float)
+    # По умолчанию свеча открывается по закрытию предыдущей
+    open_ = np.r_[close[:1], close[:-1]] if open_ is None else np.asarray(open_, dtype=float)
+    high = np.maximum(open_, close) if high is None else np.asarray(high, dtype=float)
+    low = np.minimum(open_, close) if low is None else np.asarray(low, dtype=float)
+    return ModelHistory(
+        symbol="BTCUSDT",
+        timestamps=pd.date_range("2024-01-01", periods=len(close), freq="15min").to_numpy(),
+        open=open_,
+        high=high,
+        low=low,
+        close=close,
+        outputs=np.zeros((len(close), 20), dtype=np.float32),
+    )
+
+
+def make_signals(
+    n: int, entries: dict[int, int], sl: float = 0.01, tp: float = 0.02
+) -> SignalSeries:
+    side = np.zeros(n, dtype=np.int8)
+    for index, direction in entries.items():
+        side[index] = direction
+    mask = side != 0
+    return SignalSeries(
+        side=side,
+        stop_loss_pct=np.where(mask, sl, np.nan),
+        take_profit_pct=np.where(mask, tp, np.nan),
+        quality_score=np.where(mask, 0.5, 0.0),
+    )
+
+
+def make_exchange(**sltp_overrides) -> SimulatedExchange:
+    sltp = {**SLTP_CONFIG, **sltp_overrides}
+    return SimulatedExchange(SETTINGS, {"enhanced_sltp": sltp})
+
+
+NO_MANAGEMENT = {
+    "trailing_stop": {"enabled": False},
+    "profit_protection": {"enabled": False},
+    "partial_take_profit": {"enabled": False},
+}
+
+
+class TestSimulatedExchange:
+    def test_take_profit_fill_and_costs(self):
+        history = make_history([100, 100, 101, 102.5], high=[100, 100, 101, 103])
+        result = make_exchange(**NO_MANAGEMENT).run(history, make_signals(4, {0: 1}))
+
+        [trade] = result.trades
+        entry = 100 * (1 + SLIPPAGE)
+        tp = entry * 1.02
+        size = SETTINGS.initial_capital * SETTINGS.max_position_size * SETTINGS.leverage / entry
+        assert trade.exit_reason == "take_profit"
+        assert trade.entry_price == pytest.approx(entry)
+        assert trade.exit_price == pytest.approx(tp * (1 - SLIPPAGE))
+        expected_fees = size * entry * 0.001 + size * trade.exit_price * 0.001
+        assert trade.fees == pytest.approx(expected_fees)
+        assert trade.pnl == pytest.approx(size * (trade.exit_price - entry) - expected_fees)
+        # Переоценка по свечам сходится к PnL сделки
+        assert result.pnl.sum() == pytest.approx(trade.pnl)
+        assert result.pnl[0] == 0
+
+    def test_short_stop_loss_gap_fills_at_open(self):
+        history = make_history([100, 100, 103], open_=[100, 100, 103])
+        result = make_exchange(**NO_MANAGEMENT).run(history, make_signals(3, {0: -1}))
+
+        [trade] = result.trades
+        assert trade.side == "Sell"
+        assert trade.exit_reason == "stop_loss"
+        # Открытие выше SL (entry * 1.01) - исполнение по открытию
+        assert trade.exit_price == pytest.approx(103 * (1 + SLIPPAGE))
+        assert trade.pnl < 0
+
+    def test_stop_loss_wins_when_both_levels_touched(self):
+        history = make_history([100, 100, 100], high=[100, 100, 103], low=[100, 100, 98])
+        result = make_exchange(**NO_MANAGEMENT).run(history, make_signals(3, {0: 1}))
+
+        assert result.trades[0].exit_reason == "stop_loss"
+
+    def test_trailing_stop_locks_profit(self):
+        close = [100, 100, 100.6, 101.5, 100.9]
+        history = make_history(close, low=[100, 100, 100.4, 101.3, 100.9])
+        sltp = {**NO_MANAGEMENT, "trailing_stop": SLTP_CONFIG["trailing_stop"]}
+        result = make_exchange(**sltp).run(history, make_signals(5, {0: 1}))
+
+        [trade] = result.trades
+        # SL подтянут до 101.5 * (1 - 0.5%) и сработал на откате
+        assert trade.exit_reason == "stop_loss"
+        assert trade.exit_price == pytest.approx(101.5 * 0.995 * (1 - SLIPPAGE))
+        assert trade.pnl > 0
+        assert result.sltp_stats["evaluations"] == 3
+
+    def test_partial_take_profit_and_breakeven(self):
+        close = [100, 100, 101.2, 100.0]
+        sltp = {**NO_MANAGEMENT, "partial_take_profit": SLTP_CONFIG["partial_take_profit"]}
+        exchange = make_exchange(**sltp)
+        result = exchange.run(make_history(close), make_signals(4, {0: 1}))
+
+        [trade] = result.trades
+        entry = 100 * (1 + SLIPPAGE)
+        assert trade.partial_fills == 1
+        # После частичного TP SL перенесен в безубыток + 0.1%
+        assert trade.exit_reason == "stop_loss"
+        assert trade.exit_price == pytest.approx(entry * 1.001 * (1 - SLIPPAGE))
+        assert result.pnl.sum() == pytest.approx(trade.pnl)
+
+    def test_signals_ignored_while_position_open_and_reentry(self):
+        close = [100, 100, 100, 97, 97, 97]
+        signals = make_signals(6, {0: 1, 1: 1, 3: -1})
+        result = make_exchange(**NO_MANAGEMENT).run(make_history(close), signals)
+
+        assert [t.side for t in result.trades] == ["Buy", "Sell"]
+        assert result.trades[0].exit_reason == "stop_loss"
+        # Сигнал свечи выхода исполняется по открытию следующей
+        assert result.trades[1].entry_time == np.datetime64("2024-01-01T01:00")
+        assert result.trades[1].exit_reason == "end_of_data"
+        assert result.pnl.sum() == pytest.approx(sum(t.pnl for t in result.trades))
+
+    def test_signal_on_last_candle_not_executed(self):
+        result = make_exchange().run(make_history([100, 100]), make_signals(2, {1: 1}))
+        assert result.trades == []
+        assert result.signals == 1
+
+    def test_position_size_by_risk(self):
+        exchange = make_exchange()
+        # Риск 2% капитала при SL 1% = 200k, ограничено маржой 10% x5 = 50k
+        assert exchange.position_size(100, 0.01) == pytest.approx(500)
+        # Широкий SL: 2000 / 0.05 = 40k < 50k
+        assert exchange.position_size(100, 0.05) == pytest.approx(400)
+
+
+class TestSignals:
+    @staticmethod
+    def outputs(direction_class: int, rows: int = 3) -> np.ndarray:
+        outputs = np.zeros((rows, 20), dtype=np.float32)
+        outputs[:, 0:4] = 0.01 if direction_class == 0 else -0.01
+        logits = np.zeros((4, 3))
+        logits[:, direction_class] = 3.0
+        outputs[:, 4:16] = logits.reshape(-1)
+        outputs[:, 16:20] = 0.1
+        return outputs
+
+    def test_confident_long_passes(self):
+        signals = generate_signals(self.outputs(0), SignalQualityAnalyzer({}))
+
+        assert signals.side.tolist() == [1, 1, 1]
+        result = SignalQualityAnalyzer({}).analyze_signal_quality(
+            np.zeros(4, dtype=int),
+            list(np.tile([0.9094, 0.0453, 0.0453], (4, 1))),
+            np.full(4, 0.01),
+            np.full(4, 0.1),
+            0.0,
+        )
+        expected = signal_sltp_percent(result.quality_metrics.quality_score, np.full(4, 0.01))
+        assert signals.stop_loss_pct[0] == pytest.approx(expected[0], rel=1e-3)
+        assert signals.take_profit_pct[0] == pytest.approx(expected[1], rel=1e-3)
+
+    def test_short_signal(self):
+        signals = generate_signals(self.outputs(1), SignalQualityAnalyzer({}))
+        assert signals.side.tolist() == [-1, -1, -1]
+
+    def test_all_neutral_skips_analyzer(self):
+        analyzer = Mock()
+        signals = generate_signals(self.outputs(2), analyzer)
+
+        assert signals.count == 0
+        analyzer.analyze_signal_quality.assert_not_called()
+
+
+class TestMetrics:
+    def test_drawdown_and_trade_statistics(self):
+        equity = pd.Series([110.0, 99.0, 120.0, 108.0])
+        metrics = calculate_metrics(equity, np.array([10.0, -5.0, 20.0, -5.0]), 100.0, 4)
+
+        assert metrics["total_return"] == pytest.approx(0.08)
+        assert metrics["max_drawdown"] == pytest.approx(0.1)
+        assert metrics["win_rate"] == 0.5
+        assert metrics["profit_factor"] == pytest.approx(3.0)
+        assert metrics["expectancy"] == pytest.approx(5.0)
+        assert metrics["total_trades"] == 4
+        # 4 свечи = 1 год: годовая доходность равна общей
+        assert metrics["calmar_ratio"] == pytest.approx(0.8)
+
+    def test_selected_metrics_only(self):
+        metrics = calculate_metrics(
+            pd.Series([100.0]), np.array([]), 100.0, 35040, ["sharpe_ratio"]
+        )
+        assert metrics == {"sharpe_ratio": 0.0, "total_trades": 0}
+
+    def test_max_drawdown_of_rising_curve(self):
+        assert max_drawdown(np.array([1.0, 2.0, 3.0])) == 0.0
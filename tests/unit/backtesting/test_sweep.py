@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Unit тесты перебора параметров и walk-forward по готовым выходам модели
+"""
+
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting import (
+    BacktestEngine,
+    ModelHistory,
+    ParameterSpace,
+    ParameterSweep,
+    SweepSettings,
+    sweep as sweep_module,
+)
+from backtesting.sweep import apply_overrides, plan_tasks, walk_forward_splits
+from tests.fixtures.backtest_fixtures import make_backtest_config, make_candles, make_model_history
+
+# 16 дней 15m свечей
+CANDLES = 16 * 96
+SPACE = {
+    "signal_filtering.strategy": ["aggressive", "conservative"],
+    "signal_filtering.aggressive.min_quality_score": [0.0, 0.75],
+    "enhanced_sltp.trailing_stop.step": [0.3, 0.8],
+}
+
+
+@pytest.fixture(scope="module")
+def histories():
+    return {
+        symbol: make_model_history(symbol, make_candles(CANDLES - 96 * i, seed=i), seed=i)
+        for i, symbol in enumerate(["AAAUSDT", "BBBUSDT"])
+    }
+
+
+@pytest.fixture
+def config(tmp_path):
+    return make_backtest_config(tmp_path)
+
+
+def make_sweep(config, **settings) -> ParameterSweep:
+    defaults = {"train_days": 6, "test_days": 2, "max_workers": 1}
+    return ParameterSweep(config, ParameterSpace(SPACE), SweepSettings(**{**defaults, **settings}))
+
+
+class TestParameterSpace:
+    def test_grid(self):
+        space = ParameterSpace(SPACE)
+        grid = space.grid()
+
+        assert len(space) == len(grid) == 8
+        assert grid[0] == {
+            "signal_filtering.strategy": "aggressive",
+            "signal_filtering.aggressive.min_quality_score": 0.0,
+            "enhanced_sltp.trailing_stop.step": 0.3,
+        }
+        assert len({tuple(item.values()) for item in grid}) == 8
+
+    def test_sample_is_reproducible_and_unique(self):
+        space = ParameterSpace(
+            {
+                "enhanced_sltp.trailing_stop.step": {"low": 0.1, "high": 1.0},
+                "backtesting.risk_per_trade": {"low": 0.001, "high": 0.1, "log": True},
+                "enhanced_sltp.profit_protection.max_updates": {
+                    "low": 1,
+                    "high": 9,
+                    "integer": True,
+                },
+                "enhanced_sltp.partial_take_profit.levels": [
+                    [{"percent": 1.0, "close_ratio": 0.5}],
+                    [],
+                ],
+            }
+        )
+        first = space.sample(20, seed=7)
+
+        assert first == space.sample(20, seed=7)
+        assert len(first) == 20
+        assert all(0.1 <= item["enhanced_sltp.trailing_stop.step"] <= 1.0 for item in first)
+        assert all(0.001 <= item["backtesting.risk_per_trade"] <= 0.1 for item in first)
+        assert all(
+            isinstance(item["enhanced_sltp.profit_protection.max_updates"], int) for item in first
+        )
+        with pytest.raises(ValueError):
+            space.grid()
+
+    def test_sample_capped_by_grid_size(self):
+        assert len(ParameterSpace(SPACE).sample(100, seed=1)) == 8
+
+    @pytest.mark.parametrize("parameters", [{}, {"a.b": []}, {"a.b": {"low": 2, "high": 1}}])
+    def test_invalid_space(self, parameters):
+        with pytest.raises(ValueError):
+            ParameterSpace(parameters)
+
+
+def test_apply_overrides_copies_and_seeds_filter_defaults(config):
+    result = apply_overrides(
+        config,
+        {
+            "signal_filtering.moderate.min_quality_score": 0.9,
+            "enhanced_sltp.trailing_stop.step": 0.7,
+            "backtesting.new.nested": 1,
+        },
+    )
+
+    # Остальные пороги moderate - значения по умолчанию SignalQualityAnalyzer
+    assert result["signal_filtering"]["moderate"]["min_quality_score"] == 0.9
+    assert result["signal_filtering"]["moderate"]["min_timeframe_agreement"] == 3
+    assert result["enhanced_sltp"]["trailing_stop"]["step"] == 0.7
+    assert result["backtesting"]["new"] == {"nested": 1}
+    assert "moderate" not in config["signal_filtering"]
+    assert config["enhanced_sltp"]["trailing_stop"]["step"] == 0.5
+
+
+class TestWalkForwardSplits:
+    def test_rolling(self):
+        folds = walk_forward_splits("2024-01-01", "2024-01-11", "4D", "2D")
+
+        assert len(folds) == 3
+        assert folds[0].train_start == np.datetime64("2024-01-01")
+        assert folds[0].test_start == folds[0].train_end == np.datetime64("2024-01-05")
+        assert folds[-1].test_end == np.datetime64("2024-01-11")
+        assert folds[1].train_start == np.datetime64("2024-01-03")
+
+    def test_anchored_with_step(self):
+        folds = walk_forward_splits(
+            "2024-01-01", "2024-01-11", "4D", "2D", step="1D", anchored=True
+        )
+
+        assert len(folds) == 5
+        assert all(fold.train_start == np.datetime64("2024-01-01") for fold in folds)
+        assert folds[-1].train_end == np.datetime64("2024-01-09")
+
+    def test_invalid_length(self):
+        with pytest.raises(ValueError):
+            walk_forward_splits("2024-01-01", "2024-01-11", "4D", "0D")
+
+
+def test_plan_tasks_groups_by_filter(config):
+    grid = ParameterSpace(SPACE).grid()
+    configs = [(i, apply_overrides(config, item)) for i, item in enumerate(grid)]
+
+    tasks = plan_tasks(configs, workers=1)
+    # 2 стратегии x 2 порога aggressive = 4 секции signal_filtering, шаг trailing внутри
+    assert sorted(len(task) for task in tasks) == [2, 2, 2, 2]
+
+    assert len(plan_tasks(configs, workers=6)) == 6
+    assert len(plan_tasks(configs[:1], workers=4)) == 1
+
+
+class TestParameterSweep:
+    def test_ranking_and_consistency_with_engine(self, config, histories):
+        result = make_sweep(config).run(histories)
+        ranking = result.ranking
+
+        assert len(ranking) == 8
+        assert ranking["rank"].tolist() == list(range(1, 9))
+        sharpe = ranking["sharpe_ratio"].to_numpy()
+        assert np.all(np.diff(sharpe) <= 1e-12)
+
+        # Метрики на всей истории совпадают с прогоном BacktestEngine.simulate
+        best = ranking.iloc[0]
+        overrides = {path: best[path] for path in SPACE}
+        expected = BacktestEngine(config).simulate(histories, apply_overrides(config, overrides))
+        for name, value in expected.metrics.items():
+            assert best[name] == pytest.approx(value, rel=1e-9, abs=1e-9)
+
+    def test_walk_forward(self, config, histories):
+        result = make_sweep(config).run(histories)
+        folds = walk_forward_splits(
+            "2024-01-01", "2024-01-17", pd.Timedelta(days=6), pd.Timedelta(days=2)
+        )
+
+        assert len(result.walk_forward) == len(folds) == 5
+        rows = result.results
+        assert len(rows[rows["segment"] == "train"]) == len(rows[rows["segment"] == "test"]) == 40
+        for _, selected in result.walk_forward.iterrows():
+            train = rows[(rows["segment"] == "train") & (rows["fold"] == selected["fold"])]
+            assert selected["train_sharpe_ratio"] == train["sharpe_ratio"].max()
+        # Сделки out-of-sample - сумма сделок выбранных конфигураций на test
+        assert result.oos_metrics["total_trades"] == result.walk_forward["test_total_trades"].sum()
+
+    def test_signals_computed_once_per_filter(self, config, histories, monkeypatch):
+        calls = []
+        original = sweep_module.generate_signals
+
+        def counting(outputs, analyzer):
+            calls.append(analyzer.active_strategy)
+            return original(outputs, analyzer)
+
+        monkeypatch.setattr(sweep_module, "generate_signals", counting)
+        make_sweep(config, train_days=None).run(histories)
+
+        # 4 секции signal_filtering x 2 символа, шаг trailing сигналы не пересчитывает
+        assert len(calls) == 8
+
+    def test_drawdown_limit_ranks_ineligible_last(self, config, histories):
+        free = make_sweep(config, train_days=None).run(histories).ranking
+        limit = float(free["max_drawdown"].median())
+        limited = make_sweep(config, train_days=None, max_drawdown=limit).run(histories).ranking
+
+        eligible = limited["eligible"].to_numpy()
+        assert eligible.any() and not eligible.all()
+        assert np.all(np.diff(eligible.astype(int)) <= 0)
+        assert (limited.loc[limited["eligible"], "max_drawdown"] <= limit).all()
+
+    def test_process_pool_matches_inline(self, config, histories):
+        inline = make_sweep(config).run(histories)
+        pooled = make_sweep(config, max_workers=2).run(histories)
+
+        pd.testing.assert_frame_equal(inline.results, pooled.results)
+        pd.testing.assert_frame_equal(inline.walk_forward, pooled.walk_forward)
+
+    def test_unknown_objective(self, config):
+        with pytest.raises(ValueError):
+            make_sweep(config, objective="sortino")
+
+    def test_settings_from_config(self, config):
+        config["backtesting"]["sweep"] = {
+            "objective": "calmar_ratio",
+            "train_days": 30,
+            "parameters": {"enhanced_sltp.trailing_stop.step": [0.3, 0.5]},
+        }
+        sweep = ParameterSweep(config)
+
+        assert sweep.settings.objective == "calmar_ratio"
+        assert sweep.settings.train_days == 30
+        assert len(sweep.candidates()) == 2
+
+    def test_to_parquet(self, config, histories, tmp_path):
+        pytest.importorskip("pyarrow")
+        result = make_sweep(config).run(histories)
+        path = result.to_parquet(tmp_path / "sweep" / "results.parquet")
+
+        loaded = pd.read_parquet(path)
+        assert len(loaded) == len(result.results)
+        assert loaded["rank"].iloc[0] == 1
+        assert (tmp_path / "sweep" / "results_walk_forward.parquet").exists()
+
+
+def test_model_history_roundtrip(histories, tmp_path):
+    history = replace(histories["AAAUSDT"], timings={"features": 1.5})
+    history.save(tmp_path / "AAAUSDT.npz")
+
+    loaded = ModelHistory.load(tmp_path / "AAAUSDT.npz")
+    assert loaded.symbol == "AAAUSDT"
+    assert loaded.timings == {"features": 1.5}
+    np.testing.assert_array_equal(loaded.timestamps, history.timestamps)
+    np.testing.assert_array_equal(loaded.outputs, history.outputs)
@@ -0,0 +1,72 @@
+"""
+Unit тесты ленивых импортов и профайлера импорта
+"""
+
+import sys
+import types
+
+from core.lazy_imports import LazyModule, lazy_exports, lazy_module, loaded_subsystems
+from core.startup_profiler import ImportProfiler, start_if_requested
+
+
+class TestLazyImports:
+    """Ленивые модули и экспорт пакета"""
+
+    def test_lazy_module_imports_on_first_access(self):
+        sys.modules.pop("colorsys", None)
+        module = lazy_module("colorsys")
+
+        assert isinstance(module, LazyModule)
+        assert "colorsys" not in sys.modules
+        assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert "colorsys" in sys.modules
+
+    def test_lazy_module_returns_loaded_module(self):
+        assert lazy_module("json") is sys.modules["json"]
+
+    def test_lazy_exports(self, monkeypatch):
+        package = types.ModuleType("fake_package")
+        monkeypatch.setitem(sys.modules, "fake_package", package)
+        package.__getattr__ = lazy_exports("fake_package", {"dumps": "json"})
+
+        assert package.__getattr__("dumps") is sys.modules["json"].dumps
+        # Значение кешируется в пакете
+        assert package.__dict__["dumps"] is sys.modules["json"].dumps
+
+        try:
+            package.__getattr__("missing")
+        except AttributeError as e:
+            assert "missing" in str(e)
+        else:
+            raise AssertionError("AttributeError не выброшен")
+
+    def test_loaded_subsystems(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "plotly", types.ModuleType("plotly"))
+        assert "plotly" in loaded_subsystems()["visualization"]
+
+
+class TestImportProfiler:
+    """Замер времени импорта"""
+
+    def test_records_import_times(self):
+        sys.modules.pop("wave", None)
+        profiler = ImportProfiler()
+        profiler.start()
+        try:
+            import wave  # noqa: F401
+        finally:
+            profiler.stop()
+
+        assert not profiler.active
+        assert "wave" in profiler.records
+        record = profiler.records["wave"]
+        assert 0 <= record.self_time <= record.cumulative
+        # Модуль видит исходный загрузчик
+        assert type(sys.modules["wave"].__loader__).__name__ != "_TimedLoader"
+
+        report = profiler.report()
+        assert "wave" in report
+        assert "По деревьям модулей" in report
+
+    def test_start_if_requested(self):
+        assert start_if_requested(["main.py"]) is False
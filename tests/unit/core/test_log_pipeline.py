@@ -0,0 +1,134 @@
+"""
+Unit тесты неблокирующего пайплайна логирования
+"""
+
+import logging
+import threading
+
+from core.logging.log_pipeline import LogPipeline, SamplingFilter, handlers_of, lazy_message
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.messages: list[str] = []
+        self.threads: set[str] = set()
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+class _BlockingHandler(_ListHandler):
+    def __init__(self):
+        super().__init__()
+        self.unblock = threading.Event()
+
+    def emit(self, record):
+        self.unblock.wait(5)
+        super().emit(record)
+
+
+def _logger(name: str, *handlers: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"test_log_pipeline.{name}")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    for handler in handlers:
+        logger.addHandler(handler)
+    return logger
+
+
+class TestLogPipeline:
+    """Фоновая запись, переполнение и ленивые сообщения"""
+
+    def test_records_written_in_background_thread(self):
+        pipeline = LogPipeline()
+        target = _ListHandler()
+        errors = _ListHandler(logging.ERROR)
+        logger = pipeline.attach(_logger("background", target, errors))
+
+        logger.info("price %s", 100)
+        logger.error("failed")
+        assert pipeline.flush()
+        pipeline.stop()
+
+        assert target.messages == ["price 100", "failed"]
+        assert errors.messages == ["failed"]
+        assert target.threads == {"log-pipeline"}
+        assert handlers_of(logger) == [target, errors]
+        assert pipeline.get_stats()["processed"] == 2
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        pipeline = LogPipeline(queue_size=2)
+        target = _BlockingHandler()
+        logger = pipeline.attach(_logger("drops", target))
+
+        for i in range(10):
+            logger.info("record %d", i)
+
+        stats = pipeline.get_stats()
+        assert stats["dropped_total"] >= 7
+        assert stats["dropped"] == {logger.name: stats["dropped_total"]}
+
+        target.unblock.set()
+        pipeline.stop()
+        # При остановке пайплайн сообщает о пропущенных записях
+        assert "пропущено" in target.messages[-1]
+
+    def test_lazy_message_formatted_only_when_written(self):
+        pipeline = LogPipeline()
+        target = _ListHandler(logging.INFO)
+        logger = pipeline.attach(_logger("lazy", target))
+        calls = []
+
+        def table(symbol):
+            calls.append(threading.current_thread().name)
+            return f"table {symbol}"
+
+        logger.debug(lazy_message(table, "BTCUSDT"))  # отброшено уровнем обработчика
+        logger.info(lazy_message(table, "ETHUSDT"))
+        pipeline.flush()
+        pipeline.stop()
+
+        assert target.messages == ["table ETHUSDT"]
+        assert calls == ["log-pipeline"]
+
+    def test_disabled_pipeline_keeps_handlers(self):
+        pipeline = LogPipeline(enabled=False)
+        target = _ListHandler()
+        logger = pipeline.attach(_logger("disabled", target))
+
+        logger.info("sync")
+        assert logger.handlers == [target]
+        assert target.messages == ["sync"]
+
+
+class TestSamplingFilter:
+    """Ограничение частоты по логгерам"""
+
+    def test_rate_limit_by_logger_prefix(self):
+        sampler = SamplingFilter({"ml": 0.001, "ml.critical_path": 1000}, burst=3)
+
+        def record(name, level=logging.INFO):
+            return logging.makeLogRecord({"name": name, "levelno": level})
+
+        passed = [sampler.filter(record("ml.indicators")) for _ in range(10)]
+        assert passed.count(True) == 3
+        assert sampler.suppressed == {"ml.indicators": 7}
+
+        # WARNING и другие логгеры не ограничиваются
+        assert sampler.filter(record("ml.indicators", logging.WARNING))
+        assert all(sampler.filter(record("trading")) for _ in range(10))
+        assert all(sampler.filter(record("ml.critical_path")) for _ in range(3))
+
+
+class TestLogDirectory:
+    """Каталог файловых логов"""
+
+    def test_log_directory_from_env(self, monkeypatch, tmp_path):
+        from core.logger import log_directory
+
+        monkeypatch.setenv("BOT_AI_V3_LOG_DIR", str(tmp_path / "logs"))
+        assert log_directory() == tmp_path / "logs"
+        assert (tmp_path / "logs").is_dir()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Тесты MarketDataCache на кольцевом буфере OHLCV
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.cache.market_data_cache import MarketDataCache
+from core.cache.ohlcv_ring_buffer import OHLCV_FIELDS, OHLCVRingBuffer
+
+
+def make_candles(n: int, start: str = "2024-01-01", seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "open": close - 0.5,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": rng.uniform(10, 20, n),
+            "turnover": rng.uniform(1000, 2000, n),
+        },
+        index=pd.date_range(start, periods=n, freq="15min", tz="UTC", name="datetime"),
+    )
+
+
+def reference_update(existing: pd.DataFrame, new_data: pd.DataFrame, size: int) -> pd.DataFrame:
+    """Прежняя реализация инкрементального обновления на pandas"""
+    combined = pd.concat([existing, new_data])
+    combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+    return combined.iloc[-size:]
+
+
+class TestOHLCVRingBuffer:
+    def test_wraparound_keeps_latest_contiguous(self):
+        buffer = OHLCVRingBuffer(capacity=5)
+        for i in range(12):
+            buffer.append(i, i, i, i, float(i), 1.0)
+
+        view = buffer.view()
+
+        assert len(buffer) == 5
+        assert view["ts"].tolist() == [7, 8, 9, 10, 11]
+        assert buffer.view(2)["close"].tolist() == [10.0, 11.0]
+        assert view.base is not None  # Срез, а не копия
+        assert not view.flags.writeable
+
+    def test_update_overwrites_last_and_older_candles(self):
+        buffer = OHLCVRingBuffer(capacity=4)
+        for i in range(6):
+            buffer.append(i, 0, 0, 0, float(i), 0)
+
+        assert buffer.update(5, 0, 0, 0, 50.0, 0)
+        assert buffer.update(3, 0, 0, 0, 30.0, 0)
+        assert not buffer.update(0, 0, 0, 0, 1.0, 0)  # Уже вытеснена
+
+        assert buffer.view()["close"].tolist() == [2.0, 30.0, 4.0, 50.0]
+
+    def test_frame_round_trip(self):
+        df = make_candles(50)
+        buffer = OHLCVRingBuffer(capacity=30)
+        buffer.load_frame(df)
+
+        pd.testing.assert_frame_equal(buffer.to_frame(), df.iloc[-30:], check_freq=False)
+
+
+@pytest.mark.asyncio
+class TestMarketDataCache:
+    async def test_incremental_updates_match_pandas_reference(self):
+        cache = MarketDataCache(cache_size=100)
+        history = make_candles(120)
+        await cache.update_data("BTCUSDT", history.iloc[:90], is_complete=True)
+        expected = history.iloc[:90]
+
+        # Перекрывающиеся пакеты с пересчитанными свечами
+        for start in range(85, 120, 5):
+            batch = history.iloc[start : start + 7].copy()
+            batch["close"] += 0.25
+            await cache.update_data("BTCUSDT", batch)
+            expected = reference_update(expected, batch, 100)
+
+        result = await cache.get_data("BTCUSDT", required_candles=1)
+        pd.testing.assert_frame_equal(result, expected[OHLCV_FIELDS], check_freq=False)
+
+    async def test_update_last_candle(self):
+        cache = MarketDataCache(cache_size=100)
+        history = make_candles(96)
+        await cache.update_data("ETHUSDT", history, is_complete=True)
+
+        last_time = history.index[-1]
+        await cache.update_last_candle(
+            "ETHUSDT",
+            {"timestamp": last_time, "open": 1, "high": 2, "low": 0.5, "close": 1.5, "volume": 3},
+        )
+        next_time = last_time + pd.Timedelta(minutes=15)
+        await cache.update_last_candle(
+            "ETHUSDT",
+            {
+                "timestamp": next_time.tz_localize(None),
+                "open": 2,
+                "high": 3,
+                "low": 1,
+                "close": 2.5,
+                "volume": 4,
+                "turnover": 10,
+            },
+        )
+
+        df = await cache.get_data("ETHUSDT", required_candles=97)
+
+        assert len(df) == 97
+        assert df.loc[last_time, "close"] == 1.5
+        assert df.loc[last_time, "turnover"] == history["turnover"].iloc[-1]
+        assert df.index[-1] == next_time
+        assert df["turnover"].iloc[-1] == 10
+
+    async def test_get_data_returns_independent_copy(self):
+        cache = MarketDataCache(cache_size=200)
+        await cache.update_data("BTCUSDT", make_candles(100), is_complete=True)
+
+        df = await cache.get_data("BTCUSDT")
+        df["close"] = 0.0
+        view = await cache.get_view("BTCUSDT")
+
+        assert (view["close"] != 0).all()
+        assert await cache.get_data("BTCUSDT", required_candles=101) is None
+        assert cache.get_stats()["cache_hits"] == 2
+        assert cache.get_stats()["cache_misses"] == 1
+        assert cache.needs_update("BTCUSDT")[1] in ("none", "last")
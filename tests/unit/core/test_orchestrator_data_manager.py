@@ -0,0 +1,75 @@
+"""
+Unit тесты подключения SmartDataManager к SignalScheduler в SystemOrchestrator
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.system.orchestrator import SystemOrchestrator
+
+
+def make_scheduler(mode: str) -> MagicMock:
+    scheduler = MagicMock(mode=mode)
+    scheduler.initialize = AsyncMock()
+    scheduler.start = AsyncMock()
+    return scheduler
+
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = SystemOrchestrator(MagicMock())
+    orchestrator.config = SimpleNamespace(ml=SimpleNamespace(enabled=True))
+    orchestrator.system_config = SimpleNamespace()
+    orchestrator.trading_engine = MagicMock()
+    return orchestrator
+
+
+class TestOrchestratorDataManager:
+    """Пакетный режим получает события закрытия свечи от SmartDataManager"""
+
+    async def test_candle_close_mode_creates_and_attaches_data_manager(self, orchestrator):
+        scheduler = make_scheduler("candle_close")
+        data_manager = MagicMock()
+        with (
+            patch("ml.signal_scheduler.SignalScheduler", return_value=scheduler),
+            patch(
+                "core.system.smart_data_manager.SmartDataManager", return_value=data_manager
+            ) as manager_class,
+        ):
+            await orchestrator._initialize_signal_scheduler()
+
+        manager_class.assert_called_once_with(orchestrator.config_manager)
+        assert orchestrator.data_manager is data_manager
+        scheduler.attach_data_manager.assert_called_once_with(data_manager)
+        assert "signal_scheduler" in orchestrator.active_components
+
+    async def test_interval_mode_runs_without_data_manager(self, orchestrator):
+        scheduler = make_scheduler("interval")
+        with (
+            patch("ml.signal_scheduler.SignalScheduler", return_value=scheduler),
+            patch("core.system.smart_data_manager.SmartDataManager") as manager_class,
+        ):
+            await orchestrator._initialize_signal_scheduler()
+
+        manager_class.assert_not_called()
+        assert orchestrator.data_manager is None
+        scheduler.attach_data_manager.assert_not_called()
+
+    async def test_data_manager_started_before_scheduler(self, orchestrator):
+        started = []
+        orchestrator.trader_manager = None
+        orchestrator.trading_engine = None
+        orchestrator.data_manager = MagicMock(
+            start=AsyncMock(side_effect=lambda: started.append("data_manager"))
+        )
+        orchestrator.signal_scheduler = MagicMock(
+            start=AsyncMock(side_effect=lambda: started.append("signal_scheduler"))
+        )
+
+        with patch.dict("os.environ", {"UNIFIED_MODE": "true"}):
+            await orchestrator._build_start_graph().run()
+
+        assert started == ["data_manager", "signal_scheduler"]
+        assert "data_manager" in orchestrator.active_components
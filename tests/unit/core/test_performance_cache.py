@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Тесты PerformanceCache: LRU, TTL, учет байт и квоты пространств имен
+"""
+
+import numpy as np
+import pytest
+
+from core.system import performance_cache as module
+from core.system.performance_cache import PerformanceCache, estimate_size
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(module.time, "monotonic", fake)
+    return fake
+
+
+@pytest.mark.asyncio
+class TestPerformanceCache:
+    async def test_lru_eviction_respects_access_order(self):
+        cache = PerformanceCache(max_size=3)
+        for key in ("a", "b", "c"):
+            await cache.set(key, key)
+
+        assert await cache.get("a") == "a"  # a становится самым свежим
+        await cache.set("d", "d")
+
+        assert await cache.get("b") is None
+        assert [await cache.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+        assert cache.get_stats()["evictions"] == 1
+
+    async def test_ttl_expiry_on_get_and_cleanup(self, clock):
+        cache = PerformanceCache(default_ttl=10)
+        await cache.set("short", 1, ttl=5)
+        await cache.set("long", 2)
+        await cache.set("renewed", 3, ttl=5)
+
+        clock.now += 3
+        await cache.set("renewed", 4, ttl=5)  # Новый срок, старый элемент кучи устарел
+        clock.now += 3
+
+        assert await cache.get("short") is None
+        await cache._cleanup_expired()
+        assert await cache.get("renewed") == 4
+        assert await cache.get("long") == 2
+
+        clock.now += 10
+        await cache._cleanup_expired()
+        stats = cache.get_stats()
+        assert stats["size"] == 0
+        assert stats["expirations"] == 3
+
+    async def test_byte_budget_evicts_lru(self):
+        array = np.zeros(1000)  # 8000 байт
+        cache = PerformanceCache(max_bytes=20_000)
+
+        await cache.set("a", array)
+        await cache.set("b", array)
+        await cache.set("c", array)
+        await cache.set("huge", np.zeros(10_000))  # Больше лимита - не кешируется
+
+        stats = cache.get_stats()
+        assert await cache.get("a") is None
+        assert await cache.get("huge") is None
+        assert stats["size"] == 2
+        assert stats["bytes"] == 16_000
+
+        await cache.delete("b")
+        assert cache.get_stats()["bytes"] == 8_000
+
+    async def test_namespace_quotas(self):
+        cache = PerformanceCache(namespace_quotas={"market_data": 2})
+        for symbol in ("BTCUSDT", "ETHUSDT", "SOLUSDT"):
+            await cache.cache_market_data(symbol, "15m", symbol)
+        for period in range(5):
+            await cache.cache_indicator("BTCUSDT", "RSI", period, period)
+
+        assert await cache.get_market_data("BTCUSDT", "15m") is None
+        assert await cache.get_market_data("SOLUSDT", "15m") == "SOLUSDT"
+        assert await cache.get_indicator("BTCUSDT", "RSI", 0) == 0
+        assert cache.get_stats()["namespaces"] == {"market_data": 2}
+
+    async def test_memory_pressure_and_clear(self):
+        cache = PerformanceCache(max_size=10)
+        for i in range(10):
+            await cache.set(f"k{i}", i)
+
+        await cache._check_memory_pressure()
+        assert cache.get_stats()["size"] == 8
+        assert await cache.get("k0") is None
+
+        await cache.clear()
+        assert cache.get_stats()["size"] == 0
+        assert cache.get_stats()["bytes"] == 0
+
+
+def test_estimate_size():
+    assert estimate_size(np.zeros(10)) == 80
+    assert estimate_size(b"x" * 100) >= 100
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Push-обновления свечей SmartDataManager через WebSocket Bybit
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.system.smart_data_manager import SmartDataManager
+from data.candle_writer import CandleWriter
+from tests.fixtures.fake_bybit_ws import (  # noqa: F401
+    fake_bybit_server_fixture,
+    kline_message,
+    wait_for,
+)
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT"]
+CANDLES = 100
+# Открытие последней свечи в кеше
+LAST_START = pd.Timestamp("2024-01-02 00:45", tz="UTC")
+
+
+def make_history() -> pd.DataFrame:
+    index = pd.date_range(end=LAST_START, periods=CANDLES, freq="15min", name="datetime")
+    close = 100 + np.arange(CANDLES, dtype=float)
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0},
+        index=index,
+    )
+
+
+@pytest.fixture
+async def manager(fake_bybit_server):
+    config_manager = MagicMock()
+    config_manager.get_config.return_value = {
+        "trading_pairs": SYMBOLS,
+        "data_management": {
+            "min_candles_for_ml": 96,
+            "cache_ttl": 60,
+            "websocket": {"url": fake_bybit_server.url, "close_notify_delay": 0},
+        },
+    }
+    manager = SmartDataManager(config_manager)
+    manager.db_manager = AsyncMock()
+    manager.candle_writer = CandleWriter(repository=AsyncMock(), flush_interval=0.2)
+    manager.is_running = True
+    for symbol in SYMBOLS:
+        await manager.cache.update_data(symbol, make_history(), is_complete=True)
+
+    await manager._start_websockets()
+    await wait_for(lambda: len(fake_bybit_server.subscribed_topics()) == len(SYMBOLS))
+    yield manager
+    await manager.stop()
+
+
+def start_ms(ts: pd.Timestamp) -> int:
+    return int(ts.timestamp() * 1000)
+
+
+async def test_kline_push_updates_cache(manager, fake_bybit_server):
+    """Текущая свеча обновляется, новая добавляется без REST запросов"""
+    await fake_bybit_server.push(kline_message("BTCUSDT", start_ms(LAST_START), 555.0))
+    await wait_for(lambda: manager.cache.get_stats()["last_candles_updated"] == 1)
+
+    data = await manager.get_data("BTCUSDT", 96)
+    assert data["close"].iloc[-1] == 555.0
+    assert len(data) == CANDLES
+
+    next_start = LAST_START + pd.Timedelta(minutes=15)
+    await fake_bybit_server.push(kline_message("BTCUSDT", start_ms(next_start), 556.0))
+    await wait_for(lambda: manager.cache._data_cache["BTCUSDT"].last_ts == next_start.value)
+
+    # Свежий кеш - polling не нужен
+    assert manager.cache.needs_update("BTCUSDT") == (False, "none")
+
+
+async def test_confirmed_candle_saved_once_and_notifies(manager, fake_bybit_server):
+    """
+    Закрытая свеча сохраняется в БД один раз, колбэки вызываются один раз на закрытие,
+    закрытия всех символов пишутся одной пачкой
+    """
+    callback = AsyncMock()
+    manager.register_update_callback(callback)
+
+    for symbol in SYMBOLS:
+        await fake_bybit_server.push(
+            kline_message(symbol, start_ms(LAST_START), 200.0, confirm=True)
+        )
+    # Повтор подтверждения не пишет в БД повторно
+    await fake_bybit_server.push(
+        kline_message("BTCUSDT", start_ms(LAST_START), 200.0, confirm=True)
+    )
+
+    await wait_for(lambda: callback.await_count == 1)
+    repository = manager.candle_writer._repository
+    await wait_for(lambda: repository.save_candles.await_count == 1)
+    saved = repository.save_candles.await_args.args[0]
+    assert sorted(candle.symbol for candle in saved) == SYMBOLS
+    assert {candle.timestamp for candle in saved} == {start_ms(LAST_START)}
+    assert manager.candle_writer.get_stats()["queue_depth"] == 0
+
+
+async def test_unknown_symbol_ignored(manager):
+    from exchanges.base.websocket_base import MessageType, WebSocketMessage
+
+    message = WebSocketMessage(
+        MessageType.DATA,
+        channel="kline.15",
+        symbol="FOOUSDT",
+        data=kline_message("FOOUSDT", start_ms(LAST_START), 1.0)["data"],
+    )
+    await manager._on_kline_message(message)
+
+    assert "FOOUSDT" not in manager.cache._data_cache
+
+
+async def test_stream_activity_controls_minute_loop_notify(manager, fake_bybit_server):
+    """Минутный цикл вызывает колбэки, только пока поток не присылает свечи"""
+    assert not manager._stream_active()
+
+    await fake_bybit_server.push(kline_message("BTCUSDT", start_ms(LAST_START), 555.0))
+    await wait_for(lambda: manager._last_ws_message is not None)
+    assert manager._stream_active()
+
+    # Поток отстал
+    manager.ws_config["stall_timeout"] = 0
+    assert not manager._stream_active()
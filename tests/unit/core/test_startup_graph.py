@@ -0,0 +1,129 @@
+"""
+Unit тесты графа запуска компонентов
+"""
+
+import asyncio
+
+import pytest
+
+from core.system.startup_graph import STATUS_FAILED, STATUS_SKIPPED, StartupGraph
+
+
+def _step(log: list, name: str, delay: float = 0.0, error: Exception | None = None):
+    async def run():
+        log.append(f"{name}:start")
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        log.append(f"{name}:end")
+
+    return run
+
+
+class TestStartupGraph:
+    """Порядок, параллельность и ошибки шагов"""
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self):
+        log = []
+        graph = StartupGraph()
+        graph.add("db", _step(log, "db", 0.05))
+        graph.add("ml", _step(log, "ml", 0.05))
+        graph.add("engine", _step(log, "engine"), ["db"])
+
+        report = await graph.run()
+
+        assert log.index("ml:start") < log.index("db:end")
+        assert log.index("engine:start") > log.index("db:end")
+        assert report.total < report.sequential_total
+        assert set(report.to_dict()["steps"]) == {"db", "ml", "engine"}
+
+    @pytest.mark.asyncio
+    async def test_sequential_mode(self):
+        log = []
+        graph = StartupGraph(parallel=False)
+        graph.add("a", _step(log, "a", 0.01))
+        graph.add("b", _step(log, "b", 0.01))
+
+        await graph.run()
+
+        assert log == ["a:start", "a:end", "b:start", "b:end"]
+
+    @pytest.mark.asyncio
+    async def test_critical_failure_raises_and_skips_dependents(self):
+        log = []
+        graph = StartupGraph()
+        graph.add("db", _step(log, "db", error=RuntimeError("db down")), critical=True)
+        graph.add("engine", _step(log, "engine"), ["db"])
+        graph.add("slow", _step(log, "slow", 1.0))
+
+        with pytest.raises(RuntimeError, match="db down"):
+            await graph.run()
+
+        assert "engine:start" not in log
+        assert "slow:end" not in log
+        assert graph.status("db") == STATUS_FAILED
+
+    @pytest.mark.asyncio
+    async def test_non_critical_failure_keeps_dependents(self):
+        log = []
+        graph = StartupGraph()
+        graph.add("ml", _step(log, "ml", error=RuntimeError("no model")))
+        graph.add("signals", _step(log, "signals"), ["ml"])
+
+        await graph.run()
+
+        assert graph.status("ml") == STATUS_FAILED
+        assert "signals:end" in log
+
+    @pytest.mark.asyncio
+    async def test_lazy_steps_run_in_background(self):
+        log = []
+        release = asyncio.Event()
+
+        async def telegram():
+            await release.wait()
+            log.append("telegram:end")
+
+        graph = StartupGraph()
+        graph.add("db", _step(log, "db"))
+        graph.add("telegram", telegram, lazy=True)
+        graph.add("maintenance", _step(log, "maintenance"), lazy=True)
+        graph.add("data", _step(log, "data"), ["maintenance"])
+
+        report = await graph.run()
+
+        # maintenance нужен неленивому шагу и выполняется сразу
+        assert "maintenance:end" in log and "data:end" in log
+        assert "telegram:end" not in log
+        assert not report.steps["maintenance"].lazy
+
+        release.set()
+        await graph.ensure("telegram")
+        assert "telegram:end" in log
+        assert report.steps["telegram"].lazy
+
+    @pytest.mark.asyncio
+    async def test_skipped_propagates(self):
+        graph = StartupGraph()
+        graph.add("a", _step([], "a", error=RuntimeError("x")), critical=True, lazy=True)
+        graph.add("b", _step([], "b"), ["a"], lazy=True)
+        graph.add("c", _step([], "c"))
+
+        await graph.run()
+        await graph.wait_lazy()
+
+        assert graph.status("a") == STATUS_FAILED
+        assert graph.status("b") == STATUS_SKIPPED
+
+    def test_invalid_graph(self):
+        graph = StartupGraph()
+        graph.add("a", _step([], "a"), ["b"])
+        graph.add("b", _step([], "b"), ["a"])
+        with pytest.raises(ValueError, match="Цикл"):
+            graph._order()
+
+        graph = StartupGraph()
+        graph.add("a", _step([], "a"), ["missing"])
+        with pytest.raises(ValueError, match="неизвестных"):
+            graph._order()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Unit tests for COPY-based bulk writes in BaseRepository.
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import asyncpg
+import pytest
+
+from database.repositories.base_repository import PG_MAX_PARAMS, BaseRepository
+from database.repositories.market_data_repository import CandleRecord, MarketDataRepository
+from database.repositories.trade_repository import Trade, TradeRepository
+
+
+class Item:
+    def __init__(self, name: str, value: float):
+        self.name = name
+        self.value = value
+
+
+class ItemRepository(BaseRepository[Item]):
+    def _to_dict(self, model: Item) -> dict[str, Any]:
+        return {"name": model.name, "value": model.value}
+
+    def _from_record(self, record: asyncpg.Record) -> Item:
+        return Item(record["name"], record["value"])
+
+
+def make_connection(fetch_result=None):
+    conn = MagicMock()
+    conn.execute = AsyncMock(return_value="OK")
+    conn.fetch = AsyncMock(return_value=fetch_result or [])
+    conn.copy_records_to_table = AsyncMock()
+    conn.transaction.return_value.__aenter__ = AsyncMock(return_value=None)
+    conn.transaction.return_value.__aexit__ = AsyncMock(return_value=None)
+    return conn
+
+
+def make_transaction_manager(conn):
+    manager = MagicMock()
+    manager.transaction.return_value.__aenter__ = AsyncMock(return_value=conn)
+    manager.transaction.return_value.__aexit__ = AsyncMock(return_value=None)
+    return manager
+
+
+def make_repository(conn, repository_class=ItemRepository, **kwargs):
+    manager = make_transaction_manager(conn)
+    if repository_class is ItemRepository:
+        return ItemRepository(MagicMock(), "items", Item, manager, **kwargs)
+    return repository_class(MagicMock(), manager, **kwargs)
+
+
+def executed_sql(conn):
+    return [" ".join(call.args[0].split()) for call in conn.execute.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_plain_insert_copies_into_table():
+    conn = make_connection()
+    repository = make_repository(conn, bulk_write_mode="copy")
+
+    results = await repository.bulk_insert([Item("a", 1.0), Item("b", 2.0)])
+
+    assert results == []
+    conn.copy_records_to_table.assert_awaited_once_with(
+        "items", records=[("a", 1.0), ("b", 2.0)], columns=["name", "value"]
+    )
+    conn.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upsert_merges_through_staging_table():
+    conn = make_connection(fetch_result=[{"id": 7}, {"id": 8}])
+    repository = make_repository(conn, bulk_write_mode="copy")
+
+    results = await repository.bulk_upsert(
+        [Item("a", 1.0), Item("b", 2.0), Item("a", 3.0)],
+        conflict_columns=["name"],
+        touch_columns=["updated_at"],
+    )
+
+    assert results == [{"id": 7}, {"id": 8}]
+    create, drop = executed_sql(conn)
+    staging = create.split()[3]
+    assert create == (
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        "SELECT name,value, 0::bigint AS _row FROM items WITH NO DATA"
+    )
+    assert drop == f"DROP TABLE {staging}"
+
+    # Row index is copied along to keep input order and the last duplicate
+    conn.copy_records_to_table.assert_awaited_once_with(
+        staging,
+        records=[("a", 1.0, 0), ("b", 2.0, 1), ("a", 3.0, 2)],
+        columns=["name", "value", "_row"],
+    )
+    merge = " ".join(conn.fetch.call_args.args[0].split())
+    assert f"SELECT DISTINCT ON (name) * FROM {staging} ORDER BY name, _row DESC" in merge
+    assert "ORDER BY _row ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value" in merge
+    assert merge.endswith("updated_at = NOW() RETURNING id")
+    conn.transaction.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_values_mode_respects_parameter_limit():
+    conn = make_connection()
+    repository = make_repository(conn)
+    items = [Item(str(i), float(i)) for i in range(PG_MAX_PARAMS)]
+
+    await repository.bulk_insert(items, chunk_size=len(items))
+
+    # 2 parameters per row -> 16383 rows per statement
+    assert conn.execute.await_count == 3
+    for call in conn.execute.call_args_list:
+        assert len(call.args) - 1 <= PG_MAX_PARAMS
+    conn.copy_records_to_table.assert_not_called()
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        make_repository(make_connection(), bulk_write_mode="binary")
+
+
+@pytest.mark.asyncio
+async def test_market_data_save_candles_upserts_with_copy():
+    conn = make_connection()
+    repository = make_repository(conn, MarketDataRepository)
+    moment = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    candle = CandleRecord("BTCUSDT", int(moment.timestamp() * 1000), moment, 1, 2, 0.5, 1.5, 10)
+
+    assert await repository.save_candles([candle, candle]) == 2
+
+    records = conn.copy_records_to_table.call_args.kwargs["records"]
+    assert records[0][3:7] == (Decimal("1"), Decimal("2"), Decimal("0.5"), Decimal("1.5"))
+    assert records[0][-3:] == ("bybit", "FUTURES", 0)
+    merge = " ".join(conn.execute.call_args_list[1].args[0].split())
+    assert "ON CONFLICT (symbol,timestamp,interval_minutes,exchange) DO UPDATE" in merge
+    assert "updated_at = NOW()" in merge
+    assert "RETURNING" not in merge
+
+
+@pytest.mark.asyncio
+async def test_record_trades_batch_assigns_ids():
+    conn = make_connection(fetch_result=[{"id": 11}, {"id": 12}])
+    repository = make_repository(conn, TradeRepository)
+    trades = [
+        Trade(
+            symbol="BTCUSDT",
+            exchange="bybit",
+            side="buy",
+            quantity=Decimal("1"),
+            price=Decimal("100"),
+        ),
+        Trade(
+            symbol="ETHUSDT",
+            exchange="bybit",
+            side="sell",
+            quantity=Decimal("2"),
+            price=Decimal("10"),
+        ),
+    ]
+
+    assert await repository.record_trades_batch(trades) == [11, 12]
+    assert [trade.id for trade in trades] == [11, 12]
+    assert conn.copy_records_to_table.await_args.args[0].startswith("_copy_trades_")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Тесты публичного и приватного WebSocket клиентов Bybit v5 на локальном фейковом сервере
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from exchanges.base.exceptions import WebSocketError
+from exchanges.base.websocket_base import MessageType
+from exchanges.bybit.websocket import (
+    MAX_TOPICS_PER_REQUEST,
+    BybitPrivateWebSocket,
+    BybitPublicWebSocket,
+    split_topic,
+)
+from tests.fixtures.fake_bybit_ws import (  # noqa: F401
+    FakeBybitServer,
+    fake_bybit_server_fixture,
+    kline_message,
+    wait_for,
+)
+
+START = 1_704_067_200_000
+CLIENT_LOOPS = ("._listen_loop", "._ping_loop", "._reconnect_loop")
+
+
+@pytest.fixture(autouse=True)
+async def no_leaked_client_tasks():
+    """После теста у клиентов не остается фоновых задач (ping, прослушивание, реконнект)"""
+    yield
+    leaked = [
+        task
+        for task in asyncio.all_tasks()
+        if not task.done() and task.get_coro().__qualname__.endswith(CLIENT_LOOPS)
+    ]
+    for task in leaked:
+        task.cancel()
+    await asyncio.gather(*leaked, return_exceptions=True)
+    assert not leaked, f"Незавершенные задачи клиента: {leaked}"
+
+
+@pytest.fixture
+async def client(fake_bybit_server):
+    ws = BybitPublicWebSocket(url=fake_bybit_server.url, reconnect_delay=0)
+    yield ws
+    await ws.disconnect()
+
+
+def test_split_topic():
+    assert split_topic("kline.15.BTCUSDT") == ("kline.15", "BTCUSDT")
+    assert split_topic("orderbook.50.ETHUSDT") == ("orderbook.50", "ETHUSDT")
+    assert split_topic("tickers.SOLUSDT") == ("tickers", "SOLUSDT")
+
+
+def test_parse_message_variants():
+    ws = BybitPublicWebSocket()
+
+    data = ws.parse_message(json.dumps(kline_message("BTCUSDT", START, 100.0)))
+    assert data.message_type == MessageType.DATA
+    assert (data.channel, data.symbol) == ("kline.15", "BTCUSDT")
+
+    assert ws.parse_message('{"op": "pong"}').message_type == MessageType.PONG
+    assert ws.parse_message('{"op": "ping", "ret_msg": "pong"}').message_type == MessageType.PONG
+
+    rejected = ws.parse_message('{"op": "subscribe", "success": false, "ret_msg": "bad topic"}')
+    assert rejected.message_type == MessageType.ERROR
+    assert ws.parse_message('{"op": "subscribe", "success": true}') is None
+
+
+async def test_subscriptions_are_multiplexed(client, fake_bybit_server):
+    """Все топики уходят пачками в одном соединении"""
+    symbols = [f"SYM{i}USDT" for i in range(12)]
+    await client.subscribe_klines(symbols, "15", lambda message: None)
+    await client.connect()
+
+    expected = {f"kline.15.{symbol}" for symbol in symbols}
+    await wait_for(lambda: fake_bybit_server.subscribed_topics() == expected)
+
+    assert fake_bybit_server.connection_count == 1
+    sizes = [len(args) for args in fake_bybit_server.subscribe_requests()]
+    assert sizes == [MAX_TOPICS_PER_REQUEST, 2]
+
+
+async def test_messages_routed_by_symbol(client, fake_bybit_server):
+    received = {"BTCUSDT": [], "ETHUSDT": []}
+    await client.connect()
+    await client.subscribe_klines(["BTCUSDT"], "15", received["BTCUSDT"].append)
+    await client.subscribe_klines(["ETHUSDT"], "15", received["ETHUSDT"].append)
+    await wait_for(lambda: len(fake_bybit_server.subscribed_topics()) == 2)
+
+    await fake_bybit_server.push(kline_message("ETHUSDT", START, 2500.0))
+    await wait_for(lambda: received["ETHUSDT"])
+
+    message = received["ETHUSDT"][0]
+    assert message.data[0]["close"] == "2500.0"
+    assert received["BTCUSDT"] == []
+
+
+async def test_ping_receives_pong(client, fake_bybit_server):
+    await client.connect()
+    await client._send_message(client.build_ping_message())
+
+    await wait_for(lambda: client.last_pong_time is not None)
+
+
+async def test_resubscribes_after_reconnect(client, fake_bybit_server):
+    """После разрыва клиент переподключается и восстанавливает все подписки"""
+    received = []
+    await client.subscribe_tickers(["BTCUSDT", "ETHUSDT"], received.append)
+    await client.connect()
+    await wait_for(lambda: len(fake_bybit_server.subscribed_topics()) == 2)
+
+    await fake_bybit_server.drop_connections()
+    await wait_for(lambda: fake_bybit_server.connection_count == 2 and client.is_connected)
+    await wait_for(
+        lambda: fake_bybit_server.subscribed_topics() == {"tickers.BTCUSDT", "tickers.ETHUSDT"}
+    )
+
+    await fake_bybit_server.push(
+        {"topic": "tickers.BTCUSDT", "ts": START, "data": {"lastPrice": "1"}}
+    )
+    await wait_for(lambda: received)
+
+
+async def test_private_auth_then_subscribe(fake_bybit_server):
+    """Аутентификация идет первым сообщением, затем подписки; данные приходят по топику"""
+    ws = BybitPrivateWebSocket(
+        FakeBybitServer.api_key, FakeBybitServer.api_secret, url=fake_bybit_server.url
+    )
+    received = []
+    try:
+        await ws.subscribe_orders(received.append)
+        await ws.subscribe_positions(lambda message: None)
+        await ws.connect()
+        await wait_for(lambda: fake_bybit_server.subscribed_topics() == {"order", "position"})
+
+        assert fake_bybit_server.received[0]["op"] == "auth"
+
+        await fake_bybit_server.push(
+            {"topic": "order", "creationTime": START, "data": [{"orderId": "1"}]}
+        )
+        await wait_for(lambda: received)
+        assert (received[0].channel, received[0].symbol) == ("order", None)
+    finally:
+        await ws.disconnect()
+
+
+async def test_private_auth_rejected(fake_bybit_server):
+    ws = BybitPrivateWebSocket(FakeBybitServer.api_key, "wrong-secret", url=fake_bybit_server.url)
+    try:
+        with pytest.raises(WebSocketError):
+            await ws.connect()
+        assert fake_bybit_server.subscribe_requests() == []
+    finally:
+        await ws.disconnect()
+
+
+async def test_private_topic_validation():
+    ws = BybitPrivateWebSocket("key", "secret")
+    with pytest.raises(ValueError):
+        await ws.subscribe_topic("kline.15", lambda message: None)
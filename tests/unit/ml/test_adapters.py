@@ -7,7 +7,7 @@
 import asyncio
 import tempfile
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, Mock, patch
 
 import numpy as np
 import pandas as pd
@@ -401,5 +401,74 @@ class TestAsyncIntegration:
             adapter.load.assert_called_once()
 
 
+
+@pytest.mark.asyncio
+class TestPatchTSTBatchPrediction:
+    """Тесты батчевого предсказания для нескольких символов"""
+
+    @pytest.fixture
+    def adapter(self):
+        """Адаптер с небольшой реальной моделью и тождественным scaler"""
+        from ml.logic.patchtst_model import create_unified_model
+
+        torch.manual_seed(0)
+        adapter = PatchTSTAdapter({"device": "cpu", "max_batch_size": 3})
+        adapter.model = create_unified_model(
+            {
+                "model": {
+                    "input_size": 240,
+                    "output_size": 20,
+                    "context_window": 96,
+                    "patch_len": 16,
+                    "stride": 8,
+                    "d_model": 64,
+                    "n_heads": 4,
+                    "e_layers": 1,
+                    "d_ff": 128,
+                }
+            }
+        )
+        adapter.model.eval()
+        adapter.scaler = MagicMock()
+        adapter.scaler.transform.side_effect = lambda x: np.array(x, dtype=np.float64)
+        adapter._initialized = True
+        return adapter
+
+    @pytest.fixture
+    def inputs(self):
+        rng = np.random.default_rng(0)
+        return {f"SYM{i}USDT": rng.normal(0, 1, (96, 240)) for i in range(7)}
+
+    async def test_batch_matches_single_predictions(self, adapter, inputs):
+        """Батч (с разбиением по max_batch_size) совпадает с поштучными predict"""
+        batch = await adapter.predict_batch_raw(inputs)
+
+        assert list(batch) == list(inputs)
+        for symbol, data in inputs.items():
+            single = await adapter.predict(data)
+            assert batch[symbol].shape == (20,)
+            np.testing.assert_allclose(batch[symbol], single, rtol=1e-5, atol=1e-5)
+
+    async def test_invalid_symbol_is_skipped(self, adapter, inputs):
+        """Некорректный вход одного символа не ломает батч"""
+        inputs["BROKENUSDT"] = np.zeros((10, 240))
+
+        batch = await adapter.predict_batch_raw(inputs)
+
+        assert "BROKENUSDT" not in batch
+        assert len(batch) == 7
+
+    async def test_predict_batch_interprets_outputs(self, adapter, inputs):
+        """predict_batch возвращает UnifiedPrediction по символам"""
+        adapter.interpret_outputs = MagicMock(return_value="prediction")
+
+        results = await adapter.predict_batch(inputs, current_prices={"SYM0USDT": 100.0})
+
+        assert set(results) == set(inputs)
+        adapter.interpret_outputs.assert_any_call(
+            ANY, symbol="SYM0USDT", current_price=100.0
+        )
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
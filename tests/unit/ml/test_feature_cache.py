@@ -0,0 +1,145 @@
+"""
+Тесты LRU-кеша матриц признаков и его использования в RealTimeIndicatorCalculator
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from ml.logic.feature_cache import FeatureMatrixCache, feature_matrix_key
+from ml.realtime_indicator_calculator import RealTimeIndicatorCalculator
+
+
+def make_ohlcv(n: int = 200, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 50000 + np.cumsum(rng.normal(0, 100, n))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close + 50,
+            "low": close - 50,
+            "close": close,
+            "volume": np.abs(rng.normal(1e6, 1e5, n)),
+        },
+        index=pd.date_range("2024-01-01", periods=n, freq="15min", name="datetime"),
+    )
+
+
+def fake_features(df: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """Быстрая замена create_features: 250 числовых признаков"""
+    values = df["close"].to_numpy()[:, None] * np.arange(1, 251) + np.arange(len(df))[:, None]
+    features = pd.DataFrame(values, index=df.index, columns=[f"f_{i}" for i in range(250)])
+    return pd.concat([df, features], axis=1)
+
+
+class TestFeatureMatrixCache:
+    """LRU и учет памяти"""
+
+    def test_hit_and_miss_counters(self):
+        cache = FeatureMatrixCache()
+        cache.put("a", np.zeros(10))
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["bytes"] == 80
+
+    def test_lru_eviction_by_bytes(self):
+        cache = FeatureMatrixCache(max_bytes=800 * 3)
+        for key in ["a", "b", "c"]:
+            cache.put(key, np.zeros(100))
+        cache.get("a")  # "b" становится самой старой записью
+
+        cache.put("d", np.zeros(100))
+
+        assert "b" not in cache
+        assert all(key in cache for key in ["a", "c", "d"])
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get_stats()["bytes"] == 2400
+
+    def test_oversized_entry_is_rejected(self):
+        cache = FeatureMatrixCache(max_bytes=100)
+
+        assert not cache.put("big", np.zeros(100))
+        assert len(cache) == 0
+        assert cache.get_stats()["rejected"] == 1
+
+    def test_replace_and_invalidate_keep_byte_accounting(self):
+        cache = FeatureMatrixCache(max_entries=10)
+        cache.put(("BTCUSDT", 1), np.zeros(10))
+        cache.put(("BTCUSDT", 1), np.zeros(20))
+        cache.put(("ETHUSDT", 1), np.zeros(5))
+
+        assert cache.get_stats()["bytes"] == 200
+        assert cache.invalidate("BTCUSDT") == 1
+        assert cache.get_stats()["bytes"] == 40
+
+    def test_key_changes_with_last_candle(self):
+        df = make_ohlcv(100)
+        key = feature_matrix_key("BTCUSDT", df, "v1")
+
+        updated = df.copy()
+        updated.iloc[-1, updated.columns.get_loc("close")] += 1
+
+        assert key == feature_matrix_key("BTCUSDT", df.copy(), "v1")
+        assert key != feature_matrix_key("BTCUSDT", updated, "v1")
+        assert key != feature_matrix_key("BTCUSDT", df.iloc[1:], "v1")
+        assert key != feature_matrix_key("BTCUSDT", df, "v2")
+
+
+class TestCalculatorFeatureCache:
+    """Все точки входа калькулятора делят один расчет признаков"""
+
+    @pytest.fixture
+    def calculator(self):
+        with patch("ml.logic.feature_engineering_production.create_engine"):
+            calculator = RealTimeIndicatorCalculator(config={})
+        return calculator
+
+    async def test_create_features_runs_once_per_candle(self, calculator):
+        df = make_ohlcv()
+        with patch.object(
+            calculator.feature_engineer, "create_features", side_effect=fake_features
+        ) as create_features:
+            indicators = await calculator.calculate_indicators("BTCUSDT", df, save_to_db=False)
+            features, metadata = await calculator.prepare_ml_input("BTCUSDT", df, lookback=96)
+            await calculator.get_features_for_ml("BTCUSDT", df)
+
+            assert create_features.call_count == 1
+
+            # Новая свеча - новый расчет
+            await calculator.prepare_ml_input("BTCUSDT", make_ohlcv(201), lookback=96)
+            assert create_features.call_count == 2
+
+        assert indicators
+        assert features.shape == (1, 96, 240)
+        stats = calculator.get_cache_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["symbols"] == ["BTCUSDT"]
+
+    async def test_cached_matrix_is_not_mutated(self, calculator):
+        df = make_ohlcv()
+        with patch.object(
+            calculator.feature_engineer, "create_features", side_effect=fake_features
+        ):
+            first, _ = await calculator.prepare_ml_input("BTCUSDT", df, lookback=96)
+            cached = calculator.feature_cache.get(next(iter(calculator.feature_cache._entries)))
+            columns = list(cached.columns)
+
+            await calculator.calculate_indicators("BTCUSDT", df, save_to_db=False)
+            await calculator.get_features_for_ml("BTCUSDT", df)
+            second, _ = await calculator.prepare_ml_input("BTCUSDT", df, lookback=96)
+
+        assert list(cached.columns) == columns
+        np.testing.assert_array_equal(first, second)
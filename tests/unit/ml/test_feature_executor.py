@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Тесты выноса create_features из event loop
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.logic import feature_executor as module
+from ml.logic.feature_executor import FeatureExecutor, pack_frame, unpack_frame
+from monitoring.metrics.loop_lag import LoopLagMonitor
+
+
+def make_frame(n: int = 50, symbol: str = "BTCUSDT") -> pd.DataFrame:
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "datetime": pd.date_range("2024-01-01", periods=n, freq="15min", tz="UTC"),
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": np.arange(n, dtype=float),
+            "timestamp": np.arange(n, dtype=np.int64) * 900_000,
+            "symbol": symbol,
+        }
+    )
+
+
+class FakeEngineer:
+    def __init__(self):
+        self.threads = set()
+
+    def create_features(self, df, use_enhanced_features=False):
+        self.threads.add(threading.get_ident())
+        result = df.copy()
+        result["return_1"] = result["close"].pct_change().fillna(0.0)
+        result["enhanced"] = use_enhanced_features
+        return result
+
+
+class TestSharedFrame:
+    def test_round_trip_preserves_dtypes(self):
+        df = make_frame()
+        shm, spec = pack_frame(df)
+        try:
+            restored = unpack_frame(shm.buf, spec)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        pd.testing.assert_frame_equal(restored, df)
+        assert set(spec.objects) == {"symbol"}
+
+    def test_round_trip_keeps_custom_index(self):
+        df = make_frame(10).set_index("datetime")
+        shm, spec = pack_frame(df)
+        try:
+            restored = unpack_frame(shm.buf, spec)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        pd.testing.assert_frame_equal(restored, df)
+
+    def test_process_worker_reads_shared_memory(self, monkeypatch):
+        monkeypatch.setattr(module, "_worker_engineer", FakeEngineer())
+        df = make_frame()
+        shm, spec = pack_frame(df)
+        try:
+            result = module._process_create_features(spec, True)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        expected = FakeEngineer().create_features(df, use_enhanced_features=True)
+        pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.asyncio
+class TestFeatureExecutor:
+    async def test_inline_uses_caller_engineer(self):
+        engineer = FakeEngineer()
+        executor = FeatureExecutor("inline")
+
+        result = await executor.create_features(make_frame(), engineer=engineer)
+
+        assert engineer.threads == {threading.get_ident()}
+        assert result["enhanced"].all()
+        assert executor.get_stats()["calls"] == 1
+
+    async def test_thread_backend_runs_off_loop(self, monkeypatch):
+        engineers = []
+
+        def new_engineer(self):
+            engineers.append(FakeEngineer())
+            return engineers[-1]
+
+        monkeypatch.setattr(FeatureExecutor, "_new_engineer", new_engineer)
+        executor = FeatureExecutor("thread", max_workers=2)
+        try:
+            results = await executor.create_features_many(
+                {symbol: make_frame(symbol=symbol) for symbol in ("BTCUSDT", "ETHUSDT", "SOLUSDT")}
+            )
+        finally:
+            executor.shutdown()
+
+        assert set(results) == {"BTCUSDT", "ETHUSDT", "SOLUSDT"}
+        assert (results["ETHUSDT"]["symbol"] == "ETHUSDT").all()
+        threads = set().union(*(engineer.threads for engineer in engineers))
+        assert threading.get_ident() not in threads
+        assert len(engineers) <= 2  # Один FeatureEngineer на поток пула
+
+    async def test_from_config(self):
+        executor = FeatureExecutor.from_config(
+            {"ml": {"feature_executor": {"backend": "thread", "max_workers": 3}}}
+        )
+        assert (executor.backend, executor.max_workers) == ("thread", 3)
+        assert FeatureExecutor.from_config(object()).backend == "inline"
+
+        with pytest.raises(ValueError):
+            FeatureExecutor("gpu")
+        with pytest.raises(ValueError):
+            FeatureExecutor("process", start_method="fork")
+
+    async def test_shared_executor_released_by_last_user(self, monkeypatch):
+        config = {"ml": {"feature_executor": {"backend": "thread", "max_workers": 2}}}
+        monkeypatch.setattr(FeatureExecutor, "_new_engineer", lambda self: FakeEngineer())
+
+        first = FeatureExecutor.shared(config, engineer_config={"ml": {}})
+        second = FeatureExecutor.shared(config, engineer_config={})
+        assert first is second
+        inline = FeatureExecutor.shared({"ml": {}})
+        assert inline is not first
+        inline.release()
+
+        await first.create_features(make_frame())
+        first.release()
+        assert first._pool is not None  # Пул еще используется вторым компонентом
+        second.release()
+        assert first._pool is None
+
+        restarted = FeatureExecutor.shared(config)
+        assert restarted is not first
+        restarted.release()
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_detects_blocking():
+    import time
+
+    async with LoopLagMonitor(interval=0.005) as monitor:
+        await asyncio.sleep(0.03)
+        time.sleep(0.1)  # noqa: ASYNC251 - блокирующий вызов в event loop
+        await asyncio.sleep(0.01)
+
+    stats = monitor.get_stats()
+    assert stats["samples"] >= 2
+    assert stats["max_ms"] >= 80
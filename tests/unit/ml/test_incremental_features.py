@@ -0,0 +1,202 @@
+"""
+Тесты паритета инкрементального расчета признаков с batch путем
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from ml.logic.feature_engineering_production import ProductionFeatureEngineer
+from ml.logic.incremental_features import (
+    EWMState,
+    IncrementalFeatureEngine,
+    RollingExtremum,
+    RollingSum,
+    RollingVar,
+)
+from ml.realtime_indicator_calculator import RealTimeIndicatorCalculator
+
+
+def make_candles(n: int = 480, seed: int = 42, symbol: str = "BTCUSDT") -> pd.DataFrame:
+    """Синтетические 15m свечи"""
+    rng = np.random.default_rng(seed)
+    close = 50000 + np.cumsum(rng.normal(0, 100, n))
+    df = pd.DataFrame(
+        {
+            "datetime": pd.date_range("2024-01-01", periods=n, freq="15min"),
+            "symbol": symbol,
+            "open": close - np.abs(rng.normal(0, 50, n)),
+            "high": close + np.abs(rng.normal(0, 75, n)),
+            "low": close - np.abs(rng.normal(0, 75, n)),
+            "close": close,
+            "volume": np.abs(rng.normal(5e6, 1e6, n)),
+        }
+    )
+    df["turnover"] = df["volume"] * df["close"] * (1 + rng.normal(0, 0.001, n))
+    df["high"] = df[["open", "close", "high"]].max(axis=1)
+    df["low"] = df[["open", "close", "low"]].min(axis=1)
+    return df
+
+
+@pytest.fixture
+def batch_engineer():
+    with patch("ml.logic.feature_engineering_production.create_engine"):
+        engineer = ProductionFeatureEngineer()
+    engineer.disable_progress = True
+    return engineer
+
+
+class TestRollingPrimitives:
+    """Примитивы повторяют pandas"""
+
+    @pytest.fixture
+    def series(self):
+        rng = np.random.default_rng(7)
+        values = rng.normal(100, 5, 300)
+        values[0] = np.nan
+        values[50:55] = 101.0  # Подряд одинаковые значения
+        return pd.Series(values)
+
+    @pytest.mark.parametrize("window", [3, 20, 96])
+    def test_rolling_sum_and_mean(self, series, window):
+        state = RollingSum(window)
+        sums, means = [], []
+        for value in series:
+            state.push(value)
+            sums.append(state.sum)
+            means.append(state.mean)
+
+        np.testing.assert_array_equal(sums, series.rolling(window).sum().to_numpy())
+        np.testing.assert_array_equal(means, series.rolling(window).mean().to_numpy())
+
+    @pytest.mark.parametrize("ddof", [0, 1])
+    def test_rolling_std(self, series, ddof):
+        state = RollingVar(20, ddof=ddof)
+        stds = []
+        for value in series:
+            state.push(value)
+            stds.append(state.std)
+
+        expected = series.rolling(20).std(ddof=ddof).to_numpy()
+        np.testing.assert_allclose(stds, expected, rtol=1e-12, equal_nan=True)
+
+    @pytest.mark.parametrize("mode", ["max", "min"])
+    def test_rolling_extremum(self, series, mode):
+        state = RollingExtremum(14, mode)
+        values = []
+        for value in series.fillna(0):
+            state.push(value)
+            values.append(state.value)
+
+        expected = getattr(series.fillna(0).rolling(14), mode)().to_numpy()
+        np.testing.assert_array_equal(values, expected)
+
+    def test_ewm_span(self, series):
+        state = EWMState.from_span(20, min_periods=20)
+        values = []
+        for value in series:
+            state.push(value)
+            values.append(state.value)
+
+        expected = series.ewm(span=20, min_periods=20, adjust=False).mean().to_numpy()
+        np.testing.assert_array_equal(values, expected)
+
+
+class TestIncrementalFeatureEngine:
+    """Паритет с ProductionFeatureEngineer.create_features"""
+
+    @pytest.mark.parametrize("seed", [1, 42])
+    def test_last_row_matches_batch(self, batch_engineer, seed):
+        df = make_candles(seed=seed)
+        batch_row = batch_engineer.create_features(df.copy()).iloc[-1]
+
+        engine = IncrementalFeatureEngine()
+        engine.warm_up("BTCUSDT", df.iloc[:-1])
+        row = engine.update("BTCUSDT", df.iloc[-1].to_dict())
+
+        assert set(row) == set(engine.feature_names)
+        for name, value in row.items():
+            np.testing.assert_allclose(value, float(batch_row[name]), rtol=1e-12, err_msg=name)
+
+    def test_custom_periods_match_batch(self):
+        config = {
+            "features": {
+                "technical": [
+                    {"name": "ema", "periods": [12, 26]},
+                    {"name": "rsi", "period": 21},
+                    {"name": "macd", "fast": 8, "slow": 21, "signal": 5},
+                ]
+            }
+        }
+        with patch("ml.logic.feature_engineering_production.create_engine"):
+            engineer = ProductionFeatureEngineer(config)
+        engineer.disable_progress = True
+
+        df = make_candles(seed=3)
+        batch_row = engineer.create_features(df.copy()).iloc[-1]
+        row = IncrementalFeatureEngine(config).warm_up("BTCUSDT", df)
+
+        for name in ["ema_12", "ema_26", "rsi", "macd", "macd_signal", "close_ema_26_ratio"]:
+            np.testing.assert_allclose(row[name], float(batch_row[name]), rtol=1e-12)
+        assert "ema_10" not in row
+
+    def test_duplicate_candle_is_ignored(self):
+        df = make_candles(n=120)
+        engine = IncrementalFeatureEngine()
+        first = engine.warm_up("ETHUSDT", df)
+
+        repeated = engine.update("ETHUSDT", df.iloc[-1].to_dict())
+
+        assert repeated is first
+
+    def test_symbols_are_independent(self):
+        engine = IncrementalFeatureEngine()
+        btc = engine.warm_up("BTCUSDT", make_candles(n=200, seed=1))
+        engine.warm_up("ETHUSDT", make_candles(n=200, seed=2, symbol="ETHUSDT"))
+
+        assert engine.get_last_features("BTCUSDT") == btc
+        engine.reset("ETHUSDT")
+        assert not engine.has_symbol("ETHUSDT")
+        assert engine.has_symbol("BTCUSDT")
+
+
+class TestCalculatorIntegration:
+    """RealTimeIndicatorCalculator ведет состояние движка по новым свечам"""
+
+    @pytest.fixture
+    def calculator(self):
+        with patch("ml.logic.feature_engineering_production.create_engine"):
+            calculator = RealTimeIndicatorCalculator(config={})
+        return calculator
+
+    async def test_new_candle_is_streamed_into_engine(self, calculator):
+        df = make_candles(n=300).drop(columns="symbol").set_index("datetime")
+        engine = calculator.incremental_engine
+        with (
+            patch.object(
+                calculator.feature_engineer,
+                "create_features",
+                side_effect=lambda frame, **kwargs: frame.assign(rsi=-1.0),
+            ),
+            patch.object(engine, "warm_up", wraps=engine.warm_up) as warm_up,
+        ):
+            await calculator.calculate_indicators("BTCUSDT", df.iloc[:-1], save_to_db=False)
+            result = await calculator.calculate_indicators("BTCUSDT", df.iloc[1:], save_to_db=False)
+
+        assert warm_up.call_count == 1
+        assert engine.get_last_datetime("BTCUSDT") == df.index[-1]
+        expected = IncrementalFeatureEngine().warm_up("BTCUSDT", df.reset_index())
+        assert result["ml_features"]["rsi"] == expected["rsi"]
+
+    def test_engine_can_be_disabled(self):
+        config = {"ml": {"incremental_features": {"enabled": False}}}
+        with patch("ml.logic.feature_engineering_production.create_engine"):
+            calculator = RealTimeIndicatorCalculator(config=config)
+
+        assert calculator.incremental_engine is None
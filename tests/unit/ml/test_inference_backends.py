@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Тесты бэкендов инференса PatchTST (eager / TorchScript / ONNX)
+"""
+
+import os
+import warnings
+
+import numpy as np
+import pytest
+import torch
+
+from ml.adapters import inference_backends as module
+from ml.adapters.inference_backends import (
+    EagerBackend,
+    TorchScriptBackend,
+    build_backend,
+    check_parity,
+    exported_model_path,
+)
+from ml.adapters.patchtst import PatchTSTAdapter
+from ml.logic.patchtst_model import create_unified_model
+
+SMALL_MODEL = {
+    "model": {
+        "input_size": 240,
+        "output_size": 20,
+        "context_window": 96,
+        "patch_len": 16,
+        "stride": 8,
+        "d_model": 64,
+        "n_heads": 4,
+        "e_layers": 1,
+        "d_ff": 128,
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def quiet_jit():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    return create_unified_model(SMALL_MODEL).eval()
+
+
+@pytest.fixture
+def model_path(tmp_path, model):
+    path = tmp_path / "model.pth"
+    torch.save({"model_state_dict": model.state_dict()}, path)
+    return path
+
+
+@pytest.fixture
+def batch():
+    return np.random.default_rng(1).standard_normal((5, 96, 240)).astype(np.float32)
+
+
+def example():
+    return torch.randn(1, 96, 240)
+
+
+def test_torchscript_matches_eager(model, model_path, batch):
+    """TorchScript дает те же выходы для разных размеров батча"""
+    eager = EagerBackend(model, torch.device("cpu"))
+    runtime = build_backend("torchscript", model, torch.device("cpu"), example(), model_path)
+
+    assert isinstance(runtime, TorchScriptBackend)
+    for size in (1, 5):
+        assert check_parity(eager, runtime, batch[:size]) < 1e-4
+
+
+def test_export_is_cached_until_model_changes(model, model_path, monkeypatch):
+    """Экспорт переиспользуется и пересоздается, если веса новее"""
+    calls = []
+    export = TorchScriptBackend.export
+    monkeypatch.setattr(
+        TorchScriptBackend, "export", staticmethod(lambda *a: calls.append(a) or export(*a))
+    )
+    device = torch.device("cpu")
+
+    build_backend("torchscript", model, device, example(), model_path)
+    build_backend("torchscript", model, device, example(), model_path)
+    assert len(calls) == 1
+
+    exported = exported_model_path(model_path, "torchscript")
+    stat = exported.stat()
+    os.utime(model_path, (stat.st_atime, stat.st_mtime + 10))
+    build_backend("torchscript", model, device, example(), model_path)
+    assert len(calls) == 2
+
+
+def test_unknown_backend_rejected(model, model_path):
+    with pytest.raises(ValueError):
+        build_backend("tensorrt", model, torch.device("cpu"), example(), model_path)
+
+
+def test_onnx_matches_eager(model, model_path, batch):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+
+    eager = EagerBackend(model, torch.device("cpu"))
+    runtime = build_backend(
+        "onnx", model, torch.device("cpu"), example(), model_path, num_threads=1
+    )
+
+    assert check_parity(eager, runtime, batch) < 1e-4
+
+
+class TestAdapterRuntime:
+    """Выбор бэкенда в PatchTSTAdapter"""
+
+    def make_adapter(self, model, model_path, backend):
+        adapter = PatchTSTAdapter({"device": "cpu", "inference_backend": backend})
+        adapter.model = model
+        adapter.model_path = model_path
+        return adapter
+
+    def test_torchscript_runtime_used_for_forward(self, model, model_path, batch):
+        adapter = self.make_adapter(model, model_path, "torchscript")
+        adapter._setup_runtime()
+
+        assert adapter.get_model_info()["inference_backend"] == "torchscript"
+        expected = EagerBackend(model, torch.device("cpu"))(batch)
+        np.testing.assert_allclose(adapter._forward_batch(batch), expected, atol=1e-4)
+
+    def test_parity_failure_falls_back_to_eager(self, model, model_path, monkeypatch):
+        adapter = self.make_adapter(model, model_path, "torchscript")
+        monkeypatch.setattr("ml.adapters.patchtst.check_parity", lambda *a: 1.0)
+
+        adapter._setup_runtime()
+
+        assert isinstance(adapter.runtime, EagerBackend)
+        assert adapter.get_model_info()["inference_backend"] == "eager"
+
+    def test_export_error_falls_back_to_eager(self, model, model_path, monkeypatch):
+        adapter = self.make_adapter(model, model_path, "onnx")
+
+        def fail(*args, **kwargs):
+            raise ImportError("No module named 'onnxruntime'")
+
+        monkeypatch.setattr("ml.adapters.patchtst.build_backend", fail)
+        adapter._setup_runtime()
+
+        assert adapter.runtime.name == "eager"
+
+    def test_forward_without_runtime_uses_model(self, model, batch):
+        """Без _setup_runtime (модель задана напрямую) используется eager"""
+        adapter = PatchTSTAdapter({"device": "cpu", "max_batch_size": 2})
+        adapter.model = model
+
+        expected = EagerBackend(model, torch.device("cpu"))(batch)
+        np.testing.assert_allclose(adapter._forward_batch(batch), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_configure_threads_is_noop_without_value(monkeypatch):
+    calls = []
+    monkeypatch.setattr(module.torch, "set_num_threads", calls.append)
+    module.configure_torch_threads(None)
+    assert calls == []
@@ -0,0 +1,77 @@
+"""
+Тесты векторизованных скользящих ядер против эталонных rolling(...).apply
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from ml.logic import rolling_kernels as rk
+
+
+@pytest.fixture
+def close():
+    rng = np.random.default_rng(0)
+    values = pd.Series(50000 + np.cumsum(rng.normal(0, 100, 700)))
+    values.iloc[300:310] = values.iloc[300]  # Плоский участок
+    return values
+
+
+@pytest.fixture
+def returns(close):
+    return close.pct_change()
+
+
+class TestRollingKernels:
+    """Паритет с исходными lambda-реализациями"""
+
+    def test_hurst_exponent(self, close):
+        expected = close.rolling(50).apply(lambda x: rk.hurst_exponent(x) if len(x) == 50 else 0.5)
+        result = rk.rolling_hurst_exponent(close.to_numpy(), window=50)
+
+        # Батчевый lstsq может отличаться от поштучного polyfit в последних битах
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-14)
+
+    def test_fractal_dimension(self, close):
+        expected = close.rolling(30).apply(
+            lambda x: rk.fractal_dimension(x.values) if len(x) == 30 else 1.5
+        )
+        result = rk.rolling_fractal_dimension(close.to_numpy(), window=30)
+
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-14)
+
+    def test_garch_volatility_is_bit_exact(self, returns):
+        expected = returns.rolling(20).apply(rk.garch_volatility)
+        result = rk.rolling_garch_volatility(returns.to_numpy(), window=20)
+
+        np.testing.assert_array_equal(result, expected)
+
+    def test_shannon_entropy_is_bit_exact(self, returns):
+        expected = returns.rolling(100).apply(lambda x: rk.shannon_entropy(x))
+        result = rk.rolling_shannon_entropy(returns.to_numpy(), window=100, bins=10)
+
+        np.testing.assert_array_equal(result, expected)
+
+    def test_nan_windows_and_short_input(self):
+        values = np.arange(60, dtype=float) + 100
+        values[40] = np.nan
+
+        result = rk.rolling_garch_volatility(values, window=20)
+
+        assert np.isnan(result[:19]).all()
+        assert np.isnan(result[40:60]).all()
+        assert not np.isnan(result[19:40]).any()
+        assert np.isnan(rk.rolling_hurst_exponent(values[:10], window=50)).all()
+
+    def test_chunking_does_not_change_result(self, close, monkeypatch):
+        full = rk.rolling_fractal_dimension(close.to_numpy())
+
+        monkeypatch.setattr(rk, "CHUNK_SIZE", 64)
+        chunked = rk.rolling_fractal_dimension(close.to_numpy())
+
+        np.testing.assert_array_equal(full, chunked)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Unit тесты пакетного режима SignalScheduler (генерация на закрытии свечи)
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+from ml.signal_scheduler import SignalScheduler
+
+
+def _scheduler(**generation) -> SignalScheduler:
+    config_manager = Mock()
+    config_manager.get_config.return_value = {
+        "ml": {
+            "symbols": ["BTCUSDT", "ETHUSDT", "SOLUSDT"],
+            "signal_generation": {"mode": "candle_close", "ready_timeout": 0.1, **generation},
+        }
+    }
+    scheduler = SignalScheduler(config_manager)
+    scheduler.signal_processor = Mock()
+    scheduler.signal_processor.generate_signals_for_symbols = AsyncMock(
+        side_effect=lambda symbols, **kwargs: [SimpleNamespace(symbol=s) for s in symbols]
+    )
+    scheduler.trading_engine = Mock()
+    scheduler.trading_engine.receive_trading_signal = AsyncMock()
+    return scheduler
+
+
+def _data_manager(last_ts: dict[str, int]) -> Mock:
+    data_manager = Mock()
+    data_manager.cache.get_views.return_value = {
+        symbol: np.array([(ts * 1_000_000_000,)], dtype=[("ts", "i8")])
+        for symbol, ts in last_ts.items()
+    }
+    data_manager.candle_writer.flush = AsyncMock(return_value=0)
+    return data_manager
+
+
+class TestCandleCloseBatch:
+    """Пакетная генерация сигналов"""
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_one_pipeline_call(self):
+        scheduler = _scheduler(parallel_workers=2)
+        await scheduler._run_batch(scheduler._current_candle())
+
+        processor = scheduler.signal_processor.generate_signals_for_symbols
+        processor.assert_awaited_once()
+        assert processor.await_args.args[0] == ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+        assert processor.await_args.kwargs["max_concurrency"] == 2
+        assert scheduler.trading_engine.receive_trading_signal.await_count == 3
+        assert scheduler._batch_stats["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_only_symbols_with_closed_candle(self):
+        scheduler = _scheduler()
+        candle = scheduler._current_candle()
+        # У SOLUSDT в кеше еще нет новой свечи - предыдущая не закрыта
+        data_manager = _data_manager(
+            {"BTCUSDT": candle, "ETHUSDT": candle, "SOLUSDT": candle - 900}
+        )
+        scheduler.attach_data_manager(data_manager)
+        await scheduler._run_batch(candle)
+
+        data_manager.candle_writer.flush.assert_awaited_once()
+        processor = scheduler.signal_processor.generate_signals_for_symbols
+        assert processor.await_args.args[0] == ["BTCUSDT", "ETHUSDT"]
+        assert scheduler._batch_stats["last_batch_skipped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_one_batch_per_candle(self):
+        scheduler = _scheduler()
+        scheduler.attach_data_manager(_data_manager({}))
+        scheduler._wait_ready = AsyncMock(side_effect=lambda symbols, candle: symbols)
+        scheduler._running = True
+        task = asyncio.create_task(scheduler._candle_close_loop())
+        await asyncio.sleep(0.05)
+
+        # Повторные уведомления в пределах той же свечи не запускают пакет
+        await scheduler._on_data_update()
+        await asyncio.sleep(0.05)
+        assert not scheduler._candle_event.is_set()
+
+        scheduler._running = False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert scheduler._batch_stats["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_late_symbol_retried_within_candle(self):
+        scheduler = _scheduler(ready_timeout=0)
+        candle = scheduler._current_candle()
+        data_manager = _data_manager(
+            {"BTCUSDT": candle, "ETHUSDT": candle, "SOLUSDT": candle - 900}
+        )
+        scheduler.attach_data_manager(data_manager)
+        scheduler._running = True
+        task = asyncio.create_task(scheduler._candle_close_loop())
+        await asyncio.sleep(0.05)
+
+        # Свеча SOLUSDT пришла позже - пакет той же свечи только для нее
+        data_manager.cache.get_views.return_value = _data_manager(
+            {"BTCUSDT": candle, "ETHUSDT": candle, "SOLUSDT": candle}
+        ).cache.get_views.return_value
+        await scheduler._on_data_update()
+        await asyncio.sleep(0.1)
+
+        scheduler._running = False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        processor = scheduler.signal_processor.generate_signals_for_symbols
+        assert [call.args[0] for call in processor.await_args_list] == [
+            ["BTCUSDT", "ETHUSDT"],
+            ["SOLUSDT"],
+        ]
+        assert scheduler._pending_symbols(candle) == []
+
+    @pytest.mark.asyncio
+    async def test_batch_error_counts_per_symbol(self):
+        scheduler = _scheduler()
+        scheduler.signal_processor.generate_signals_for_symbols = AsyncMock(
+            side_effect=RuntimeError("db down")
+        )
+        candle = scheduler._current_candle()
+
+        assert await scheduler._run_batch(candle) == 3
+        assert scheduler._error_counts == {"BTCUSDT": 1, "ETHUSDT": 1, "SOLUSDT": 1}
+        # Пакет свечи уже был - повторной попытки в той же свече нет
+        assert await scheduler._run_batch(candle) == 0
+
+        scheduler._error_counts["BTCUSDT"] = scheduler._max_errors
+        await scheduler._run_batch(candle + 900)
+        processor = scheduler.signal_processor.generate_signals_for_symbols
+        assert processor.await_args.args[0] == ["ETHUSDT", "SOLUSDT"]
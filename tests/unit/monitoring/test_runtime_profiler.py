@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Тесты профайлера event loop: гистограммы стадий, семплер, экспорт Prometheus
+"""
+
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+from monitoring.metrics.runtime_profiler import Histogram, RuntimeProfiler, StackSampler
+
+
+def busy_coroutine_step(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestHistogram:
+    def test_buckets_and_quantiles(self):
+        histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+        for value in (0.005, 0.05, 0.05, 0.5, 2.0):
+            histogram.observe(value)
+
+        assert histogram.cumulative() == [("0.01", 1), ("0.1", 3), ("1", 4), ("+Inf", 5)]
+        assert histogram.count == 5
+        assert histogram.sum == pytest.approx(2.605)
+        assert 0.01 < histogram.quantile(0.5) <= 0.1
+        assert histogram.snapshot()["max_ms"] == pytest.approx(2000)
+
+
+class TestRuntimeProfiler:
+    def test_span_records_stage_duration(self):
+        profiler = RuntimeProfiler(buckets=(0.001, 0.1))
+        with profiler.span("features"):
+            time.sleep(0.01)
+        with pytest.raises(RuntimeError), profiler.span("order"):
+            raise RuntimeError("ошибка исполнения")
+
+        stages = profiler.get_stats()["stages"]
+        assert stages["features"]["count"] == 1
+        assert stages["features"]["max_ms"] >= 10
+        assert stages["order"]["count"] == 1  # Время учитывается и при исключении
+
+    def test_prometheus_text_format(self):
+        profiler = RuntimeProfiler(buckets=(0.01, 0.1))
+        profiler.observe("inference", 0.05)
+        profiler.loop_lag.record(0.002)
+
+        text = profiler.render_prometheus()
+
+        assert "# TYPE bot_trading_stage_duration_seconds histogram" in text
+        assert 'bot_trading_stage_duration_seconds_bucket{stage="inference",le="0.01"} 0' in text
+        assert 'bot_trading_stage_duration_seconds_bucket{stage="inference",le="+Inf"} 1' in text
+        assert 'bot_trading_stage_duration_seconds_count{stage="inference"} 1' in text
+        assert 'bot_trading_event_loop_lag_seconds_bucket{le="0.01"} 1' in text
+        assert text.endswith("\n")
+
+    @pytest.mark.asyncio
+    async def test_loop_monitor_and_sampler_find_blocking_code(self):
+        profiler = RuntimeProfiler()
+        profiler.loop_lag.interval = 0.005
+        profiler.start_loop_monitor()
+        profiler.start_sampler(interval_ms=2)
+
+        await asyncio.sleep(0.02)
+        busy_coroutine_step(0.15)
+        await asyncio.sleep(0.02)
+
+        report = profiler.stop_sampler()
+        await profiler.stop_loop_monitor()
+        stats = profiler.get_stats()
+
+        assert stats["loop_lag"]["max_ms"] >= 100
+        assert stats["loop_lag"]["histogram"]["count"] == stats["loop_lag"]["samples"]
+        assert report["samples"] > 10
+        top = {item["function"] for item in report["top_functions"][:3]}
+        assert any("busy_coroutine_step" in name for name in top)
+
+
+def test_sampler_attributes_sample_to_leaf_function():
+    sampler = StackSampler(threading.get_ident())
+    sampler.sample(sys._getframe())
+
+    report = sampler.report()
+    assert report["samples"] == 1
+    assert (
+        "test_sampler_attributes_sample_to_leaf_function" in report["top_functions"][0]["function"]
+    )
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Unit тесты портфельного риск-движка
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from risk_management.manager import RiskManager
+from risk_management.portfolio import PortfolioRiskEngine, RiskLimits
+
+
+def _views(closes: dict[str, np.ndarray], start: int = 0) -> dict[str, np.ndarray]:
+    """Структурированные массивы как у OHLCVRingBuffer.view()"""
+    views = {}
+    for symbol, close in closes.items():
+        view = np.zeros(len(close), dtype=[("ts", "i8"), ("close", "f8")])
+        view["ts"] = start + np.arange(len(close)) * 900
+        view["close"] = close
+        views[symbol] = view
+    return views
+
+
+def _prices(returns: np.ndarray) -> np.ndarray:
+    return 100.0 * np.exp(np.concatenate([[0.0], np.cumsum(returns)]))
+
+
+@pytest.fixture
+def market():
+    rng = np.random.default_rng(7)
+    base = rng.normal(0, 0.01, 300)
+    return {
+        "BTCUSDT": _prices(base),
+        "ETHUSDT": _prices(base + rng.normal(0, 0.002, 300)),
+        "XRPUSDT": _prices(rng.normal(0, 0.01, 300)),
+    }
+
+
+def _engine(**limits) -> PortfolioRiskEngine:
+    return PortfolioRiskEngine(
+        limits=RiskLimits(**limits), equity=1000.0, window=200, min_history=50
+    )
+
+
+class TestCovariance:
+    """Скользящая ковариация доходностей"""
+
+    def test_incremental_matches_numpy(self, market):
+        engine = _engine()
+        # Свечи подаются частями, последняя свеча каждого вида незакрыта
+        engine.update_from_views(_views({s: c[:120] for s, c in market.items()}))
+        engine.update_from_views(_views(market))
+
+        returns = np.column_stack([np.diff(np.log(market[s][:-1]))[-200:] for s in engine.symbols])
+        np.testing.assert_allclose(engine.covariance(), np.cov(returns.T), rtol=1e-9, atol=1e-14)
+        assert engine.correlation()[0, 1] > 0.9
+        assert abs(engine.correlation()[0, 2]) < 0.3
+
+    def test_stale_bar_ignored(self, market):
+        engine = _engine()
+        engine.update_from_views(_views(market))
+        assert engine.update_from_views(_views(market)) == 0
+        assert not engine.update_bar(0, {"BTCUSDT": 1.0})
+
+    def test_short_history_uses_default_volatility(self):
+        engine = _engine()
+        engine.update_bar(0, {"NEWUSDT": 1.0})
+        engine.update_bar(900, {"NEWUSDT": 2.0})
+        assert engine.covariance()[0, 0] == pytest.approx(engine.default_volatility**2)
+
+
+class TestChecks:
+    """Проверки сигналов"""
+
+    def test_symbol_exposure_and_order_leverage(self):
+        engine = _engine(max_symbol_exposure=0.5, max_order_leverage=10)
+        assert engine.check_exposure("BTCUSDT", 400).approved
+        decision = engine.check_exposure("BTCUSDT", -600, leverage=20)
+        assert not decision.approved
+        assert len(decision.reasons) == 2
+
+    def test_portfolio_leverage_and_positions(self):
+        engine = _engine(max_portfolio_leverage=1.0, max_positions=2)
+        engine.set_exposure("BTCUSDT", 500)
+        engine.set_exposure("ETHUSDT", 400)
+        decision = engine.check_exposure("XRPUSDT", 200)
+        assert not decision.approved
+        assert decision.portfolio_leverage == pytest.approx(1.1)
+        assert any("позиций" in reason for reason in decision.reasons)
+
+    def test_correlated_exposure(self, market):
+        engine = _engine(max_correlated_exposure=0.5, max_var=10, max_es=10)
+        engine.update_from_views(_views(market))
+        engine.set_exposure("BTCUSDT", 400)
+
+        # ETH движется вместе с BTC, XRP - нет; шорт ETH хеджирует
+        assert not engine.check_exposure("ETHUSDT", 200).approved
+        assert engine.check_exposure("ETHUSDT", -200).approved
+        assert engine.check_exposure("XRPUSDT", 200).approved
+
+    def test_var_matches_full_recompute(self, market):
+        engine = _engine(max_var=10, max_es=10)
+        engine.update_from_views(_views(market))
+        engine.sync_positions(
+            [
+                SimpleNamespace(symbol="BTCUSDT", side="Buy", size=2.0, mark_price=100.0),
+                SimpleNamespace(symbol="XRPUSDT", side="Sell", size=1.0, mark_price=150.0),
+            ]
+        )
+        decision = engine.check_exposure("ETHUSDT", 300)
+
+        weights = np.array([200.0, 300.0, -150.0])
+        sigma = np.sqrt(weights @ engine.covariance() @ weights)
+        assert decision.var == pytest.approx(engine._var_scale * sigma)
+        assert decision.es > decision.var
+
+        # set_exposure обновляет дисперсию инкрементально
+        engine.set_exposure("ETHUSDT", 300)
+        assert engine.get_state()["var"] == pytest.approx(decision.var)
+
+    def test_reduction_always_approved(self):
+        engine = _engine(max_symbol_exposure=0.1)
+        engine.set_exposure("BTCUSDT", 800)
+        assert engine.check_exposure("BTCUSDT", 500).approved
+        assert not engine.check_exposure("BTCUSDT", -500).approved
+
+    def test_check_limits(self):
+        engine = _engine(max_portfolio_leverage=1.0)
+        assert engine.check_limits() == []
+        engine.set_exposure("BTCUSDT", 1500)
+        assert len(engine.check_limits()) == 1
+
+
+class TestRiskManager:
+    """Интеграция с RiskManager"""
+
+    @pytest.fixture
+    def manager(self):
+        return RiskManager(
+            config={
+                "fixed_risk_balance": 1000,
+                "max_leverage": 10,
+                "risk_profiles": {"standard": {"max_position_size": 50}},
+                "portfolio": {
+                    "breach_action": "pause",
+                    "limits": {"max_symbol_exposure": 0.6, "max_portfolio_leverage": 1.0},
+                },
+            }
+        )
+
+    @pytest.mark.asyncio
+    async def test_check_signal_risk(self, manager):
+        signal = {"symbol": "BTCUSDT", "side": "long", "leverage": 10}
+        assert await manager.check_signal_risk(signal)
+        assert not await manager.check_signal_risk({**signal, "leverage": 20})
+        assert await manager.check_signal_risk({"symbol": "BTCUSDT", "side": "close_long"})
+
+    @pytest.mark.asyncio
+    async def test_commit_and_global_risks(self, manager):
+        manager.commit_signal({"symbol": "BTCUSDT", "side": "long", "notional": 600})
+        manager.commit_signal({"symbol": "ETHUSDT", "side": "short", "notional": 600})
+        assert manager.portfolio.get_exposure("ETHUSDT") == -600
+
+        status = await manager.check_global_risks()
+        assert status.requires_action
+        assert status.action == "pause"
+
+    def test_reserve_blocks_parallel_signals(self, manager):
+        # Резерв виден следующей проверке до создания ордеров
+        first = {"symbol": "BTCUSDT", "side": "long", "notional": 600}
+        second = {"symbol": "ETHUSDT", "side": "long", "notional": 600}
+        assert manager.reserve_signal(first).approved
+        assert not manager.reserve_signal(second).approved
+        assert manager.portfolio.get_exposure("ETHUSDT") == 0
+
+        # Ордер не создан - экспозиция возвращается
+        manager.release_signal(first)
+        assert manager.portfolio.get_exposure("BTCUSDT") == 0
+        assert manager.reserve_signal(second).approved
+
+    def test_reservations_survive_position_sync(self, manager):
+        position = SimpleNamespace(symbol="ETHUSDT", side="Buy", size=1.0, mark_price=300.0)
+        manager.reserve_signal({"symbol": "BTCUSDT", "side": "long", "notional": 400})
+        manager.sync_positions([position])
+        assert manager.portfolio.get_exposure("BTCUSDT") == 400
+        assert manager.portfolio.get_exposure("ETHUSDT") == 300
+
+        # Подтвержденный резерв держится до появления позиции
+        manager.commit_signal({"symbol": "BTCUSDT", "side": "long", "notional": 350})
+        manager.sync_positions([position])
+        assert manager.portfolio.get_exposure("BTCUSDT") == 350
+
+        filled = SimpleNamespace(symbol="BTCUSDT", side="Buy", size=0.01, mark_price=34000.0)
+        manager.sync_positions([position, filled])
+        manager.sync_positions([position])
+        assert manager.portfolio.get_exposure("BTCUSDT") == 0
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Тесты общего буферизованного writer свечей
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from data.candle_writer import CandleWriter
+from database.repositories.market_data_repository import CandleRecord
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def candle(symbol: str, index: int, close: float = 100.0) -> CandleRecord:
+    moment = START + timedelta(minutes=15 * index)
+    return CandleRecord(
+        symbol, int(moment.timestamp() * 1000), moment, close, close + 1, close - 1, close, 1.0
+    )
+
+
+def make_writer(**kwargs) -> tuple[CandleWriter, AsyncMock]:
+    repository = AsyncMock()
+    return CandleWriter(repository=repository, **kwargs), repository
+
+
+def saved(repository: AsyncMock, call: int = -1) -> list[CandleRecord]:
+    return repository.save_candles.await_args_list[call].args[0]
+
+
+async def test_flush_writes_all_symbols_in_one_call():
+    writer, repository = make_writer()
+    for symbol in ["AAAUSDT", "BBBUSDT", "CCCUSDT"]:
+        writer.enqueue(candle(symbol, i) for i in range(100))
+
+    assert writer.queue_depth == 300
+    assert await writer.flush() == 300
+
+    repository.save_candles.assert_awaited_once()
+    assert len(saved(repository)) == 300
+    stats = writer.get_stats()
+    assert stats["queue_depth"] == 0
+    assert stats["flushes"] == 1
+    assert stats["candles_written"] == stats["last_batch_size"] == 300
+    assert stats["last_flush_ms"] >= 0
+
+
+async def test_updates_of_same_candle_coalesced():
+    writer, repository = make_writer()
+    writer.enqueue([candle("AAAUSDT", 0, 100.0), candle("AAAUSDT", 1, 101.0)])
+    writer.enqueue([candle("AAAUSDT", 0, 105.0)])
+
+    await writer.flush()
+
+    batch = saved(repository)
+    assert [c.close for c in batch] == [101.0, 105.0]
+    assert writer.get_stats()["coalesced"] == 1
+
+
+async def test_add_flushes_when_batch_full():
+    writer, repository = make_writer(max_batch=10, flush_interval=60)
+    await writer.add(candle("AAAUSDT", i) for i in range(5))
+    repository.save_candles.assert_not_awaited()
+
+    await writer.add(candle("BBBUSDT", i) for i in range(5))
+    assert len(saved(repository)) == 10
+    await writer.stop()
+
+
+async def test_background_flush():
+    writer, repository = make_writer(flush_interval=0.01)
+    await writer.add([candle("AAAUSDT", 0)])
+    await writer.add([candle("BBBUSDT", 0)])
+
+    for _ in range(100):
+        if repository.save_candles.await_count:
+            break
+        await asyncio.sleep(0.01)
+
+    assert len(saved(repository)) == 2
+    assert writer.queue_depth == 0
+
+
+async def test_failed_flush_keeps_candles_without_overwriting_newer():
+    writer, repository = make_writer(max_pending=3, max_batch=1)
+    gate = asyncio.Event()
+
+    async def failing(batch):
+        # Пока идет запись, приходит обновление той же свечи
+        writer.enqueue([candle("AAAUSDT", 0, 200.0)])
+        gate.set()
+        raise ConnectionError("db down")
+
+    repository.save_candles.side_effect = failing
+    writer.enqueue([candle("AAAUSDT", 0), candle("AAAUSDT", 1), candle("AAAUSDT", 2)])
+
+    with pytest.raises(ConnectionError):
+        await writer.flush()
+
+    assert gate.is_set()
+    assert writer.queue_depth == 3
+    assert writer.get_stats()["failed_flushes"] == 1
+    assert writer._pending[candle("AAAUSDT", 0).key].close == 200.0
+
+    # Переполнение буфера отбрасывает самые старые свечи
+    writer.enqueue([candle("AAAUSDT", 3)])
+    assert writer.queue_depth == 3
+    assert writer.get_stats()["dropped"] == 1
+
+    repository.save_candles.side_effect = None
+    assert await writer.write([]) == 0
+    assert writer.queue_depth == 0
+
+
+async def test_data_error_rejects_only_bad_candles():
+    writer, repository = make_writer()
+    bad = candle("BBBUSDT", 5, close=-1.0)
+    written = []
+
+    async def check_constraint(batch):
+        if bad in batch:
+            raise ValueError("new row violates check constraint")
+        written.extend(batch)
+
+    repository.save_candles.side_effect = check_constraint
+    writer.enqueue(candle("AAAUSDT", i) for i in range(8))
+    writer.enqueue([bad])
+
+    assert await writer.flush() == 8
+    assert writer.queue_depth == 0
+    assert sorted(written) == sorted(candle("AAAUSDT", i) for i in range(8))
+    stats = writer.get_stats()
+    assert stats["rejected"] == 1
+    assert stats["candles_written"] == 8
+    assert stats["failed_flushes"] == 0
+
+
+async def test_connection_error_during_bisect_keeps_unwritten():
+    writer, repository = make_writer()
+    calls = []
+
+    async def failing(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise ValueError("bad row")
+        if len(calls) == 3:
+            raise ConnectionError("db down")
+
+    repository.save_candles.side_effect = failing
+    writer.enqueue(candle("AAAUSDT", i) for i in range(4))
+
+    with pytest.raises(ConnectionError):
+        await writer.flush()
+
+    # Первая половина записана, вторая возвращена в буфер
+    assert calls == [4, 2, 2]
+    assert list(writer._pending) == [candle("AAAUSDT", i).key for i in (2, 3)]
+    assert writer.get_stats()["rejected"] == 0
+
+
+async def test_stop_during_background_write_keeps_candles():
+    writer, repository = make_writer(flush_interval=0)
+    started = asyncio.Event()
+
+    async def hanging(batch):
+        started.set()
+        await asyncio.Event().wait()
+
+    repository.save_candles.side_effect = hanging
+    await writer.add([candle("AAAUSDT", 0)])
+    await asyncio.wait_for(started.wait(), 1)
+
+    # Отмена фонового flush возвращает пачку, stop дописывает ее
+    repository.save_candles.side_effect = None
+    await writer.stop()
+
+    assert repository.save_candles.await_count == 2
+    assert len(saved(repository)) == 1
+    assert writer.queue_depth == 0
+
+
+def test_from_config():
+    writer = CandleWriter.from_config(
+        {"data_management": {"candle_writer": {"max_batch": 100, "flush_interval": 0.5}}}
+    )
+    assert writer.max_batch == 100
+    assert writer.flush_interval == 0.5
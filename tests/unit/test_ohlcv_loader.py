@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Тесты колоночной загрузки OHLCV через бинарный COPY
+"""
+
+import struct
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.ohlcv_loader import (
+    COPY_SIGNATURE,
+    OHLCV_COLUMNS,
+    PG_EPOCH_US,
+    OHLCVColumnarLoader,
+    parse_binary_copy,
+)
+
+
+def encode_binary_copy(rows: list[tuple], codes: list[str]) -> bytes:
+    """Кодирует строки в бинарный формат COPY (None -> NULL)"""
+    buffer = bytearray(COPY_SIGNATURE)
+    buffer += struct.pack(">ii", 0, 0)
+    for row in rows:
+        buffer += struct.pack(">h", len(row))
+        for value, code in zip(row, codes, strict=True):
+            if value is None:
+                buffer += struct.pack(">i", -1)
+            else:
+                buffer += struct.pack(">i", 8) + struct.pack(
+                    f">{'q' if code == 'i8' else 'd'}", value
+                )
+    buffer += struct.pack(">h", -1)
+    return bytes(buffer)
+
+
+def candle_row(symbol_idx: int, minute: int, close: float) -> tuple:
+    moment = datetime(2024, 1, 1, 0, minute, tzinfo=UTC)
+    epoch_us = int(moment.timestamp() * 1_000_000)
+    return (
+        symbol_idx,
+        epoch_us // 1000,
+        epoch_us - PG_EPOCH_US,
+        close - 1,
+        close + 2,
+        close - 3,
+        close,
+        1000.5,
+        close * 1000.5,
+    )
+
+
+class FakeConnection:
+    def __init__(self, payload: bytes):
+        self.payload = payload
+        self.calls = []
+
+    async def copy_from_query(self, query, *args, output, format):
+        self.calls.append((query, args, format))
+        output.write(self.payload)
+
+
+class FakePool:
+    def __init__(self, payload: bytes):
+        self.connection = FakeConnection(payload)
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.connection
+
+
+CODES = [code for _, _, code in OHLCV_COLUMNS]
+
+
+class TestParseBinaryCopy:
+    def test_parses_fixed_width_rows(self):
+        payload = encode_binary_copy([candle_row(1, 0, 100.0), candle_row(1, 15, 101.5)], CODES)
+
+        rows = parse_binary_copy(payload, [(name, code) for name, _, code in OHLCV_COLUMNS])
+
+        assert len(rows) == 2
+        np.testing.assert_array_equal(rows["close"].astype(float), [100.0, 101.5])
+
+    def test_empty_result(self):
+        rows = parse_binary_copy(encode_binary_copy([], CODES), [("a", "i8")])
+        assert len(rows) == 0
+
+    def test_null_values_are_rejected(self):
+        row = list(candle_row(1, 0, 100.0))
+        row[-1] = None
+        payload = encode_binary_copy([tuple(row)], CODES)
+
+        with pytest.raises(ValueError):
+            parse_binary_copy(payload, [(name, code) for name, _, code in OHLCV_COLUMNS])
+
+    def test_invalid_signature(self):
+        with pytest.raises(ValueError):
+            parse_binary_copy(b"not a copy stream", [("a", "i8")])
+
+
+@pytest.mark.asyncio
+class TestOHLCVColumnarLoader:
+    async def test_load_many_splits_by_symbol(self):
+        payload = encode_binary_copy(
+            [candle_row(1, 0, 100.0), candle_row(1, 15, 101.0), candle_row(3, 0, 10.0)],
+            CODES,
+        )
+        pool = FakePool(payload)
+        loader = OHLCVColumnarLoader(pool)
+
+        frames = await loader.load_many(
+            ["BTCUSDT", "ETHUSDT", "SOLUSDT"], limit=480, add_symbol=True
+        )
+
+        assert set(frames) == {"BTCUSDT", "SOLUSDT"}
+        btc = frames["BTCUSDT"]
+        assert list(btc.columns) == [
+            "timestamp",
+            "open",
+            "high",
+            "low",
+            "close",
+            "volume",
+            "turnover",
+            "symbol",
+        ]
+        assert btc.index.name == "datetime"
+        assert btc.index[1] == pd.Timestamp("2024-01-01 00:15", tz="UTC")
+        assert btc["close"].dtype == np.float64
+        assert btc["timestamp"].iloc[0] == int(btc.index[0].timestamp() * 1000)
+        assert frames["SOLUSDT"]["close"].tolist() == [10.0]
+        assert (btc["symbol"] == "BTCUSDT").all()
+
+        query, args, copy_format = pool.connection.calls[0]
+        assert copy_format == "binary"
+        assert args == (["BTCUSDT", "ETHUSDT", "SOLUSDT"], "bybit", 15, 480)
+        assert "PARTITION BY symbol ORDER BY timestamp DESC" in query
+
+    async def test_load_returns_none_without_rows(self):
+        loader = OHLCVColumnarLoader(FakePool(encode_binary_copy([], CODES)))
+
+        assert await loader.load("BTCUSDT") is None
+
+    async def test_optional_filters(self):
+        start = datetime(2024, 1, 1, tzinfo=UTC)
+        query, args = OHLCVColumnarLoader.build_query(
+            exchange=None, interval_minutes=None, start=start, limit=10, newest=False
+        )
+
+        assert args == [start, 10]
+        assert "datetime >= $2" in query
+        assert "rn <= $3" in query
+        assert "exchange" not in query
+        assert "ORDER BY timestamp ASC" in query
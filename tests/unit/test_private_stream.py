@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Unit тесты обработчика приватного потока: ордера -> OrderManager, позиции -> трекер
+"""
+
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from database.models.base_models import Order, OrderSide, OrderStatus, OrderType
+from exchanges.base.websocket_base import MessageType, WebSocketMessage
+from trading.orders.order_manager import OrderManager
+from trading.position_tracker import EnhancedPositionTracker
+from trading.private_stream import PrivateStreamHandler
+
+pytestmark = pytest.mark.unit
+
+
+def stream_message(channel: str, *items: dict) -> WebSocketMessage:
+    return WebSocketMessage(MessageType.DATA, channel=channel, data=list(items))
+
+
+def active_handler(**kwargs) -> PrivateStreamHandler:
+    """Обработчик подписанного и подключенного потока"""
+    handler = PrivateStreamHandler(**kwargs)
+    handler._subscribed = handler.active = True
+    return handler
+
+
+@pytest.fixture
+def order_manager():
+    manager = OrderManager(exchange_registry=MagicMock())
+    manager._update_order_in_db = AsyncMock()
+    order = Order(
+        exchange="bybit",
+        symbol="BTCUSDT",
+        order_id="local-1",
+        side=OrderSide.BUY,
+        order_type=OrderType.LIMIT,
+        status=OrderStatus.OPEN,
+        price=50000.0,
+        quantity=0.01,
+    )
+    manager._active_orders["local-1"] = order
+    # place_order вернул ID биржи
+    manager._exchange_order_ids["exch-1"] = "local-1"
+    order.order_id = "exch-1"
+    return manager
+
+
+@pytest.fixture
+async def tracker():
+    tracker = EnhancedPositionTracker(exchange_manager=AsyncMock())
+    tracker._save_position_to_db = AsyncMock()
+    tracker._update_position_in_db = AsyncMock()
+    await tracker.track_position(
+        position_id="pos-1",
+        symbol="BTCUSDT",
+        side="long",
+        size=Decimal("0.01"),
+        entry_price=Decimal("50000"),
+    )
+    return tracker
+
+
+async def test_order_update_resolved_by_order_link_id(order_manager):
+    handler = active_handler(order_manager=order_manager)
+
+    await handler.on_order(
+        stream_message(
+            "order",
+            {
+                "orderId": "exch-1",
+                "orderLinkId": "local-1",
+                "orderStatus": "PartiallyFilled",
+                "cumExecQty": "0.004",
+                "avgPrice": "50010",
+            },
+        )
+    )
+
+    order = order_manager.get_order("local-1")
+    assert order.status == OrderStatus.PARTIALLY_FILLED
+    assert order.filled_quantity == 0.004
+    assert order.average_price == 50010.0
+
+
+async def test_filled_order_removed_via_exchange_id(order_manager):
+    handler = active_handler(order_manager=order_manager)
+
+    await handler.on_order(
+        stream_message(
+            "order",
+            {
+                "orderId": "exch-1",
+                "orderLinkId": "",
+                "orderStatus": "Filled",
+                "cumExecQty": "0.01",
+                "avgPrice": "",
+            },
+        )
+    )
+
+    assert order_manager.get_order("exch-1") is None
+    assert order_manager._exchange_order_ids == {}
+    assert handler.stats["orders"] == 1
+
+
+async def test_unknown_status_ignored(order_manager):
+    handler = active_handler(order_manager=order_manager)
+
+    await handler.on_order(stream_message("order", {"orderId": "exch-1", "orderStatus": "Weird"}))
+
+    assert order_manager.get_order("local-1").status == OrderStatus.OPEN
+
+
+async def test_position_update_applied_and_notifies(tracker):
+    changed = []
+    handler = active_handler(position_tracker=tracker, on_change=lambda: changed.append(1))
+
+    await handler.on_position(
+        stream_message(
+            "position",
+            {
+                "symbol": "BTCUSDT",
+                "side": "Buy",
+                "positionIdx": 0,
+                "size": "0.02",
+                "avgPrice": "50100",
+                "markPrice": "51000",
+                "stopLoss": "49000",
+                "takeProfit": "",
+            },
+        )
+    )
+
+    position = tracker.tracked_positions["pos-1"]
+    assert position.size == Decimal("0.02")
+    assert position.entry_price == Decimal("50100")
+    assert position.current_price == Decimal("51000")
+    assert position.stop_loss == Decimal("49000")
+    assert position.metrics.unrealized_pnl > 0
+    assert changed == [1]
+
+
+async def test_zero_size_position_removed(tracker):
+    handler = active_handler(position_tracker=tracker)
+
+    # Hedge mode: закрытая позиция без side, сторона по positionIdx
+    await handler.on_position(
+        stream_message("position", {"symbol": "BTCUSDT", "side": "", "positionIdx": 1, "size": "0"})
+    )
+
+    assert "pos-1" not in tracker.tracked_positions
+
+
+async def test_execution_notifies_only_trades():
+    changed = []
+    handler = active_handler(on_change=lambda: changed.append(1))
+
+    await handler.on_execution(
+        stream_message(
+            "execution",
+            {"symbol": "ETHUSDT", "execType": "Funding"},
+            {
+                "symbol": "BTCUSDT",
+                "execType": "Trade",
+                "side": "Buy",
+                "execQty": "0.01",
+                "execPrice": "50000",
+            },
+        )
+    )
+
+    assert changed == [1]
+    assert handler.stats["executions"] == 1
+
+
+async def test_subscribe_marks_active():
+    exchange = MagicMock()
+    exchange.subscribe_orders = AsyncMock(return_value=True)
+    exchange.subscribe_positions = AsyncMock(return_value=True)
+    exchange.subscribe_executions = AsyncMock(return_value=False)
+    handler = PrivateStreamHandler()
+
+    assert await handler.subscribe(exchange) is False
+    assert handler.active is False
+
+    exchange.subscribe_executions.return_value = True
+    assert await handler.subscribe(exchange) is True
+    assert handler.get_stats()["active"] is True
+
+
+async def test_disconnect_deactivates_and_requires_resync(order_manager):
+    exchange = MagicMock()
+    exchange.subscribe_orders = AsyncMock(return_value=True)
+    exchange.subscribe_positions = AsyncMock(return_value=True)
+    exchange.subscribe_executions = AsyncMock(return_value=True)
+    exchange.private_stream_connected = True
+    exchange.stop_websocket = AsyncMock()
+    handler = PrivateStreamHandler(order_manager=order_manager)
+
+    assert await handler.subscribe(exchange)
+    callbacks = exchange.set_private_stream_callbacks.call_args.kwargs
+    callbacks["on_disconnect"]()
+    assert handler.active is False
+    assert handler.resync_required
+
+    # Пока поток отключен, события не применяются
+    filled = stream_message("order", {"orderId": "exch-1", "orderStatus": "Filled"})
+    await handler.on_order(filled)
+    assert order_manager.get_order("exch-1") is not None
+
+    handler.resync_required = False
+    callbacks["on_connect"]()
+    assert handler.active and handler.resync_required
+
+    await handler.stop()
+    exchange.stop_websocket.assert_awaited_once()
+    assert handler.active is False
+    await handler.on_order(filled)
+    assert order_manager.get_order("exch-1") is not None
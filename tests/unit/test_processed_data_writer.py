@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Тесты write-behind очереди снимков индикаторов (processed_market_data)
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.processed_data_writer import (
+    PROCESSED_COLUMNS,
+    IndicatorSnapshot,
+    ProcessedDataWriter,
+)
+from ml.realtime_indicator_calculator import RealTimeIndicatorCalculator
+
+START = pd.Timestamp("2024-01-01", tz="UTC")
+STEP_MS = 15 * 60 * 1000
+
+
+def snapshot(symbol: str, index: int, rsi: float = 50.0) -> IndicatorSnapshot:
+    moment = START + pd.Timedelta(minutes=15 * index)
+    return IndicatorSnapshot(
+        symbol=symbol,
+        timestamp=int(moment.timestamp() * 1000),
+        datetime=moment,
+        ohlcv={"open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10.0},
+        technical_indicators={"rsi_14": rsi},
+        microstructure_features={},
+        ml_features={"rsi_14": rsi, "broken": float("nan")},
+    )
+
+
+def make_pool(status: str | None = None) -> MagicMock:
+    pool = MagicMock()
+
+    async def execute(query, *arrays):
+        return status or f"INSERT 0 {len(arrays[0])}"
+
+    pool.execute = AsyncMock(side_effect=execute)
+    return pool
+
+
+def columns(call) -> dict[str, list]:
+    return {
+        name: values for (name, _), values in zip(PROCESSED_COLUMNS, call.args[1:], strict=True)
+    }
+
+
+async def test_flush_is_single_upsert_with_raw_join():
+    pool = make_pool()
+    writer = ProcessedDataWriter(pool, flush_interval=60)
+    for symbol in ["AAAUSDT", "BBBUSDT", "CCCUSDT"]:
+        writer.submit(snapshot(symbol, 0))
+
+    pool.execute.assert_not_awaited()
+    assert await writer.flush() == 3
+
+    pool.execute.assert_awaited_once()
+    call = pool.execute.await_args
+    query = " ".join(call.args[0].split())
+    assert "FROM unnest($1::text[], $2::int8[]" in query
+    assert "CROSS JOIN LATERAL" in query
+    assert "r.symbol = s.symbol AND r.timestamp <= s.timestamp" in query
+    assert "ON CONFLICT ON CONSTRAINT _symbol_timestamp_processed_uc DO UPDATE" in query
+
+    values = columns(call)
+    assert values["symbol"] == ["AAAUSDT", "BBBUSDT", "CCCUSDT"]
+    assert values["close"] == [1.5, 1.5, 1.5]
+    # NaN недопустим в JSONB
+    assert json.loads(values["ml_features"][0]) == {"rsi_14": 50.0, "broken": None}
+    assert writer.get_stats()["written"] == 3
+    await writer.stop()
+
+
+async def test_same_candle_coalesced():
+    pool = make_pool()
+    writer = ProcessedDataWriter(pool, flush_interval=60)
+    writer.submit(snapshot("AAAUSDT", 0, rsi=40.0))
+    writer.submit(snapshot("AAAUSDT", 0, rsi=45.0))
+
+    await writer.flush()
+
+    values = columns(pool.execute.await_args)
+    assert json.loads(values["technical_indicators"][0]) == {"rsi_14": 45.0}
+    assert writer.get_stats()["coalesced"] == 1
+    await writer.stop()
+
+
+async def test_backpressure_drops_superseded_snapshots_first():
+    writer = ProcessedDataWriter(make_pool(), flush_interval=60, max_pending=3)
+    writer.submit(snapshot("AAAUSDT", 0))
+    writer.submit(snapshot("BBBUSDT", 0))
+    writer.submit(snapshot("AAAUSDT", 1))
+    # AAAUSDT@0 вытеснен более новым снимком, BBBUSDT@0 - единственный для символа
+    writer.submit(snapshot("CCCUSDT", 0))
+
+    assert [key[0] for key in writer._pending] == ["BBBUSDT", "AAAUSDT", "CCCUSDT"]
+    assert writer.get_stats()["superseded"] == 1
+
+    # Без устаревших снимков вытесняются самые старые
+    writer.submit(snapshot("DDDUSDT", 0))
+    assert [key[0] for key in writer._pending] == ["AAAUSDT", "CCCUSDT", "DDDUSDT"]
+    assert writer.get_stats()["dropped"] == 1
+    await writer.stop()
+
+
+async def test_failed_flush_requeues_and_batches():
+    pool = make_pool()
+    pool.execute.side_effect = ConnectionError("db down")
+    writer = ProcessedDataWriter(pool, flush_interval=60, max_batch=2)
+    for index in range(3):
+        writer.submit(snapshot("AAAUSDT", index))
+
+    with pytest.raises(ConnectionError):
+        await writer.flush()
+    assert writer.queue_depth == 3
+    assert writer.get_stats()["failed_flushes"] == 1
+
+    async def one_raw_row(query, *arrays):
+        return "INSERT 0 1"
+
+    pool.execute.side_effect = one_raw_row
+    assert await writer.flush() == 2
+    # 2 пачки по max_batch, во второй снимку не нашлась свеча в raw_market_data
+    assert pool.execute.await_count == 3
+    assert writer.get_stats()["missing_raw"] == 1
+    assert writer.queue_depth == 0
+
+
+async def test_background_flush():
+    pool = make_pool()
+    writer = ProcessedDataWriter(pool, flush_interval=0.01)
+    writer.submit(snapshot("AAAUSDT", 0))
+
+    for _ in range(100):
+        if writer.queue_depth == 0 and pool.execute.await_count:
+            break
+        await asyncio.sleep(0.01)
+
+    assert writer.get_stats()["written"] == 1
+
+
+async def test_calculator_does_not_wait_for_database():
+    """Генерация индикаторов не ждет записи в БД"""
+    blocked = asyncio.Event()
+
+    async def slow_execute(query, *arrays):
+        await blocked.wait()
+        return f"INSERT 0 {len(arrays[0])}"
+
+    pool = MagicMock()
+    pool.execute = AsyncMock(side_effect=slow_execute)
+    writer = ProcessedDataWriter(pool, flush_interval=0)
+
+    close = 100 + np.arange(150, dtype=float)
+    df = pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0},
+        index=pd.date_range("2024-01-01", periods=150, freq="15min", name="datetime", tz="UTC"),
+    )
+
+    def fake_features(frame, **kwargs):
+        values = frame["close"].to_numpy()[:, None] * np.arange(1, 11)
+        features = pd.DataFrame(values, index=frame.index, columns=[f"rsi_{i}" for i in range(10)])
+        return pd.concat([frame, features], axis=1)
+
+    with patch("ml.logic.feature_engineering_production.create_engine"):
+        calculator = RealTimeIndicatorCalculator(config={}, snapshot_writer=writer)
+    with patch.object(calculator.feature_engineer, "create_features", side_effect=fake_features):
+        result = await asyncio.wait_for(calculator.calculate_indicators("BTCUSDT", df), 5)
+
+    assert result["metadata"]["symbol"] == "BTCUSDT"
+    await asyncio.sleep(0.05)
+    # Запись начата в фоне и висит на БД, расчет уже вернулся
+    assert pool.execute.await_count == 1
+    assert calculator.get_snapshot_writer_stats()["submitted"] == 1
+
+    blocked.set()
+    await calculator.shutdown()
+    assert writer.get_stats()["written"] == 1
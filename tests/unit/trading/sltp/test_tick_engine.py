@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Unit тесты тикового SL/TP движка
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+from exchanges.base.websocket_base import MessageType, WebSocketMessage
+from trading.sltp.enhanced_manager import EnhancedSLTPManager
+from trading.sltp.tick_engine import REASON_PROTECTION, REASON_TRAILING, TickSLTPEngine
+
+SLTP_CONFIG = {
+    "enhanced_sltp": {
+        "trailing_stop": {"enabled": True, "type": "percentage", "step": 0.5, "min_profit": 0.3},
+        "profit_protection": {
+            "enabled": True,
+            "breakeven_percent": 1.0,
+            "breakeven_offset": 0.2,
+            "lock_percent": [{"trigger": 2.0, "lock": 1.0}, {"trigger": 3.0, "lock": 2.0}],
+            "max_updates": 5,
+        },
+        "partial_take_profit": {
+            "enabled": True,
+            "levels": [
+                {"percent": 1.0, "close_ratio": 0.25},
+                {"percent": 2.0, "close_ratio": 0.25},
+            ],
+        },
+    }
+}
+
+
+def make_position(
+    position_id: str, side: str, entry: float, stop_loss: float | None, symbol="BTCUSDT"
+):
+    return SimpleNamespace(
+        id=position_id, symbol=symbol, side=side, size=1.0, entry_price=entry, stop_loss=stop_loss
+    )
+
+
+@pytest.fixture
+def manager():
+    config_manager = Mock()
+    config_manager.get_system_config.return_value = SLTP_CONFIG
+    manager = EnhancedSLTPManager(config_manager=config_manager)
+    manager.amend_stop_loss = AsyncMock(return_value=Mock())
+    manager.check_partial_tp = AsyncMock(return_value=True)
+    return manager
+
+
+@pytest.fixture
+def engine(manager):
+    engine = TickSLTPEngine(manager, debounce=0.01, min_amend_interval=0.0, min_move_percent=0.0)
+    engine.sync_positions(
+        [
+            make_position("long", "Buy", 100.0, 98.0),
+            make_position("short", "Sell", 100.0, 102.0),
+            make_position("no_sl", "Buy", 100.0, None),
+        ]
+    )
+    return engine
+
+
+def test_trailing_matches_manager_formula(engine):
+    """Лонг +0.5%: трейлинг price*(1-0.5%); шорт в убытке не трогается"""
+    amendments, partial_hits = engine.evaluate("BTCUSDT", 100.5)
+
+    assert [a.position_id for a in amendments] == ["long"]
+    assert amendments[0].price == pytest.approx(100.5 * 0.995)
+    assert amendments[0].reason == REASON_TRAILING
+    assert partial_hits == []
+
+
+def test_protection_lock_level(engine, manager):
+    """Шорт +3% без трейлинга: фиксация 2% прибыли (entry*0.98)"""
+    manager.config.trailing_stop.enabled = False
+    amendments, _ = engine.evaluate("BTCUSDT", 97.0)
+
+    short = next(a for a in amendments if a.position_id == "short")
+    assert short.price == pytest.approx(98.0)
+    assert short.reason == REASON_PROTECTION
+    assert engine._books["BTCUSDT"].protection_updates[1] == 1
+
+
+def test_only_improvements_emitted(engine):
+    engine.evaluate("BTCUSDT", 101.0)
+    # Откат цены не ухудшает SL
+    amendments, _ = engine.evaluate("BTCUSDT", 100.6)
+    assert amendments == []
+
+
+def test_partial_tp_levels_crossed_once(engine):
+    _, hits = engine.evaluate("BTCUSDT", 102.5)
+    assert hits == [(0, 2), (2, 2)]
+
+    _, hits = engine.evaluate("BTCUSDT", 103.0)
+    assert hits == []
+
+
+def test_state_survives_sync(engine):
+    engine.evaluate("BTCUSDT", 101.0)
+    sl = engine._books["BTCUSDT"].sl[0]
+
+    engine.sync_positions([make_position("long", "Buy", 100.0, 98.0)])
+
+    assert engine._books["BTCUSDT"].sl[0] == sl
+    assert engine._books["BTCUSDT"].partial_done[0].tolist() == [True, False]
+
+
+async def test_amendments_coalesced_per_position(engine, manager):
+    for price in (100.5, 100.8, 101.2):
+        await engine.on_tick("BTCUSDT", price)
+    await engine.flush(force=True)
+
+    manager.amend_stop_loss.assert_awaited_once()
+    args = manager.amend_stop_loss.await_args
+    assert args.args[1] == pytest.approx(101.2 * 0.995)
+    assert engine.stats["amendments_coalesced"] == 2
+    await engine.stop()
+
+
+async def test_min_amend_interval_defers_update(manager):
+    engine = TickSLTPEngine(manager, debounce=0.01, min_amend_interval=60.0, min_move_percent=0.0)
+    engine.sync_positions([make_position("long", "Buy", 100.0, 98.0)])
+
+    await engine.on_tick("BTCUSDT", 100.5)
+    await engine.flush()
+    await engine.on_tick("BTCUSDT", 101.0)
+    assert await engine.flush() == 0
+    assert "long" in engine._pending
+
+    assert await engine.flush(force=True) == 1
+    assert manager.amend_stop_loss.await_count == 2
+    await engine.stop()
+
+
+async def test_failed_amendment_rolls_back(engine, manager):
+    manager.amend_stop_loss.return_value = None
+
+    await engine.on_tick("BTCUSDT", 100.5)
+    await engine.flush(force=True)
+
+    assert engine._books["BTCUSDT"].sl[0] == 98.0
+    assert engine.stats["amendments_failed"] == 1
+    await engine.stop()
+
+
+async def test_ticker_message_triggers_debounced_flush(engine, manager):
+    message = WebSocketMessage(
+        MessageType.DATA, channel="tickers", symbol="BTCUSDT", data={"lastPrice": "100.5"}
+    )
+    await engine.on_ticker_message(message)
+    # delta без lastPrice игнорируется
+    await engine.on_ticker_message(
+        WebSocketMessage(
+            MessageType.DATA, channel="tickers", symbol="BTCUSDT", data={"volume24h": "1"}
+        )
+    )
+
+    await asyncio.sleep(0.05)
+    manager.amend_stop_loss.assert_awaited_once()
+    assert engine.stats["ticks"] == 1
+    await engine.stop()
+
+
+def test_positions_without_sl_are_not_amended(engine):
+    amendments, _ = engine.evaluate("BTCUSDT", 110.0)
+    assert "no_sl" not in {a.position_id for a in amendments}
+    assert np.isnan(engine._books["BTCUSDT"].sl[2])
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Unit тесты планировщика задач по символам
+"""
+
+import asyncio
+
+import pytest
+
+from trading.symbol_scheduler import SymbolScheduler
+
+
+async def wait_until(condition, timeout: float = 2.0) -> None:
+    """Опрашивает условие, пока оно не выполнится или не истечет timeout"""
+    for _ in range(int(timeout / 0.005)):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("Условие не выполнено за отведенное время")
+
+
+class TestSymbolScheduler:
+    """Параллельность между символами и порядок внутри символа"""
+
+    @pytest.mark.asyncio
+    async def test_order_preserved_within_symbol(self):
+        done = []
+
+        async def handler(item):
+            symbol, n = item
+            await asyncio.sleep(0.01 if n == 0 else 0)
+            done.append(item)
+
+        scheduler = SymbolScheduler(handler, workers=4)
+        scheduler.start()
+        for n in range(3):
+            for symbol in ("BTCUSDT", "ETHUSDT"):
+                await scheduler.submit(symbol, (symbol, n), priority=n)
+        await wait_until(lambda: scheduler.get_stats()["processed"] >= 6)
+        await scheduler.stop()
+
+        for symbol in ("BTCUSDT", "ETHUSDT"):
+            assert [n for s, n in done if s == symbol] == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_slow_symbol_does_not_block_others(self):
+        release = asyncio.Event()
+        done = []
+
+        async def handler(symbol):
+            if symbol == "SLOWUSDT":
+                await release.wait()
+            done.append(symbol)
+
+        scheduler = SymbolScheduler(handler, workers=2)
+        scheduler.start()
+        await scheduler.submit("SLOWUSDT", "SLOWUSDT")
+        for symbol in ("BTCUSDT", "ETHUSDT", "XRPUSDT"):
+            await scheduler.submit(symbol, symbol)
+        await wait_until(lambda: len(done) >= 3)
+
+        assert "SLOWUSDT" not in done
+        release.set()
+        await wait_until(lambda: len(done) >= 4)
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_priority_and_bounded_workers(self):
+        running = 0
+        peak = 0
+        done = []
+
+        async def handler(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.005)
+            done.append(item)
+            running -= 1
+
+        scheduler = SymbolScheduler(handler, workers=1)
+        # Задачи ставятся до запуска воркеров - порядок определяет приоритет
+        await scheduler.submit("A", "A", priority=0.1)
+        await scheduler.submit("B", "B", priority=0.9)
+        await scheduler.submit("C", "C", priority=0.5)
+        scheduler.start()
+        await wait_until(lambda: len(done) >= 3)
+        await scheduler.stop()
+
+        assert done == ["B", "C", "A"]
+        assert peak == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_counted_and_symbol_released(self):
+        calls = []
+
+        async def handler(item):
+            calls.append(item)
+            if item == 1:
+                raise RuntimeError("boom")
+
+        scheduler = SymbolScheduler(handler, workers=2)
+        scheduler.start()
+        await scheduler.submit("BTCUSDT", 1)
+        await scheduler.submit("BTCUSDT", 2)
+        await wait_until(lambda: len(calls) >= 2)
+        stats = scheduler.get_stats()
+        await scheduler.stop()
+
+        assert calls == [1, 2]
+        assert stats["errors"] == 1
+        assert stats["pending"] == 0
+        assert stats["max_queue_latency_ms"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_keeps_latest_pending(self):
+        release = asyncio.Event()
+        done = []
+
+        async def handler(item):
+            if item == 0:
+                await release.wait()
+            done.append(item)
+
+        scheduler = SymbolScheduler(
+            handler, workers=2, max_pending_per_symbol=1, overflow="drop_oldest"
+        )
+        scheduler.start()
+        await scheduler.submit("BTCUSDT", 0)
+        await asyncio.sleep(0.01)
+        for n in range(1, 5):
+            await scheduler.submit("BTCUSDT", n)
+        assert scheduler.pending == 1
+
+        release.set()
+        await wait_until(lambda: len(done) >= 2)
+        await scheduler.stop()
+
+        assert done == [0, 4]
+        assert scheduler.get_stats()["dropped"] == 3
+
+    @pytest.mark.asyncio
+    async def test_block_applies_backpressure(self):
+        release = asyncio.Event()
+        done = []
+
+        async def handler(item):
+            await release.wait()
+            done.append(item)
+
+        scheduler = SymbolScheduler(handler, workers=1, max_pending_per_symbol=2)
+        scheduler.start()
+        for n in range(3):
+            await scheduler.submit("BTCUSDT", n)
+        await asyncio.sleep(0.01)
+
+        blocked = asyncio.create_task(scheduler.submit("BTCUSDT", 3))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        assert scheduler.pending == 2
+
+        release.set()
+        await asyncio.wait_for(blocked, 1)
+        await wait_until(lambda: len(done) >= 4)
+        await scheduler.stop()
+
+        assert done == [0, 1, 2, 3]
+        assert scheduler.get_stats()["dropped"] == 0
+
+    @pytest.mark.asyncio
+    async def test_reject_returns_immediately(self):
+        release = asyncio.Event()
+        done = []
+
+        async def handler(item):
+            await release.wait()
+            done.append(item)
+
+        scheduler = SymbolScheduler(handler, workers=2, max_pending_per_symbol=1, overflow="reject")
+        scheduler.start()
+        assert await scheduler.submit("BTCUSDT", 0)
+        await asyncio.sleep(0.01)
+        assert await scheduler.submit("BTCUSDT", 1)
+        assert not await scheduler.submit("BTCUSDT", 2)
+        assert await scheduler.submit("ETHUSDT", 3)
+
+        release.set()
+        await wait_until(lambda: len(done) >= 3)
+        await scheduler.stop()
+
+        assert sorted(done) == [0, 1, 3]
+        stats = scheduler.get_stats()
+        assert stats["rejected"] == 1
+        assert stats["dropped"] == 0
@@ -316,5 +316,51 @@ class TestTradingEngineWithSLTP:
         assert result is True
 
 
+    @pytest.mark.asyncio
+    async def test_full_symbol_queue_does_not_block_other_symbols(
+        self, mock_orchestrator, mock_config
+    ):
+        """Переполненная очередь ордеров символа отклоняет ордер, остальные идут дальше"""
+        mock_config["order_pending_per_symbol"] = 1
+        with patch("trading.engine.setup_logger"):
+            engine = TradingEngine(mock_orchestrator, mock_config)
+
+        btc_started = asyncio.Event()
+        release = asyncio.Event()
+        eth_done = asyncio.Event()
+        executed = []
+
+        async def execute_order(order):
+            if order.symbol == "BTCUSDT":
+                btc_started.set()
+                await release.wait()
+            executed.append(order.symbol)
+            if order.symbol == "ETHUSDT":
+                eth_done.set()
+            return True
+
+        engine.execution_engine = Mock(execute_order=execute_order)
+        engine.state = TradingState.RUNNING
+        engine._running = True
+        engine.order_scheduler.start()
+        loop_task = asyncio.create_task(engine._order_processing_loop())
+        try:
+            await engine.order_queue.put(Mock(symbol="BTCUSDT"))
+            await asyncio.wait_for(btc_started.wait(), 1)
+            for symbol in ("BTCUSDT", "BTCUSDT", "ETHUSDT"):
+                await engine.order_queue.put(Mock(symbol=symbol))
+
+            await asyncio.wait_for(eth_done.wait(), 1)
+            assert executed == ["ETHUSDT"]
+            assert engine.metrics.orders_rejected == 1
+            assert engine.get_status()["order_scheduler"]["rejected"] == 1
+        finally:
+            release.set()
+            engine._running = False
+            loop_task.cancel()
+            await asyncio.gather(loop_task, return_exceptions=True)
+            await engine.order_scheduler.stop()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
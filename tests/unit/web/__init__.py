@@ -0,0 +1 @@
+# Web unit tests
@@ -0,0 +1,197 @@
+"""
+Unit тесты очередей отправки WebSocket и fan-out broadcast
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from web.api.websocket.send_queue import EVICT_SLOW, ConnectionSendQueue
+from web.integration.event_bridge import EventBridge, EventType
+
+
+class FakeWebSocket:
+    """Клиент с настраиваемой задержкой отправки (None - отправка зависает)"""
+
+    def __init__(self, delay: float | None = 0.0):
+        self.delay = delay
+        self.received: list[str] = []
+        self.closed_with: int | None = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.delay is None:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append(text)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed_with = code
+
+
+async def _drain(*queues: ConnectionSendQueue, timeout: float = 5.0, settle: float = 0.1):
+    for _ in range(int(timeout / 0.01)):
+        if not any(len(q) for q in queues):
+            break
+        await asyncio.sleep(0.01)
+    # Последнее сообщение могло еще отправляться
+    await asyncio.sleep(settle)
+
+
+class TestConnectionSendQueue:
+    """Схлопывание, переполнение и отключение медленного клиента"""
+
+    @pytest.mark.asyncio
+    async def test_coalesces_pending_messages_by_key(self):
+        client = FakeWebSocket(delay=0.05)
+        queue = ConnectionSendQueue(client.send_text, "c1")
+
+        queue.put("first")
+        for price in range(10):
+            queue.put(f"BTC {price}", key="prices:BTCUSDT")
+        queue.put("last")
+        await _drain(queue)
+        await queue.close()
+
+        assert client.received[0] == "first"
+        # Пока первое сообщение отправлялось, цены схлопнулись в последнюю
+        assert client.received[1:] == ["BTC 9", "last"]
+        assert queue.coalesced == 9
+
+    @pytest.mark.asyncio
+    async def test_overflow_drops_keyed_then_evicts(self):
+        client = FakeWebSocket(delay=None)
+        evicted = []
+
+        async def on_evict(reason):
+            evicted.append(reason)
+
+        queue = ConnectionSendQueue(client.send_text, "c1", max_size=3, on_evict=on_evict)
+        queue.put("a")
+        await asyncio.sleep(0)  # "a" уже отправляется и зависла
+        queue.put("p1", key="prices:BTC")
+        queue.put("p2", key="prices:ETH")
+        queue.put("b")
+        assert queue.put("c")  # вытесняют самые старые цены
+        assert queue.put("d")
+        assert queue.dropped == 2
+        assert not evicted
+
+        assert not queue.put("e")  # места нет, отбрасывать нечего
+        await asyncio.sleep(0)
+        assert evicted == [EVICT_SLOW]
+        assert not queue.put("f")
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_stalled_send_evicts_after_timeout(self):
+        client = FakeWebSocket(delay=None)
+        evicted = []
+
+        async def on_evict(reason):
+            evicted.append(reason)
+
+        queue = ConnectionSendQueue(client.send_text, "c1", send_timeout=0.05, on_evict=on_evict)
+        queue.put("a")
+        await asyncio.sleep(0.1)
+
+        assert evicted == [EVICT_SLOW]
+        assert queue.closed
+
+
+class TestEventBridgeFanOut:
+    """Нагрузочный сценарий: 500 клиентов, часть медленных и зависших"""
+
+    @pytest.mark.asyncio
+    async def test_500_clients_slow_consumers_do_not_block_emitter(self):
+        bridge = EventBridge()
+        fast = [FakeWebSocket() for _ in range(445)]
+        slow = [FakeWebSocket(delay=0.02) for _ in range(50)]
+        stuck = [FakeWebSocket(delay=None) for _ in range(5)]
+        for websocket in fast + slow + stuck:
+            bridge.add_websocket_connection(websocket)
+        for send_queue in bridge._send_queues.values():
+            send_queue.send_timeout = 0.5
+
+        symbols = [f"SYM{i}USDT" for i in range(20)]
+        with patch("web.api.websocket.send_queue.json.dumps", wraps=json.dumps) as dumps:
+            started = time.perf_counter()
+            for tick in range(10):
+                for symbol in symbols:
+                    await bridge.emit_event(
+                        EventType.POSITION_UPDATED, {"symbol": symbol, "tick": tick}
+                    )
+                await bridge.emit_event(EventType.ORDER_FILLED, {"order": tick})
+            emit_time = time.perf_counter() - started
+
+        # Один json.dumps на событие, а не на клиента
+        assert dumps.call_count == 210
+        # Событие не ждет отправки клиентам (последовательно - минуты)
+        assert emit_time < 2.0
+
+        await _drain(*bridge._send_queues.values())
+        await asyncio.sleep(0.6)
+
+        for websocket in fast + slow:
+            messages = [json.loads(text) for text in websocket.received]
+            orders = [m["data"]["order"] for m in messages if m["type"] == "order_filled"]
+            assert orders == list(range(10))
+            latest = {
+                m["data"]["symbol"]: m["data"]["tick"]
+                for m in messages
+                if m["type"] == "position_updated"
+            }
+            assert latest == dict.fromkeys(symbols, 9)
+
+        # Медленные получили меньше промежуточных позиций за счет схлопывания
+        assert max(len(ws.received) for ws in slow) < 210
+        # Зависшие клиенты отключены, остальные на месте
+        assert all(ws.closed_with == 1008 for ws in stuck)
+        assert len(bridge.websocket_connections) == 495
+        assert bridge.get_status()["send_queues"]["evicted_connections"] == 5
+
+        await bridge.cleanup()
+
+
+class TestWebSocketManagerFanOut:
+    """Broadcast менеджера: потоки с схлопыванием и отключение медленных"""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_to_stream_500_clients(self):
+        pytest.importorskip("fastapi")
+        from web.api.websocket.manager import WebSocketManager
+
+        manager = WebSocketManager()
+        manager.send_timeout = 0.5
+        await manager.start()
+        clients = [FakeWebSocket() for _ in range(500)]
+        for websocket in clients:
+            connection_id = await manager.connect(websocket)
+            await manager._handle_subscribe(connection_id, {"stream": "prices"})
+        # Последние 5 клиентов перестают принимать сообщения
+        for websocket in clients[495:]:
+            websocket.delay = None
+
+        started = time.perf_counter()
+        for tick in range(20):
+            await manager.broadcast_to_stream("prices", {"symbol": "BTCUSDT", "price": tick})
+        await manager.broadcast_to_all({"type": "system_alert", "level": "info"})
+        assert time.perf_counter() - started < 1.0
+
+        await _drain(*(conn.send_queue for conn in manager.connections.values()), settle=0.6)
+
+        for websocket in clients[:495]:
+            messages = [json.loads(text) for text in websocket.received]
+            prices = [m["price"] for m in messages if m.get("symbol") == "BTCUSDT"]
+            assert prices[-1] == 19
+            assert messages[-1]["type"] == "system_alert"
+
+        assert len(manager.connections) == 495
+        assert manager.get_status()["send_queues"]["evicted_connections"] == 5
+        await manager.stop()
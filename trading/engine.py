@@ -4,6 +4,7 @@
 """
 
 import asyncio
+import contextlib
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -28,6 +29,7 @@ from database.repositories.trade_repository import TradeRepository
 # Импортируем модели для создания ордеров
 from database.models.base_models import Order, OrderSide, OrderStatus, OrderType, SignalType
 from exchanges.exchange_manager import ExchangeManager
+from monitoring.metrics.runtime_profiler import runtime_profiler
 from risk_management.manager import RiskManager
 from strategies.manager import StrategyManager
 
@@ -35,6 +37,9 @@ from .execution.executor import ExecutionEngine
 from .orders.order_manager import OrderManager
 # from .positions.position_manager import PositionManager  # Удален legacy класс
 from .position_tracker import EnhancedPositionTracker, get_position_tracker
+from .private_stream import PrivateStreamHandler
+from .sltp.tick_engine import TickSLTPEngine
+from .symbol_scheduler import OVERFLOW_DROP_OLDEST, OVERFLOW_REJECT, SymbolScheduler
 
 
 class TradingState(Enum):
@@ -54,6 +59,7 @@ class TradingMetrics:
 
     signals_processed: int = 0
     orders_executed: int = 0
+    orders_rejected: int = 0  # Отклонены при переполнении очереди символа
     trades_completed: int = 0
     total_pnl: Decimal = Decimal("0")
     win_rate: float = 0.0
@@ -105,6 +111,8 @@ class TradingEngine:
         self.strategy_manager: StrategyManager | None = None
         self.exchange_registry: ExchangeManager | None = None
         self.enhanced_sltp_manager = None  # Будет инициализирован в initialize()
+        self.sltp_engine: TickSLTPEngine | None = None  # Тиковый SL/TP (enhanced_sltp.tick_engine)
+        self._sltp_streamed: set[str] = set()  # Символы с WebSocket тикером
 
         # Менеджер БД и репозитории
         self._db_manager = None
@@ -116,12 +124,35 @@ class TradingEngine:
         self.signal_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
         self.order_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
 
+        # Параллельная обработка по символам с сохранением порядка внутри символа.
+        # Сигналы копятся только в signal_queue: у символа ожидает лишь последний
+        # сигнал. Ордер сверх очереди символа отклоняется, а не ждет места: общий
+        # цикл приема ордеров не должен стоять из-за одного символа
+        self.signal_scheduler = SymbolScheduler(
+            self._handle_signal,
+            workers=config.get("signal_workers", 8),
+            name="signals",
+            max_pending_per_symbol=1,
+            overflow=OVERFLOW_DROP_OLDEST,
+        )
+        self.order_scheduler = SymbolScheduler(
+            self._execute_order,
+            workers=config.get("order_workers", 4),
+            name="orders",
+            max_pending_per_symbol=config.get("order_pending_per_symbol", 16),
+            overflow=OVERFLOW_REJECT,
+        )
+
         # Кеш и состояние
         self._price_cache: dict[str, Decimal] = {}
         self._instrument_cache: dict[str, Any] = {}  # Кеш информации об инструментах
         self._recent_signal_times: dict[str, float] = {}  # Защита от частых сигналов
         self._last_sync: datetime | None = None
 
+        # Приватный поток биржи: события будят цикл синхронизации позиций
+        self.private_stream: PrivateStreamHandler | None = None
+        self._position_event = asyncio.Event()
+
     async def initialize(self) -> bool:
         """Инициализация торгового движка"""
         try:
@@ -210,6 +241,11 @@ class TradingEngine:
             config_manager = ConfigManager()
             self.enhanced_sltp_manager = EnhancedSLTPManager(config_manager=config_manager)
             self.logger.info("Enhanced SL/TP Manager инициализирован")
+
+            tick_config = dict(self.config.get("enhanced_sltp", {}).get("tick_engine", {}))
+            if tick_config.pop("enabled", False):
+                self.sltp_engine = TickSLTPEngine(self.enhanced_sltp_manager, **tick_config)
+                self.logger.info("Тиковый SL/TP движок инициализирован")
         except Exception as e:
             self.logger.warning(f"Не удалось инициализировать Enhanced SL/TP Manager: {e}")
             self.enhanced_sltp_manager = None
@@ -394,6 +430,8 @@ class TradingEngine:
             self.metrics.start_time = datetime.now()
 
             # Создание задач
+            self.signal_scheduler.start()
+            self.order_scheduler.start()
             self._tasks.add(asyncio.create_task(self._signal_processing_loop()))
             self._tasks.add(asyncio.create_task(self._order_processing_loop()))
             self._tasks.add(asyncio.create_task(self._position_sync_loop()))
@@ -402,6 +440,8 @@ class TradingEngine:
             self._tasks.add(asyncio.create_task(self._heartbeat_loop()))
             self._tasks.add(asyncio.create_task(self._balance_update_loop()))
 
+            await self._start_private_stream()
+
             self.logger.info("Торговый движок успешно запущен")
             return True
 
@@ -431,6 +471,15 @@ class TradingEngine:
                     timeout=timeout,
                 )
 
+            await self.signal_scheduler.stop()
+            await self.order_scheduler.stop()
+
+            if self.private_stream:
+                # Закрывает WebSocket биржи - события после остановки не применяются
+                await self.private_stream.stop()
+            if self.sltp_engine:
+                await self.sltp_engine.stop()
+
             # Остановка компонентов
             if self.execution_engine:
                 await self.execution_engine.stop()
@@ -485,7 +534,12 @@ class TradingEngine:
         return True
 
     async def _signal_processing_loop(self):
-        """Основной цикл обработки сигналов"""
+        """
+        Основной цикл обработки сигналов
+
+        Сигналы из очереди распределяются по символам: разные символы
+        обрабатываются параллельно, сигналы одного символа - по порядку.
+        """
         self.logger.info("Запуск цикла обработки сигналов")
 
         while self._running:
@@ -500,21 +554,39 @@ class TradingEngine:
                 except TimeoutError:
                     continue
 
-                # Обработка сигнала
-                start_time = datetime.now()
-                await self._process_signal(signal)
-
-                # Обновление метрик
-                processing_time = (datetime.now() - start_time).total_seconds()
-                self._update_processing_metrics(processing_time)
-
-                self.metrics.signals_processed += 1
+                await self.signal_scheduler.submit(
+                    signal.symbol, signal, priority=self._signal_priority(signal)
+                )
 
             except Exception as e:
                 self.logger.error(f"Ошибка в цикле обработки сигналов: {e}")
                 self.metrics.errors_count += 1
                 await asyncio.sleep(1)
 
+    @staticmethod
+    def _signal_priority(signal) -> float:
+        """Приоритет сигнала в планировщике: сила, затем уверенность"""
+        strength = getattr(signal, "strength", None)
+        if strength is None:
+            strength = getattr(signal, "confidence", None)
+        return float(strength or 0.0)
+
+    async def _handle_signal(self, signal):
+        """Обработка сигнала воркером планировщика"""
+        try:
+            start_time = datetime.now()
+            with runtime_profiler.span("engine.process_signal"):
+                await self._process_signal(signal)
+
+            # Обновление метрик
+            processing_time = (datetime.now() - start_time).total_seconds()
+            self._update_processing_metrics(processing_time)
+
+            self.metrics.signals_processed += 1
+        except Exception:
+            self.metrics.errors_count += 1
+            raise
+
     async def _process_signal(self, signal):
         """Обработка одного торгового сигнала"""
         try:
@@ -529,48 +601,72 @@ class TradingEngine:
                 self.logger.warning(f"❌ Сигнал {signal_id} не прошел валидацию")
                 return
 
-            # Проверка рисков - TODO: включить после реализации RiskManager
-            # if self.risk_manager and not await self.risk_manager.check_signal_risk(signal):
-            #     self.logger.warning(f"Сигнал {signal_id} отклонен по риск-менеджменту")
-            #     return
-
-            # КРИТИЧНО: Проверяем и закрываем противоположные позиции
-            opposite_position = await self._check_and_close_opposite_position(signal.symbol, signal.signal_type)
-            if opposite_position:
-                self.logger.info(
-                    f"🔄 Закрыта противоположная позиция для {signal.symbol} перед открытием {signal.signal_type}"
-                )
-                # Даем время на закрытие позиции
-                await asyncio.sleep(2)
-            
-            # Проверяем существующие позиции в том же направлении
-            if await self._has_existing_position(signal.symbol, signal.signal_type):
-                self.logger.info(
-                    f"⚠️ Уже есть позиция {signal.signal_type} для {signal.symbol}, пропускаем сигнал"
-                )
+            # Портфельная проверка рисков (экспозиция, корреляция, VaR/ES, плечо).
+            # Экспозиция резервируется сразу при проверке: сигналы других символов
+            # обрабатываются параллельно и должны видеть этот резерв
+            risk_signal = self._risk_signal(signal)
+            if self.risk_manager and not self.risk_manager.reserve_signal(risk_signal).approved:
+                self.logger.warning(f"Сигнал {signal_id} отклонен по риск-менеджменту")
                 return
 
-            # Проверяем активные ордера в том же направлении
-            if await self._has_pending_orders(signal.symbol, signal.signal_type):
-                self.logger.info(
-                    f"⚠️ Уже есть активные ордера {signal.signal_type} для {signal.symbol}, пропускаем сигнал"
+            committed = False
+            try:
+                # КРИТИЧНО: Проверяем и закрываем противоположные позиции
+                opposite_position = await self._check_and_close_opposite_position(
+                    signal.symbol, signal.signal_type
                 )
-                return
+                if opposite_position:
+                    self.logger.info(
+                        f"🔄 Закрыта противоположная позиция для {signal.symbol} "
+                        f"перед открытием {signal.signal_type}"
+                    )
+                    # Даем время на закрытие позиции
+                    await asyncio.sleep(2)
 
-            # Создание ордеров напрямую
-            self.logger.info(f"📊 Создаем ордера для сигнала {signal.symbol}")
-            orders = await self._create_orders_from_signal(signal)
+                # Проверяем существующие позиции в том же направлении
+                if await self._has_existing_position(signal.symbol, signal.signal_type):
+                    self.logger.info(
+                        f"⚠️ Уже есть позиция {signal.signal_type} для {signal.symbol}, "
+                        "пропускаем сигнал"
+                    )
+                    return
 
-            if orders:
-                self.logger.info(f"✅ Создано {len(orders)} ордеров для {signal.symbol}")
-                # Отправка ордеров на исполнение
-                for order in orders:
+                # Проверяем активные ордера в том же направлении
+                if await self._has_pending_orders(signal.symbol, signal.signal_type):
                     self.logger.info(
-                        f"📤 Отправляем ордер на исполнение: {order.side} {order.quantity} {order.symbol}"
+                        f"⚠️ Уже есть активные ордера {signal.signal_type} для {signal.symbol}, "
+                        "пропускаем сигнал"
                     )
-                    await self.order_queue.put(order)
-            else:
-                self.logger.warning(f"⚠️ Не создано ни одного ордера для сигнала {signal.symbol}")
+                    return
+
+                # Создание ордеров напрямую
+                self.logger.info(f"📊 Создаем ордера для сигнала {signal.symbol}")
+                orders = await self._create_orders_from_signal(signal)
+
+                if orders:
+                    self.logger.info(f"✅ Создано {len(orders)} ордеров для {signal.symbol}")
+                    # Экспозиция учитывается сразу, до следующей синхронизации позиций
+                    if self.risk_manager:
+                        entry = orders[0]
+                        if entry.price:
+                            risk_signal["notional"] = float(entry.quantity) * float(entry.price)
+                        self.risk_manager.commit_signal(risk_signal)
+                        committed = True
+                    # Отправка ордеров на исполнение
+                    for order in orders:
+                        self.logger.info(
+                            "📤 Отправляем ордер на исполнение: "
+                            f"{order.side} {order.quantity} {order.symbol}"
+                        )
+                        await self.order_queue.put(order)
+                else:
+                    self.logger.warning(
+                        f"⚠️ Не создано ни одного ордера для сигнала {signal.symbol}"
+                    )
+            finally:
+                # Ордера не созданы (пропуск, ошибка) - резерв освобождается
+                if self.risk_manager and not committed:
+                    self.risk_manager.release_signal(risk_signal)
 
             # Сохранение в БД
             if self.signal_repository:
@@ -587,8 +683,18 @@ class TradingEngine:
             self.logger.error(f"Ошибка обработки сигнала: {e}")
             raise
 
+    def _risk_signal(self, signal) -> dict[str, Any]:
+        """Сигнал в формате RiskManager.check_signal_risk"""
+        return {
+            "symbol": signal.symbol,
+            "side": signal.signal_type.value,
+            "price": float(signal.suggested_price) if signal.suggested_price else None,
+            "leverage": (signal.extra_data or {}).get("leverage"),
+            "risk_profile": (signal.extra_data or {}).get("risk_profile", "standard"),
+        }
+
     async def _order_processing_loop(self):
-        """Цикл обработки ордеров"""
+        """Цикл обработки ордеров (параллельно по символам, по порядку внутри символа)"""
         self.logger.info("Запуск цикла обработки ордеров")
 
         while self._running:
@@ -603,21 +709,30 @@ class TradingEngine:
                 except TimeoutError:
                     continue
 
-                # Исполнение ордера
-                success = await self.execution_engine.execute_order(order)
-
-                if success:
-                    self.metrics.orders_executed += 1
-                    self.logger.info("✅ Ордер успешно исполнен")
-                else:
-                    self.logger.warning("❌ Ошибка исполнения ордера")
-                    self.metrics.errors_count += 1
+                if not await self.order_scheduler.submit(order.symbol, order):
+                    self.metrics.orders_rejected += 1
+                    self.logger.error(
+                        f"Ордер {order.side} {order.quantity} {order.symbol} отклонен: "
+                        "очередь ордеров символа заполнена"
+                    )
 
             except Exception as e:
                 self.logger.error(f"Ошибка в цикле обработки ордеров: {e}")
                 self.metrics.errors_count += 1
                 await asyncio.sleep(1)
 
+    async def _execute_order(self, order):
+        """Исполнение ордера воркером планировщика"""
+        with runtime_profiler.span("order"):
+            success = await self.execution_engine.execute_order(order)
+
+        if success:
+            self.metrics.orders_executed += 1
+            self.logger.info("✅ Ордер успешно исполнен")
+        else:
+            self.logger.warning("❌ Ошибка исполнения ордера")
+            self.metrics.errors_count += 1
+
     async def _position_sync_loop(self):
         """Цикл синхронизации позиций"""
         self.logger.info("Запуск цикла синхронизации позиций")
@@ -628,24 +743,43 @@ class TradingEngine:
                     await asyncio.sleep(10)
                     continue
 
-                # Синхронизация позиций с биржами
-                await self.position_manager.sync_positions()
-
-                # ДОБАВЛЕНО: Синхронизация статусов ордеров
-                # Исправляет проблему когда ордера остаются в статусе OPEN
-                if self.order_manager:
+                # При активном приватном потоке REST - только редкая сверка
+                if self._reconciliation_due():
+                    # Флаг сбрасывается до запросов: разрыв во время сверки потребует новую
+                    stream = self.private_stream
+                    resync = stream is not None and stream.resync_required
+                    if resync:
+                        stream.resync_required = False
+                    # Синхронизация позиций с биржами
                     try:
-                        await self.order_manager.sync_orders_with_exchange("bybit")
-                        self.logger.debug("Синхронизация ордеров выполнена")
-                    except Exception as e:
-                        self.logger.error(f"Ошибка синхронизации ордеров: {e}")
+                        await self.position_manager.sync_positions()
+                    except Exception:
+                        if resync:
+                            stream.resync_required = True
+                        raise
+
+                    # ДОБАВЛЕНО: Синхронизация статусов ордеров
+                    # Исправляет проблему когда ордера остаются в статусе OPEN
+                    if self.order_manager:
+                        try:
+                            await self.order_manager.sync_orders_with_exchange("bybit")
+                            self.logger.debug("Синхронизация ордеров выполнена")
+                        except Exception as e:
+                            self.logger.error(f"Ошибка синхронизации ордеров: {e}")
+
+                    self._last_sync = datetime.now()
 
                 # Обновление метрик позиций
                 positions = await self.position_manager.get_all_positions()
                 self.metrics.active_positions = len([p for p in positions if p.size != 0])
+                if self.risk_manager:
+                    self.risk_manager.sync_positions(positions)
 
                 # Проверка enhanced SL/TP для активных позиций
-                if self.enhanced_sltp_manager:
+                if self.sltp_engine:
+                    # Тиковый движок: позиции синхронизируются, оценка идет по тикам
+                    await self._sync_sltp_engine([p for p in positions if p.size != 0])
+                elif self.enhanced_sltp_manager:
                     for position in positions:
                         if position.size != 0:  # Только для активных позиций
                             try:
@@ -704,16 +838,83 @@ class TradingEngine:
                                     f"Ошибка применения enhanced SL/TP для {position.symbol}: {e}"
                                 )
 
-                self._last_sync = datetime.now()
-
-                # Пауза между синхронизациями
-                await asyncio.sleep(self.config.get("position_sync_interval", 30))
+                # Пауза до следующей проверки или до события приватного потока
+                await self._wait_position_event(self.config.get("position_sync_interval", 30))
 
             except Exception as e:
                 self.logger.error(f"Ошибка синхронизации позиций: {e}")
                 self.metrics.errors_count += 1
                 await asyncio.sleep(60)
 
+    async def _sync_sltp_engine(self, positions: list):
+        """
+        Синхронизация позиций тикового SL/TP движка
+
+        Для новых символов подписывается WebSocket тикер; символы без потока
+        получают одну REST цену на символ (а не на позицию).
+        """
+        exchange = await self.exchange_registry.get_exchange("bybit")
+        if exchange is None:
+            return
+        self.enhanced_sltp_manager.exchange_client = exchange
+
+        new_symbols = self.sltp_engine.sync_positions(positions)
+        if hasattr(exchange, "subscribe_ticker"):
+            for symbol in new_symbols - self._sltp_streamed:
+                if await exchange.subscribe_ticker(symbol, self.sltp_engine.on_ticker_message):
+                    self._sltp_streamed.add(symbol)
+
+        for symbol in self.sltp_engine.symbols - self._sltp_streamed:
+            try:
+                ticker = await exchange.get_ticker(symbol)
+                await self.sltp_engine.on_tick(symbol, float(ticker.last_price))
+            except Exception as e:
+                self.logger.error(f"Ошибка получения цены {symbol} для SL/TP: {e}")
+
+    def _private_stream_config(self) -> dict[str, Any]:
+        return self.config.get("position_management", {}).get("private_stream", {})
+
+    async def _start_private_stream(self):
+        """Подписка на приватный поток биржи (ордера, позиции, исполнения)"""
+        if not self._private_stream_config().get("enabled", True) or not self.exchange_registry:
+            return
+
+        try:
+            exchange = await self.exchange_registry.get_exchange("bybit")
+            if exchange is None or not hasattr(exchange, "subscribe_orders"):
+                return
+
+            handler = PrivateStreamHandler(
+                order_manager=self.order_manager,
+                position_tracker=self.position_tracker,
+                on_change=self._on_private_event,
+            )
+            if await handler.subscribe(exchange):
+                self.private_stream = handler
+                self.logger.info("✅ Приватный поток Bybit подключен, REST синхронизация - сверка")
+        except Exception as e:
+            self.logger.warning(f"Приватный поток недоступен, используется REST синхронизация: {e}")
+
+    def _on_private_event(self):
+        """Исполнение или изменение позиции - будим цикл SL/TP без ожидания таймера"""
+        self._position_event.set()
+
+    def _reconciliation_due(self) -> bool:
+        """Нужна ли REST синхронизация позиций и ордеров"""
+        stream = self.private_stream
+        if not (stream and stream.active) or self._last_sync is None:
+            return True
+        if stream.resync_required:
+            # Поток переподключился - события за время разрыва потеряны
+            return True
+        interval = self._private_stream_config().get("reconciliation_interval", 300)
+        return datetime.now() - self._last_sync >= timedelta(seconds=interval)
+
+    async def _wait_position_event(self, timeout: float):
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._position_event.wait(), timeout=timeout)
+        self._position_event.clear()
+
     async def _metrics_update_loop(self):
         """Цикл обновления метрик"""
         while self._running:
@@ -730,6 +931,13 @@ class TradingEngine:
         while self._running:
             try:
                 if self.state == TradingState.RUNNING and self.risk_manager:
+                    # Новые закрытые свечи для корреляции и VaR
+                    data_manager = getattr(self.orchestrator, "data_manager", None)
+                    if data_manager is not None:
+                        self.risk_manager.portfolio.update_from_views(
+                            data_manager.cache.get_views()
+                        )
+
                     # Проверка общих рисков
                     risk_status = await self.risk_manager.check_global_risks()
 
@@ -835,6 +1043,7 @@ class TradingEngine:
             "metrics": {
                 "signals_processed": self.metrics.signals_processed,
                 "orders_executed": self.metrics.orders_executed,
+                "orders_rejected": self.metrics.orders_rejected,
                 "trades_completed": self.metrics.trades_completed,
                 "total_pnl": str(self.metrics.total_pnl),
                 "win_rate": self.metrics.win_rate,
@@ -848,7 +1057,11 @@ class TradingEngine:
                 "signals": self.signal_queue.qsize(),
                 "orders": self.order_queue.qsize(),
             },
+            "signal_scheduler": self.signal_scheduler.get_stats(),
+            "order_scheduler": self.order_scheduler.get_stats(),
             "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+            "private_stream": self.private_stream.get_stats() if self.private_stream else None,
+            "sltp_engine": self.sltp_engine.get_stats() if self.sltp_engine else None,
             "component_status": {
                 # "signal_processor": (
                 #     self.signal_processor.is_running()
@@ -44,6 +44,8 @@ class OrderManager:
         self.logger = logger or logging.getLogger(__name__)
         self._active_orders: dict[str, Order] = {}
         self._order_locks: dict[str, asyncio.Lock] = {}
+        # ID ордера на бирже -> локальный ID (ключ _active_orders)
+        self._exchange_order_ids: dict[str, str] = {}
         # Интеграция с SL/TP Manager
         self.sltp_integration = SLTPIntegration(sltp_manager) if sltp_manager else None
         # Интеграция с Partial TP Manager
@@ -327,6 +329,9 @@ class OrderManager:
                     stop_loss=validated_sl,
                     take_profit=validated_tp,
                     position_idx=position_idx,  # Для правильного режима позиций
+                    # Локальный ID как orderLinkId: события приватного WebSocket
+                    # сопоставляются с ордером даже до ответа place_order
+                    client_order_id=order.order_id,
                     # Дополнительные параметры для Bybit
                     exchange_params={
                         "tpslMode": "Full",  # Или "Partial" для частичного закрытия
@@ -353,6 +358,8 @@ class OrderManager:
 
                 if exchange_order_id:
                     # Обновляем ID ордера от биржи
+                    if exchange_order_id != order.order_id:
+                        self._exchange_order_ids[exchange_order_id] = order.order_id
                     order.order_id = exchange_order_id
                     order.status = OrderStatus.OPEN
                     order.updated_at = datetime.utcnow()
@@ -452,7 +459,13 @@ class OrderManager:
         filled_quantity: float | None = None,
         average_price: float | None = None,
     ):
-        """Обновление статуса ордера"""
+        """
+        Обновление статуса ордера
+
+        Args:
+            order_id: Локальный ID, ID ордера на бирже или orderLinkId
+        """
+        order_id = self.resolve_order_id(order_id)
         order = self._active_orders.get(order_id)
         if not order:
             return
@@ -491,9 +504,20 @@ class OrderManager:
                 # Удаляем из активных
                 self._active_orders.pop(order_id, None)
                 self._order_locks.pop(order_id, None)
+                self._exchange_order_ids.pop(order.order_id, None)
 
             await self._update_order_in_db(order)
 
+    def resolve_order_id(self, order_id: str) -> str:
+        """Локальный ID ордера по ID на бирже (или сам order_id)"""
+        if order_id in self._active_orders:
+            return order_id
+        return self._exchange_order_ids.get(order_id, order_id)
+
+    def get_order(self, order_id: str) -> Order | None:
+        """Активный ордер по локальному ID или ID на бирже"""
+        return self._active_orders.get(self.resolve_order_id(order_id))
+
     async def get_active_orders(
         self, exchange: str | None = None, symbol: str | None = None
     ) -> list[Order]:
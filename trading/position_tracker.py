@@ -112,6 +112,7 @@ class EnhancedPositionTracker:
             "active_positions": 0,
             "updates_count": 0,
             "sync_errors": 0,
+            "stream_updates": 0,
             "last_update": None,
         }
 
@@ -374,6 +375,55 @@ class EnhancedPositionTracker:
             self.stats["sync_errors"] += 1
             return False
 
+    async def apply_exchange_update(self, update: Dict[str, Any]) -> List[TrackedPosition]:
+        """
+        Применить обновление позиции из приватного потока биржи (Bybit v5 position)
+
+        Обновляет размер, цены и SL/TP отслеживаемых позиций символа и сразу
+        пересчитывает метрики; позиции с нулевым размером снимаются с учета.
+
+        Args:
+            update: Элемент data сообщения position
+
+        Returns:
+            List[TrackedPosition]: Затронутые позиции
+        """
+
+        symbol = update.get("symbol")
+        side = _update_side(update)
+        matched = [
+            position
+            for position in self.tracked_positions.values()
+            if position.symbol == symbol and (side is None or position.side.lower() == side)
+        ]
+        size = _to_decimal(update.get("size"))
+
+        for position in matched:
+            if size == 0:
+                await self.remove_position(position.position_id, "closed")
+                continue
+
+            position.size = size
+            mark_price = _to_decimal(update.get("markPrice"))
+            if mark_price > 0:
+                position.current_price = mark_price
+            entry_price = _to_decimal(update.get("avgPrice") or update.get("entryPrice"))
+            if entry_price > 0:
+                position.entry_price = entry_price
+            stop_loss = _to_decimal(update.get("stopLoss"))
+            if stop_loss > 0:
+                position.stop_loss = stop_loss
+            take_profit = _to_decimal(update.get("takeProfit"))
+            if take_profit > 0:
+                position.take_profit = take_profit
+            position.updated_at = datetime.now()
+
+            await self._calculate_position_metrics(position)
+            await self._check_position_health(position)
+
+        self.stats["stream_updates"] += 1
+        return matched
+
     async def get_tracker_stats(self) -> Dict[str, Any]:
         """Получить статистику трекера"""
 
@@ -653,6 +703,22 @@ class EnhancedPositionTracker:
 position_tracker: Optional[EnhancedPositionTracker] = None
 
 
+def _to_decimal(value: Any) -> Decimal:
+    """Decimal из строкового поля биржи (пустая строка -> 0)"""
+    return Decimal(str(value)) if value not in (None, "") else Decimal("0")
+
+
+def _update_side(update: Dict[str, Any]) -> Optional[str]:
+    """Сторона позиции (long/short) из обновления Bybit; None - любая сторона символа"""
+    # В hedge mode закрытая позиция приходит с пустым side, но с positionIdx
+    position_idx = update.get("positionIdx")
+    if position_idx == 1:
+        return "long"
+    if position_idx == 2:
+        return "short"
+    return {"buy": "long", "sell": "short"}.get(str(update.get("side", "")).lower())
+
+
 async def get_position_tracker() -> EnhancedPositionTracker:
     """Получить глобальный экземпляр position tracker"""
     global position_tracker
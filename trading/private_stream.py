@@ -0,0 +1,187 @@
+"""
+Обработчик приватного потока биржи (ордера, позиции, исполнения)
+
+События приватного WebSocket Bybit v5 сразу попадают в OrderManager и
+EnhancedPositionTracker, поэтому исполнения и изменения позиций видны без
+ожидания REST синхронизации. REST остается медленной сверкой на случай
+пропущенных событий.
+
+Обработчик активен, пока приватный WebSocket подключен. После разрыва
+события могли быть пропущены, поэтому выставляется resync_required - после
+переподключения нужна полная REST синхронизация.
+"""
+
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from core.logger import setup_logger
+from database.models.base_models import OrderStatus
+
+logger = setup_logger(__name__)
+
+# orderStatus Bybit v5 -> статус ордера
+BYBIT_ORDER_STATUS = {
+    "Created": OrderStatus.PENDING,
+    "New": OrderStatus.OPEN,
+    "Untriggered": OrderStatus.OPEN,
+    "Triggered": OrderStatus.OPEN,
+    "Active": OrderStatus.OPEN,
+    "PartiallyFilled": OrderStatus.PARTIALLY_FILLED,
+    "Filled": OrderStatus.FILLED,
+    "Cancelled": OrderStatus.CANCELLED,
+    "PartiallyFilledCanceled": OrderStatus.CANCELLED,
+    "Deactivated": OrderStatus.CANCELLED,
+    "Rejected": OrderStatus.REJECTED,
+}
+
+
+def _to_float(value: Any) -> float | None:
+    if value in (None, ""):
+        return None
+    return float(value)
+
+
+class PrivateStreamHandler:
+    """
+    Маршрутизация событий приватного потока
+
+    Args:
+        order_manager: OrderManager для статусов ордеров
+        position_tracker: EnhancedPositionTracker для позиций
+        on_change: Вызывается после исполнения или изменения позиции
+    """
+
+    def __init__(
+        self,
+        order_manager=None,
+        position_tracker=None,
+        on_change: Callable[[], Any] | None = None,
+    ):
+        self.order_manager = order_manager
+        self.position_tracker = position_tracker
+        self.on_change = on_change
+        # Подписан и подключен - события можно применять
+        self.active = False
+        # Поток прерывался - нужна полная REST синхронизация
+        self.resync_required = False
+        self._subscribed = False
+        self._exchange = None
+        self.stats = {
+            "orders": 0,
+            "positions": 0,
+            "executions": 0,
+            "errors": 0,
+            "disconnects": 0,
+            "last_event": None,
+        }
+
+    async def subscribe(self, exchange) -> bool:
+        """Подписывает обработчик на приватные топики биржи"""
+        subscribed = await exchange.subscribe_orders(self.on_order)
+        subscribed = await exchange.subscribe_positions(self.on_position) and subscribed
+        if hasattr(exchange, "subscribe_executions"):
+            subscribed = await exchange.subscribe_executions(self.on_execution) and subscribed
+        self._subscribed = bool(subscribed)
+        self._exchange = exchange
+
+        connected = True
+        if self._subscribed and hasattr(exchange, "set_private_stream_callbacks"):
+            exchange.set_private_stream_callbacks(
+                on_connect=self.on_connect, on_disconnect=self.on_disconnect
+            )
+            connected = bool(exchange.private_stream_connected)
+        self.active = self._subscribed and connected
+        return self.active
+
+    async def stop(self) -> None:
+        """Отключает обработчик и закрывает WebSocket биржи"""
+        self._subscribed = False
+        self.active = False
+        exchange, self._exchange = self._exchange, None
+        if exchange is not None and hasattr(exchange, "stop_websocket"):
+            await exchange.stop_websocket()
+
+    def on_connect(self) -> None:
+        """Переподключение: события за время разрыва потеряны"""
+        if not self._subscribed:
+            return
+        self.active = True
+        self.resync_required = True
+        logger.info("Приватный поток переподключен, требуется REST синхронизация")
+
+    def on_disconnect(self) -> None:
+        if not self._subscribed:
+            return
+        self.active = False
+        self.resync_required = True
+        self.stats["disconnects"] += 1
+        logger.warning("Приватный поток отключен, используется REST синхронизация")
+
+    def _touch(self, kind: str) -> None:
+        self.stats[kind] += 1
+        self.stats["last_event"] = datetime.now(UTC)
+
+    def _notify(self, symbol: str | None) -> None:
+        if self.on_change is not None and symbol:
+            self.on_change()
+
+    async def on_order(self, message) -> None:
+        """Обновления ордеров -> OrderManager.update_order_status"""
+        if not self.active or self.order_manager is None:
+            return
+
+        for item in message.data or []:
+            self._touch("orders")
+            status = BYBIT_ORDER_STATUS.get(item.get("orderStatus"))
+            if status is None:
+                continue
+
+            # orderLinkId - локальный ID ордера, orderId - ID на бирже
+            order_id = item.get("orderLinkId")
+            if not order_id or self.order_manager.get_order(order_id) is None:
+                order_id = item.get("orderId")
+
+            try:
+                await self.order_manager.update_order_status(
+                    order_id,
+                    status,
+                    _to_float(item.get("cumExecQty")),
+                    _to_float(item.get("avgPrice")) or None,
+                )
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Ошибка обновления ордера {order_id} из потока: {e}")
+
+    async def on_position(self, message) -> None:
+        """Изменения позиций -> EnhancedPositionTracker"""
+        if not self.active:
+            return
+
+        for item in message.data or []:
+            self._touch("positions")
+            if self.position_tracker is not None:
+                try:
+                    await self.position_tracker.apply_exchange_update(item)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"Ошибка обновления позиции {item.get('symbol')} из потока: {e}")
+            self._notify(item.get("symbol"))
+
+    async def on_execution(self, message) -> None:
+        """Исполнения (fills)"""
+        if not self.active:
+            return
+
+        for item in message.data or []:
+            if item.get("execType", "Trade") != "Trade":
+                continue
+            self._touch("executions")
+            logger.info(
+                f"⚡ Исполнение {item.get('symbol')} {item.get('side')} "
+                f"{item.get('execQty')} @ {item.get('execPrice')}"
+            )
+            self._notify(item.get("symbol"))
+
+    def get_stats(self) -> dict[str, Any]:
+        return {**self.stats, "active": self.active, "resync_required": self.resync_required}
@@ -4,5 +4,12 @@ SL/TP Management Module for BOT Trading v3
 
 from .enhanced_manager import EnhancedSLTPManager
 from .models import PartialTPLevel, SLTPConfig, TrailingStopConfig
+from .tick_engine import TickSLTPEngine
 
-__all__ = ["EnhancedSLTPManager", "PartialTPLevel", "SLTPConfig", "TrailingStopConfig"]
+__all__ = [
+    "EnhancedSLTPManager",
+    "PartialTPLevel",
+    "SLTPConfig",
+    "TickSLTPEngine",
+    "TrailingStopConfig",
+]
@@ -645,6 +645,48 @@ class EnhancedSLTPManager:
 
         return False
 
+    async def amend_stop_loss(
+        self, position, new_price: float, reason: str = "Tick engine update"
+    ) -> SLTPOrder | None:
+        """
+        Переносит SL позиции на новую цену (используется TickSLTPEngine).
+
+        Если SL позиции уже есть в кэше - ордер пересоздается, иначе SL
+        устанавливается на позицию и сохраняется в кэш.
+
+        Args:
+            position: Позиция
+            new_price: Новая цена SL
+            reason: Причина для истории
+
+        Returns:
+            Новый SL ордер или None при ошибке
+        """
+        position = PositionAdapter(position)
+        new_price = round_price(position.symbol, new_price)
+
+        current_sl = self._get_active_stop_loss(position.id)
+        if current_sl:
+            old_price = current_sl.trigger_price
+            new_order = await self._update_stop_loss_order(current_sl, new_price)
+        else:
+            old_price = None
+            new_order = await self._create_stop_loss_order(position, new_price)
+            if new_order:
+                self._active_orders.setdefault(position.id, []).append(new_order)
+
+        if new_order:
+            self._add_history(
+                position.id,
+                "update",
+                "stop_loss",
+                old_price=old_price,
+                new_price=new_price,
+                reason=reason,
+            )
+
+        return new_order
+
     async def process_partial_tp_fill(
         self, position, filled_order: Order
     ) -> list[SLTPOrder] | None:
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Событийный SL/TP движок на тиках цены
+
+Вместо последовательного обхода позиций (get_ticker + check_partial_tp +
+update_profit_protection + update_trailing_stop на каждую позицию) состояние
+трейлинга и защиты прибыли хранится в памяти в виде массивов по символу.
+Каждый тик символа пересчитывает все его позиции одним векторным проходом,
+а на биржу уходят только изменения, пересекшие порог:
+
+- перенос SL - если новый уровень лучше текущего больше чем на min_move_percent;
+- изменения SL по позиции объединяются: за окно debounce отправляется только
+  последний уровень, и не чаще одного раза в min_amend_interval;
+- частичный TP - один раз при пересечении уровня.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from core.logger import setup_logger
+
+from .enhanced_manager import EnhancedSLTPManager, PositionAdapter, normalize_percentage
+from .models import SLTPConfig, TrailingType
+
+logger = setup_logger("sltp_tick_engine")
+
+REASON_TRAILING = "trailing_stop"
+REASON_PROTECTION = "profit_protection"
+
+
+@dataclass
+class SLAmendment:
+    """Отложенный перенос SL позиции"""
+
+    position_id: str
+    symbol: str
+    price: float
+    reason: str
+    queued_at: float
+
+
+def _is_long(side: str) -> bool:
+    return str(side).upper() in ("BUY", "LONG")
+
+
+class SymbolBook:
+    """Позиции одного символа в виде массивов для векторной оценки"""
+
+    def __init__(
+        self, positions: list[PositionAdapter], config: SLTPConfig, partial_levels: np.ndarray
+    ):
+        self.positions = positions
+        self.ids = [p.id for p in positions]
+        self.index = {position_id: i for i, position_id in enumerate(self.ids)}
+        self.rows = np.arange(len(positions))
+        self.sign = np.array([1.0 if _is_long(p.side) else -1.0 for p in positions])
+        self.entry = np.array([p.entry_price for p in positions], dtype=float)
+        self.profit_scale = self.sign * 100 / self.entry
+        self.sl = np.full(len(positions), np.nan)
+        self.protection_updates = np.zeros(len(positions), dtype=int)
+        self.partial_levels = partial_levels
+        self.partial_done = np.zeros((len(positions), partial_levels.size), dtype=bool)
+
+        # Уровни защиты прибыли зависят только от цены входа - считаются один раз
+        protection = config.profit_protection
+        locks = sorted(protection.lock_percent, key=lambda x: x["trigger"])
+        self.lock_triggers = np.array([level["trigger"] for level in locks], dtype=float)
+        lock_percents = np.array([level["lock"] for level in locks], dtype=float)
+        self.signed_locks = (
+            self.sign[:, None]
+            * self.entry[:, None]
+            * (1 + self.sign[:, None] * lock_percents / 100)
+        ).reshape(len(positions), lock_percents.size)
+        self.signed_breakeven = (
+            self.sign * self.entry * (1 + self.sign * protection.breakeven_offset / 100)
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def inherit(self, previous: "SymbolBook") -> None:
+        """Переносит состояние позиций, оставшихся после синхронизации"""
+        for i, position_id in enumerate(self.ids):
+            j = previous.index.get(position_id)
+            if j is None or previous.entry[j] != self.entry[i]:
+                continue
+            # SL в памяти может опережать данные синхронизации (перенос в очереди)
+            if np.isnan(self.sl[i]) or self.sign[i] * (previous.sl[j] - self.sl[i]) > 0:
+                self.sl[i] = previous.sl[j]
+            self.protection_updates[i] = previous.protection_updates[j]
+            if previous.partial_levels.size == self.partial_levels.size:
+                self.partial_done[i] = previous.partial_done[j]
+
+
+class TickSLTPEngine:
+    """
+    Векторная оценка SL/TP по тикам цены
+
+    Args:
+        manager: EnhancedSLTPManager - конфигурация и исполнение на бирже
+        debounce: Окно объединения изменений SL (секунды)
+        min_amend_interval: Минимальный интервал между переносами SL одной позиции
+        min_move_percent: Минимальное улучшение SL (% от цены) для переноса
+    """
+
+    def __init__(
+        self,
+        manager: EnhancedSLTPManager,
+        debounce: float = 0.5,
+        min_amend_interval: float = 2.0,
+        min_move_percent: float = 0.05,
+    ):
+        self.manager = manager
+        self.debounce = debounce
+        self.min_amend_interval = min_amend_interval
+        self.min_move_percent = min_move_percent
+
+        self._books: dict[str, SymbolBook] = {}
+        self._pending: dict[str, SLAmendment] = {}
+        self._confirmed_sl: dict[str, float] = {}
+        self._last_sent: dict[str, float] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._partial_tasks: set[asyncio.Task] = set()
+
+        self.stats = {
+            "ticks": 0,
+            "evaluations": 0,
+            "amendments_queued": 0,
+            "amendments_coalesced": 0,
+            "amendments_sent": 0,
+            "amendments_failed": 0,
+            "partial_tp_triggers": 0,
+            "eval_time_total": 0.0,
+        }
+
+    @property
+    def config(self) -> SLTPConfig:
+        return self.manager.config
+
+    @property
+    def symbols(self) -> set[str]:
+        return set(self._books)
+
+    # =================== ПОЗИЦИИ ===================
+
+    def sync_positions(self, positions: list[Any]) -> set[str]:
+        """
+        Обновляет набор отслеживаемых позиций
+
+        Состояние (SL, число обновлений защиты, исполненные уровни TP) для
+        оставшихся позиций сохраняется.
+
+        Returns:
+            Символы, появившиеся после синхронизации
+        """
+        by_symbol: dict[str, list[PositionAdapter]] = {}
+        for position in positions:
+            adapter = PositionAdapter(position)
+            if adapter.size and adapter.entry_price > 0:
+                by_symbol.setdefault(adapter.symbol, []).append(adapter)
+
+        levels = self._partial_levels()
+        books = {}
+        for symbol, symbol_positions in by_symbol.items():
+            book = SymbolBook(symbol_positions, self.config, levels)
+            for i, position in enumerate(symbol_positions):
+                book.sl[i] = self._known_stop_loss(position)
+            previous = self._books.get(symbol)
+            if previous is not None:
+                book.inherit(previous)
+            books[symbol] = book
+
+        added = set(books) - set(self._books)
+        confirmed = {}
+        for book in books.values():
+            for position_id, sl in zip(book.ids, book.sl, strict=True):
+                confirmed[position_id] = self._confirmed_sl.get(position_id, sl)
+        self._confirmed_sl = confirmed
+        for position_id in list(self._pending):
+            if position_id not in confirmed:
+                del self._pending[position_id]
+
+        self._books = books
+        return added
+
+    def _known_stop_loss(self, position: PositionAdapter) -> float:
+        """Текущий SL позиции: кэш менеджера, затем поле позиции"""
+        active = self.manager._get_active_stop_loss(position.id)
+        if active:
+            return float(active.trigger_price)
+        stop_loss = getattr(position._position, "stop_loss", None)
+        if stop_loss:
+            return float(stop_loss)
+        return np.nan
+
+    def _partial_levels(self) -> np.ndarray:
+        if not self.config.partial_tp_enabled:
+            return np.empty(0)
+        return np.array(
+            [normalize_percentage(level.percentage) for level in self.config.partial_tp_levels],
+            dtype=float,
+        )
+
+    # =================== ОЦЕНКА ===================
+
+    def evaluate(
+        self, symbol: str, price: float
+    ) -> tuple[list[SLAmendment], list[tuple[int, int]]]:
+        """
+        Векторная оценка всех позиций символа на цене тика
+
+        Returns:
+            (новые переносы SL, [(индекс позиции, число пересеченных уровней TP)])
+        """
+        book = self._books.get(symbol)
+        if book is None or price <= 0:
+            return [], []
+
+        started = time.perf_counter()
+        sign = book.sign
+        profit = (price - book.entry) * book.profit_scale
+
+        # Уровни SL в "знаковом" пространстве (sign * цена): больше - лучше для обеих сторон
+        signed = np.full(len(book), -np.inf)
+        trailing = self.config.trailing_stop
+        if trailing.enabled:
+            if trailing.type == TrailingType.FIXED:
+                distance = trailing.step
+            else:
+                distance = price * trailing.step / 100
+            signed = np.where(profit >= trailing.min_profit, sign * price - distance, -np.inf)
+
+        from_protection = np.zeros(len(book), dtype=bool)
+        protection = self.config.profit_protection
+        if protection.enabled:
+            # Старший достигнутый уровень lock_percent, иначе безубыток
+            level = np.searchsorted(book.lock_triggers, profit, side="right") - 1
+            protect = np.where(
+                level >= 0,
+                book.signed_locks[book.rows, np.maximum(level, 0)],
+                np.where(profit >= protection.breakeven_percent, book.signed_breakeven, -np.inf),
+            )
+            protect[book.protection_updates >= protection.max_updates] = -np.inf
+            from_protection = protect > signed
+            signed = np.maximum(signed, protect)
+
+        # Только улучшение известного SL больше порога (NaN сравнивается как False)
+        min_move = price * self.min_move_percent / 100
+        improved = np.flatnonzero(signed - sign * book.sl > min_move)
+        candidate = sign * signed
+
+        amendments = []
+        now = time.monotonic()
+        for i in improved:
+            book.sl[i] = candidate[i]
+            if from_protection[i]:
+                book.protection_updates[i] += 1
+            amendments.append(
+                SLAmendment(
+                    position_id=book.ids[i],
+                    symbol=symbol,
+                    price=float(candidate[i]),
+                    reason=REASON_PROTECTION if from_protection[i] else REASON_TRAILING,
+                    queued_at=now,
+                )
+            )
+
+        partial_hits = []
+        levels = book.partial_levels
+        if levels.size:
+            crossed = (profit[:, None] >= levels) & ~book.partial_done
+            book.partial_done |= crossed
+            counts = crossed.sum(axis=1)
+            partial_hits = [(int(i), int(counts[i])) for i in np.flatnonzero(counts)]
+
+        self.stats["evaluations"] += len(book)
+        self.stats["eval_time_total"] += time.perf_counter() - started
+        return amendments, partial_hits
+
+    async def on_tick(self, symbol: str, price: float) -> None:
+        """Обработка тика: оценка, постановка переносов SL и частичных TP"""
+        self.stats["ticks"] += 1
+        amendments, partial_hits = self.evaluate(symbol, price)
+
+        for amendment in amendments:
+            if amendment.position_id in self._pending:
+                self.stats["amendments_coalesced"] += 1
+            self._pending[amendment.position_id] = amendment
+            self.stats["amendments_queued"] += 1
+
+        book = self._books.get(symbol)
+        for i, count in partial_hits:
+            self.stats["partial_tp_triggers"] += count
+            task = asyncio.create_task(self._execute_partial_tp(book.positions[i], price, count))
+            self._partial_tasks.add(task)
+            task.add_done_callback(self._partial_tasks.discard)
+
+        if self._pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._debounced_flush())
+
+    async def on_ticker_message(self, message) -> None:
+        """Колбэк WebSocket tickers: delta-сообщения без lastPrice пропускаются"""
+        data = message.data or {}
+        last_price = data.get("lastPrice") if isinstance(data, dict) else None
+        if message.symbol and last_price:
+            await self.on_tick(message.symbol, float(last_price))
+
+    # =================== ИСПОЛНЕНИЕ ===================
+
+    async def _debounced_flush(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.debounce)
+            await self.flush()
+
+    async def flush(self, force: bool = False) -> int:
+        """
+        Отправляет накопленные переносы SL на биржу
+
+        Args:
+            force: Игнорировать min_amend_interval
+
+        Returns:
+            Число отправленных переносов
+        """
+        now = time.monotonic()
+        due = [
+            amendment
+            for position_id, amendment in self._pending.items()
+            if force or now - self._last_sent.get(position_id, -np.inf) >= self.min_amend_interval
+        ]
+        if not due:
+            return 0
+
+        for amendment in due:
+            del self._pending[amendment.position_id]
+            self._last_sent[amendment.position_id] = now
+
+        results = await asyncio.gather(
+            *(self._send_amendment(amendment) for amendment in due), return_exceptions=True
+        )
+        return sum(1 for result in results if result is True)
+
+    async def _send_amendment(self, amendment: SLAmendment) -> bool:
+        book = self._books.get(amendment.symbol)
+        i = book.index.get(amendment.position_id) if book else None
+        if i is None:
+            return False
+
+        try:
+            order = await self.manager.amend_stop_loss(
+                book.positions[i], amendment.price, reason=amendment.reason
+            )
+        except Exception as e:
+            logger.error(f"Ошибка переноса SL {amendment.position_id}: {e}")
+            order = None
+
+        if order is None:
+            # Откат к подтвержденному SL - следующий тик оценит позицию заново
+            self.stats["amendments_failed"] += 1
+            book.sl[i] = self._confirmed_sl.get(amendment.position_id, book.sl[i])
+            return False
+
+        self._confirmed_sl[amendment.position_id] = amendment.price
+        self.stats["amendments_sent"] += 1
+        logger.info(
+            f"SL {amendment.symbol} {amendment.position_id} -> {amendment.price} "
+            f"({amendment.reason})"
+        )
+        return True
+
+    async def _execute_partial_tp(
+        self, position: PositionAdapter, price: float, count: int
+    ) -> None:
+        # check_partial_tp исполняет один уровень за вызов
+        for _ in range(count):
+            if not await self.manager.check_partial_tp(position._position, price):
+                break
+
+    async def stop(self) -> None:
+        """Отправляет оставшиеся переносы и останавливает фоновые задачи"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        await self.flush(force=True)
+        if self._partial_tasks:
+            await asyncio.gather(*self._partial_tasks, return_exceptions=True)
+
+    def get_stats(self) -> dict[str, Any]:
+        evaluations = self.stats["evaluations"]
+        return {
+            **self.stats,
+            "symbols": len(self._books),
+            "positions": sum(len(book) for book in self._books.values()),
+            "pending": len(self._pending),
+            "avg_eval_us_per_position": (
+                self.stats["eval_time_total"] / evaluations * 1e6 if evaluations else 0.0
+            ),
+        }
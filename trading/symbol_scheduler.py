@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Планировщик задач с последовательной обработкой внутри символа
+
+Задачи разных символов выполняются параллельно ограниченным числом
+воркеров, задачи одного символа - строго по очереди в порядке поступления.
+Из символов, ожидающих обработки, воркер берет тот, у которого первая
+задача в очереди имеет наибольший приоритет (сила сигнала); при равном
+приоритете - тот, что встал в очередь раньше.
+
+Пока символ обрабатывается, его новые задачи ждут в очереди символа и не
+занимают воркер, поэтому долгая обработка одного символа (закрытие
+противоположной позиции, запросы к бирже) не задерживает остальные.
+
+Очередь символа ограничена max_pending_per_symbol. При переполнении:
+- "block" - submit ждет места, и задачи копятся во входной очереди вызывающего
+  кода (обратное давление);
+- "drop_oldest" - самая старая ожидающая задача символа отбрасывается
+  (для сигналов: устаревший сигнал заменяется новым);
+- "reject" - новая задача не ставится и submit возвращает False, не дожидаясь
+  места (для ордеров: переполненный символ не задерживает общий цикл приема).
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from core.logger import setup_logger
+
+logger = setup_logger("symbol_scheduler")
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_REJECT = "reject"
+
+
+class SymbolScheduler:
+    """
+    Параллельная обработка задач по символам
+
+    Args:
+        handler: Корутина-обработчик задачи
+        workers: Максимум одновременно обрабатываемых символов
+        name: Имя для логов и метрик
+        max_pending_per_symbol: Максимум ожидающих задач одного символа
+        overflow: Поведение при переполнении очереди символа ("block", "drop_oldest", "reject")
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[Any]],
+        workers: int = 8,
+        name: str = "scheduler",
+        max_pending_per_symbol: int = 16,
+        overflow: str = OVERFLOW_BLOCK,
+    ):
+        if workers < 1:
+            raise ValueError(f"workers должно быть не меньше 1: {workers}")
+        if max_pending_per_symbol < 1:
+            raise ValueError(
+                f"max_pending_per_symbol должно быть не меньше 1: {max_pending_per_symbol}"
+            )
+        if overflow not in (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_REJECT):
+            raise ValueError(f"Неизвестное поведение при переполнении: {overflow}")
+        self.handler = handler
+        self.workers = workers
+        self.name = name
+        self.max_pending_per_symbol = max_pending_per_symbol
+        self.overflow = overflow
+
+        # symbol -> очередь (enqueued_at, item, priority)
+        self._queues: dict[str, deque[tuple[float, Any, float]]] = {}
+        # Символы с задачами, которые сейчас не обрабатываются: (-priority, seq, symbol).
+        # Актуальна только запись с seq из _ready_seq, остальные пропускаются
+        self._ready: list[tuple[float, int, str]] = []
+        self._ready_seq: dict[str, int] = {}
+        self._active: set[str] = set()
+        self._seq = itertools.count()
+        self._lock = asyncio.Lock()
+        self._condition = asyncio.Condition(self._lock)
+        self._not_full = asyncio.Condition(self._lock)
+        self._tasks: list[asyncio.Task] = []
+        self._pending = 0
+
+        self.stats = {
+            "submitted": 0,
+            "processed": 0,
+            "errors": 0,
+            "dropped": 0,
+            "rejected": 0,
+            "queue_latency_total": 0.0,
+            "queue_latency_max": 0.0,
+            "max_pending": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Задач в очередях (без обрабатываемых)"""
+        return self._pending
+
+    def start(self) -> None:
+        """Запускает воркеры"""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Останавливает воркеры; задачи, не взятые в обработку, отбрасываются"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pending:
+            logger.warning(f"{self.name}: отброшено {self._pending} задач при остановке")
+        self._queues.clear()
+        self._ready.clear()
+        self._ready_seq.clear()
+        self._active.clear()
+        self._pending = 0
+
+    async def submit(self, symbol: str, item: Any, priority: float = 0.0) -> bool:
+        """
+        Ставит задачу в очередь символа
+
+        Args:
+            symbol: Ключ последовательной обработки
+            item: Задача для handler
+            priority: Приоритет символа, если задача окажется первой в его очереди
+
+        Returns:
+            False, если задача отклонена (overflow="reject")
+        """
+        async with self._condition:
+            limit = self.max_pending_per_symbol
+            if self.overflow == OVERFLOW_BLOCK:
+                await self._not_full.wait_for(lambda: len(self._queues.get(symbol, ())) < limit)
+            elif self.overflow == OVERFLOW_REJECT and len(self._queues.get(symbol, ())) >= limit:
+                self.stats["rejected"] += 1
+                logger.warning(
+                    f"{self.name}: {symbol} - очередь символа заполнена, задача отклонена"
+                )
+                return False
+
+            queue = self._queues.setdefault(symbol, deque())
+            dropped = len(queue) >= limit
+            if dropped:
+                queue.popleft()
+                self._pending -= 1
+                self.stats["dropped"] += 1
+                logger.debug(f"{self.name}: {symbol} - устаревшая задача заменена новой")
+            queue.append((time.perf_counter(), item, priority))
+            self._pending += 1
+            self.stats["submitted"] += 1
+            self.stats["max_pending"] = max(self.stats["max_pending"], self._pending)
+            if symbol not in self._active and (len(queue) == 1 or dropped):
+                # Первая задача символа изменилась - приоритет пересчитывается
+                self._schedule(symbol, queue[0][2])
+            return True
+
+    def _schedule(self, symbol: str, priority: float) -> None:
+        seq = next(self._seq)
+        self._ready_seq[symbol] = seq
+        heapq.heappush(self._ready, (-priority, seq, symbol))
+        self._condition.notify()
+
+    async def _next(self) -> tuple[str, float, Any]:
+        async with self._condition:
+            while True:
+                await self._condition.wait_for(lambda: bool(self._ready))
+                _, seq, symbol = heapq.heappop(self._ready)
+                if self._ready_seq.get(symbol) == seq:
+                    break
+            del self._ready_seq[symbol]
+            enqueued_at, item, _ = self._queues[symbol].popleft()
+            self._active.add(symbol)
+            self._pending -= 1
+            self._not_full.notify_all()
+            return symbol, enqueued_at, item
+
+    async def _release(self, symbol: str) -> None:
+        async with self._condition:
+            self._active.discard(symbol)
+            queue = self._queues[symbol]
+            if queue:
+                self._schedule(symbol, queue[0][2])
+            else:
+                del self._queues[symbol]
+
+    async def _worker(self) -> None:
+        while True:
+            symbol, enqueued_at, item = await self._next()
+            try:
+                latency = time.perf_counter() - enqueued_at
+                self.stats["queue_latency_total"] += latency
+                self.stats["queue_latency_max"] = max(self.stats["queue_latency_max"], latency)
+                await self.handler(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"{self.name}: ошибка обработки {symbol}: {e}")
+            finally:
+                self.stats["processed"] += 1
+                await asyncio.shield(self._release(symbol))
+
+    def get_stats(self) -> dict[str, Any]:
+        processed = self.stats["processed"]
+        return {
+            "submitted": self.stats["submitted"],
+            "processed": processed,
+            "errors": self.stats["errors"],
+            "dropped": self.stats["dropped"],
+            "rejected": self.stats["rejected"],
+            "pending": self._pending,
+            "max_pending": self.stats["max_pending"],
+            "active_symbols": len(self._active),
+            "workers": self.workers,
+            "avg_queue_latency_ms": (
+                round(self.stats["queue_latency_total"] / processed * 1000, 2) if processed else 0.0
+            ),
+            "max_queue_latency_ms": round(self.stats["queue_latency_max"] * 1000, 2),
+        }
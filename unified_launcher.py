@@ -21,8 +21,14 @@ from enum import Enum
 from pathlib import Path
 from typing import Any
 
-import psutil
-from dotenv import load_dotenv
+# Профайлер импорта включается до остальных импортов,
+# поэтому импорты ниже идут после кода (noqa: E402)
+from core.startup_profiler import PROFILE_FLAG, import_profiler, start_if_requested
+
+start_if_requested()
+
+import psutil  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
 
 # Загружаем переменные окружения
 load_dotenv()
@@ -30,10 +36,10 @@ load_dotenv()
 # Добавляем корневую директорию в путь
 sys.path.insert(0, str(Path(__file__).parent))
 
-from core.config.config_manager import ConfigManager
-from core.logger import setup_logger
-from core.system.health_monitor import HealthMonitor
-from core.system.process_manager import ProcessManager
+from core.config.config_manager import ConfigManager  # noqa: E402
+from core.logger import setup_logger  # noqa: E402
+from core.system.health_monitor import HealthMonitor  # noqa: E402
+from core.system.process_manager import ProcessManager  # noqa: E402
 
 # Настройка логирования
 logger = setup_logger("unified_launcher")
@@ -128,8 +134,9 @@ class UnifiedLauncher:
     Главный лаунчер для управления всеми компонентами системы
     """
 
-    def __init__(self, mode: LaunchMode = LaunchMode.FULL):
+    def __init__(self, mode: LaunchMode = LaunchMode.FULL, profile_startup: bool = False):
         self.mode = mode
+        self.profile_startup = profile_startup
         self.config_manager = ConfigManager()
         self.process_manager = ProcessManager()
         self.health_monitor = HealthMonitor()
@@ -224,6 +231,13 @@ class UnifiedLauncher:
             for comp in default_config.values():
                 comp["auto_restart"] = False
 
+        # Профилирование импорта передается Python процессам компонентов
+        if self.profile_startup:
+            for comp_name in ("core", "api"):
+                command = default_config[comp_name].get("command")
+                if command and PROFILE_FLAG not in command:
+                    default_config[comp_name]["command"] = f"{command} {PROFILE_FLAG}"
+
         return default_config
 
     async def initialize(self):
@@ -620,6 +634,11 @@ async def main():
     )
     parser.add_argument("--status", action="store_true", help="Показать статус системы")
     parser.add_argument("--logs", action="store_true", help="Следить за логами")
+    parser.add_argument(
+        PROFILE_FLAG,
+        action="store_true",
+        help="Отчет о времени импорта модулей (лаунчер, Core и Web API)",
+    )
 
     args = parser.parse_args()
 
@@ -634,7 +653,7 @@ async def main():
         return
 
     # Запуск системы
-    launcher = UnifiedLauncher(mode=LaunchMode(args.mode))
+    launcher = UnifiedLauncher(mode=LaunchMode(args.mode), profile_startup=args.profile_startup)
 
     # Настройка обработчиков сигналов
     signal.signal(signal.SIGINT, launcher.handle_signal)
@@ -644,6 +663,10 @@ async def main():
         # Инициализация
         await launcher.initialize()
 
+        if import_profiler.active:
+            logger.info(import_profiler.report())
+            import_profiler.stop()
+
         # Запуск компонентов
         await launcher.start()
 
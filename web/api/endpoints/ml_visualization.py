@@ -16,18 +16,20 @@ import base64
 import io
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-import plotly.subplots as sp
-from plotly.offline import plot
-import plotly.io as pio
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
 from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
 
+from core.lazy_imports import lazy_module
 from core.logging.logger_factory import get_global_logger_factory
 from database.connections.postgres import AsyncPGPool
 
+# Визуализация загружается при первом построении графика
+plt = lazy_module("matplotlib.pyplot")
+go = lazy_module("plotly.graph_objects")
+sp = lazy_module("plotly.subplots")
+pio = lazy_module("plotly.io")
+
 logger_factory = get_global_logger_factory()
 logger = logger_factory.get_logger("ml_visualization_api")
 
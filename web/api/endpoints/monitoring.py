@@ -13,9 +13,11 @@ from typing import Any, Optional
 
 import psutil
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 from core.logging.logger_factory import get_global_logger_factory
+from monitoring.metrics.runtime_profiler import runtime_profiler
 
 logger_factory = get_global_logger_factory()
 logger = logger_factory.get_logger("monitoring_api")
@@ -381,6 +383,52 @@ async def get_system_logs(
         raise HTTPException(status_code=500, detail=f"Ошибка получения логов: {e!s}")
 
 
+@router.get("/runtime", response_model=dict[str, Any])
+async def get_runtime_metrics():
+    """Задержка event loop, тайминги стадий конвейера и состояние профайлера"""
+    return runtime_profiler.get_stats()
+
+
+@router.get("/runtime/prometheus", response_class=PlainTextResponse)
+async def get_runtime_metrics_prometheus():
+    """Метрики event loop и стадий в текстовом формате Prometheus"""
+    return PlainTextResponse(
+        runtime_profiler.render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@router.post("/profiler/start", response_model=dict[str, Any])
+async def start_profiler(
+    interval_ms: float = Query(5.0, ge=1.0, le=1000.0, description="Период семплирования"),
+):
+    """Включить семплирующий профайлер потока event loop"""
+    if not runtime_profiler.loop_lag.is_running:
+        runtime_profiler.start_loop_monitor()
+    runtime_profiler.start_sampler(interval_ms)
+    logger.info(f"Семплирующий профайлер включен, период {interval_ms} мс")
+    return {"status": "running", "interval_ms": interval_ms}
+
+
+@router.post("/profiler/stop", response_model=dict[str, Any])
+async def stop_profiler():
+    """Выключить профайлер и получить отчет"""
+    report = runtime_profiler.stop_sampler()
+    if report is None:
+        raise HTTPException(status_code=404, detail="Профайлер не запускался")
+    logger.info(f"Семплирующий профайлер выключен, семплов: {report['samples']}")
+    return report
+
+
+@router.get("/profiler", response_model=dict[str, Any])
+async def get_profiler_report(
+    top: int = Query(20, ge=1, le=200, description="Количество горячих стеков"),
+):
+    """Текущий отчет семплирующего профайлера"""
+    if runtime_profiler.sampler is None:
+        raise HTTPException(status_code=404, detail="Профайлер не запускался")
+    return runtime_profiler.sampler.report(top)
+
+
 # =================== HELPER FUNCTIONS ===================
 
 
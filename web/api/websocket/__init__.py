@@ -3,12 +3,14 @@ WebSocket модуль для BOT_Trading v3.0
 
 Real-time WebSocket соединения для торгового интерфейса:
 - manager: WebSocket менеджер подключений
-- streams: Потоки данных (трейдеры, сделки, метрики)
-- events: Типы и обработка событий
+- send_queue: Очереди отправки соединений (fan-out без ожидания клиентов)
 """
 
-from .events import EventType, WebSocketEvent
-from .manager import WebSocketManager
-from .streams import StreamManager
+from core.lazy_imports import lazy_exports
 
-__all__ = ["EventType", "StreamManager", "WebSocketEvent", "WebSocketManager"]
+from .send_queue import ConnectionSendQueue, encode_message
+
+# Менеджер зависит от FastAPI и загружается по требованию
+__getattr__ = lazy_exports(__name__, {"WebSocketManager": ".manager"})
+
+__all__ = ["ConnectionSendQueue", "WebSocketManager", "encode_message"]
@@ -7,7 +7,7 @@ WebSocket Manager для BOT_Trading v3.0
 - Управление WebSocket соединениями
 - Аутентификация пользователей
 - Подписки на потоки данных
-- Broadcast сообщений
+- Broadcast сообщений через очереди отправки соединений (send_queue)
 - Heartbeat и keepalive
 - Обработка отключений
 """
@@ -23,6 +23,8 @@ from fastapi import WebSocket, WebSocketDisconnect
 
 from core.logging.logger_factory import get_global_logger_factory
 
+from .send_queue import EVICT_SEND_ERROR, ConnectionSendQueue, encode_message
+
 logger_factory = get_global_logger_factory()
 logger = logger_factory.get_logger("websocket_manager")
 
@@ -30,7 +32,15 @@ logger = logger_factory.get_logger("websocket_manager")
 class WebSocketConnection:
     """Класс для управления отдельным WebSocket соединением"""
 
-    def __init__(self, websocket: WebSocket, connection_id: str, user_id: Optional[str] = None):
+    def __init__(
+        self,
+        websocket: WebSocket,
+        connection_id: str,
+        user_id: str | None = None,
+        send_queue_size: int = 256,
+        send_timeout: float = 5.0,
+        on_evict: Callable | None = None,
+    ):
         self.websocket = websocket
         self.connection_id = connection_id
         self.user_id = user_id
@@ -40,6 +50,15 @@ class WebSocketConnection:
         self.is_authenticated = user_id is not None
         self.metadata: dict[str, Any] = {}
 
+        # Исходящие сообщения отправляет задача очереди, broadcast не ждет клиента
+        self.send_queue = ConnectionSendQueue(
+            self.send_text,
+            connection_id,
+            max_size=send_queue_size,
+            send_timeout=send_timeout,
+            on_evict=on_evict,
+        )
+
     async def send_message(self, message: dict[str, Any]):
         """Отправка сообщения через WebSocket"""
         try:
@@ -58,8 +77,13 @@ class WebSocketConnection:
             logger.error(f"Ошибка отправки текста через WebSocket {self.connection_id}: {e}")
             raise
 
+    def queue_message(self, message: dict[str, Any] | str, key: str | None = None) -> bool:
+        """Поставить сообщение в очередь отправки (без ожидания клиента)"""
+        return self.send_queue.put(encode_message(message), key)
+
     async def close(self, code: int = 1000, reason: str = ""):
         """Закрытие соединения"""
+        await self.send_queue.close()
         try:
             await self.websocket.close(code=code, reason=reason)
         except Exception as e:
@@ -89,6 +113,7 @@ class WebSocketConnection:
             "is_authenticated": self.is_authenticated,
             "subscriptions": list(self.subscriptions),
             "uptime_seconds": (datetime.now() - self.connected_at).total_seconds(),
+            "send_queue": self.send_queue.get_stats(),
         }
 
 
@@ -113,6 +138,13 @@ class WebSocketManager:
         self.heartbeat_interval = 30  # секунд
         self.connection_timeout = 300  # секунд
         self.max_connections_per_user = 5
+        self.send_queue_size = 256  # сообщений на соединение
+        self.send_timeout = 5.0  # секунд на одну отправку
+
+        # Потоки, в которых важно только последнее значение: ожидающее
+        # сообщение заменяется новым (ключ - поток + symbol/type сообщения)
+        self.coalesce_streams: set[str] = {"prices", "tickers", "orderbook", "metrics", "system"}
+        self.evicted_connections = 0
 
         # Состояние
         self._running = False
@@ -178,7 +210,14 @@ class WebSocketManager:
             await websocket.accept()
 
             # Создаем объект соединения
-            connection = WebSocketConnection(websocket, connection_id, user_id)
+            connection = WebSocketConnection(
+                websocket,
+                connection_id,
+                user_id,
+                self.send_queue_size,
+                self.send_timeout,
+                on_evict=lambda reason: self._evict(connection_id, reason),
+            )
 
             # Сохраняем соединение
             self.connections[connection_id] = connection
@@ -199,6 +238,9 @@ class WebSocketManager:
                 }
             )
 
+            # Дальше сообщения идут через очередь отправки
+            connection.send_queue.start()
+
             logger.info(f"Новое WebSocket соединение: {connection_id} (пользователь: {user_id})")
 
             # Вызываем обработчики события подключения
@@ -331,7 +373,7 @@ class WebSocketManager:
             connection.add_subscription(stream)
             self._add_to_stream(connection_id, stream)
 
-            await connection.send_message(
+            connection.queue_message(
                 {
                     "type": "subscribed",
                     "stream": stream,
@@ -350,7 +392,7 @@ class WebSocketManager:
             connection.remove_subscription(stream)
             self._remove_from_stream(connection_id, stream)
 
-            await connection.send_message(
+            connection.queue_message(
                 {
                     "type": "unsubscribed",
                     "stream": stream,
@@ -364,7 +406,7 @@ class WebSocketManager:
             connection = self.connections[connection_id]
             connection.last_ping = datetime.now()
 
-            await connection.send_message({"type": "pong", "timestamp": datetime.now().isoformat()})
+            connection.queue_message({"type": "pong", "timestamp": datetime.now().isoformat()})
 
     async def _handle_auth(self, connection_id: str, data: dict[str, Any]):
         """Обработка аутентификации"""
@@ -379,7 +421,7 @@ class WebSocketManager:
                 connection.is_authenticated = True
                 connection.user_id = "authenticated_user"
 
-                await connection.send_message(
+                connection.queue_message(
                     {
                         "type": "auth_success",
                         "user_id": connection.user_id,
@@ -387,7 +429,7 @@ class WebSocketManager:
                     }
                 )
             else:
-                await connection.send_message(
+                connection.queue_message(
                     {
                         "type": "auth_failed",
                         "error": "Invalid token",
@@ -396,60 +438,63 @@ class WebSocketManager:
                 )
 
     # =================== BROADCAST METHODS ===================
+    #
+    # Сообщение сериализуется один раз и ставится в очереди соединений;
+    # broadcast не ждет отправки клиентам.
 
-    async def broadcast_to_stream(self, stream: str, message: dict[str, Any]):
-        """Отправка сообщения всем подписчикам потока"""
-        if stream not in self.stream_subscribers:
-            return
+    async def broadcast_to_stream(
+        self, stream: str, message: dict[str, Any], coalesce_key: str | None = None
+    ):
+        """
+        Отправка сообщения всем подписчикам потока
 
-        # Создаем копию для безопасной итерации
-        subscribers = self.stream_subscribers[stream].copy()
+        Args:
+            stream: Поток
+            message: Сообщение
+            coalesce_key: Ключ схлопывания; для coalesce_streams по умолчанию
+                поток + symbol (или type) сообщения
+        """
+        subscribers = self.stream_subscribers.get(stream)
+        if not subscribers:
+            return
 
-        for connection_id in subscribers:
-            if connection_id in self.connections:
-                try:
-                    await self.connections[connection_id].send_message(message)
-                except Exception as e:
-                    logger.warning(
-                        f"Ошибка отправки сообщения в поток {stream} для соединения {connection_id}: {e}"
-                    )
-                    # Удаляем неработающее соединение
-                    await self.disconnect(connection_id, code=1011, reason="Send error")
+        if coalesce_key is None and stream in self.coalesce_streams:
+            coalesce_key = f"{stream}:{message.get('symbol') or message.get('type') or ''}"
+        self._fan_out(list(subscribers), encode_message(message), coalesce_key)
 
     async def broadcast_to_user(self, user_id: str, message: dict[str, Any]):
         """Отправка сообщения всем соединениям пользователя"""
-        if user_id not in self.user_connections:
+        connection_ids = self.user_connections.get(user_id)
+        if not connection_ids:
             return
 
-        # Создаем копию для безопасной итерации
-        connection_ids = self.user_connections[user_id].copy()
-
-        for connection_id in connection_ids:
-            if connection_id in self.connections:
-                try:
-                    await self.connections[connection_id].send_message(message)
-                except Exception as e:
-                    logger.warning(
-                        f"Ошибка отправки сообщения пользователю {user_id} для соединения {connection_id}: {e}"
-                    )
-                    # Удаляем неработающее соединение
-                    await self.disconnect(connection_id, code=1011, reason="Send error")
+        self._fan_out(list(connection_ids), encode_message(message))
 
-    async def broadcast_to_all(self, message: dict[str, Any]):
+    async def broadcast_to_all(self, message: dict[str, Any], coalesce_key: str | None = None):
         """Отправка сообщения всем подключенным клиентам"""
-        # Создаем копию для безопасной итерации
-        connection_ids = list(self.connections.keys())
+        self._fan_out(list(self.connections), encode_message(message), coalesce_key)
 
+    def _fan_out(self, connection_ids: list[str], text: str, key: str | None = None):
+        """Постановка готового текста в очереди соединений"""
         for connection_id in connection_ids:
-            if connection_id in self.connections:
-                try:
-                    await self.connections[connection_id].send_message(message)
-                except Exception as e:
-                    logger.warning(
-                        f"Ошибка broadcast сообщения для соединения {connection_id}: {e}"
-                    )
-                    # Удаляем неработающее соединение
-                    await self.disconnect(connection_id, code=1011, reason="Send error")
+            connection = self.connections.get(connection_id)
+            if connection is not None:
+                # Переполнение обрабатывает очередь: схлопывание или отключение
+                connection.send_queue.put(text, key)
+
+    async def _evict(self, connection_id: str, reason: str):
+        """Отключение соединения, которое не успевает получать сообщения"""
+        connection = self.connections.get(connection_id)
+        if connection is None:
+            return
+
+        self.evicted_connections += 1
+        logger.warning(
+            f"WebSocket {connection_id} отключен: {reason} "
+            f"(очередь: {connection.send_queue.get_stats()})"
+        )
+        code = 1011 if reason == EVICT_SEND_ERROR else 1008
+        await self.disconnect(connection_id, code=code, reason=reason)
 
     # =================== UTILITY METHODS ===================
 
@@ -540,6 +585,20 @@ class WebSocketManager:
             "heartbeat_interval": self.heartbeat_interval,
             "connection_timeout": self.connection_timeout,
             "max_connections_per_user": self.max_connections_per_user,
+            "send_queues": self._send_queue_stats(),
+        }
+
+    def _send_queue_stats(self) -> dict[str, Any]:
+        """Суммарная статистика очередей отправки"""
+        stats = [conn.send_queue.get_stats() for conn in self.connections.values()]
+        return {
+            "queue_size": self.send_queue_size,
+            "queued": sum(item["queued"] for item in stats),
+            "max_depth": max((item["max_depth"] for item in stats), default=0),
+            "sent": sum(item["sent"] for item in stats),
+            "dropped": sum(item["dropped"] for item in stats),
+            "coalesced": sum(item["coalesced"] for item in stats),
+            "evicted_connections": self.evicted_connections,
         }
 
     def get_connections_info(self) -> list[dict[str, Any]]:
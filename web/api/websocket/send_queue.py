@@ -0,0 +1,181 @@
+"""
+Очереди отправки WebSocket соединений
+
+Broadcast не ждет клиентов: сообщение сериализуется один раз и кладется в
+ограниченную очередь каждого соединения, отправку выполняет отдельная задача
+соединения. Медленный клиент задерживает только свою очередь:
+
+- сообщения с ключом (цены, метрики) схлопываются - в очереди остается
+  последнее значение по ключу; при переполнении первыми отбрасываются они;
+- если очередь заполнена сообщениями без ключа или одна отправка дольше
+  send_timeout, соединение отключается как медленный потребитель.
+"""
+
+import asyncio
+import json
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+EVICT_SLOW = "Slow consumer"
+EVICT_SEND_ERROR = "Send error"
+
+
+def encode_message(message: dict[str, Any] | str) -> str:
+    """JSON сообщения (строка передается как есть)"""
+    if isinstance(message, str):
+        return message
+    return json.dumps(message, ensure_ascii=False)
+
+
+class ConnectionSendQueue:
+    """
+    Ограниченная очередь отправки одного соединения
+
+    Args:
+        send: Отправка текста клиенту
+        name: Имя соединения для логов и статистики
+        max_size: Максимум сообщений в очереди
+        send_timeout: Максимальное время одной отправки (секунды)
+        on_evict: Вызывается один раз при отключении (причина)
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[Any]],
+        name: str = "",
+        max_size: int = 256,
+        send_timeout: float = 5.0,
+        on_evict: Callable[[str], Awaitable[Any]] | None = None,
+    ):
+        self.name = name
+        self.max_size = max_size
+        self.send_timeout = send_timeout
+        self._send = send
+        self._on_evict = on_evict
+
+        self._queue: deque[list] = deque()  # [ключ, текст]
+        self._keyed: dict[str, list] = {}
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._evict_task: asyncio.Task | None = None
+
+        self.closed = False
+        self.evicted: str | None = None
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> None:
+        """Запускает задачу отправки (нужен работающий event loop)"""
+        if self._task is None and not self.closed:
+            self._task = asyncio.create_task(self._writer(), name=f"ws-send-{self.name}")
+
+    def put(self, text: str, key: str | None = None) -> bool:
+        """
+        Ставит сообщение в очередь без ожидания
+
+        Args:
+            text: Сериализованное сообщение
+            key: Ключ схлопывания - новое значение заменяет ожидающее с тем же ключом
+
+        Returns:
+            False, если соединение закрыто или отключено как медленное
+        """
+        if self.closed:
+            return False
+        self.start()
+
+        if key is not None:
+            pending = self._keyed.get(key)
+            if pending is not None:
+                pending[1] = text
+                self.coalesced += 1
+                return True
+
+        if len(self._queue) >= self.max_size and not self._make_room():
+            if key is not None:
+                self.dropped += 1
+                return True
+            self._evict(EVICT_SLOW)
+            return False
+
+        entry = [key, text]
+        self._queue.append(entry)
+        if key is not None:
+            self._keyed[key] = entry
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._ready.set()
+        return True
+
+    def discard(self) -> asyncio.Task | None:
+        """Останавливает отправку без ожидания; неотправленные сообщения отбрасываются"""
+        self.closed = True
+        self._queue.clear()
+        self._keyed.clear()
+        task = self._task
+        if task is None or task is asyncio.current_task() or task.done():
+            return None
+        task.cancel()
+        return task
+
+    async def close(self) -> None:
+        """Останавливает отправку и ждет завершения задачи"""
+        task = self.discard()
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "evicted": self.evicted,
+        }
+
+    def _make_room(self) -> bool:
+        """Отбрасывает самое старое сообщение с ключом"""
+        for entry in self._queue:
+            if entry[0] is not None:
+                self._queue.remove(entry)
+                del self._keyed[entry[0]]
+                self.dropped += 1
+                return True
+        return False
+
+    def _evict(self, reason: str) -> None:
+        if self.evicted is not None:
+            return
+        self.evicted = reason
+        self.closed = True
+        self._queue.clear()
+        self._keyed.clear()
+        self._ready.set()
+        if self._on_evict is not None:
+            self._evict_task = asyncio.create_task(self._on_evict(reason))
+
+    async def _writer(self) -> None:
+        while not self.closed:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            entry = self._queue.popleft()
+            key, text = entry
+            if key is not None and self._keyed.get(key) is entry:
+                del self._keyed[key]
+
+            try:
+                await asyncio.wait_for(self._send(text), self.send_timeout)
+                self.sent += 1
+            except asyncio.TimeoutError:
+                self._evict(EVICT_SLOW)
+            except Exception:
+                self._evict(EVICT_SEND_ERROR)
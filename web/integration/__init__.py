@@ -9,13 +9,17 @@ Web Integration Layer для BOT_Trading v3.0
 - permissions: Система прав доступа
 """
 
+from core.lazy_imports import lazy_exports
+
 from .data_adapters import DataAdapters
 
 # from .dependencies import Dependencies  # TODO: Добавить класс Dependencies
 from .event_bridge import EventBridge
 
 # from .permissions import PermissionManager  # TODO: Добавить файл permissions.py
-from .web_integration import WebIntegration
+
+# WebIntegration тянет SystemOrchestrator и uvicorn - только по требованию
+__getattr__ = lazy_exports(__name__, {"WebIntegration": ".web_integration"})
 
 __all__ = [
     "DataAdapters",
@@ -13,13 +13,14 @@ Event Bridge для BOT_Trading v3.0
 """
 
 import asyncio
-import json
+import contextlib
 from collections.abc import Callable
 from datetime import datetime
 from enum import Enum
 from typing import Any, Optional
 
 from core.logging.logger_factory import get_global_logger_factory
+from web.api.websocket.send_queue import ConnectionSendQueue, encode_message
 
 logger_factory = get_global_logger_factory()
 logger = logger_factory.get_logger("event_bridge")
@@ -72,6 +73,17 @@ class EventType(Enum):
     STRATEGY_DEACTIVATED = "strategy_deactivated"
 
 
+# Частые события: в очереди клиента остается только последнее значение
+# по ключу (тип + symbol/exchange/trader_id)
+COALESCED_EVENTS = {
+    EventType.SYSTEM_METRICS_UPDATE,
+    EventType.SYSTEM_STATUS_UPDATE,
+    EventType.EXCHANGE_LATENCY_UPDATE,
+    EventType.POSITION_UPDATED,
+    EventType.TRADER_STATUS_CHANGED,
+}
+
+
 class EventBridge:
     """
     Мост событий между системой бота и веб-интерфейсом
@@ -100,6 +112,8 @@ class EventBridge:
         # Подписчики на события
         self.event_handlers: dict[EventType, list[Callable]] = {}
         self.websocket_connections: set = set()
+        self._send_queues: dict[Any, ConnectionSendQueue] = {}
+        self.evicted_connections = 0
 
         # Фильтры событий
         self.event_filters: dict[str, Callable] = {}
@@ -360,7 +374,9 @@ class EventBridge:
             # Применяем фильтры
             if await self._should_emit_event(event_type, data):
                 # Отправляем через WebSocket
-                await self._broadcast_to_websockets(event_message)
+                await self._broadcast_to_websockets(
+                    event_message, self._coalesce_key(event_type, data)
+                )
 
                 # Вызываем локальные обработчики
                 await self._call_local_handlers(event_type, data)
@@ -382,23 +398,44 @@ class EventBridge:
             logger.error(f"Ошибка проверки фильтра события {event_type.value}: {e}")
             return True
 
-    async def _broadcast_to_websockets(self, message: dict[str, Any]):
-        """Отправка сообщения всем WebSocket подключениям"""
+    @staticmethod
+    def _coalesce_key(event_type: EventType, data: dict[str, Any]) -> str | None:
+        """Ключ схлопывания для частых событий, где важно только последнее значение"""
+        if event_type not in COALESCED_EVENTS:
+            return None
+        target = data.get("symbol") or data.get("exchange") or data.get("trader_id") or ""
+        return f"{event_type.value}:{target}"
+
+    async def _broadcast_to_websockets(self, message: dict[str, Any], key: str | None = None):
+        """
+        Отправка сообщения всем WebSocket подключениям
+
+        Сообщение сериализуется один раз и ставится в очереди соединений,
+        отправку клиентам выполняют задачи очередей - событие не ждет клиентов.
+        """
         if not self.websocket_connections:
             return
 
-        message_json = json.dumps(message, ensure_ascii=False)
+        message_json = encode_message(message)
 
         # Создаем копию множества для итерации
-        connections_copy = self.websocket_connections.copy()
-
-        for websocket in connections_copy:
-            try:
-                await websocket.send_text(message_json)
-            except Exception as e:
-                logger.warning(f"Ошибка отправки сообщения через WebSocket: {e}")
-                # Удаляем неработающее соединение
-                self.websocket_connections.discard(websocket)
+        for websocket in self.websocket_connections.copy():
+            send_queue = self._send_queues.get(websocket)
+            if send_queue is None:
+                send_queue = self._create_send_queue(websocket)
+            send_queue.put(message_json, key)
+
+    def _create_send_queue(self, websocket) -> ConnectionSendQueue:
+        async def evict(reason: str):
+            self.evicted_connections += 1
+            logger.warning(f"WebSocket соединение отключено: {reason}")
+            self.remove_websocket_connection(websocket)
+            with contextlib.suppress(Exception):
+                await websocket.close(code=1008, reason=reason)
+
+        send_queue = ConnectionSendQueue(websocket.send_text, str(id(websocket)), on_evict=evict)
+        self._send_queues[websocket] = send_queue
+        return send_queue
 
     async def _call_local_handlers(self, event_type: EventType, data: dict[str, Any]):
         """Вызов локальных обработчиков события"""
@@ -414,11 +451,15 @@ class EventBridge:
     def add_websocket_connection(self, websocket):
         """Добавить WebSocket соединение"""
         self.websocket_connections.add(websocket)
+        self._create_send_queue(websocket)
         logger.info(f"Добавлено WebSocket соединение. Всего: {len(self.websocket_connections)}")
 
     def remove_websocket_connection(self, websocket):
         """Удалить WebSocket соединение"""
         self.websocket_connections.discard(websocket)
+        send_queue = self._send_queues.pop(websocket, None)
+        if send_queue is not None:
+            send_queue.discard()
         logger.info(f"Удалено WebSocket соединение. Осталось: {len(self.websocket_connections)}")
 
     # =================== EVENT SUBSCRIPTION ===================
@@ -483,6 +524,12 @@ class EventBridge:
         return {
             "active": self._active,
             "websocket_connections": len(self.websocket_connections),
+            "send_queues": {
+                "queued": sum(len(send_queue) for send_queue in self._send_queues.values()),
+                "dropped": sum(send_queue.dropped for send_queue in self._send_queues.values()),
+                "coalesced": sum(send_queue.coalesced for send_queue in self._send_queues.values()),
+                "evicted_connections": self.evicted_connections,
+            },
             "event_handlers_count": sum(len(handlers) for handlers in self.event_handlers.values()),
             "event_filters_count": len(self.event_filters),
             "last_heartbeat": self._last_heartbeat.isoformat(),
@@ -502,6 +549,9 @@ class EventBridge:
         self._active = False
 
         # Закрываем все WebSocket соединения
+        for send_queue in self._send_queues.values():
+            await send_queue.close()
+        self._send_queues.clear()
         for websocket in self.websocket_connections.copy():
             try:
                 await websocket.close()
@@ -16,6 +16,16 @@ project_root = Path(__file__).parent.parent.absolute()
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+# Профайлер импорта включается до остальных импортов, но после настройки
+# sys.path, поэтому импорты ниже идут после кода (noqa: E402)
+from core.startup_profiler import (  # noqa: E402
+    PROFILE_FLAG,
+    import_profiler,
+    start_if_requested,
+)
+
+start_if_requested()
+
 # Проверяем виртуальное окружение
 if not hasattr(sys, "real_prefix") and not (
     hasattr(sys, "base_prefix") and sys.base_prefix != sys.prefix
@@ -29,7 +39,7 @@ if not hasattr(sys, "real_prefix") and not (
 print(f"✅ Используется Python из venv: {sys.executable}")
 
 # Импортируем после добавления пути
-from web.api.main import start_web_server
+from web.api.main import start_web_server  # noqa: E402
 
 
 def setup_environment():
@@ -47,9 +57,16 @@ async def main():
     parser.add_argument("--port", type=int, default=8083, help="Port to bind to (default: 8083)")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload for development")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument(
+        PROFILE_FLAG, action="store_true", help="Report module import times on startup"
+    )
 
     args = parser.parse_args()
 
+    if import_profiler.active:
+        print(import_profiler.report())
+        import_profiler.stop()
+
     # Настройка окружения
     setup_environment()
 